@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Turn large CSV/TSV/JSONL exports into laid-out .drawio org charts and inventories.
+
+With ``--parent`` each row hangs under the row its parent column names and
+the result is a tidy tree; without it, ``--links`` columns connect the rows
+as a graph.  Rows are streamed: only a few numbers per row are kept for the
+whole file, and pages are laid out and written one at a time.  Subtrees
+that do not fit in ``--page-size`` rows move to their own page, linked from
+a dashed stub; ``--group`` draws large subtrees as swimlane containers.
+
+Examples:
+    python3 csv2drawio.py employees.csv --parent manager_id --label name,title
+    python3 csv2drawio.py staff.csv --parent boss --group 25 --kind dept -o org.drawio
+    python3 csv2drawio.py assets.jsonl --id arn --links depends_on --kind type -d LR --icons
+    some-export | python3 csv2drawio.py - --parent parent -o - > out.drawio
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mxfile import MxFileError
+from mxfile.ingest import FORMATS, Columns, ingest
+from mxfile.layout import DIRECTIONS
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV, TSV or JSONL file, or - for stdin")
+    parser.add_argument("-o", "--out",
+                        help="output file or - for stdout (default: next to the input)")
+    parser.add_argument("-f", "--format", choices=FORMATS,
+                        help="input format (default: from the extension or content)")
+    parser.add_argument("--id", default="id", help="column with the row id (default: id)")
+    parser.add_argument("--parent", help="column with the parent row's id")
+    parser.add_argument("--label", help="comma-separated label columns (default: name)")
+    parser.add_argument("--links", help="column listing related row ids (;-separated)")
+    parser.add_argument("--kind", help="column that picks the colour")
+    parser.add_argument("-d", "--direction", choices=DIRECTIONS, default="TB")
+    parser.add_argument("--page-size", type=int, default=1000,
+                        help="max rows per page (default: 1000)")
+    parser.add_argument("--group", type=int, default=0,
+                        help="draw subtrees of at least N rows as swimlanes")
+    parser.add_argument("--stack", type=int, default=8,
+                        help="stack N or more leaf children in a column (0 = never)")
+    parser.add_argument("--icons", action="store_true",
+                        help="draw rows whose --kind names a cloud service as its icon")
+    parser.add_argument("--no-data", action="store_true",
+                        help="do not keep other columns as cell attributes")
+    parser.add_argument("--compressed", action="store_true",
+                        help="store pages compressed, like draw.io does by default")
+    parser.add_argument("--time", action="store_true", help="print elapsed time")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+
+    columns = Columns(
+        id=args.id,
+        parent=args.parent,
+        label=tuple(name.strip() for name in args.label.split(",")) if args.label else (),
+        links=args.links,
+        kind=args.kind,
+    )
+    options = dict(
+        fmt=args.format, direction=args.direction, page_size=args.page_size,
+        group=args.group, stack=args.stack, data=not args.no_data,
+        icons=args.icons, compressed=args.compressed,
+    )
+
+    spooled = None
+    try:
+        if args.input == "-":
+            # Rows are read back by offset, so stdin is spooled to a file.
+            with tempfile.NamedTemporaryFile("wb", suffix=".rows", delete=False) as fh:
+                shutil.copyfileobj(sys.stdin.buffer, fh)
+            source = spooled = Path(fh.name)
+            name = "diagram"
+            if args.out is None:
+                args.out = "-"
+        else:
+            source = Path(args.input)
+            name = source.stem
+        if args.out == "-":
+            stats = ingest(source, sys.stdout, columns, name=name, **options)
+        else:
+            target = Path(args.out) if args.out else source.with_suffix(".drawio")
+            tmp = target.with_name(target.name + ".tmp")
+            try:
+                with open(tmp, "w", encoding="utf-8") as out:
+                    stats = ingest(source, out, columns, name=name, **options)
+                os.replace(tmp, target)
+            finally:
+                tmp.unlink(missing_ok=True)
+    except (MxFileError, OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if spooled is not None:
+            spooled.unlink()
+
+    notes = []
+    if stats.unknown:
+        notes.append(f"{stats.unknown} unknown ids")
+    if stats.cycles:
+        notes.append(f"{stats.cycles} parent cycles cut")
+    if stats.cross_page:
+        notes.append(f"{stats.cross_page} links across pages left out")
+    if stats.no_icon:
+        notes.append(f"{stats.no_icon} kinds without an icon")
+    print(f"{stats.rows} rows, {stats.edges} edges on {stats.pages} pages"
+          + (f" ({', '.join(notes)})" if notes else ""), file=sys.stderr)
+    if args.time:
+        print(f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Convert Mermaid (.mmd) diagrams to laid-out .drawio files, offline.
+
+Supports flowchart/graph, stateDiagram(-v2), sequenceDiagram, classDiagram
+and erDiagram.  Directories are searched recursively for ``*.mmd``; outputs
+that are newer than their source are skipped unless ``--force`` is given.
+
+Examples:
+    python3 mmd2drawio.py ../examples/ec2_lifecycle.mmd
+    python3 mmd2drawio.py diagrams/ -o build/ -j 8
+    python3 mmd2drawio.py flow.mmd -o - | less
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from mxfile import MxFileError
+from mxfile.convert import convert, convert_file
+
+
+def collect(inputs: list[str]) -> list[tuple[Path, Path]]:
+    """(source, path relative to its input root) for every diagram."""
+    found = []
+    for name in inputs:
+        path = Path(name)
+        if path.is_dir():
+            found.extend((p, p.relative_to(path)) for p in sorted(path.rglob("*.mmd")))
+        else:
+            found.append((path, Path(path.name)))
+    return found
+
+
+def target_for(source: Path, relative: Path, out: str | None, single: bool) -> Path:
+    if out is None:
+        return source.with_suffix(".drawio")
+    if single and not out.endswith(os.sep) and not Path(out).is_dir():
+        return Path(out)
+    return Path(out, relative).with_suffix(".drawio")
+
+
+def run_one(job: tuple[Path, Path, bool]) -> tuple[Path, str | None]:
+    source, target, compressed = job
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        convert_file(source, target, compressed=compressed)
+    except (MxFileError, OSError, UnicodeDecodeError) as exc:
+        return source, str(exc)
+    return source, None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help=".mmd files or directories")
+    parser.add_argument("-o", "--out",
+                        help="output file (one input), directory, or - for stdout")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="worker processes (0 = one per CPU)")
+    parser.add_argument("--compressed", action="store_true",
+                        help="store pages compressed, like draw.io does by default")
+    parser.add_argument("--force", action="store_true",
+                        help="convert even when the output is up to date")
+    parser.add_argument("--time", action="store_true", help="print elapsed time")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+
+    sources = collect(args.inputs)
+    if args.out == "-":
+        if len(sources) != 1:
+            parser.error("-o - needs exactly one input file")
+        try:
+            convert(sources[0][0].read_text(encoding="utf-8"), sys.stdout,
+                    name=sources[0][0].stem, compressed=args.compressed)
+        except (MxFileError, OSError) as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        return 0
+
+    single = len(sources) == 1 and not Path(args.inputs[0]).is_dir()
+    jobs = []
+    for source, relative in sources:
+        target = target_for(source, relative, args.out, single)
+        if (not args.force and target.exists()
+                and target.stat().st_mtime_ns >= source.stat().st_mtime_ns):
+            continue
+        jobs.append((source, target, args.compressed))
+
+    workers = args.jobs or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        results = [run_one(job) for job in jobs]
+
+    failed = 0
+    for source, error in results:
+        if error is not None:
+            failed += 1
+            print(f"error: {source}: {error}", file=sys.stderr)
+    print(f"{len(results) - failed} converted, {len(sources) - len(jobs)} up to date"
+          + (f", {failed} failed" if failed else ""), file=sys.stderr)
+    if args.time:
+        print(f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
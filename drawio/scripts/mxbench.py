@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Benchmark the skill's parse, edit, write, layout and render paths.
+
+Times each case on synthetic diagrams shaped like the bundled examples, at
+sizes from the examples' 30 cells up to 100,000, and writes the results as
+JSON.  When a baseline exists (``run --save-baseline`` stores one in the
+skill cache, or pass ``--baseline``), the run is compared with it and exits 1
+if any case's median time got slower by more than ``--threshold`` and by
+more than three times the spread between runs.  Baselines only mean
+something on the machine that recorded them.
+
+To see where a slow real-world run spends its time instead, set
+``DRAWIO_SKILL_PROFILE=1`` (or ``alloc``) for any script; see
+``mxfile.profile``.
+
+Examples:
+    python3 mxbench.py run -o bench.json
+    python3 mxbench.py run --sizes 30,1000 --cases parse,edit,compress
+    python3 mxbench.py run --save-baseline
+    python3 mxbench.py run --baseline ci/bench-baseline.json --threshold 0.2
+    python3 mxbench.py compare before.json after.json
+    python3 mxbench.py list
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from mxfile import MxFileError
+from mxfile.bench import CASES, SIZES, Comparison, Result, comparable, compare, run
+from mxfile.cache import cache_dir
+
+
+def default_baseline() -> Path:
+    return cache_dir("bench") / "baseline.json"
+
+
+def show(result: Result) -> None:
+    alloc = f"  {result.alloc_peak_kb / 1024:8.1f} MiB" if result.alloc_peak_kb is not None else ""
+    print(f"{result.case:<11} {result.cells:>7} cells {result.best_ms:>10.2f} ms "
+          f"(median {result.median_ms:.2f} ± {result.spread_ms:.2f}, {result.runs} runs){alloc}",
+          file=sys.stderr)
+
+
+def report(comparisons: list[Comparison]) -> int:
+    """Print the comparison; return the number of regressions."""
+    print(f"{'case':<11} {'cells':>7} {'base med':>10} {'new med':>10} {'change':>8}  status",
+          file=sys.stderr)
+    for c in comparisons:
+        base = "-" if c.base_ms is None else f"{c.base_ms:.2f}"
+        new = "-" if c.new_ms is None else f"{c.new_ms:.2f}"
+        change = "" if c.ratio is None else f"{(c.ratio - 1) * 100:+.0f}%"
+        print(f"{c.case:<11} {c.cells:>7} {base:>10} {new:>10} {change:>8}  {c.status}",
+              file=sys.stderr)
+    regressions = sum(c.status == "regression" for c in comparisons)
+    faster = sum(c.status == "faster" for c in comparisons)
+    print(f"{regressions} regressions, {faster} faster", file=sys.stderr)
+    return regressions
+
+
+def check(baseline: dict, current: dict, threshold: float) -> int:
+    reasons = comparable(baseline, current)
+    for reason in reasons:
+        print(f"warning: baseline differs: {reason}; not failing on regressions",
+              file=sys.stderr)
+    regressions = report(compare(baseline, current, threshold))
+    return 1 if regressions and not reasons else 0
+
+
+def load(path: str | Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except ValueError as exc:
+        raise MxFileError(f"{path}: not a benchmark report: {exc}") from exc
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    cases = args.cases.split(",") if args.cases else None
+    for name in cases or ():
+        if name not in CASES:
+            raise MxFileError(f"unknown case {name!r}; choose from {', '.join(CASES)}")
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")] if args.sizes else list(SIZES)
+    except ValueError:
+        raise MxFileError(f"invalid --sizes: {args.sizes!r}") from None
+    baseline_path = Path(args.baseline) if args.baseline else default_baseline()
+    baseline = load(baseline_path) if baseline_path.exists() else None
+    if args.baseline and baseline is None:
+        raise MxFileError(f"no baseline at {baseline_path}")
+
+    current = run(cases, sizes, repeat=args.repeat, budget=args.budget,
+                  min_runs=args.min_runs, alloc=args.alloc, progress=show)
+    text = json.dumps(current, indent=1) + "\n"
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+
+    status = 0
+    if baseline is not None and not args.save_baseline:
+        status = check(baseline, current, args.threshold)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(text, encoding="utf-8")
+        print(f"baseline saved to {baseline_path}", file=sys.stderr)
+    return status
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    return check(load(args.baseline), load(args.current), args.threshold)
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    for case in CASES.values():
+        print(f"{case.name:<11} {case.description}")
+    print(f"default sizes: {', '.join(str(size) for size in SIZES)} cells")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="run the benchmarks")
+    p.add_argument("--cases", help="comma-separated cases (default: all; see 'list')")
+    p.add_argument("--sizes", help="comma-separated cell counts (default: 30,1000,10000,100000)")
+    p.add_argument("--repeat", type=int, default=9,
+                   help="most runs per case and size (default: 9)")
+    p.add_argument("--budget", type=float, default=3.0,
+                   help="stop repeating a case after this many seconds (default: 3)")
+    p.add_argument("--min-runs", type=int, default=3,
+                   help="runs per case and size regardless of --budget (default: 3)")
+    p.add_argument("--alloc", action="store_true",
+                   help="also measure each case's peak Python allocation")
+    p.add_argument("-o", "--out", help="write the JSON report here instead of stdout")
+    p.add_argument("--baseline", help="report to compare with (default: the saved baseline)")
+    p.add_argument("--save-baseline", action="store_true",
+                   help="store this run as the baseline instead of comparing")
+    p.add_argument("--threshold", type=float, default=0.25,
+                   help="median slowdown that counts as a regression (default: 0.25 = 25%%)")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("compare", help="compare two saved reports")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.25)
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser("list", help="list the benchmark cases")
+    p.set_defaults(func=cmd_list)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (MxFileError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
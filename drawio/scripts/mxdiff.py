@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Semantic diff and three-way merge of .drawio files.
+
+``diff`` reports added, removed and changed cells, keeping moves and resizes
+apart from label, style and connection changes.  With one file it compares
+the working copy against git (``HEAD`` unless ``--rev`` is given).
+
+``merge`` is a git merge driver: it merges ``%O %A %B`` into ``%A`` and exits
+1 if there were conflicts (conflicting properties keep our side).
+``install-driver`` registers it for ``*.drawio`` in the current repository.
+
+Examples:
+    python3 mxdiff.py diff arch.drawio
+    python3 mxdiff.py diff old.drawio new.drawio --limit 50
+    python3 mxdiff.py merge base.drawio ours.drawio theirs.drawio -o merged.drawio
+    python3 mxdiff.py install-driver
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shlex
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from mxfile import MxFileError
+from mxfile.diff import diff, plain, summarize
+from mxfile.merge import merge_files
+
+
+def git_show(path: Path, rev: str) -> bytes:
+    """Contents of ``path`` at ``rev``."""
+    top = subprocess.run(
+        ["git", "-C", str(path.parent or "."), "rev-parse", "--show-toplevel"],
+        capture_output=True, text=True,
+    )
+    if top.returncode:
+        raise MxFileError(f"{path} is not in a git repository")
+    relative = path.resolve().relative_to(Path(top.stdout.strip()).resolve())
+    shown = subprocess.run(
+        ["git", "-C", top.stdout.strip(), "show", f"{rev}:{relative.as_posix()}"],
+        capture_output=True,
+    )
+    if shown.returncode:
+        raise MxFileError(shown.stderr.decode(errors="replace").strip())
+    return shown.stdout
+
+
+def cmd_diff(args: argparse.Namespace) -> int:
+    if len(args.files) == 1:
+        path = Path(args.files[0])
+        old, new = git_show(path, args.rev), path
+    elif len(args.files) == 2:
+        old, new = Path(args.files[0]), Path(args.files[1])
+    else:
+        raise MxFileError("diff takes one or two files")
+    pages = diff(old, new)
+    if args.json:
+        json.dump([
+            {
+                "page": page.name,
+                "changes": [
+                    {
+                        "kind": change.kind,
+                        "id": change.id,
+                        "old_id": change.old_id,
+                        "aspects": list(change.aspects),
+                        "label": plain((change.new or change.old).value, 200),
+                    }
+                    for change in page.changes
+                ],
+            }
+            for page in pages
+        ], sys.stdout, indent=1)
+        print()
+    else:
+        print(summarize(pages, args.limit))
+    return 0
+
+
+def cmd_merge(args: argparse.Namespace) -> int:
+    conflicts = merge_files(args.base, args.ours, args.theirs, args.out)
+    for conflict in conflicts:
+        print(f"conflict: {conflict}", file=sys.stderr)
+    return 1 if conflicts else 0
+
+
+def cmd_install_driver(args: argparse.Namespace) -> int:
+    script = Path(__file__).resolve()
+    driver = f"{shlex.quote(sys.executable)} {shlex.quote(str(script))} merge %O %A %B"
+    scope = ["--global"] if args.global_ else []
+    for key, value in (("name", "draw.io semantic merge"), ("driver", driver)):
+        subprocess.run(["git", "config", *scope, f"merge.drawio.{key}", value], check=True)
+    if args.global_:
+        print("registered merge.drawio globally; add '*.drawio merge=drawio' to .gitattributes")
+        return 0
+    top = subprocess.run(["git", "rev-parse", "--show-toplevel"],
+                         capture_output=True, text=True, check=True).stdout.strip()
+    attributes = Path(top, ".gitattributes")
+    line = "*.drawio merge=drawio"
+    existing = attributes.read_text(encoding="utf-8").splitlines() if attributes.exists() else []
+    if line not in existing:
+        with open(attributes, "a", encoding="utf-8") as fh:
+            if existing and existing[-1]:
+                fh.write("\n")
+            fh.write(line + "\n")
+    print(f"registered merge.drawio and added '{line}' to {attributes}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--time", action="store_true", help="print elapsed time")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("diff", help="summarize changes between two files, or file vs git")
+    p.add_argument("files", nargs="+", metavar="file")
+    p.add_argument("--rev", default="HEAD", help="git revision for one-file diffs")
+    p.add_argument("--limit", type=int, default=20, help="max lines per page")
+    p.add_argument("--json", action="store_true", help="machine-readable output")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("merge", help="three-way merge (git merge driver)")
+    p.add_argument("base")
+    p.add_argument("ours")
+    p.add_argument("theirs")
+    p.add_argument("-o", "--out", help="output file (default: overwrite ours)")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("install-driver", help="register the merge driver with git")
+    p.add_argument("--global", dest="global_", action="store_true",
+                   help="register in ~/.gitconfig instead of this repository")
+    p.set_defaults(func=cmd_install_driver)
+
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    try:
+        status = args.func(args)
+    except (MxFileError, OSError, subprocess.CalledProcessError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    if args.time:
+        print(f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
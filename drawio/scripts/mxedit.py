@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Inspect and edit .drawio files without loading them whole.
+
+Examples:
+    python3 mxedit.py info arch.drawio
+    python3 mxedit.py show arch.drawio svc_user
+    python3 mxedit.py add-vertex arch.drawio --id cloudwatch --value CloudWatch \\
+        --style "...;shape=mxgraph.aws4.cloudwatch_2;" --x 900 --y 130 --w 60 --h 60
+    python3 mxedit.py add-vertex arch.drawio --icon "step functions" --value Orders --x 900
+    python3 mxedit.py add-edge arch.drawio svc_user cloudwatch --value metrics
+    python3 mxedit.py set arch.drawio cloudwatch --value "Amazon CloudWatch"
+    python3 mxedit.py delete arch.drawio cloudwatch --cascade
+    python3 mxedit.py compress arch.drawio
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from mxfile import CellIndex, Editor, MxFileError, recode
+from mxfile.icons import load_catalog
+
+
+def check_icons(style: str | None) -> None:
+    """Warn about icon shapes draw.io would draw as blank boxes.
+
+    Only the built catalog knows every stencil; with the seed alone there is
+    nothing to check against.
+    """
+    if not style:
+        return
+    catalog = load_catalog()
+    if not catalog.complete:
+        return
+    for ref in catalog.unknown(style):
+        matches = catalog.search(ref, 1)
+        hint = f" (did you mean {matches[0].icon.id}?)" if matches else ""
+        print(f"warning: unknown icon {ref}{hint}", file=sys.stderr)
+
+
+def cmd_info(args: argparse.Namespace) -> None:
+    with CellIndex(args.file) as index:
+        for page in index.pages():
+            kind = "compressed" if page.compressed else "plain"
+            print(f"[{page.index}] {page.name or ''} (id={page.id}, {kind}): "
+                  f"{index.count(page.index)} cells")
+
+
+def cmd_show(args: argparse.Namespace) -> None:
+    with CellIndex(args.file) as index:
+        page = index.page(args.page)
+        cell = index.get(args.id, page.index)
+        print(index.read_cell(cell, page).decode("utf-8"))
+        for edge in index.edges(args.id, page.index):
+            print(f"edge {edge.id}: {edge.source} -> {edge.target}"
+                  + (f" ({edge.value})" if edge.value else ""))
+        for child in index.children(args.id, page.index):
+            print(f"child {child.id}: {child.value!r}")
+
+
+def cmd_add_vertex(args: argparse.Namespace) -> None:
+    style, width, height = args.style, args.w, args.h
+    if args.icon:
+        icon = load_catalog().lookup(args.icon)
+        if icon is None:
+            raise MxFileError(f"no icon matches {args.icon!r}; try mxicons.py find")
+        style = style or icon.style()
+        width = width or icon.width or None
+        height = height or icon.height or None
+    check_icons(style)
+    with Editor(args.file) as ed:
+        cell = ed.add_vertex(
+            args.value, style or "rounded=1;whiteSpace=wrap;html=1;",
+            args.x, args.y, width or 120, height or 60,
+            id=args.id, parent=args.parent, page=args.page,
+        )
+    print(cell.id)
+
+
+def cmd_add_edge(args: argparse.Namespace) -> None:
+    kwargs = {"style": args.style} if args.style else {}
+    with Editor(args.file) as ed:
+        cell = ed.add_edge(
+            args.source, args.target, args.value or "",
+            id=args.id, parent=args.parent, page=args.page, **kwargs,
+        )
+    print(cell.id)
+
+
+def cmd_set(args: argparse.Namespace) -> None:
+    geometry = {
+        key: value
+        for key, value in (("x", args.x), ("y", args.y), ("width", args.w), ("height", args.h))
+        if value is not None
+    }
+    check_icons(args.style)
+    with Editor(args.file) as ed:
+        ed.update(args.id, page=args.page, value=args.value, style=args.style,
+                  geometry=geometry or None)
+
+
+def cmd_delete(args: argparse.Namespace) -> None:
+    with Editor(args.file) as ed:
+        removed = ed.delete(args.id, page=args.page, cascade=args.cascade)
+    print("removed: " + ", ".join(removed))
+
+
+def cmd_recode(args: argparse.Namespace) -> None:
+    changed = recode(args.file, compressed=args.command == "compress")
+    print(f"{changed} page(s) {args.command}ed")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--time", action="store_true", help="print elapsed time")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def command(name: str, func, help: str) -> argparse.ArgumentParser:
+        p = sub.add_parser(name, help=help)
+        p.add_argument("file")
+        p.set_defaults(func=func)
+        return p
+
+    def page_arg(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--page", default="0", help="page index, name or id (default 0)")
+
+    command("info", cmd_info, "list pages and cell counts")
+
+    p = command("show", cmd_show, "print a cell with its edges and children")
+    p.add_argument("id")
+    page_arg(p)
+
+    p = command("add-vertex", cmd_add_vertex, "add a vertex")
+    p.add_argument("--id")
+    p.add_argument("--value", default="")
+    p.add_argument("--style")
+    p.add_argument("--icon", help="AWS/Azure/GCP icon by name or alias, e.g. 'alb'")
+    p.add_argument("--x", type=float, default=0)
+    p.add_argument("--y", type=float, default=0)
+    p.add_argument("--w", type=float, help="width (default: the icon's, else 120)")
+    p.add_argument("--h", type=float, help="height (default: the icon's, else 60)")
+    p.add_argument("--parent", default="1")
+    page_arg(p)
+
+    p = command("add-edge", cmd_add_edge, "connect two cells")
+    p.add_argument("source")
+    p.add_argument("target")
+    p.add_argument("--id")
+    p.add_argument("--value")
+    p.add_argument("--style")
+    p.add_argument("--parent", default="1")
+    page_arg(p)
+
+    p = command("set", cmd_set, "change a cell's value, style or geometry")
+    p.add_argument("id")
+    p.add_argument("--value")
+    p.add_argument("--style")
+    for name in ("x", "y", "w", "h"):
+        p.add_argument(f"--{name}", type=float)
+    page_arg(p)
+
+    p = command("delete", cmd_delete, "remove a cell")
+    p.add_argument("id")
+    p.add_argument("--cascade", action="store_true",
+                   help="also remove children and connected edges")
+    page_arg(p)
+
+    command("compress", cmd_recode, "store every page compressed")
+    command("decompress", cmd_recode, "store every page as plain XML")
+
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    try:
+        args.func(args)
+    except (MxFileError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    if args.time:
+        print(f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Read, index and edit draw.io ``.drawio`` (mxfile) documents.
+
+The package is built for large files: reading is streamed, lookups go
+through a persistent on-disk index, and edits rewrite only the byte ranges
+of the cells they touch.
+
+* :mod:`mxfile.reader` -- iterate pages and cells with flat memory use.
+* :mod:`mxfile.index` -- on-disk index by cell id, parent and edge endpoint.
+* :mod:`mxfile.editor` -- add, update and delete cells in place.
+* :mod:`mxfile.writer` -- stream out new documents.
+* :mod:`mxfile.store` / :mod:`mxfile.styles` -- compact cells with interned
+  styles for generating large diagrams.
+* :mod:`mxfile.codec` -- compressed ``<diagram>`` payloads.
+* :mod:`mxfile.mermaid` / :mod:`mxfile.layout` / :mod:`mxfile.convert` --
+  Mermaid parsing, layered layout with orthogonal routing, and conversion.
+* :mod:`mxfile.svg` / :mod:`mxfile.render` -- pure-Python SVG rendering and
+  the cached batch renderer.
+* :mod:`mxfile.diff` / :mod:`mxfile.merge` -- semantic diff and three-way
+  merge of whole documents.
+* :mod:`mxfile.ingest` -- streaming CSV/JSONL import into paged tidy trees
+  and graphs.
+* :mod:`mxfile.icons` -- memory-mapped AWS/Azure/GCP icon catalog with
+  fuzzy lookup.
+* :mod:`mxfile.lint` / :mod:`mxfile.watch` -- incremental, cached structural
+  lint and the file watcher behind ``mxlint.py --watch``.
+* :mod:`mxfile.profile` / :mod:`mxfile.bench` -- opt-in phase timing via
+  ``$DRAWIO_SKILL_PROFILE``, and benchmarks on synthetic diagrams.
+"""
+
+from .codec import compress_diagram, decompress_diagram
+from .editor import Editor, recode
+from .errors import CellNotFound, MermaidError, MxFileError
+from .index import CellIndex
+from .model import Cell, Diagram, Geometry
+from .reader import iter_cells, iter_pages, read_cells
+from .scanner import CellSpan, PageSpan
+from .store import CellStore
+from .styles import StyleTable, format_style, parse_style
+from .writer import MxFileWriter
+
+__all__ = [
+    "Cell",
+    "CellIndex",
+    "CellNotFound",
+    "CellSpan",
+    "CellStore",
+    "Diagram",
+    "Editor",
+    "Geometry",
+    "MermaidError",
+    "MxFileError",
+    "MxFileWriter",
+    "PageSpan",
+    "StyleTable",
+    "compress_diagram",
+    "decompress_diagram",
+    "format_style",
+    "iter_cells",
+    "iter_pages",
+    "parse_style",
+    "read_cells",
+    "recode",
+]
@@ -0,0 +1,459 @@
+"""Benchmarks for the skill's hot paths on synthetic diagrams.
+
+Two generators stand in for real inputs, scaled up from the bundled
+examples.  :func:`architecture` repeats the shape of
+``examples/microservices.drawio``: rows of service swimlanes, each holding
+a Lambda and a database icon, fed by an API gateway and publishing to an
+event bus.  :func:`flowchart` writes Mermaid source like
+``examples/ec2_lifecycle.mmd``: chains of steps with decisions, loops back
+and links between subgraphs.  Both are deterministic, so the same size
+always produces the same bytes.
+
+A :class:`Case` times one operation -- parse, index, edit, serialize,
+compress, decompress, layout, convert, render, lint, diff -- at a given cell
+count.  Fixtures are generated once per size and shared between cases;
+only the operation itself is timed.  Each case runs at least ``min_runs``
+and up to ``repeat`` times, stopping in between once it has used its time
+budget, so the 100,000-cell sizes run three times and a full run takes
+several minutes.
+
+:func:`run` returns a JSON-ready report; :func:`compare` checks it against
+a stored baseline.  Single timings on a shared machine wander by tens of
+percent, so compare works on medians and on their spread (the median
+absolute deviation of the runs): a case regresses only when its median
+grows by more than the threshold, by more than a couple of milliseconds,
+and by more than a few times the spread the two reports measured.
+"""
+
+from __future__ import annotations
+
+import gc
+import io
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .codec import compress_diagram, decompress_diagram
+from .convert import convert, to_store
+from .diff import diff
+from .editor import Editor
+from .errors import MxFileError
+from .index import CellIndex
+from .lint import FileLinter
+from .mermaid import parse
+from .model import Cell
+from .profile import peak_rss_kb
+from .reader import iter_cells, read_cells
+from .scanner import scan_pages
+from .store import CellStore
+from .styles import StyleTable
+from .svg import render_svg
+from .writer import MxFileWriter
+
+# Bump when generators or cases change; results of other versions are not compared.
+BENCH_VERSION = "2"
+
+# The examples hold about 30 cells.
+SIZES = (30, 1_000, 10_000, 100_000)
+
+_ICON = (
+    "outlineConnect=0;fontColor=#232F3E;gradientColor=none;strokeColor=none;dashed=0;"
+    "verticalLabelPosition=bottom;verticalAlign=top;align=center;html=1;fontSize=10;"
+    "fontStyle=0;aspect=fixed;pointerEvents=1;"
+)
+_LANE = "swimlane;startSize=30;fontStyle=1;fontSize=14;rounded=1;arcSize=8;swimlaneLine=0;"
+_EDGE = "edgeStyle=orthogonalEdgeStyle;strokeWidth=2;"
+_EVENT = "curved=1;strokeColor=#7B1FA2;strokeWidth=1;dashed=1;dashPattern=8 8;"
+_LANE_COLORS = (("#E8F5E9", "#43A047"), ("#E3F2FD", "#1E88E5"),
+                ("#FFF3E0", "#FB8C00"), ("#FCE4EC", "#E53935"))
+_DATABASES = ("mxgraph.aws4.dynamodb", "mxgraph.aws4.rds_instance")
+_PER_ROW = 8
+
+
+# -------------------------------------------------------------- generators
+
+def architecture(cells: int) -> CellStore:
+    """A microservices diagram of about ``cells`` cells (at least one row)."""
+    styles = StyleTable()
+    styles.define("icon", _ICON)
+    styles.define("lane", _LANE)
+    styles.define("edge", _EDGE)
+    styles.define("event", _EVENT)
+    store = CellStore(styles)
+    row = 0
+    while len(store) - 2 < cells:
+        top = row * 520.0
+        gateway, bus = f"apigw{row}", f"bus{row}"
+        middle = 40 + _PER_ROW * 280 / 2 - 30
+        store.add_vertex(gateway, "API Gateway", "icon", middle, top, 60, 60,
+                         fillColor="#8C4FFF", shape="mxgraph.aws4.api_gateway")
+        store.add_vertex(bus, "Event Bus", "icon", middle, top + 420, 60, 60,
+                         fillColor="#E7157B", shape="mxgraph.aws4.sns")
+        for i in range(_PER_ROW):
+            if len(store) - 2 >= cells:
+                break
+            n = row * _PER_ROW + i
+            fill, stroke = _LANE_COLORS[n % len(_LANE_COLORS)]
+            box, service, db = f"svc{n}_box", f"svc{n}", f"db{n}"
+            store.add_vertex(box, f"Service {n}", "lane", 40 + i * 280, top + 120, 240, 220,
+                             fillColor=fill, strokeColor=stroke)
+            store.add_vertex(service, f"Service {n}", "icon", 90, 40, 60, 60, parent=box,
+                             fillColor="#ED7100", shape="mxgraph.aws4.lambda_function")
+            store.add_vertex(db, f"DB {n}", "icon", 90, 130, 60, 60, parent=box,
+                             fillColor="#C925D1", shape=_DATABASES[n % 2])
+            store.add_edge(f"e{n}_in", gateway, service, f"/api/{n}", "edge", strokeColor=stroke)
+            store.add_edge(f"e{n}_db", service, db, "", "edge", strokeColor=stroke)
+            store.add_edge(f"e{n}_out", service, bus, "events", "event")
+        row += 1
+    return store
+
+
+def flowchart(cells: int, seed: int = 0) -> str:
+    """Mermaid flowchart source that converts to about ``cells`` cells."""
+    rng = random.Random(seed)
+    lines = ["flowchart TD"]
+    # Roughly one edge per node, plus one container per 25 nodes.
+    nodes = max(2, cells * 25 // 52)
+    per_group = 25
+    for start in range(0, nodes, per_group):
+        stop = min(nodes, start + per_group)
+        lines.append(f"    subgraph g{start // per_group}[Stage {start // per_group}]")
+        for n in range(start, stop):
+            if n % 7 == 3:
+                lines.append(f"        n{n}{{Check {n}?}}")
+            else:
+                lines.append(f"        n{n}[Step {n}]")
+        lines.append("    end")
+    for n in range(1, nodes):
+        if n % 7 == 4 and n >= 4:
+            lines.append(f"    n{n - 1} -->|yes| n{n}")
+        else:
+            lines.append(f"    n{n - 1} --> n{n}")
+        if n % 7 == 6 and n >= 5:
+            lines.append(f"    n{n - 3} -.->|retry| n{rng.randrange(max(0, n - 20), n - 3)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_store(store: CellStore, target: Path, compressed: bool = False) -> Path:
+    with open(target, "w", encoding="utf-8") as fh, MxFileWriter(fh, compressed=compressed) as w:
+        w.begin_page("Benchmark")
+        store.write(w)
+        w.end_page()
+    return target
+
+
+class Fixtures:
+    """Generated inputs per size, made on first use and kept for the run."""
+
+    def __init__(self, workdir: Path) -> None:
+        self.workdir = workdir
+        self._made: dict[tuple[str, int], object] = {}
+
+    def _get(self, kind: str, cells: int, make: Callable[[], object]):
+        key = (kind, cells)
+        if key not in self._made:
+            self._made[key] = make()
+        return self._made[key]
+
+    def store(self, cells: int) -> CellStore:
+        return self._get("store", cells, lambda: architecture(cells))
+
+    def drawio(self, cells: int) -> Path:
+        return self._get("drawio", cells, lambda: write_store(
+            self.store(cells), self.workdir / f"arch-{cells}.drawio"))
+
+    def data(self, cells: int) -> bytes:
+        return self._get("data", cells, lambda: self.drawio(cells).read_bytes())
+
+    def page_xml(self, cells: int) -> str:
+        """The uncompressed ``<mxGraphModel>`` of the generated page."""
+        def make() -> str:
+            data = self.data(cells)
+            page = next(scan_pages(data))
+            return data[page.content_start:page.content_stop].decode("utf-8").strip()
+        return self._get("page", cells, make)
+
+    def cells(self, cells: int) -> list[Cell]:
+        return self._get("cells", cells, lambda: read_cells(self.drawio(cells)))
+
+    def mermaid(self, cells: int) -> str:
+        return self._get("mermaid", cells, lambda: flowchart(cells))
+
+
+# ------------------------------------------------------------------- cases
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    name: str
+    description: str
+    # Given the fixtures and a size, prepare and return the timed operation.
+    setup: Callable[[Fixtures, int], Callable[[], object]]
+
+
+def _parse(fx: Fixtures, cells: int) -> Callable[[], object]:
+    path = fx.drawio(cells)
+    return lambda: sum(1 for _ in iter_cells(path))
+
+
+def _index(fx: Fixtures, cells: int) -> Callable[[], object]:
+    path = fx.drawio(cells)
+    index = CellIndex(path, fx.workdir / f"index-{cells}.sqlite")
+    return index.rebuild
+
+
+def _edit(fx: Fixtures, cells: int) -> Callable[[], object]:
+    path = fx.workdir / f"edit-{cells}.drawio"
+    shutil.copyfile(fx.drawio(cells), path)
+    index = CellIndex(path, fx.workdir / f"edit-{cells}.sqlite")
+    store = fx.store(cells)
+    services = 0
+    while f"svc{services}" in store:
+        services += 1
+    count = 0
+
+    def edit() -> None:
+        nonlocal count
+        count += 1
+        n = count * 7919 % services
+        with Editor(path, index) as ed:
+            ed.update(f"svc{n}", value=f"Service {n} v{count}", geometry={"x": 100})
+            vertex = ed.add_vertex(f"Queue {count}", x=-200, y=count * 80.0, id=f"q{count}")
+            ed.add_edge(f"svc{n}", vertex.id, id=f"q{count}_in")
+    return edit
+
+
+def _serialize(fx: Fixtures, cells: int) -> Callable[[], object]:
+    store = fx.store(cells)
+
+    def serialize() -> int:
+        out = io.StringIO()
+        with MxFileWriter(out) as writer:
+            writer.begin_page("Benchmark")
+            store.write(writer)
+            writer.end_page()
+        return out.tell()
+    return serialize
+
+
+def _compress(fx: Fixtures, cells: int) -> Callable[[], object]:
+    xml = fx.page_xml(cells)
+    return lambda: compress_diagram(xml)
+
+
+def _decompress(fx: Fixtures, cells: int) -> Callable[[], object]:
+    xml = fx.page_xml(cells)
+    payload = compress_diagram(xml)
+    if decompress_diagram(payload) != xml:
+        raise MxFileError("compressed payload does not round-trip")
+    return lambda: decompress_diagram(payload)
+
+
+def _layout(fx: Fixtures, cells: int) -> Callable[[], object]:
+    source = fx.mermaid(cells)
+    return lambda: to_store(parse(source))
+
+
+def _convert(fx: Fixtures, cells: int) -> Callable[[], object]:
+    source = fx.mermaid(cells)
+    return lambda: convert(source, io.StringIO())
+
+
+def _render(fx: Fixtures, cells: int) -> Callable[[], object]:
+    page = fx.cells(cells)
+    return lambda: render_svg(page)
+
+
+def _lint(fx: Fixtures, cells: int) -> Callable[[], object]:
+    path, data = fx.drawio(cells), fx.data(cells)
+    return lambda: FileLinter(path).run(data)
+
+
+def _diff(fx: Fixtures, cells: int) -> Callable[[], object]:
+    old = fx.data(cells)
+    # Rename every 50th service and move every 30th lane.
+    new = re.sub(rb'value="Service (\d*0)" style', rb'value="Service \1 (v2)" style', old)
+    new = re.sub(rb'(id="svc\d*0_box"[^>]*>\s*<mxGeometry x=")(\d+)', rb"\g<1>1\2", new)
+    return lambda: diff(old, new)
+
+
+CASES = {case.name: case for case in (
+    Case("parse", "stream every cell of a .drawio file", _parse),
+    Case("index", "rebuild the per-file cell index", _index),
+    Case("edit", "update one cell, add a vertex and an edge, commit", _edit),
+    Case("serialize", "write a CellStore as mxfile XML", _serialize),
+    Case("compress", "deflate and base64 a <diagram> payload", _compress),
+    Case("decompress", "decode a compressed <diagram> payload", _decompress),
+    Case("layout", "parse and lay out a Mermaid flowchart", _layout),
+    Case("convert", "Mermaid to .drawio end to end", _convert),
+    Case("render", "draw a page as SVG", _render),
+    Case("lint", "check a whole file from scratch", _lint),
+    Case("diff", "semantic diff against a copy with a few changes", _diff),
+)}
+
+
+# ------------------------------------------------------------------ runner
+
+@dataclass(slots=True)
+class Result:
+    case: str
+    cells: int
+    runs: int
+    best_ms: float
+    median_ms: float
+    # Median absolute deviation of the runs from ``median_ms``.
+    spread_ms: float
+    # Peak Python allocation during one run, with ``alloc``.
+    alloc_peak_kb: int | None = None
+
+
+def time_case(
+    fx: Fixtures, case: Case, cells: int, *,
+    repeat: int = 9, budget: float = 3.0, min_runs: int = 3, alloc: bool = False,
+) -> Result:
+    """Time ``case`` at ``cells`` up to ``repeat`` times, or until ``budget``
+    seconds are spent (but at least ``min_runs`` times)."""
+    operation = case.setup(fx, cells)
+    times = []
+    spent = 0.0
+    while len(times) < repeat and (len(times) < min_runs or spent < budget):
+        gc.collect()
+        started = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - started
+        times.append(elapsed * 1000)
+        spent += elapsed
+    median = statistics.median(times)
+    spread = statistics.median(abs(t - median) for t in times)
+    result = Result(case.name, cells, len(times), round(min(times), 3),
+                    round(median, 3), round(spread, 3))
+    if alloc:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        gc.collect()
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+        if not tracing:
+            tracemalloc.stop()
+        result.alloc_peak_kb = (peak - start) // 1024
+    return result
+
+
+def run(
+    cases: Iterable[str] | None = None,
+    sizes: Iterable[int] = SIZES,
+    *,
+    repeat: int = 9,
+    budget: float = 3.0,
+    min_runs: int = 3,
+    alloc: bool = False,
+    workdir: str | os.PathLike[str] | None = None,
+    progress: Callable[[Result], None] | None = None,
+) -> dict:
+    """Run the benchmarks and return the report."""
+    chosen = [CASES[name] for name in cases] if cases else list(CASES.values())
+    results = []
+    with tempfile.TemporaryDirectory(prefix="mxbench-", dir=workdir) as tmp:
+        fx = Fixtures(Path(tmp))
+        for cells in sorted(sizes):
+            for case in chosen:
+                result = time_case(fx, case, cells, repeat=repeat, budget=budget,
+                                   min_runs=min_runs, alloc=alloc)
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return {
+        "version": BENCH_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine(),
+        "peak_rss_kb": peak_rss_kb(),
+        "results": [asdict(r) for r in results],
+    }
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "arch": platform.machine(),
+        "cpus": os.cpu_count(),
+        "byteorder": sys.byteorder,
+    }
+
+
+# -------------------------------------------------------------- comparison
+
+@dataclass(slots=True)
+class Comparison:
+    case: str
+    cells: int
+    base_ms: float | None
+    new_ms: float | None
+    # "regression", "faster", "same", "new" (no baseline) or "missing".
+    status: str
+
+    @property
+    def ratio(self) -> float | None:
+        if not self.base_ms or self.new_ms is None:
+            return None
+        return self.new_ms / self.base_ms
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = 0.25, floor_ms: float = 2.0,
+    noise: float = 3.0,
+) -> list[Comparison]:
+    """Match results by case and size and classify each change in median time.
+
+    A change counts when the medians differ by more than ``threshold`` of
+    the faster one, by more than ``floor_ms`` and by more than ``noise``
+    times the two results' summed spread.
+    """
+    base = {(r["case"], r["cells"]): r for r in baseline.get("results", ())}
+    new = {(r["case"], r["cells"]): r for r in current.get("results", ())}
+    out = []
+    for key in sorted(base.keys() | new.keys(), key=lambda k: (k[1], k[0])):
+        rb, rn = base.get(key), new.get(key)
+        b = None if rb is None else rb["median_ms"]
+        n = None if rn is None else rn["median_ms"]
+        if b is None:
+            status = "new"
+        elif n is None:
+            status = "missing"
+        else:
+            # Reports from before spread_ms was recorded count as noiseless.
+            margin = max(floor_ms, noise * (rb.get("spread_ms", 0.0) + rn.get("spread_ms", 0.0)))
+            if n > b * (1 + threshold) and n - b > margin:
+                status = "regression"
+            elif b > n * (1 + threshold) and b - n > margin:
+                status = "faster"
+            else:
+                status = "same"
+        out.append(Comparison(key[0], key[1], b, n, status))
+    return out
+
+
+def comparable(baseline: dict, current: dict) -> list[str]:
+    """Reasons the two reports should not be compared; empty if they can."""
+    reasons = []
+    if baseline.get("version") != current.get("version"):
+        reasons.append(f"benchmark version {baseline.get('version')} != {current.get('version')}")
+    a, b = baseline.get("machine", {}), current.get("machine", {})
+    for key in ("python", "implementation", "arch", "cpus"):
+        if a.get(key) != b.get(key):
+            reasons.append(f"{key} {a.get(key)} != {b.get(key)}")
+    return reasons
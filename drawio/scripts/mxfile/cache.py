@@ -0,0 +1,30 @@
+"""Location of the skill's on-disk caches."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+
+def cache_dir(*parts: str) -> Path:
+    """Return (and create) a cache directory for the drawio skill.
+
+    ``$DRAWIO_SKILL_CACHE`` overrides the default of
+    ``$XDG_CACHE_HOME/drawio-skill`` (``~/.cache/drawio-skill``).
+    """
+    base = os.environ.get("DRAWIO_SKILL_CACHE")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        base = os.path.join(xdg, "drawio-skill")
+    path = Path(base, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def path_key(path: str | os.PathLike[str]) -> str:
+    """Stable cache key for a file path."""
+    real = os.path.realpath(os.fspath(path))
+    return hashlib.sha1(real.encode("utf-8")).hexdigest()[:20]
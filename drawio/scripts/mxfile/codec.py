@@ -0,0 +1,152 @@
+"""Compressed ``<diagram>`` payloads.
+
+draw.io saves each page as ``base64(deflate_raw(encodeURIComponent(xml)))``
+unless compression is turned off.  Both directions are available as one-shot
+functions and as incremental coders, so a large page can be streamed without
+holding its decompressed XML in memory.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import re
+import zlib
+from typing import Iterable, Iterator
+
+from .errors import MxFileError
+from .profile import span
+
+# encodeURIComponent leaves A-Z a-z 0-9 and these marks unescaped.
+_URI_SAFE = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_.!~*'()"
+_ESCAPES = [b"%%%02X" % byte for byte in range(256)]
+_HEX_RE = re.compile(rb"[0-9A-Fa-f]{2}")
+_WS_RE = re.compile(rb"\s+")
+_CHUNK = 1 << 16
+
+
+def decompress_diagram(payload: str | bytes) -> str:
+    """Decode a compressed ``<diagram>`` payload to its mxGraphModel XML."""
+    with span("decompress"):
+        return b"".join(iter_decompressed(payload)).decode("utf-8")
+
+
+def compress_diagram(xml: str) -> str:
+    """Encode mxGraphModel XML the way draw.io stores a compressed page."""
+    with span("compress"):
+        encoder = PayloadEncoder()
+        return encoder.feed(xml) + encoder.finish()
+
+
+def looks_compressed(content: str | bytes) -> bool:
+    """Return True if ``<diagram>`` text content is a compressed payload."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    content = content.strip()
+    return bool(content) and not content.startswith(b"<")
+
+
+def iter_decompressed(payload: str | bytes | Iterable[bytes]) -> Iterator[bytes]:
+    """Yield the UTF-8 XML of a compressed payload in chunks.
+
+    ``payload`` may be the whole base64 text or an iterable of byte chunks.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("ascii", "ignore")
+    if isinstance(payload, bytes):
+        whole = payload
+        payload = (whole[i:i + _CHUNK] for i in range(0, len(whole), _CHUNK))
+
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+    b64_tail = b""
+    pct_tail = b""
+    try:
+        for chunk in payload:
+            data = b64_tail + _WS_RE.sub(b"", chunk)
+            cut = len(data) - len(data) % 4
+            b64_tail = data[cut:]
+            raw = inflater.decompress(base64.b64decode(data[:cut], validate=True))
+            text, pct_tail = _unquote_partial(pct_tail + raw)
+            if text:
+                yield text
+        if b64_tail:
+            raise MxFileError("truncated base64 in compressed diagram")
+        text, pct_tail = _unquote_partial(pct_tail + inflater.flush(), final=True)
+        if text:
+            yield text
+    except (binascii.Error, zlib.error) as exc:
+        raise MxFileError(f"invalid compressed diagram: {exc}") from exc
+
+
+def _unquote_partial(data: bytes, final: bool = False) -> tuple[bytes, bytes]:
+    """Percent-decode ``data``, holding back an escape split across chunks."""
+    if not final:
+        pos = data.rfind(b"%", max(0, len(data) - 2))
+        if pos != -1:
+            return _uri_decode(data[:pos]), data[pos:]
+    return _uri_decode(data), b""
+
+
+# urllib's quote() and unquote_to_bytes() work a byte at a time in Python,
+# which dominated editing large compressed pages.  XML uses few distinct
+# escapes, so replacing each one throughout the text runs at C speed.
+
+def _uri_encode(data: bytes) -> bytes:
+    """``encodeURIComponent`` on UTF-8 bytes."""
+    unsafe = data.translate(None, _URI_SAFE)
+    if b"%" in unsafe:
+        data = data.replace(b"%", b"%25")
+        unsafe = unsafe.replace(b"%", b"")
+    while unsafe:
+        byte = unsafe[:1]
+        data = data.replace(byte, _ESCAPES[byte[0]])
+        unsafe = unsafe.replace(byte, b"")
+    return data
+
+
+def _uri_decode(data: bytes) -> bytes:
+    """Percent-decode like ``unquote_to_bytes``, keeping malformed escapes."""
+    # Decoding %25 last would turn "%253C" into "%<"; split on it instead.
+    parts = data.split(b"%25")
+    for i, part in enumerate(parts):
+        pos = part.find(b"%")
+        while pos != -1:
+            code = part[pos:pos + 3]
+            if _HEX_RE.fullmatch(code, 1):
+                part = part.replace(code, bytes((int(code[1:], 16),)))
+                pos = part.find(b"%", pos)
+            else:
+                pos = part.find(b"%", pos + 1)
+        parts[i] = part
+    return b"%".join(parts)
+
+
+class PayloadEncoder:
+    """Incremental inverse of :func:`iter_decompressed`.
+
+    Feed XML text in any chunking; each call returns the base64 produced so
+    far, and :meth:`finish` returns the remainder.
+    """
+
+    # draw.io deflates with pako's default level; 9 is four times slower on
+    # large pages for about 4% less output.
+    def __init__(self, level: int = zlib.Z_DEFAULT_COMPRESSION) -> None:
+        self._deflater = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._pending = b""
+
+    def feed(self, xml: str) -> str:
+        quoted = _uri_encode(xml.encode("utf-8"))
+        return self._encode(self._deflater.compress(quoted))
+
+    def finish(self) -> str:
+        out = self._encode(self._deflater.flush())
+        out += base64.b64encode(self._pending).decode("ascii")
+        self._pending = b""
+        return out
+
+    def _encode(self, data: bytes) -> str:
+        data = self._pending + data
+        cut = len(data) - len(data) % 3
+        self._pending = data[cut:]
+        return base64.b64encode(data[:cut]).decode("ascii")
+
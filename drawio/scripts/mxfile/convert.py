@@ -0,0 +1,567 @@
+"""Mermaid to draw.io conversion.
+
+:func:`to_store` turns a parsed diagram into cells.  Graph diagrams go
+through :func:`~mxfile.layout.compound_layout`: nodes get absolute
+geometry, subgraphs and composite states become swimlane containers, and
+every edge the layout routed carries its waypoints and ``exitX``/``entryX``
+ports, so draw.io shows the computed route rather than re-routing it.
+Classes and entities are stack-layout swimlanes with one row per member, in
+the shape draw.io's own UML and ER templates use.  Sequence diagrams are laid
+out directly on a timeline of ``umlLifeline`` cells.
+
+All base styles are defined in the page's :class:`~mxfile.styles.StyleTable`
+under their role names (``state``, ``lifeline``...), so the output can also
+be written with stylesheet references.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import TextIO
+
+from .editor import DEFAULT_EDGE_STYLE
+from .layout import compound_layout
+from .mermaid import Activation, Block, Graph, Message, Note, Sequence, parse
+from .model import format_number
+from .profile import span
+from .store import CellStore
+from .styles import StyleTable
+from .writer import DEFAULT_MODEL, MxFileWriter
+
+# Bump when parsing, layout or conversion changes what a Mermaid source
+# turns into; renders and lint findings of .mmd files are cached by source.
+CONVERTER_VERSION = "2"
+
+MARGIN = 40.0
+ROW = 26.0  # class member / entity attribute row
+LIFELINE_HEAD = 40.0
+
+BASE_STYLES = {
+    # flowchart shapes
+    "rect": "rounded=0;whiteSpace=wrap;html=1;",
+    "round": "rounded=1;whiteSpace=wrap;html=1;",
+    "stadium": "rounded=1;arcSize=50;whiteSpace=wrap;html=1;",
+    "subroutine": "shape=process;whiteSpace=wrap;html=1;backgroundOutline=1;",
+    "cylinder": "shape=cylinder3;whiteSpace=wrap;html=1;boundedLbl=1;backgroundOutline=1;size=10;",
+    "circle": "ellipse;whiteSpace=wrap;html=1;aspect=fixed;",
+    "double_circle": "ellipse;shape=doubleEllipse;whiteSpace=wrap;html=1;aspect=fixed;",
+    "rhombus": "rhombus;whiteSpace=wrap;html=1;",
+    "hexagon": "shape=hexagon;perimeter=hexagonPerimeter2;whiteSpace=wrap;html=1;fixedSize=1;",
+    "parallelogram": "shape=parallelogram;perimeter=parallelogramPerimeter;whiteSpace=wrap;html=1;fixedSize=1;",
+    "parallelogram_alt": "shape=parallelogram;perimeter=parallelogramPerimeter;whiteSpace=wrap;html=1;fixedSize=1;flipH=1;",
+    "trapezoid": "shape=trapezoid;perimeter=trapezoidPerimeter;whiteSpace=wrap;html=1;fixedSize=1;",
+    "trapezoid_alt": "shape=trapezoid;perimeter=trapezoidPerimeter;whiteSpace=wrap;html=1;fixedSize=1;flipV=1;",
+    "asymmetric": "shape=step;perimeter=stepPerimeter;whiteSpace=wrap;html=1;fixedSize=1;size=15;",
+    # state diagrams
+    "state": "rounded=1;whiteSpace=wrap;html=1;arcSize=40;",
+    "start": "ellipse;html=1;aspect=fixed;fillColor=#232F3E;strokeColor=#232F3E;",
+    "end": "ellipse;html=1;shape=endState;fillColor=#232F3E;strokeColor=#232F3E;",
+    "fork": "html=1;fillColor=#232F3E;strokeColor=none;",
+    "choice": "rhombus;html=1;",
+    # containers
+    "group": "swimlane;startSize=30;fontStyle=1;rounded=1;arcSize=8;swimlaneLine=0;html=1;",
+    "class": "swimlane;fontStyle=1;align=center;verticalAlign=top;childLayout=stackLayout;horizontal=1;startSize=26;horizontalStack=0;resizeParent=1;resizeParentMax=0;resizeLast=0;collapsible=1;marginBottom=0;whiteSpace=wrap;html=1;",
+    "entity": "swimlane;fontStyle=1;childLayout=stackLayout;horizontal=1;startSize=26;horizontalStack=0;resizeParent=1;resizeParentMax=0;resizeLast=0;collapsible=1;marginBottom=0;html=1;",
+    "member": "text;strokeColor=none;fillColor=none;align=left;verticalAlign=top;spacingLeft=4;spacingRight=4;overflow=hidden;rotatable=0;points=[[0,0.5],[1,0.5]];portConstraint=eastwest;whiteSpace=wrap;html=1;",
+    "divider": "line;strokeWidth=1;fillColor=none;align=left;verticalAlign=middle;spacingTop=-1;spacingLeft=3;spacingRight=3;rotatable=0;labelPosition=right;points=[];portConstraint=eastwest;strokeColor=inherit;",
+    "edge": DEFAULT_EDGE_STYLE,
+    # sequence diagrams
+    "lifeline": "shape=umlLifeline;perimeter=lifelinePerimeter;whiteSpace=wrap;html=1;container=1;dropTarget=0;collapsible=0;recursiveResize=0;outlineConnect=0;portConstraint=eastwest;size=40;",
+    "actor": "shape=umlLifeline;participant=umlActor;perimeter=lifelinePerimeter;whiteSpace=wrap;html=1;container=1;dropTarget=0;collapsible=0;recursiveResize=0;verticalAlign=top;spacingTop=36;outlineConnect=0;portConstraint=eastwest;size=40;",
+    "activation": "html=1;points=[];perimeter=orthogonalPerimeter;outlineConnect=0;targetShapes=umlLifeline;portConstraint=eastwest;",
+    "message": "html=1;verticalAlign=bottom;endArrow=block;endFill=1;edgeStyle=none;rounded=0;",
+    "note": "shape=note;whiteSpace=wrap;html=1;backgroundOutline=1;size=10;fillColor=#FFF2CC;strokeColor=#D6B656;",
+    "frame": "shape=umlFrame;whiteSpace=wrap;html=1;pointerEvents=0;width=60;height=20;",
+    "condition": "text;html=1;align=left;verticalAlign=middle;fontStyle=2;strokeColor=none;fillColor=none;",
+    "separator": "line;strokeWidth=1;dashed=1;html=1;align=left;verticalLabelPosition=bottom;verticalAlign=top;spacingLeft=70;",
+    "highlight": "html=1;strokeColor=none;opacity=30;",
+}
+
+# (arrow, fill, size) per marker name in :mod:`mxfile.mermaid`.
+_MARKERS = {
+    "none": ("none", None, None),
+    "arrow": ("classic", "1", None),
+    "open": ("open", "0", None),
+    "circle": ("oval", "1", None),
+    "cross": ("cross", None, None),
+    "triangle": ("block", "0", "12"),
+    "diamond": ("diamondThin", "1", "14"),
+    "odiamond": ("diamondThin", "0", "14"),
+    "one": ("ERmandOne", "0", None),
+    "zero_or_one": ("ERzeroToOne", "0", None),
+    "zero_or_more": ("ERzeroToMany", "0", None),
+    "one_or_more": ("ERoneToMany", "0", None),
+}
+
+_TAGS = re.compile(r"<[^>]+>")
+_BREAKS = re.compile(r"<br\s*/?>|\n", re.I)
+
+
+def new_styles() -> StyleTable:
+    """A style table with every :data:`BASE_STYLES` entry defined."""
+    styles = StyleTable()
+    for name, style in BASE_STYLES.items():
+        styles.define(name, style)
+    return styles
+
+
+def to_store(
+    diagram: Graph | Sequence, styles: StyleTable | None = None
+) -> tuple[CellStore, tuple[float, float]]:
+    """Return the cells of ``diagram`` and the page size they need."""
+    store = CellStore(styles if styles is not None else new_styles())
+    if isinstance(diagram, Sequence):
+        extent = _sequence(diagram, store)
+    else:
+        extent = _graph(diagram, store)
+    return store, extent
+
+
+def convert(
+    source: str,
+    stream: TextIO,
+    *,
+    name: str | None = None,
+    compressed: bool = False,
+) -> int:
+    """Convert Mermaid ``source`` to an mxfile on ``stream``; return the cell count."""
+    with span("mermaid"):
+        diagram = parse(source)
+    with span("layout"):
+        store, (width, height) = to_store(diagram)
+    page_width = max(int(DEFAULT_MODEL["pageWidth"]), int(width + 2 * MARGIN))
+    page_height = max(int(DEFAULT_MODEL["pageHeight"]), int(height + 2 * MARGIN))
+    with span("write"), MxFileWriter(stream, compressed=compressed) as writer:
+        writer.begin_page(name, pageWidth=page_width, pageHeight=page_height)
+        store.write(writer)
+        writer.end_page()
+    return len(store) - 2
+
+
+def convert_file(
+    source: str | Path, target: str | Path | None = None, *, compressed: bool = False
+) -> Path:
+    """Convert one ``.mmd`` file; by default the output sits next to it."""
+    source = Path(source)
+    target = Path(target) if target is not None else source.with_suffix(".drawio")
+    text = source.read_text(encoding="utf-8")
+    with open(target, "w", encoding="utf-8") as fh:
+        convert(text, fh, name=source.stem, compressed=compressed)
+    return target
+
+
+def _text_size(label: str, font: float = 12.0) -> tuple[float, float]:
+    """Rough rendered size of a label; draw.io wraps, so this only sizes boxes."""
+    lines = _BREAKS.split(label)
+    width = max(len(_TAGS.sub("", line)) for line in lines) * font * 0.6
+    return width, len(lines) * font * 1.4
+
+
+def _cell_id(name: str) -> str:
+    """Keep Mermaid ids as cell ids, except the reserved root and layer ids."""
+    return f"_{name}" if name in ("0", "1") else name
+
+
+def _unique(base: str, store: CellStore) -> str:
+    cell_id = base
+    n = 1
+    while cell_id in store:
+        n += 1
+        cell_id = f"{base}_{n}"
+    return cell_id
+
+
+def _html(text: str) -> str:
+    return html.escape(text, quote=False).replace("\n", "<br>")
+
+
+def _snap(value: float) -> float:
+    return float(-(-value // 10) * 10)
+
+
+# ----------------------------------------------------------------- graphs
+
+def _node_size(node, horizontal: bool) -> tuple[float, float]:
+    shape = node.shape
+    if shape in ("class", "entity"):
+        lines = [node.label, *node.rows, *node.methods]
+        width = max(160.0, _snap(max(len(line) for line in lines) * 7.2 + 20))
+        header = ROW * (node.label.count("\n") + 1)
+        body = ROW * (len(node.rows) + len(node.methods)) + (8 if node.methods else 0)
+        return width, header + max(body, ROW if shape == "class" else 0)
+    if shape == "start":
+        return 20.0, 20.0
+    if shape == "end":
+        return 30.0, 30.0
+    if shape in ("fork", "join"):
+        return (10.0, 70.0) if horizontal else (70.0, 10.0)
+    if shape == "choice":
+        return 40.0, 40.0
+    label = "\n".join([node.label, *node.rows])
+    tw, th = _text_size(label)
+    if shape == "state":
+        return max(120.0, _snap(tw + 30)), max(40.0, _snap(th + 16))
+    if shape == "rhombus":
+        return max(120.0, _snap(tw * 1.6 + 30)), max(80.0, _snap(th * 2 + 30))
+    if shape in ("circle", "double_circle"):
+        side = max(60.0, _snap(max(tw, th) + 30))
+        return side, side
+    return max(120.0, _snap(tw + 40)), max(60.0, _snap(th + 24))
+
+
+def _graph(graph: Graph, store: CellStore) -> tuple[float, float]:
+    horizontal = graph.direction in ("LR", "RL")
+    sizes = {name: _node_size(node, horizontal) for name, node in graph.nodes.items()}
+    links = [(edge.source, edge.target) for edge in graph.edges]
+    parent = {**{g: None for g in graph.groups}, **graph.parent}
+    # Looser layers leave room for edge labels.
+    layer_gap = 80.0 if any(edge.label for edge in graph.edges) else 60.0
+    layout = compound_layout(
+        sizes, links, parent, graph.direction, graph.group_direction,
+        layer_gap=layer_gap,
+    )
+
+    def box(name: str) -> tuple[float, float, float, float]:
+        x, y, w, h = layout.boxes[name]
+        if graph.parent.get(name) is None:
+            x, y = x + MARGIN, y + MARGIN
+        return x, y, w, h
+
+    def container(name: str) -> str:
+        group = graph.parent.get(name)
+        return _cell_id(group) if group is not None else "1"
+
+    def depth(group: str) -> int:
+        n = 0
+        while group in graph.parent:
+            group = graph.parent[group]
+            n += 1
+        return n
+
+    for group in sorted(graph.groups, key=depth):
+        x, y, w, h = box(group)
+        store.add_vertex(
+            _cell_id(group), graph.groups[group], "group", x, y, w, h, container(group)
+        )
+
+    for name, node in graph.nodes.items():
+        x, y, w, h = box(name)
+        cell_id = _cell_id(name)
+        if node.shape in ("class", "entity"):
+            _stack(store, node, cell_id, (x, y, w, h), container(name))
+            continue
+        label = node.label
+        if node.rows:
+            label = "<br>".join([f"<b>{label}</b>", *node.rows])
+        style = "fork" if node.shape == "join" else node.shape
+        store.add_vertex(cell_id, label, style, x, y, w, h, container(name), **node.style)
+
+    for k, edge in enumerate(graph.edges):
+        if edge.line == "invisible":
+            continue
+        overrides = _edge_overrides(edge)
+        route = layout.routes.get(k)
+        points = None
+        edge_parent = "1"
+        if route is not None:
+            group = graph.parent.get(edge.source)
+            offset = MARGIN if group is None else 0.0
+            points = [(x + offset, y + offset) for x, y in route.points]
+            edge_parent = container(edge.source)
+            overrides.update(
+                exitX=format_number(round(route.exit[0], 4)),
+                exitY=format_number(round(route.exit[1], 4)),
+                entryX=format_number(round(route.entry[0], 4)),
+                entryY=format_number(round(route.entry[1], 4)),
+            )
+        label = " ".join(part for part in (edge.tail_label, edge.label, edge.head_label) if part)
+        store.add_edge(
+            _unique(f"edge{k}", store), _cell_id(edge.source), _cell_id(edge.target),
+            label, "edge", edge_parent, points, **overrides,
+        )
+    return layout.width, layout.height
+
+
+def _edge_overrides(edge) -> dict[str, str]:
+    overrides: dict[str, str] = {}
+    if edge.line == "dotted":
+        overrides["dashed"] = "1"
+    elif edge.line == "thick":
+        overrides["strokeWidth"] = "3"
+    for end, marker in (("end", edge.head), ("start", edge.tail)):
+        if (end, marker) in (("end", "arrow"), ("start", "none")):
+            continue  # draw.io's defaults
+        arrow, fill, size = _MARKERS[marker]
+        overrides[f"{end}Arrow"] = arrow
+        if fill is not None:
+            overrides[f"{end}Fill"] = fill
+        if size is not None:
+            overrides[f"{end}Size"] = size
+    return overrides
+
+
+def _stack(store: CellStore, node, cell_id: str, bounds, parent: str) -> None:
+    """A class or entity: swimlane header plus one child row per member."""
+    x, y, w, h = bounds
+    header = ROW * (node.label.count("\n") + 1)
+    overrides = dict(node.style)
+    if header != ROW:
+        overrides["startSize"] = format_number(header)
+    store.add_vertex(cell_id, _html(node.label), node.shape, x, y, w, h, parent, **overrides)
+    top = header
+    for i, row in enumerate(node.rows):
+        store.add_vertex(f"{cell_id}.{i}", _html(row), "member", 0, top, w, ROW, cell_id)
+        top += ROW
+    if node.methods:
+        store.add_vertex(f"{cell_id}.div", "", "divider", 0, top, w, 8, cell_id)
+        top += 8
+        for i, method in enumerate(node.methods):
+            store.add_vertex(f"{cell_id}.m{i}", _html(method), "member", 0, top, w, ROW, cell_id)
+            top += ROW
+
+
+# --------------------------------------------------------------- sequence
+
+class _Frame:
+    __slots__ = ("block", "top", "bottom", "lo", "hi", "inner", "dividers")
+
+    def __init__(self, block: Block, top: float) -> None:
+        self.block = block
+        self.top = top
+        self.bottom = top
+        self.lo: int | None = None
+        self.hi: int | None = None
+        self.inner = 0  # nesting depth below this frame
+        self.dividers: list[tuple[float, str]] = []
+
+    def touch(self, *columns: int) -> None:
+        for c in columns:
+            self.lo = c if self.lo is None else min(self.lo, c)
+            self.hi = c if self.hi is None else max(self.hi, c)
+
+
+def _sequence(seq: Sequence, store: CellStore) -> tuple[float, float]:
+    parts = list(seq.participants.values())
+    if not parts:
+        return 0.0, 0.0
+    column = {p.id: i for i, p in enumerate(parts)}
+    widths = [max(100.0, _snap(_text_size(p.label)[0] + 30)) for p in parts]
+
+    # Centre distances wide enough for the labels of the messages between,
+    # and for notes to clear the neighbouring lifelines.
+    need = [0.0] * len(parts)
+    last = len(parts) - 1
+    # How far notes reach out past the first and last lifelines' centres.
+    reach = [widths[0] / 2, widths[last] / 2]
+    for event in seq.events:
+        if isinstance(event, Message) and event.source != event.target:
+            lo, hi = sorted((column[event.source], column[event.target]))
+            room = (_text_size(event.label)[0] + 40) / (hi - lo)
+            for i in range(lo, hi):
+                need[i] = max(need[i], room)
+        elif isinstance(event, Note):
+            cols = [column[name] for name in event.over]
+            width = _note_width(event)
+            if event.side == "right":
+                if cols[0] < last:
+                    need[cols[0]] = max(need[cols[0]], width + 30)
+                else:
+                    reach[1] = max(reach[1], width + 10)
+            elif event.side == "left":
+                if cols[0] > 0:
+                    need[cols[0] - 1] = max(need[cols[0] - 1], width + 30)
+                else:
+                    reach[0] = max(reach[0], width + 10)
+            else:
+                # At most half the note sticks out past either end.
+                lo, hi = min(cols), max(cols)
+                if lo > 0:
+                    need[lo - 1] = max(need[lo - 1], width / 2 + 20)
+                else:
+                    reach[0] = max(reach[0], width / 2)
+                if hi < last:
+                    need[hi] = max(need[hi], width / 2 + 20)
+                else:
+                    reach[1] = max(reach[1], width / 2)
+    centres = [MARGIN + reach[0]]
+    for i in range(1, len(parts)):
+        gap = max((widths[i - 1] + widths[i]) / 2 + 40, need[i - 1])
+        centres.append(centres[-1] + gap)
+
+    top = MARGIN
+    y = top + LIFELINE_HEAD + 20
+    messages: list[tuple[Message, float, int]] = []
+    notes: list[tuple[Note, float, float]] = []
+    bars: list[tuple[int, float, float, int]] = []  # column, top, bottom, depth
+    active: dict[str, list[float]] = defaultdict(list)
+    frames: list[_Frame] = []
+    stack: list[_Frame] = []
+    number = 0
+
+    def close_bar(name: str, at: float) -> None:
+        if active[name]:
+            start = active[name].pop()
+            bars.append((column[name], start, at, len(active[name])))
+
+    for event in seq.events:
+        if isinstance(event, Message):
+            number += 1
+            y += 20
+            messages.append((event, y, number))
+            if stack:
+                stack[-1].touch(column[event.source], column[event.target])
+            if event.source == event.target:
+                y += 30
+            if event.activate:
+                active[event.target].append(y)
+            if event.deactivate:
+                close_bar(event.source, y)
+            y += 20
+        elif isinstance(event, Activation):
+            if event.active:
+                active[event.participant].append(y)
+            else:
+                close_bar(event.participant, y)
+        elif isinstance(event, Note):
+            height = max(40.0, _snap(_text_size(event.text)[1] + 16))
+            notes.append((event, y, height))
+            if stack:
+                stack[-1].touch(*(column[name] for name in event.over))
+            y += height + 10
+        elif event.kind == "end":
+            if stack:
+                frame = stack.pop()
+                frame.bottom = y
+                if stack:
+                    outer = stack[-1]
+                    outer.inner = max(outer.inner, frame.inner + 1)
+                    if frame.lo is not None:
+                        outer.touch(frame.lo, frame.hi)
+            y += 20
+        elif event.kind in ("else", "and", "option"):
+            if stack:
+                stack[-1].dividers.append((y, event.text))
+            y += 30
+        else:
+            frame = _Frame(event, y)
+            frames.append(frame)
+            stack.append(frame)
+            y += 30
+    for name in list(active):
+        while active[name]:
+            close_bar(name, y)
+    for frame in stack:
+        frame.bottom = y
+    height = y + 20 - top
+
+    def left(c: int) -> float:
+        return centres[c] - widths[c] / 2
+
+    def right(c: int) -> float:
+        return centres[c] + widths[c] / 2
+
+    for frame in frames:
+        if frame.block.kind != "rect":
+            continue
+        lo = frame.lo if frame.lo is not None else 0
+        hi = frame.hi if frame.hi is not None else len(parts) - 1
+        x0, x1 = left(lo) - 10, right(hi) + 10
+        store.add_vertex(
+            _unique("rect", store), "", "highlight", x0, frame.top, x1 - x0,
+            frame.bottom - frame.top, fillColor=_rgb(frame.block.text),
+        )
+
+    for i, part in enumerate(parts):
+        store.add_vertex(
+            _cell_id(part.id), part.label, "actor" if part.actor else "lifeline",
+            left(i), top, widths[i], height,
+        )
+    for c, start, stop, level in bars:
+        part = parts[c]
+        store.add_vertex(
+            _unique(f"{part.id}.active", store), "", "activation",
+            widths[c] / 2 - 5 + 5 * level, start - top, 10, max(stop - start, 10),
+            _cell_id(part.id),
+        )
+
+    for frame in frames:
+        kind = frame.block.kind
+        if kind in ("rect", "box"):
+            continue
+        lo = frame.lo if frame.lo is not None else 0
+        hi = frame.hi if frame.hi is not None else len(parts) - 1
+        pad = 10 + 10 * frame.inner
+        x0, x1 = left(lo) - pad, right(hi) + pad
+        frame_id = _unique(kind, store)
+        store.add_vertex(frame_id, kind, "frame", x0, frame.top, x1 - x0, frame.bottom - frame.top)
+        if frame.block.text:
+            store.add_vertex(
+                f"{frame_id}.text", _html(f"[{frame.block.text}]"), "condition",
+                70, 0, max(x1 - x0 - 80, 40), 20, frame_id,
+            )
+        for i, (at, text) in enumerate(frame.dividers):
+            store.add_vertex(
+                f"{frame_id}.{i}", _html(f"[{text}]") if text else "", "separator",
+                0, at - frame.top - 5, x1 - x0, 10, frame_id,
+            )
+
+    for note, at, note_height in notes:
+        cols = [column[name] for name in note.over]
+        w = _note_width(note)
+        if note.side == "right":
+            x0 = centres[cols[0]] + 10
+        elif note.side == "left":
+            x0 = centres[cols[0]] - 10 - w
+        else:
+            lo, hi = min(cols), max(cols)
+            w = max(w, centres[hi] - centres[lo] + 60)
+            x0 = (centres[lo] + centres[hi]) / 2 - w / 2
+        store.add_vertex(_unique("note", store), note.text, "note", x0, at, w, note_height)
+
+    for message, at, number in messages:
+        overrides = _message_overrides(message)
+        fy = format_number(round((at - top) / height, 4))
+        label = f"{number}. {message.label}" if seq.autonumber else message.label
+        points = None
+        entry_y = fy
+        if message.source == message.target:
+            c = centres[column[message.source]]
+            points = [(c + 40, at), (c + 40, at + 30)]
+            entry_y = format_number(round((at + 30 - top) / height, 4))
+            overrides.update(align="left", verticalAlign="middle", spacingLeft="4")
+        store.add_edge(
+            _unique(f"msg{number}", store), _cell_id(message.source), _cell_id(message.target),
+            label, "message", "1", points,
+            exitX="0.5", exitY=fy, entryX="0.5", entryY=entry_y, **overrides,
+        )
+    return centres[last] + reach[1] - MARGIN, height
+
+
+def _note_width(note: Note) -> float:
+    return max(100.0, _snap(_text_size(note.text)[0] + 30))
+
+
+def _message_overrides(message: Message) -> dict[str, str]:
+    overrides: dict[str, str] = {}
+    if message.line == "dotted":
+        overrides["dashed"] = "1"
+    if message.head == "open":
+        overrides.update(endArrow="open", endFill="0")
+    elif message.head == "cross":
+        overrides["endArrow"] = "cross"
+    elif message.head == "none":
+        overrides["endArrow"] = "none"
+    if message.tail == "arrow":
+        overrides.update(startArrow="block", startFill="1")
+    return overrides
+
+
+def _rgb(text: str) -> str:
+    """``rgb(200, 150, 255)`` or ``rgba(...)`` as ``#C896FF``; anything else as given."""
+    m = re.match(r"rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)", text)
+    if m is None:
+        return text or "#DAE8FC"
+    return "#" + "".join(f"{int(v):02X}" for v in m.groups())
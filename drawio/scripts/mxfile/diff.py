@@ -0,0 +1,454 @@
+"""Semantic diff of mxfile pages.
+
+Comparing two 50k-cell files cell by cell through ElementTree costs more than
+a second per side, so pages are first split into raw cell elements with one
+regular expression, and a cell's raw bytes serve as its fingerprint (bytes
+objects cache their hash, so the dict lookups and comparisons are cheap).
+Cells whose id and fingerprint match are unchanged and never parsed; only
+the rest go through :func:`~mxfile.model.cell_from_element`.
+
+Cells are matched by id.  Cells left over on both sides are then paired by
+label and shape (by label and endpoints for edges) when that pairing is
+unique, which catches copy-paste and tools that renumber ids.  A change is
+reported as a set of *aspects*, so that a move is never confused with a
+restyle:
+
+* geometry -- ``position``, ``size``, ``points``
+* content -- ``value``, ``style``, ``data``
+* structure -- ``parent``, ``source``, ``target``
+* ``other`` -- anything else: attributes such as ``collapsed`` or
+  ``connectable``, ``<mxPoint as="targetPoint">`` and other geometry
+  children, or XML the model does not read at all.  Two cells whose bytes
+  differ but whose canonical XML is equal (reindented, attributes
+  reordered) are unchanged.
+"""
+
+from __future__ import annotations
+
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .codec import decompress_diagram
+from .errors import MxFileError
+from .model import Cell, Geometry, cell_from_element
+from .profile import span
+from .scanner import scan_pages
+from .styles import parse_style
+from .xmlutil import ATTRS, unescape
+
+GEOMETRY = ("position", "size", "points")
+CONTENT = ("value", "style", "data")
+STRUCTURE = ("parent", "source", "target")
+ASPECTS = GEOMETRY + CONTENT + STRUCTURE + ("other",)
+
+_CELL_RE = re.compile(rb"<(mxCell|object|UserObject)" + ATTRS + rb"(/?)>")
+_ID_RE = re.compile(rb"""\sid\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_TAG_RE = re.compile(r"<[^>]+>")
+_AS_RE = re.compile(r'\sas="([^"]*)"')
+
+
+@dataclass(slots=True)
+class Snapshot:
+    """The cells of one page as raw XML, parsed on demand."""
+
+    index: int
+    id: str | None
+    name: str | None
+    compressed: bool
+    model: dict[str, str]
+    order: list[str] = field(default_factory=list)
+    raw: dict[str, bytes] = field(default_factory=dict)
+    _parsed: dict[str, Cell] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __contains__(self, cell_id: str) -> bool:
+        return cell_id in self.raw
+
+    def cell(self, cell_id: str) -> Cell:
+        cell = self._parsed.get(cell_id)
+        if cell is None:
+            try:
+                elem = ET.fromstring(self.raw[cell_id])
+            except ET.ParseError as exc:
+                raise MxFileError(f"cell {cell_id!r}: {exc}") from exc
+            cell = self._parsed[cell_id] = cell_from_element(elem)
+        return cell
+
+
+@dataclass(slots=True)
+class Change:
+    """One added, removed or changed cell.
+
+    ``id`` is the cell's id in the new page (the old page for removals);
+    ``old_id`` is set when the cell was matched by label and shape under a
+    different id.
+    """
+
+    kind: str
+    id: str
+    old: Cell | None
+    new: Cell | None
+    aspects: tuple[str, ...] = ()
+    old_id: str | None = None
+
+    @property
+    def geometry_only(self) -> bool:
+        return bool(self.aspects) and all(a in GEOMETRY for a in self.aspects)
+
+
+@dataclass(slots=True)
+class PageDiff:
+    old: Snapshot | None
+    new: Snapshot | None
+    changes: list[Change]
+    # new id -> old id for cells matched by label and shape.
+    renamed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        page = self.new or self.old
+        return page.name or page.id or f"page {page.index + 1}"
+
+
+def load(source: str | Path | bytes) -> list[Snapshot]:
+    """Split every page of an mxfile into raw cells."""
+    buf = source if isinstance(source, bytes) else Path(source).read_bytes()
+    pages = []
+    for page in scan_pages(buf):
+        content = buf[page.content_start:page.content_stop]
+        model = page.model
+        if page.compressed:
+            content = decompress_diagram(content).encode("utf-8")
+            inner = next(scan_pages(content), None)
+            model = inner.model if inner is not None else {}
+        snapshot = Snapshot(page.index, page.id, page.name, page.compressed, model)
+        _split(content, snapshot)
+        pages.append(snapshot)
+    if not pages:
+        raise MxFileError("no pages found")
+    return pages
+
+
+def _split(buf: bytes, snapshot: Snapshot) -> None:
+    pos = 0
+    order, raw = snapshot.order, snapshot.raw
+    search = _CELL_RE.search
+    while True:
+        m = search(buf, pos)
+        if m is None:
+            return
+        if m.group(3):
+            close = m.end()
+        else:
+            closing = b"</" + m.group(1) + b">"
+            close = buf.find(closing, m.end())
+            if close == -1:
+                raise MxFileError(f"unterminated <{m.group(1).decode()}> cell")
+            close += len(closing)
+        found = _ID_RE.search(m.group(2))
+        if found is not None:
+            cell_id = unescape((found.group(1) or found.group(2) or b"").decode("utf-8"))
+            if cell_id not in raw:
+                order.append(cell_id)
+            raw[cell_id] = buf[m.start():close]
+        pos = close
+
+
+def diff_pages(old: Snapshot, new: Snapshot) -> PageDiff:
+    """Changes that turn ``old`` into ``new``, in ``new``'s cell order."""
+    old_raw, new_raw = old.raw, new.raw
+    suspects = [
+        cell_id for cell_id in new.order
+        if cell_id in old_raw and old_raw[cell_id] != new_raw[cell_id]
+    ]
+    added = [cell_id for cell_id in new.order if cell_id not in old_raw]
+    removed = [cell_id for cell_id in old.order if cell_id not in new_raw]
+    renamed = _match_leftovers(old, new, removed, added) if added and removed else {}
+
+    changes: dict[str, Change] = {}
+    for cell_id in suspects:
+        a, b = old.cell(cell_id), new.cell(cell_id)
+        aspects = compare(a, b, renamed)
+        if (
+            not aspects
+            # A reference to a renamed cell differs in the XML alone.
+            and all(getattr(a, attr) == getattr(b, attr) for attr in STRUCTURE)
+            and _canonical(old_raw[cell_id]) != _canonical(new_raw[cell_id])
+        ):
+            aspects = ("other",)
+        if aspects:
+            changes[cell_id] = Change("changed", cell_id, a, b, aspects)
+    matched_old = set(renamed.values())
+    for cell_id in added:
+        b = new.cell(cell_id)
+        if cell_id in renamed:
+            a = old.cell(renamed[cell_id])
+            aspects = compare(a, b, renamed)
+            changes[cell_id] = Change("changed", cell_id, a, b, aspects, renamed[cell_id])
+        else:
+            changes[cell_id] = Change("added", cell_id, None, b)
+    # Cells whose references changed only because a neighbour was renamed
+    # compare equal once ids are mapped back, and are dropped above.
+    ordered = [changes[cell_id] for cell_id in new.order if cell_id in changes]
+    ordered.extend(
+        Change("removed", cell_id, old.cell(cell_id), None)
+        for cell_id in removed if cell_id not in matched_old
+    )
+    return PageDiff(old, new, ordered, renamed)
+
+
+def diff(old: str | Path | bytes | list[Snapshot], new: str | Path | bytes | list[Snapshot]) -> list[PageDiff]:
+    """Diff two files page by page; pages pair up by id, else by position."""
+    with span("load"):
+        old_pages = old if isinstance(old, list) else load(old)
+        new_pages = new if isinstance(new, list) else load(new)
+    result = []
+    for a, b in pair_pages(old_pages, new_pages):
+        if a is None:
+            result.append(PageDiff(None, b, [Change("added", i, None, b.cell(i)) for i in b.order]))
+        elif b is None:
+            result.append(PageDiff(a, None, [Change("removed", i, a.cell(i), None) for i in a.order]))
+        else:
+            with span("diff"):
+                result.append(diff_pages(a, b))
+    return result
+
+
+def pair_pages(
+    old: list[Snapshot], new: list[Snapshot]
+) -> list[tuple[Snapshot | None, Snapshot | None]]:
+    by_id = {page.id: page for page in old if page.id}
+    used: set[int] = set()
+    pairs: list[tuple[Snapshot | None, Snapshot | None]] = []
+    for page in new:
+        match = by_id.get(page.id) if page.id else None
+        if match is None and page.index < len(old) and old[page.index].id not in {p.id for p in new}:
+            match = old[page.index]
+        if match is not None and match.index in used:
+            match = None
+        if match is not None:
+            used.add(match.index)
+        pairs.append((match, page))
+    pairs.extend((page, None) for page in old if page.index not in used)
+    return pairs
+
+
+def compare(a: Cell, b: Cell, renamed: dict[str, str] | None = None) -> tuple[str, ...]:
+    """Aspects in which ``b`` differs from ``a``.
+
+    ``renamed`` maps ids in ``b``'s page to ids in ``a``'s, so references
+    to a renamed cell are not reported as changes.
+    """
+    renamed = renamed or {}
+    out = []
+    ga, gb = a.geometry, b.geometry
+    if (ga is None) != (gb is None):
+        out.append("position")
+    elif ga is not None and gb is not None:
+        if (ga.x, ga.y, ga.relative) != (gb.x, gb.y, gb.relative):
+            out.append("position")
+        if (ga.width, ga.height) != (gb.width, gb.height):
+            out.append("size")
+        if (ga.points or []) != (gb.points or []):
+            out.append("points")
+    if a.value != b.value:
+        out.append("value")
+    if a.style != b.style and style_props(a.style) != style_props(b.style):
+        out.append("style")
+    if a.data != b.data:
+        out.append("data")
+    for aspect in STRUCTURE:
+        mine = getattr(b, aspect)
+        if getattr(a, aspect) != renamed.get(mine, mine):
+            out.append(aspect)
+    if a.vertex != b.vertex or a.edge != b.edge:
+        out.append("style")
+    if a.extra != b.extra or _geometry_extra(ga) != _geometry_extra(gb):
+        out.append("other")
+    return tuple(dict.fromkeys(out))
+
+
+def _geometry_extra(geometry: Geometry | None) -> tuple:
+    if geometry is None:
+        return ({}, [])
+    return (geometry.extra, geometry.children)
+
+
+def _canonical(raw: bytes) -> str:
+    try:
+        return ET.canonicalize(raw.decode("utf-8"), strip_text=True)
+    except ET.ParseError as exc:
+        raise MxFileError(f"invalid cell XML: {exc}") from exc
+
+
+def style_props(style: str) -> dict[str, str | None]:
+    """A style as one mapping; bare names (``ellipse;``) map to ``None``."""
+    names, props = parse_style(style or "")
+    merged: dict[str, str | None] = dict.fromkeys(names)
+    merged.update(props)
+    return merged
+
+
+def shape_of(cell: Cell) -> str:
+    if cell.edge:
+        return "edge"
+    names, props = parse_style(cell.style or "")
+    return props.get("shape") or (names[0] if names else "rect")
+
+
+def plain(value: str, limit: int = 40) -> str:
+    """A label as one line of text."""
+    text = _TAG_RE.sub(" ", value.replace("<br>", " "))
+    text = " ".join(unescape(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _match_leftovers(old: Snapshot, new: Snapshot, removed: list[str], added: list[str]) -> dict[str, str]:
+    """Pair unmatched cells by label and shape; only unique keys count."""
+    renamed: dict[str, str] = {}
+
+    def keys(page: Snapshot, ids: list[str], mapping: dict[str, str]) -> dict[tuple, str | None]:
+        out: dict[tuple, str | None] = {}
+        for cell_id in ids:
+            cell = page.cell(cell_id)
+            label = plain(cell.value, 200)
+            if cell.edge:
+                key = ("edge", label, mapping.get(cell.source, cell.source),
+                       mapping.get(cell.target, cell.target))
+            elif label:
+                key = ("vertex", label, shape_of(cell))
+            else:
+                continue
+            out[key] = None if key in out else cell_id
+        return out
+
+    # Vertices first, so that edges between renamed vertices can pair up.
+    old_keys = keys(old, [i for i in removed if not old.cell(i).edge], {})
+    new_keys = keys(new, [i for i in added if not new.cell(i).edge], {})
+    for key, new_id in new_keys.items():
+        old_id = old_keys.get(key)
+        if new_id is not None and old_id is not None:
+            renamed[new_id] = old_id
+    old_keys = keys(old, [i for i in removed if old.cell(i).edge], {})
+    new_keys = keys(new, [i for i in added if new.cell(i).edge], renamed)
+    for key, new_id in new_keys.items():
+        old_id = old_keys.get(key)
+        if new_id is not None and old_id is not None:
+            renamed[new_id] = old_id
+    return renamed
+
+
+# ------------------------------------------------------------ summaries
+
+def describe(cell: Cell, cell_id: str | None = None) -> str:
+    cell_id = cell_id or cell.id
+    label = plain(cell.value)
+    if cell.edge:
+        text = f"edge {cell_id} {cell.source or '?'} -> {cell.target or '?'}"
+    else:
+        kind = "vertex" if cell.vertex else "cell"
+        text = f"{kind} {cell_id} ({shape_of(cell)})"
+    return f'{text} "{label}"' if label else text
+
+
+def explain(change: Change) -> str:
+    """One line describing what happened to a cell."""
+    if change.kind == "added":
+        return "+ " + describe(change.new)
+    if change.kind == "removed":
+        return "- " + describe(change.old)
+    a, b = change.old, change.new
+    head = describe(b, change.id)
+    parts = []
+    if change.old_id:
+        parts.append(f"id {change.old_id} -> {change.id}")
+    ga, gb = a.geometry, b.geometry
+    for aspect in change.aspects:
+        if aspect == "position" and ga and gb:
+            parts.append(f"moved ({_n(ga.x)},{_n(ga.y)}) -> ({_n(gb.x)},{_n(gb.y)})")
+        elif aspect == "size" and ga and gb:
+            parts.append(f"resized {_n(ga.width)}x{_n(ga.height)} -> {_n(gb.width)}x{_n(gb.height)}")
+        elif aspect == "points":
+            parts.append(f"rerouted ({len(gb.points or []) if gb else 0} waypoints)")
+        elif aspect == "value":
+            parts.append(f'relabeled "{plain(a.value)}" -> "{plain(b.value)}"')
+        elif aspect == "style":
+            parts.append("style " + _style_delta(a.style, b.style))
+        elif aspect == "data":
+            keys = sorted(set(a.data) ^ set(b.data) | {k for k in a.data if a.data.get(k) != b.data.get(k)})
+            parts.append("data " + ", ".join(keys))
+        elif aspect == "parent":
+            parts.append(f"moved from {a.parent} into {b.parent}")
+        elif aspect in ("source", "target"):
+            parts.append(f"{aspect} {getattr(a, aspect)} -> {getattr(b, aspect)}")
+        elif aspect == "other":
+            parts.append("other " + _other_delta(a, b))
+    return f"~ {head}: " + "; ".join(parts)
+
+
+def _style_delta(old: str, new: str) -> str:
+    a, b = style_props(old), style_props(new)
+    out = []
+    for key in dict.fromkeys([*a, *b]):
+        if key not in b:
+            out.append(f"-{key}")
+        elif key not in a:
+            out.append(f"+{key}" if b[key] is None else f"+{key}={b[key]}")
+        elif a[key] != b[key]:
+            out.append(f"{key} {a[key]} -> {b[key]}")
+    return ", ".join(out) or "reordered"
+
+
+def _other_delta(a: Cell, b: Cell) -> str:
+    (ax, ac), (bx, bc) = _geometry_extra(a.geometry), _geometry_extra(b.geometry)
+    keys = {k for k in a.extra.keys() | b.extra.keys() if a.extra.get(k) != b.extra.get(k)}
+    keys |= {k for k in ax.keys() | bx.keys() if ax.get(k) != bx.get(k)}
+    keys |= {_child_role(child) for child in set(ac) ^ set(bc)}
+    return ", ".join(sorted(keys)) or "XML"
+
+
+def _child_role(xml: str) -> str:
+    """``targetPoint`` for ``<mxPoint as="targetPoint" .../>``, else the tag."""
+    m = _AS_RE.search(xml)
+    return m.group(1) if m else xml[1:].split()[0].rstrip("/>")
+
+
+def _n(value: float) -> str:
+    return f"{value:g}"
+
+
+def summarize(diffs: list[PageDiff], limit: int = 20) -> str:
+    """A compact, human-readable account of every page's changes.
+
+    Geometry-only changes are listed after content and structure changes,
+    and at most ``limit`` lines are printed per page.
+    """
+    lines = []
+    for page in diffs:
+        changes = page.changes
+        if page.old is None:
+            lines.append(f'page "{page.name}": added ({len(changes)} cells)')
+            continue
+        if page.new is None:
+            lines.append(f'page "{page.name}": removed ({len(changes)} cells)')
+            continue
+        if not changes:
+            continue
+        added = sum(c.kind == "added" for c in changes)
+        removed = sum(c.kind == "removed" for c in changes)
+        changed = [c for c in changes if c.kind == "changed"]
+        moved = sum(c.geometry_only for c in changed)
+        header = f'page "{page.name}": {added} added, {removed} removed, {len(changed)} changed'
+        if moved:
+            header += f" ({moved} geometry only)"
+        lines.append(header)
+        ranked = sorted(changes, key=lambda c: (c.geometry_only, c.kind == "changed"))
+        for change in ranked[:limit]:
+            lines.append("  " + explain(change))
+        if len(ranked) > limit:
+            lines.append(f"  ... and {len(ranked) - limit} more")
+    return "\n".join(lines) if lines else "no changes"
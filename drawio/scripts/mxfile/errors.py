@@ -0,0 +1,22 @@
+"""Exceptions raised by the mxfile package."""
+
+from __future__ import annotations
+
+
+class MxFileError(Exception):
+    """A .drawio file is malformed or an edit cannot be applied to it."""
+
+
+class CellNotFound(MxFileError, KeyError):
+    """No cell with the requested id exists on the selected page."""
+
+    def __str__(self) -> str:
+        return f"cell not found: {self.args[0]!r}"
+
+
+class MermaidError(MxFileError):
+    """Mermaid source that cannot be converted."""
+
+    def __init__(self, message: str, line: int | None = None) -> None:
+        super().__init__(message if line is None else f"line {line}: {message}")
+        self.line = line
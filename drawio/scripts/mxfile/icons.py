@@ -0,0 +1,525 @@
+"""Catalog of AWS, Azure and GCP icons with exact and fuzzy lookup.
+
+The catalog maps what people call a service ("Application Load Balancer",
+"alb", "dynamo") to the draw.io identifier that renders it
+(``mxgraph.aws4.application_load_balancer``), with its category, default
+fill colour and icon size.  Identifiers are stencil names for AWS
+(``shape=``/``resIcon=``) and GCP (``prIcon=``), and image paths for Azure
+(``image=img/lib/azure2/...``).
+
+:func:`build` compiles the entries into one binary file that is opened with
+``mmap`` and never parsed: records and lookup keys are fixed-size structs
+over a shared string blob, keys are sorted for binary search, and every
+key's trigrams have posting lists for fuzzy search.  Opening costs one
+system call and a lookup touches a few pages.
+
+A seed catalog (``icons.tsv``, the icons the skill uses most) is compiled
+on first use.  ``mxicons.py build`` adds draw.io's own stencil libraries
+(``stencils/aws4.xml``, ``gcp2.xml``...), sidebar scripts for categories
+and colours, and Azure image directories.  The result is cached as
+``icons/catalog.idx`` and loaded in preference to the seed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+from .cache import cache_dir
+from .errors import MxFileError
+from .styles import parse_style
+
+SEED = Path(__file__).with_name("icons.tsv")
+MAGIC = b"MXICONS1"
+PROVIDERS = ("aws", "azure", "gcp")
+
+# Namespaces the catalog speaks for; other shapes are not checked.
+PREFIXES = {
+    "mxgraph.aws4.": "aws",
+    "mxgraph.azure.": "azure",
+    "img/lib/azure2/": "azure",
+    "mxgraph.gcp2.": "gcp",
+}
+
+STYLES = {
+    "aws": (
+        "outlineConnect=0;fontColor=#232F3E;gradientColor=none;fillColor={fill};"
+        "strokeColor=none;dashed=0;verticalLabelPosition=bottom;verticalAlign=top;"
+        "align=center;html=1;fontSize=10;fontStyle=0;aspect=fixed;pointerEvents=1;"
+        "shape={id};"
+    ),
+    "gcp": (
+        "html=1;fillColor={fill};strokeColor=none;verticalAlign=top;"
+        "labelPosition=center;verticalLabelPosition=bottom;align=center;spacingTop=-6;"
+        "fontSize=11;fontStyle=1;fontColor=#999999;shape=mxgraph.gcp2.hexIcon;prIcon={name};"
+    ),
+    "azure": "image;aspect=fixed;html=1;points=[];align=center;fontSize=12;image={id};",
+    "stencil": "html=1;verticalLabelPosition=bottom;verticalAlign=top;aspect=fixed;shape={id};",
+}
+
+_HEADER = struct.Struct("<8sHHIIIIIIIII")
+_RECORD = struct.Struct("<IHIHIHIHHBB")  # id, name, category, fill, w, h, provider, pad
+_KEY = struct.Struct("<IHIH")  # key, record, trigram count
+_TRIGRAM = struct.Struct("<III")  # code, first posting, posting count
+_COMPLETE = 1
+
+_VENDOR = re.compile(r"^(?:amazon|aws|azure|microsoft|google cloud|google|gcp|cloud) ")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_FILL = re.compile(r"fillColor=(#[0-9A-Fa-f]{6})")
+_PALETTE = re.compile(r"Sidebar\.prototype\.add(\w+?)Palette\s*=\s*function")
+_TOKEN = re.compile(r"(?:shape|resIcon|grIcon|prIcon)=(?:mxgraph\.\w+\.)?(\w+)|\+\s*'(\w+);")
+
+
+@dataclass(frozen=True, slots=True)
+class Icon:
+    id: str
+    name: str
+    provider: str
+    category: str
+    fill: str | None
+    width: int
+    height: int
+
+    def style(self, fill: str | None = None) -> str:
+        """A complete style string, label below the icon."""
+        template = STYLES[self.provider if self.id.startswith(_PREFIX_OF[self.provider]) else "stencil"]
+        return template.format(
+            id=self.id, name=self.id.rsplit(".", 1)[-1], fill=fill or self.fill or "#232F3E"
+        )
+
+
+_PREFIX_OF = {"aws": "mxgraph.aws4.", "azure": "img/lib/azure2/", "gcp": "mxgraph.gcp2."}
+
+
+@dataclass(frozen=True, slots=True)
+class Match:
+    score: float
+    key: str
+    icon: Icon
+
+
+@dataclass(slots=True)
+class _Entry:
+    id: str
+    name: str = ""
+    category: str = ""
+    fill: str | None = None
+    width: int = 0
+    height: int = 0
+    aliases: set[str] = field(default_factory=set)
+
+
+# ------------------------------------------------------------------ lookup
+
+class Catalog:
+    """A compiled catalog, memory-mapped read-only."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            try:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise MxFileError(f"empty icon index: {self.path}") from None
+        (magic, _version, flags, self._records, self._keys, self._trigrams, _postings,
+         self._strings_at, self._records_at, self._keys_at, self._trigrams_at,
+         postings_at) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise MxFileError(f"not an icon index: {self.path}")
+        self.complete = bool(flags & _COMPLETE)
+        view = memoryview(self._map)
+        self._codes = view[self._trigrams_at:self._trigrams_at + self._trigrams * 12].cast("I")
+        self._postings = view[postings_at:postings_at + _postings * 4].cast("I")
+
+    def __len__(self) -> int:
+        return self._records
+
+    def __iter__(self):
+        return (self._icon(i) for i in range(self._records))
+
+    def __contains__(self, icon_id: str) -> bool:
+        return self.get(icon_id) is not None
+
+    def get(self, icon_id: str) -> Icon | None:
+        """The icon with this identifier (stencil names ignore case, as in draw.io)."""
+        lo, hi = 0, self._records
+        target = fold(icon_id).encode("utf-8")
+        while lo < hi:  # records are sorted by folded id
+            mid = (lo + hi) // 2
+            key = self._record_id(mid)
+            if key.startswith(b"mxgraph."):
+                key = key.lower()
+            if key < target:
+                lo = mid + 1
+            elif key > target:
+                hi = mid
+            else:
+                return self._icon(mid)
+        return None
+
+    def lookup(self, query: str, provider: str | None = None, threshold: float = 0.5) -> Icon | None:
+        """Best icon for a name, alias or identifier, or None."""
+        icon = self.get(query)
+        if icon is not None and provider in (None, icon.provider):
+            return icon
+        key = normalize(query)
+        for record in self._exact(key.encode("utf-8")):
+            icon = self._icon(record)
+            if provider in (None, icon.provider):
+                return icon
+        matches = self.search(query, 1, provider)
+        return matches[0].icon if matches and matches[0].score >= threshold else None
+
+    def search(self, query: str, limit: int = 5, provider: str | None = None) -> list[Match]:
+        """Icons ranked by trigram similarity of any of their keys to ``query``."""
+        grams = trigrams(normalize(query))
+        if not grams:
+            return []
+        shared: dict[int, int] = {}
+        for code in grams:
+            at = self._find_trigram(code)
+            if at < 0:
+                continue
+            start, count = self._codes[at * 3 + 1], self._codes[at * 3 + 2]
+            for key in self._postings[start:start + count]:
+                shared[key] = shared.get(key, 0) + 1
+        scored = []
+        for key, common in shared.items():
+            _, _, record, size = _KEY.unpack_from(self._map, self._keys_at + key * _KEY.size)
+            scored.append((2.0 * common / (len(grams) + size), key, record))
+        # Ties go to AWS, the provider the skill's examples use, then by key.
+        scored.sort(key=lambda item: (-item[0], self._provider(item[2]), item[1]))
+        out: list[Match] = []
+        seen: set[int] = set()
+        for score, key, record in scored:
+            if record in seen:
+                continue
+            icon = self._icon(record)
+            if provider not in (None, icon.provider):
+                continue
+            seen.add(record)
+            out.append(Match(round(score, 3), self._key_text(key), icon))
+            if len(out) == limit:
+                break
+        return out
+
+    def unknown(self, style: str) -> list[str]:
+        """Icon identifiers used by ``style`` that are not in the catalog."""
+        return [ref for ref in icon_refs(style) if ref not in self]
+
+    def close(self) -> None:
+        self._codes.release()
+        self._postings.release()
+        self._map.close()
+
+    # -- internals
+
+    def _record_id(self, i: int) -> bytes:
+        off, length = struct.unpack_from("<IH", self._map, self._records_at + i * _RECORD.size)
+        at = self._strings_at + off
+        return self._map[at:at + length]
+
+    def _string(self, off: int, length: int) -> str:
+        at = self._strings_at + off
+        return self._map[at:at + length].decode("utf-8")
+
+    def _icon(self, i: int) -> Icon:
+        (id_off, id_len, name_off, name_len, cat_off, cat_len, fill, width, height,
+         provider, _) = _RECORD.unpack_from(self._map, self._records_at + i * _RECORD.size)
+        return Icon(
+            self._string(id_off, id_len), self._string(name_off, name_len),
+            PROVIDERS[provider], self._string(cat_off, cat_len),
+            None if fill == 0xFFFFFFFF else f"#{fill:06X}", width, height,
+        )
+
+    def _provider(self, i: int) -> int:
+        return self._map[self._records_at + i * _RECORD.size + _RECORD.size - 2]
+
+    def _key_text(self, key: int) -> str:
+        off, length, _, _ = _KEY.unpack_from(self._map, self._keys_at + key * _KEY.size)
+        return self._string(off, length)
+
+    def _exact(self, target: bytes) -> Iterable[int]:
+        lo, hi = 0, self._keys
+        while lo < hi:  # first key >= target
+            mid = (lo + hi) // 2
+            if self._key_text(mid).encode("utf-8") < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < self._keys:
+            off, length, record, _ = _KEY.unpack_from(self._map, self._keys_at + lo * _KEY.size)
+            at = self._strings_at + off
+            if self._map[at:at + length] != target:
+                break
+            yield record
+            lo += 1
+
+    def _find_trigram(self, code: int) -> int:
+        lo, hi = 0, self._trigrams
+        codes = self._codes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = codes[mid * 3]
+            if value < code:
+                lo = mid + 1
+            elif value > code:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path: str | None = None) -> Catalog:
+    """The built catalog if there is one, else the compiled seed."""
+    if path is not None:
+        return Catalog(path)
+    built = cache_dir("icons") / "catalog.idx"
+    if built.exists():
+        return Catalog(built)
+    digest = hashlib.sha1(SEED.read_bytes()).hexdigest()[:12]
+    seed = cache_dir("icons") / f"seed-{digest}.idx"
+    if not seed.exists():
+        build([], seed)
+    return Catalog(seed)
+
+
+def fold(icon_id: str) -> str:
+    """Stencil ids are case-insensitive, image paths are not."""
+    return icon_id.lower() if icon_id.startswith("mxgraph.") else icon_id
+
+
+def normalize(text: str) -> str:
+    """Lower-case words: ``mxgraph.aws4.Lambda_Function`` -> ``lambda function``."""
+    text = text.strip()
+    for prefix in PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            if prefix == "img/lib/azure2/":
+                text = text.rsplit("/", 1)[-1].removesuffix(".svg")
+            break
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(key: str) -> set[int]:
+    data = f" {key} ".encode("utf-8")
+    return {
+        data[i] << 16 | data[i + 1] << 8 | data[i + 2] for i in range(len(data) - 2)
+    }
+
+
+def icon_refs(style: str) -> list[str]:
+    """Catalog identifiers a style refers to (``shape``, ``resIcon``, ``prIcon``...)."""
+    _, props = parse_style(style)
+    refs = []
+    for key in ("shape", "resIcon", "grIcon", "image"):
+        value = props.get(key)
+        if value and any(value.startswith(prefix) for prefix in PREFIXES):
+            refs.append(value)
+    shape = props.get("shape") or ""
+    if shape.startswith("mxgraph.gcp2.") and props.get("prIcon"):
+        refs.append(f"mxgraph.gcp2.{props['prIcon']}")
+    return refs
+
+
+def provider_of(icon_id: str) -> str | None:
+    for prefix, provider in PREFIXES.items():
+        if icon_id.startswith(prefix):
+            return provider
+    return None
+
+
+# ---------------------------------------------------------------- building
+
+def build(sources: Iterable[str | Path], target: str | Path, seed: bool = True) -> int:
+    """Compile the seed plus ``sources`` into an index at ``target``.
+
+    Sources are draw.io stencil libraries (``*.xml``), sidebar scripts
+    (``*.js``, for categories and colours), catalogs in the seed's TSV
+    format, and directories, which are searched for all of these and for
+    ``img/lib/azure2`` SVGs.  Later sources override earlier ones field by
+    field.  Returns the number of icons.
+    """
+    entries: dict[str, _Entry] = {}
+    complete = False
+    if seed:
+        _read_tsv(SEED, entries)
+    sidebars = []
+    for source in map(Path, sources):
+        files = sorted(source.rglob("*")) if source.is_dir() else [source]
+        for path in files:
+            if path.suffix == ".xml":
+                complete |= _read_stencils(path, entries)
+            elif path.suffix == ".tsv":
+                _read_tsv(path, entries)
+            elif path.suffix == ".js":
+                sidebars.append(path)
+            elif path.suffix == ".svg" and "img/lib/azure2/" in path.as_posix():
+                _read_azure_image(path, entries)
+    for path in sidebars:  # after the stencils, whose ids they refer to
+        _read_sidebar(path, entries)
+    _write(entries, Path(target), complete)
+    return len(entries)
+
+
+def _read_tsv(path: Path, entries: dict[str, _Entry]) -> None:
+    with open(path, encoding="utf-8") as fh:
+        for number, line in enumerate(fh, 1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 6:
+                raise MxFileError(f"{path}:{number}: expected at least 6 columns")
+            icon_id, name, category, fill, width, height = fields[:6]
+            entry = entries.setdefault(fold(icon_id), _Entry(icon_id))
+            entry.name = name or entry.name
+            entry.category = category or entry.category
+            entry.fill = fill or entry.fill
+            entry.width = int(width or entry.width)
+            entry.height = int(height or entry.height)
+            if len(fields) > 6 and fields[6]:
+                entry.aliases.update(alias.strip() for alias in fields[6].split("|"))
+
+
+def _read_stencils(path: Path, entries: dict[str, _Entry]) -> bool:
+    """Shapes of one stencil library; True if it is in a covered namespace."""
+    covered = False
+    package = ""
+    try:
+        for event, elem in ET.iterparse(path, events=("start", "end")):
+            if event == "start" and elem.tag == "shapes":
+                package = elem.get("name", "") + "."
+                covered = provider_of(package) is not None
+            elif event == "end" and elem.tag == "shape" and covered:
+                name = elem.get("name", "")
+                icon_id = fold(package + name.replace(" ", "_"))
+                # draw.io lower-cases stencil ids; a seed entry keeps its spelling.
+                entry = entries.setdefault(icon_id, _Entry(icon_id))
+                entry.name = entry.name or name
+                entry.width = entry.width or round(float(elem.get("w", 0)))
+                entry.height = entry.height or round(float(elem.get("h", 0)))
+                elem.clear()
+    except ET.ParseError as exc:
+        raise MxFileError(f"{path}: {exc}") from None
+    return covered
+
+
+def _read_sidebar(path: Path, entries: dict[str, _Entry]) -> None:
+    """Categories and fill colours from a draw.io ``Sidebar-*.js`` palette."""
+    text = path.read_text(encoding="utf-8", errors="replace")
+    starts = [(m.start(), m.group(1)) for m in _PALETTE.finditer(text)]
+    for (start, palette), (end, _) in zip(starts, starts[1:] + [(len(text), "")]):
+        chunk = text[start:end]
+        match = re.match(r"(AWS4|Azure|GCP2|GCP)(\w*)", palette)
+        if not match:
+            continue
+        vendor, words = match.groups()
+        prefix = {"AWS4": "mxgraph.aws4.", "Azure": "mxgraph.azure.", "GCP2": "mxgraph.gcp2."}.get(
+            vendor, "mxgraph.gcp2."
+        )
+        category = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", words).strip() or vendor
+        fills = _FILL.findall(chunk)
+        fill = max(set(fills), key=fills.count) if fills else None
+        for token in _TOKEN.finditer(chunk):
+            entry = entries.get(fold(prefix + (token.group(1) or token.group(2))))
+            if entry is None:
+                continue
+            entry.category = entry.category or category
+            entry.fill = entry.fill or fill
+
+
+def _read_azure_image(path: Path, entries: dict[str, _Entry]) -> None:
+    posix = path.as_posix()
+    icon_id = posix[posix.index("img/lib/azure2/"):]
+    entry = entries.setdefault(icon_id, _Entry(icon_id))
+    entry.name = entry.name or path.stem.replace("_", " ")
+    entry.category = entry.category or path.parent.name.replace("_", " ").title()
+    if not entry.width:
+        head = path.read_bytes()[:600].decode("utf-8", errors="replace")
+        size = re.search(r'width="([\d.]+)[^"]*"\s+height="([\d.]+)', head)
+        entry.width, entry.height = (
+            (round(float(size.group(1))), round(float(size.group(2)))) if size else (64, 64)
+        )
+
+
+def _keys_of(icon_id: str, entry: _Entry) -> set[str]:
+    keys = {normalize(icon_id), normalize(entry.name)}
+    keys.update(normalize(alias) for alias in entry.aliases)
+    keys.update(_VENDOR.sub("", key) for key in list(keys))
+    keys.discard("")
+    return keys
+
+
+def _write(entries: dict[str, _Entry], target: Path, complete: bool) -> None:
+    strings = bytearray()
+    interned: dict[str, tuple[int, int]] = {}
+
+    def intern(text: str) -> tuple[int, int]:
+        if text not in interned:
+            data = text.encode("utf-8")[:0xFFFF]
+            interned[text] = (len(strings), len(data))
+            strings.extend(data)
+        return interned[text]
+
+    ids = sorted(entries, key=lambda folded: folded.encode("utf-8"))
+    records = bytearray()
+    keys: list[tuple[bytes, int, str]] = []
+    for number, folded in enumerate(ids):
+        entry = entries[folded]
+        icon_id = entry.id
+        provider = provider_of(icon_id)
+        if provider is None:
+            raise MxFileError(f"icon {icon_id!r} is not in a known namespace")
+        fill = int(entry.fill[1:], 16) if entry.fill else 0xFFFFFFFF
+        records += _RECORD.pack(
+            *intern(icon_id), *intern(entry.name or icon_id), *intern(entry.category),
+            fill, min(entry.width, 0xFFFF), min(entry.height, 0xFFFF),
+            PROVIDERS.index(provider), 0,
+        )
+        keys.extend((key.encode("utf-8"), number, key) for key in _keys_of(icon_id, entry))
+    keys.sort()
+
+    key_table = bytearray()
+    postings: dict[int, list[int]] = {}
+    for k, (_, record, text) in enumerate(keys):
+        grams = trigrams(text)
+        key_table += _KEY.pack(*intern(text), record, len(grams))
+        for code in grams:
+            postings.setdefault(code, []).append(k)
+    trigram_table = bytearray()
+    posting_list: list[int] = []
+    for code in sorted(postings):
+        trigram_table += _TRIGRAM.pack(code, len(posting_list), len(postings[code]))
+        posting_list.extend(postings[code])
+
+    def pad(buf: bytearray) -> bytearray:
+        buf.extend(b"\0" * (-len(buf) % 4))
+        return buf
+
+    sections = [pad(strings), pad(records), pad(key_table), trigram_table,
+                struct.pack(f"<{len(posting_list)}I", *posting_list)]
+    offsets = []
+    at = _HEADER.size
+    for section in sections:
+        offsets.append(at)
+        at += len(section)
+    header = _HEADER.pack(
+        MAGIC, 1, _COMPLETE if complete else 0, len(ids), len(keys),
+        len(postings), len(posting_list), *offsets,
+    )
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(header)
+        for section in sections:
+            fh.write(section)
+    os.replace(tmp, target)
@@ -0,0 +1,301 @@
+"""Persistent on-disk index of the cells in a .drawio file.
+
+The index is an SQLite database in the skill's cache directory, one per file,
+keyed by cell id, parent and edge endpoints and storing each cell's byte range.
+It is rebuilt with a single streaming pass whenever the file's size or mtime
+no longer match what the index recorded, so memory stays flat regardless of
+file size: uncompressed pages are scanned straight out of an ``mmap`` and
+compressed pages are decoded one at a time.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .cache import cache_dir, path_key
+from .codec import decompress_diagram
+from .errors import CellNotFound, MxFileError
+from .profile import span
+from .scanner import CellSpan, PageSpan, scan_cells, scan_pages
+
+SCHEMA_VERSION = "2"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    idx INTEGER PRIMARY KEY, id TEXT, name TEXT,
+    start INTEGER, stop INTEGER, content_start INTEGER, content_stop INTEGER,
+    root_end INTEGER, compressed INTEGER, model TEXT
+);
+CREATE TABLE IF NOT EXISTS cells (
+    page INTEGER, id TEXT, parent TEXT, source TEXT, target TEXT,
+    kind INTEGER, value TEXT, style TEXT,
+    x REAL, y REAL, width REAL, height REAL,
+    start INTEGER, stop INTEGER,
+    PRIMARY KEY (page, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cells_parent ON cells (page, parent);
+CREATE INDEX IF NOT EXISTS cells_source ON cells (page, source);
+CREATE INDEX IF NOT EXISTS cells_target ON cells (page, target);
+CREATE INDEX IF NOT EXISTS cells_start ON cells (page, start);
+"""
+
+_CELL_COLUMNS = (
+    "page, id, parent, source, target, kind, value, style, "
+    "x, y, width, height, start, stop"
+)
+_PAGE_COLUMNS = (
+    "idx, id, name, start, stop, content_start, content_stop, "
+    "root_end, compressed, model"
+)
+
+
+class CellIndex:
+    """Index of one .drawio file; see the module docstring."""
+
+    def __init__(
+        self, path: str | os.PathLike[str], index_path: str | os.PathLike[str] | None = None
+    ) -> None:
+        self.path = Path(path)
+        if index_path is None:
+            index_path = cache_dir("index") / f"{path_key(self.path)}.sqlite"
+        self.index_path = Path(index_path)
+        self._db = sqlite3.connect(self.index_path)
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute("PRAGMA journal_mode = MEMORY")
+        self._db.executescript(_SCHEMA)
+        self.refresh()
+
+    def __enter__(self) -> CellIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    # -- freshness ---------------------------------------------------------
+
+    def _stat_key(self) -> str:
+        st = os.stat(self.path)
+        return f"{SCHEMA_VERSION}:{st.st_size}:{st.st_mtime_ns}"
+
+    def is_current(self) -> bool:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'stat'").fetchone()
+        return row is not None and row[0] == self._stat_key()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the index if the file changed; return True if rebuilt."""
+        if not force and self.is_current():
+            return False
+        self.rebuild()
+        return True
+
+    def stamp(self) -> None:
+        """Record the file's current size and mtime as indexed."""
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('stat', ?)", (self._stat_key(),)
+            )
+
+    def rebuild(self) -> None:
+        with span("index"), self._db:
+            self._db.execute("DELETE FROM pages")
+            self._db.execute("DELETE FROM cells")
+            with self._mapped() as buf:
+                for page in scan_pages(buf):
+                    if page.compressed:
+                        xml = decompress_diagram(buf[page.content_start:page.content_stop])
+                        data = xml.encode("utf-8")
+                        for inner in scan_pages(data):
+                            page.model = inner.model
+                        self._put_page(page)
+                        self.add_cells(scan_cells(data, page.index))
+                    else:
+                        self._put_page(page)
+                        self.add_cells(
+                            scan_cells(
+                                buf, page.index, page.content_start,
+                                page.content_stop, page.content_start,
+                            )
+                        )
+        self.stamp()
+
+    @contextmanager
+    def _mapped(self) -> Iterator[bytes | mmap.mmap]:
+        with open(self.path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
+
+    # -- queries -----------------------------------------------------------
+
+    def pages(self) -> list[PageSpan]:
+        rows = self._db.execute(f"SELECT {_PAGE_COLUMNS} FROM pages ORDER BY idx")
+        return [_page_from_row(row) for row in rows]
+
+    def page(self, selector: int | str = 0) -> PageSpan:
+        """Look up a page by position, or by ``name`` or ``id`` attribute."""
+        pages = self.pages()
+        if isinstance(selector, int) or str(selector).isdigit():
+            pos = int(selector)
+            if 0 <= pos < len(pages):
+                return pages[pos]
+        else:
+            for page in pages:
+                if selector in (page.name, page.id):
+                    return page
+        raise MxFileError(f"no such page: {selector!r} ({len(pages)} pages)")
+
+    def find(self, cell_id: str, page: int = 0) -> CellSpan | None:
+        row = self._db.execute(
+            f"SELECT {_CELL_COLUMNS} FROM cells WHERE page = ? AND id = ?",
+            (page, cell_id),
+        ).fetchone()
+        return CellSpan(*row) if row else None
+
+    def get(self, cell_id: str, page: int = 0) -> CellSpan:
+        cell = self.find(cell_id, page)
+        if cell is None:
+            raise CellNotFound(cell_id)
+        return cell
+
+    def children(self, parent: str, page: int = 0) -> list[CellSpan]:
+        return self._cells("page = ? AND parent = ?", (page, parent))
+
+    def edges(self, cell_id: str, page: int = 0) -> list[CellSpan]:
+        """Edges whose source or target is ``cell_id``."""
+        return self._cells(
+            "page = ? AND source = ? UNION "
+            f"SELECT {_CELL_COLUMNS} FROM cells WHERE page = ? AND target = ?",
+            (page, cell_id, page, cell_id),
+        )
+
+    def cells(self, page: int | None = None) -> Iterator[CellSpan]:
+        """Iterate cells in document order, optionally for a single page."""
+        if page is None:
+            rows = self._db.execute(
+                f"SELECT {_CELL_COLUMNS} FROM cells ORDER BY page, start"
+            )
+        else:
+            rows = self._db.execute(
+                f"SELECT {_CELL_COLUMNS} FROM cells WHERE page = ? ORDER BY start",
+                (page,),
+            )
+        for row in rows:
+            yield CellSpan(*row)
+
+    def count(self, page: int | None = None) -> int:
+        if page is None:
+            return self._db.execute("SELECT COUNT(*) FROM cells").fetchone()[0]
+        return self._db.execute(
+            "SELECT COUNT(*) FROM cells WHERE page = ?", (page,)
+        ).fetchone()[0]
+
+    def read_page(self, page: PageSpan) -> bytes:
+        """Return the page's mxGraphModel XML, decompressing if needed."""
+        with open(self.path, "rb") as fh:
+            fh.seek(page.content_start)
+            content = fh.read(page.content_stop - page.content_start)
+        if page.compressed:
+            return decompress_diagram(content).encode("utf-8")
+        return content
+
+    def read_cell(self, cell: CellSpan, page: PageSpan | None = None) -> bytes:
+        """Return the raw XML of a cell element."""
+        if page is None:
+            page = self.page(cell.page)
+        if page.compressed:
+            return self.read_page(page)[cell.start:cell.stop]
+        with open(self.path, "rb") as fh:
+            fh.seek(page.content_start + cell.start)
+            return fh.read(cell.stop - cell.start)
+
+    def _cells(self, where: str, params: tuple) -> list[CellSpan]:
+        rows = self._db.execute(
+            f"SELECT {_CELL_COLUMNS} FROM cells WHERE {where}", params
+        )
+        return [CellSpan(*row) for row in rows]
+
+    # -- maintenance (used by the editor) ----------------------------------
+
+    def add_cells(self, cells: Iterable[CellSpan]) -> None:
+        # Duplicate ids keep the first occurrence, like draw.io itself.
+        self._db.executemany(
+            f"INSERT OR IGNORE INTO cells ({_CELL_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (_cell_row(cell) for cell in cells),
+        )
+
+    def drop_cells(self, page: int, ids: Iterable[str] | None = None) -> None:
+        """Forget the given cells, or every cell on ``page``."""
+        if ids is None:
+            self._db.execute("DELETE FROM cells WHERE page = ?", (page,))
+        else:
+            self._db.executemany(
+                "DELETE FROM cells WHERE page = ? AND id = ?",
+                ((page, cell_id) for cell_id in ids),
+            )
+
+    def shift(self, page: PageSpan, at: int, delta: int) -> None:
+        """Account for ``delta`` bytes inserted at file offset ``at``.
+
+        ``at`` must lie inside ``page``; only that page's later cells and
+        the offsets of later pages move.
+        """
+        if not delta:
+            return
+        if not page.compressed:
+            self.shift_cells(page.index, at - page.content_start, delta)
+        for column in ("start", "stop", "content_start", "content_stop", "root_end"):
+            self._db.execute(
+                f"UPDATE pages SET {column} = {column} + ? WHERE {column} >= ?",
+                (delta, at),
+            )
+
+    def shift_cells(self, page: int, at: int, delta: int) -> None:
+        """Move the cells of ``page`` from page offset ``at`` on by ``delta``.
+
+        Offsets on a compressed page are into its decompressed XML, which
+        :meth:`shift` leaves alone.
+        """
+        self._db.execute(
+            "UPDATE cells SET start = start + ?, stop = stop + ? WHERE page = ? AND start >= ?",
+            (delta, delta, page, at),
+        )
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def _put_page(self, page: PageSpan) -> None:
+        self._db.execute(
+            f"INSERT OR REPLACE INTO pages ({_PAGE_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                page.index, page.id, page.name, page.start, page.stop,
+                page.content_start, page.content_stop, page.root_end,
+                int(page.compressed), json.dumps(page.model),
+            ),
+        )
+
+
+def _cell_row(cell: CellSpan) -> tuple:
+    return (
+        cell.page, cell.id, cell.parent, cell.source, cell.target, cell.kind,
+        cell.value, cell.style, cell.x, cell.y, cell.width, cell.height,
+        cell.start, cell.stop,
+    )
+
+
+def _page_from_row(row: tuple) -> PageSpan:
+    *head, compressed, model = row
+    return PageSpan(*head, bool(compressed), json.loads(model or "{}"))
@@ -0,0 +1,788 @@
+"""Streaming CSV/JSONL ingestion for large org charts and inventories.
+
+Input is read twice, row by row.  The first pass keeps only a skeleton of
+the whole dataset: per row an integer parent, a box size, a kind number and
+the byte offset of the row in the file.  Labels and other columns are not
+kept.  From the skeleton the rows are cut into pages of at most
+``page_size`` rows: a subtree that would push its parent's page over the
+limit moves to its own page and is shown in the parent page as a dashed
+stub linking to it; small trees are packed together.  The second pass
+lays out and writes one page at a time, reading back only that page's rows
+by offset, so memory beyond the skeleton is proportional to one page.
+
+With a parent column the rows form a forest laid out by
+:func:`~mxfile.layout.tidy_layout`.  Subtrees of at least ``group`` rows
+become swimlane containers headed by their root, the way
+``svc_user_box`` holds the user service in ``microservices.drawio``.
+Without a parent column the rows are nodes of a graph whose edges come
+from the links column; pages hold whole connected components where
+possible and are laid out with :func:`~mxfile.layout.layered_layout`.
+Links between two rows on the same page become dashed edges in either
+mode; links across pages are counted and left out.  With ``icons``, kind
+values that name an AWS, Azure or GCP service ("lambda", "AWS::S3::Bucket")
+are drawn as that service's icon from :mod:`~mxfile.icons`.
+"""
+
+from __future__ import annotations
+
+import csv
+import html
+import json
+import re
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterator, TextIO
+
+from .editor import DEFAULT_EDGE_STYLE
+from .errors import MxFileError
+from .icons import Icon, load_catalog
+from .layout import compound_layout, layered_layout, tidy_layout
+from .model import Cell, Geometry, format_number
+from .profile import span
+from .writer import DEFAULT_MODEL, MxFileWriter
+
+FORMATS = ("csv", "tsv", "jsonl")
+MARGIN = 40.0
+
+NODE_STYLE = "rounded=1;whiteSpace=wrap;html=1;arcSize=10;"
+GROUP_STYLE = "swimlane;startSize={start};fontStyle=1;rounded=1;arcSize=8;swimlaneLine=0;html=1;"
+TREE_EDGE_STYLE = DEFAULT_EDGE_STYLE + "endArrow=none;"
+LINK_STYLE = DEFAULT_EDGE_STYLE + "dashed=1;"
+STUB_STYLE = "dashed=1;dashPattern=4 2;"
+
+# (fill, stroke) per kind, in order of first appearance.
+PALETTE = (
+    ("#dae8fc", "#6c8ebf"),
+    ("#d5e8d4", "#82b366"),
+    ("#ffe6cc", "#d79b00"),
+    ("#fff2cc", "#d6b656"),
+    ("#f8cecc", "#b85450"),
+    ("#e1d5e7", "#9673a6"),
+    ("#f5f5f5", "#666666"),
+)
+
+_LABEL_FIELDS = ("name", "label", "title")
+_RESERVED = {"id", "label", "placeholders", "link", "tooltip"}
+_SPLIT_LINKS = re.compile(r"\s*[;,|]\s*")
+_ATTR_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+@dataclass(slots=True)
+class Columns:
+    """Which input fields hold the id, parent, label, links and kind."""
+
+    id: str = "id"
+    # Id of the parent row; without one the rows form a graph.
+    parent: str | None = None
+    # Joined with line breaks, the first line bold; default: the first of
+    # name/label/title present, else the id.
+    label: tuple[str, ...] = ()
+    # Ids of related rows, separated by ``;``, ``,`` or ``|``.
+    links: str | None = None
+    # Rows of one kind share a colour.
+    kind: str | None = None
+
+
+@dataclass(slots=True)
+class Stats:
+    rows: int = 0
+    pages: int = 0
+    edges: int = 0
+    # Links whose ends ended up on different pages.
+    cross_page: int = 0
+    # Parent or link ids that match no row.
+    unknown: int = 0
+    # Parent chains that looped and were cut.
+    cycles: int = 0
+    # Kind values that name no known icon (with ``icons``).
+    no_icon: int = 0
+
+
+@dataclass(slots=True)
+class Skeleton:
+    """Everything the first pass keeps: a few numbers per row."""
+
+    fmt: str
+    keys: dict[str, int] = field(default_factory=dict)
+    offsets: array = field(default_factory=lambda: array("q"))
+    parent: array = field(default_factory=lambda: array("i"))
+    width: array = field(default_factory=lambda: array("f"))
+    height: array = field(default_factory=lambda: array("f"))
+    kind: array = field(default_factory=lambda: array("I"))
+    kinds: dict[str, int] = field(default_factory=dict)
+    # Kind number -> icon drawn for rows of that kind.
+    icons: dict[int, Icon] = field(default_factory=dict)
+    # Links as parallel source/target row numbers.
+    link_source: array = field(default_factory=lambda: array("i"))
+    link_target: array = field(default_factory=lambda: array("i"))
+    header: list[str] | None = None
+    label: tuple[str, ...] = ()
+    unknown: int = 0
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+@dataclass(slots=True)
+class _Page:
+    roots: list[int]
+    up: int | None = None  # page number the roots link back to
+    members: list[int] | None = None  # graph mode: fixed membership
+
+
+# ------------------------------------------------------------------ reading
+
+def detect_format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if suffix in (".tsv", ".tab"):
+        return "tsv"
+    if suffix == ".csv":
+        return "csv"
+    with open(path, "rb") as fh:
+        head = fh.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return "jsonl" if head.startswith(b"{") else "csv"
+
+
+class _Lines:
+    """Decoded lines of a binary file, tracking the offset of the next one."""
+
+    def __init__(self, fh: BinaryIO) -> None:
+        self.fh = fh
+        self.pos = fh.tell()
+
+    def __iter__(self) -> _Lines:
+        return self
+
+    def __next__(self) -> str:
+        line = self.fh.readline()
+        if not line:
+            raise StopIteration
+        self.pos += len(line)
+        return line.decode("utf-8", errors="replace")
+
+
+def iter_rows(
+    path: str | Path, fmt: str | None = None, header: list[str] | None = None
+) -> Iterator[tuple[int, dict[str, str]]]:
+    """Yield (byte offset, row) for every row of a CSV, TSV or JSONL file.
+
+    Values are strings: lists in JSON rows are joined with ``;`` and objects
+    are kept as JSON text.
+    """
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    with open(path, "rb") as fh:
+        if fh.read(3) != b"\xef\xbb\xbf":
+            fh.seek(0)
+        lines = _Lines(fh)
+        if fmt == "jsonl":
+            for start, line in _numbered(lines):
+                if line.strip():
+                    yield start, _flatten(_json_row(line, start))
+            return
+        reader = csv.reader(lines, delimiter=_delimiter(fmt))
+        first = [name.strip() for name in next(reader, [])]
+        header = header or first
+        while True:
+            start = lines.pos
+            row = next(reader, None)
+            if row is None:
+                return
+            if any(row):
+                yield start, dict(zip(header, row))
+
+
+def read_header(path: str | Path, fmt: str) -> list[str]:
+    """Column names of a CSV or TSV file."""
+    with open(path, encoding="utf-8-sig", newline="") as fh:
+        return [name.strip() for name in next(csv.reader(fh, delimiter=_delimiter(fmt)), [])]
+
+
+def read_rows(
+    path: str | Path, fmt: str, offsets: list[int], header: list[str] | None = None
+) -> Iterator[tuple[int, dict[str, str]]]:
+    """Re-read the rows starting at ``offsets`` (sorted), as (offset, row)."""
+    with open(path, "rb") as fh:
+        for offset in offsets:
+            fh.seek(offset)
+            lines = _Lines(fh)
+            if fmt == "jsonl":
+                yield offset, _flatten(_json_row(next(lines), offset))
+            else:
+                row = next(csv.reader(lines, delimiter=_delimiter(fmt)))
+                yield offset, dict(zip(header or [], row))
+
+
+def _delimiter(fmt: str) -> str:
+    return "\t" if fmt == "tsv" else ","
+
+
+def _numbered(lines: _Lines) -> Iterator[tuple[int, str]]:
+    while True:
+        start = lines.pos
+        line = next(lines, None)
+        if line is None:
+            return
+        yield start, line
+
+
+def _json_row(line: str, offset: int) -> dict:
+    try:
+        row = json.loads(line)
+    except ValueError as exc:
+        raise MxFileError(f"invalid JSON at byte {offset}: {exc}") from None
+    if not isinstance(row, dict):
+        raise MxFileError(f"expected a JSON object at byte {offset}")
+    return row
+
+
+def _flatten(row: dict) -> dict[str, str]:
+    out = {}
+    for key, value in row.items():
+        if value is None:
+            value = ""
+        elif isinstance(value, list):
+            value = ";".join(str(v) for v in value)
+        elif isinstance(value, dict):
+            value = json.dumps(value, separators=(",", ":"))
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        out[str(key)] = str(value)
+    return out
+
+
+# ---------------------------------------------------------------- skeleton
+
+def scan(path: str | Path, columns: Columns, fmt: str | None = None) -> Skeleton:
+    """First pass: read every row once and keep the skeleton."""
+    path = Path(path)
+    sk = Skeleton(fmt or detect_format(path))
+    parents: list[str] = []
+    links: list[tuple[int, str]] = []
+    if sk.fmt != "jsonl":
+        sk.header = read_header(path, sk.fmt)
+    for offset, row in iter_rows(path, sk.fmt, sk.header):
+        if not sk.offsets:
+            if columns.id not in row:
+                raise MxFileError(f"no {columns.id!r} column in {path}")
+            sk.label = columns.label or (
+                next((name for name in _LABEL_FIELDS if name in row), columns.id),
+            )
+        i = len(sk.offsets)
+        key = row.get(columns.id, "").strip() or f"row{i + 1}"
+        if key in sk.keys:
+            raise MxFileError(f"duplicate id {key!r} at byte {offset}")
+        sk.keys[key] = i
+        sk.offsets.append(offset)
+        width, height = _box(_label(row, sk.label))
+        sk.width.append(width)
+        sk.height.append(height)
+        if columns.kind:
+            kind = row.get(columns.kind, "")
+            sk.kind.append(sk.kinds.setdefault(kind, len(sk.kinds)))
+        if columns.parent:
+            parents.append(row.get(columns.parent, "").strip())
+        if columns.links:
+            value = row.get(columns.links, "").strip()
+            if value:
+                links.extend((i, target) for target in _SPLIT_LINKS.split(value) if target)
+
+    for i, key in enumerate(parents):
+        p = sk.keys.get(key, -1) if key else -1
+        if key and p < 0:
+            sk.unknown += 1
+        sk.parent.append(-1 if p == i else p)
+    if not columns.parent:
+        sk.parent.extend([-1] * len(sk.offsets))
+    for i, key in links:
+        j = sk.keys.get(key)
+        if j is None:
+            sk.unknown += 1
+        elif j != i:
+            sk.link_source.append(i)
+            sk.link_target.append(j)
+    return sk
+
+
+def _label(row: dict[str, str], fields: tuple[str, ...]) -> str:
+    parts = [
+        html.escape(row.get(name, "").strip(), quote=False).replace("\n", "<br>")
+        for name in fields
+    ]
+    parts = [part for part in parts if part]
+    if len(parts) > 1:
+        parts[0] = f"<b>{parts[0]}</b>"
+    return "<br>".join(parts)
+
+
+def _box(label: str) -> tuple[float, float]:
+    """A box that fits ``label``; draw.io wraps, so this is only a size hint."""
+    lines = label.replace("<b>", "").replace("</b>", "").split("<br>")
+    chars = max((len(html.unescape(line)) for line in lines), default=0)
+    width = max(120.0, _snap(chars * 7.2 + 30))
+    return width, max(50.0, _snap(len(lines) * 17 + 20))
+
+
+def _snap(value: float) -> float:
+    return float(-(-value // 10) * 10)
+
+
+# ------------------------------------------------------------------- trees
+
+class _Forest:
+    """Child lists and page cuts over the skeleton's parent column."""
+
+    def __init__(self, sk: Skeleton, page_size: int) -> None:
+        n = len(sk)
+        self.parent = sk.parent
+        self.first = array("i", [-1]) * n
+        self.next = array("i", [-1]) * n
+        self.cycles = self._link(n)
+        self.roots = [v for v in range(n) if self.parent[v] < 0]
+        # weight: cells of the subtree on its own page; size: whole subtree.
+        self.weight = array("i", [1]) * n
+        self.size = array("i", [1]) * n
+        self.cut = bytearray(n)
+        self._cut(page_size)
+
+    def children(self, v: int) -> Iterator[int]:
+        c = self.first[v]
+        while c >= 0:
+            yield c
+            c = self.next[c]
+
+    def members(self, roots: list[int]) -> tuple[list[int], list[int]]:
+        """Rows on the page holding ``roots``, and the cut stubs among them."""
+        members: list[int] = []
+        stubs: list[int] = []
+        tops = set(roots)
+        todo = list(reversed(roots))
+        while todo:
+            v = todo.pop()
+            members.append(v)
+            if self.cut[v] and v not in tops:
+                stubs.append(v)
+                continue
+            todo.extend(reversed(list(self.children(v))))
+        return members, stubs
+
+    def _link(self, n: int) -> int:
+        parent = self.parent
+        for v in range(n - 1, -1, -1):
+            p = parent[v]
+            if p >= 0:
+                self.next[v] = self.first[p]
+                self.first[p] = v
+        # Rows whose parent chain never reaches a root sit on a loop.
+        state = bytearray(n)  # 0 unseen, 1 on the current walk, 2 settled
+        cycles = 0
+        for start in range(n):
+            walk = []
+            v = start
+            while v >= 0 and not state[v]:
+                state[v] = 1
+                walk.append(v)
+                v = parent[v]
+            if v >= 0 and state[v] == 1:
+                parent[v] = -1
+                cycles += 1
+            for v in walk:
+                state[v] = 2
+        if cycles:
+            self.first = array("i", [-1]) * n
+            self.next = array("i", [-1]) * n
+            for v in range(n - 1, -1, -1):
+                p = parent[v]
+                if p >= 0:
+                    self.next[v] = self.first[p]
+                    self.first[p] = v
+        return cycles
+
+    def _cut(self, page_size: int) -> None:
+        order = array("i")
+        todo = list(reversed(self.roots))
+        while todo:
+            v = todo.pop()
+            order.append(v)
+            todo.extend(self.children(v))
+        weight, size, cut = self.weight, self.size, self.cut
+        for v in reversed(order):
+            kids = list(self.children(v))
+            w = 1 + sum(weight[c] for c in kids)
+            size[v] = 1 + sum(size[c] for c in kids)
+            if w > page_size:
+                # Move the heaviest subtrees out; a lone node with more
+                # direct children than fit is left oversized.
+                for c in sorted((c for c in kids if weight[c] > 1), key=lambda c: -weight[c]):
+                    cut[c] = 1
+                    w -= weight[c] - 1
+                    if w <= page_size:
+                        break
+            weight[v] = w
+
+
+def _plan_tree(forest: _Forest, page_size: int) -> tuple[list[_Page], dict[int, int]]:
+    """Pages in reading order (each followed by its sub-pages) and the page of every cut row."""
+    buckets: list[list[int]] = []
+    load = 0
+    for r in forest.roots:
+        if not buckets or load + forest.weight[r] > page_size:
+            buckets.append([])
+            load = 0
+        buckets[-1].append(r)
+        load += forest.weight[r]
+    pages: list[_Page] = []
+    page_of: dict[int, int] = {}
+    todo = [_Page(roots) for roots in reversed(buckets)]
+    while todo:
+        page = todo.pop()
+        number = len(pages)
+        pages.append(page)
+        if len(page.roots) == 1 and forest.cut[page.roots[0]]:
+            page_of[page.roots[0]] = number
+        _, stubs = forest.members(page.roots)
+        todo.extend(_Page([c], number) for c in reversed(stubs))
+    return pages, page_of
+
+
+# ------------------------------------------------------------------ graphs
+
+def _plan_graph(sk: Skeleton, page_size: int) -> list[_Page]:
+    """Connected components packed into pages; large ones cut in BFS order."""
+    n = len(sk)
+    root = array("i", range(n))
+
+    def find(v: int) -> int:
+        while root[v] != v:
+            root[v] = root[root[v]]
+            v = root[v]
+        return v
+
+    for s, t in zip(sk.link_source, sk.link_target):
+        a, b = find(s), find(t)
+        if a != b:
+            root[max(a, b)] = min(a, b)
+    count = array("i", [0]) * n
+    for v in range(n):
+        count[find(v)] += 1
+
+    adjacency = _adjacency(n, sk.link_source, sk.link_target, both=True)
+    pages: list[_Page] = []
+    small: list[int] = []
+    for v in range(n):
+        if root[v] != v:
+            continue
+        if count[v] <= page_size:
+            if len(small) + count[v] > page_size:
+                pages.append(_Page([], members=small))
+                small = []
+            small.extend(sorted(_component(v, adjacency)))
+            continue
+        order = _component(v, adjacency)
+        for i in range(0, len(order), page_size):
+            pages.append(_Page([], members=order[i:i + page_size]))
+    if small:
+        pages.append(_Page([], members=small))
+    return pages
+
+
+def _adjacency(n: int, sources: array, targets: array, both: bool) -> tuple[array, array]:
+    """Compressed adjacency: neighbours of v are ``adj[start[v]:start[v + 1]]``."""
+    start = array("i", [0]) * (n + 1)
+    for s in sources:
+        start[s + 1] += 1
+    if both:
+        for t in targets:
+            start[t + 1] += 1
+    for v in range(n):
+        start[v + 1] += start[v]
+    fill = array("i", start[:n])
+    adj = array("i", [0]) * start[n]
+    for s, t in zip(sources, targets):
+        adj[fill[s]] = t
+        fill[s] += 1
+        if both:
+            adj[fill[t]] = s
+            fill[t] += 1
+    return start, adj
+
+
+def _component(v: int, adjacency: tuple[array, array]) -> list[int]:
+    start, adj = adjacency
+    seen = {v}
+    order = [v]
+    for u in order:  # grows while iterating: breadth-first
+        for w in adj[start[u]:start[u + 1]]:
+            if w not in seen:
+                seen.add(w)
+                order.append(w)
+    return order
+
+
+# ----------------------------------------------------------------- writing
+
+def ingest(
+    source: str | Path,
+    stream: TextIO,
+    columns: Columns,
+    *,
+    fmt: str | None = None,
+    direction: str = "TB",
+    page_size: int = 1000,
+    group: int = 0,
+    stack: int = 8,
+    data: bool = True,
+    icons: bool = False,
+    compressed: bool = False,
+    name: str | None = None,
+) -> Stats:
+    """Write an mxfile for the rows of ``source`` to ``stream``.
+
+    ``group`` of 0 disables swimlane containers; ``stack`` of 0 keeps leaf
+    children in rows.  With ``data``, each row's other columns are kept as
+    cell attributes, as draw.io's own CSV import does.  With ``icons``, rows
+    whose kind names a cloud service are drawn as its icon.
+    """
+    if page_size < 2:
+        raise MxFileError("page size must be at least 2")
+    source = Path(source)
+    with span("scan"):
+        sk = scan(source, columns, fmt)
+    stats = Stats(rows=len(sk), unknown=sk.unknown)
+    if not len(sk):
+        raise MxFileError(f"no rows in {source}")
+    if icons and columns.kind:
+        stats.no_icon = _resolve_icons(sk)
+    name = name or source.stem
+    keys = list(sk.keys)
+    out_links = _adjacency(len(sk), sk.link_source, sk.link_target, both=False)
+
+    forest = page_of = None
+    with span("plan"):
+        if columns.parent:
+            forest = _Forest(sk, page_size)
+            stats.cycles = forest.cycles
+            pages, page_of = _plan_tree(forest, page_size)
+        else:
+            pages = _plan_graph(sk, page_size)
+
+    with MxFileWriter(stream, compressed=compressed) as writer:
+        for number, page in enumerate(pages):
+            if forest is not None:
+                members, stubs = forest.members(page.roots)
+            else:
+                members, stubs = page.members, []
+            with span("read"):
+                offsets = sorted(sk.offsets[v] for v in members)
+                by_offset = dict(read_rows(source, sk.fmt, offsets, sk.header))
+                rows = {v: by_offset[sk.offsets[v]] for v in members}
+            with span("layout"):
+                builder = _PageBuilder(sk, keys, columns, rows, direction, data)
+                if forest is not None:
+                    extent = builder.tree(forest, page, set(stubs), page_of, group, stack)
+                else:
+                    extent = builder.graph(out_links)
+                stats.cross_page += builder.links(out_links)
+
+            title = name
+            if len(page.roots) == 1 or len(members) == 1:
+                title = _plain(_label(rows[members[0]], sk.label[:1])) or keys[members[0]]
+            elif len(pages) > 1:
+                title = f"{name} {number + 1}"
+            width, height = extent
+            with span("write"):
+                writer.begin_page(
+                    title, f"page-{number + 1}",
+                    pageWidth=max(int(DEFAULT_MODEL["pageWidth"]), int(width + 2 * MARGIN)),
+                    pageHeight=max(int(DEFAULT_MODEL["pageHeight"]), int(height + 2 * MARGIN)),
+                )
+                for cell in builder.cells:
+                    writer.write_cell(cell)
+                    stats.edges += cell.edge
+                writer.end_page()
+            stats.pages += 1
+    return stats
+
+
+def _resolve_icons(sk: Skeleton) -> int:
+    """Match kinds to icons and size their rows; return the misses."""
+    catalog = load_catalog()
+    misses = 0
+    for kind, number in sk.kinds.items():
+        icon = catalog.lookup(kind) if kind.strip() else None
+        if icon is None:
+            misses += bool(kind.strip())
+        elif icon.width and icon.height:
+            sk.icons[number] = icon
+    if sk.icons:
+        for v, number in enumerate(sk.kind):
+            icon = sk.icons.get(number)
+            if icon is not None:
+                sk.width[v], sk.height[v] = icon.width, icon.height
+    return misses
+
+
+def ingest_file(
+    source: str | Path, target: str | Path | None = None, columns: Columns | None = None, **options
+) -> Stats:
+    """Ingest one file; by default the output sits next to it."""
+    source = Path(source)
+    target = Path(target) if target is not None else source.with_suffix(".drawio")
+    with open(target, "w", encoding="utf-8") as fh:
+        return ingest(source, fh, columns or Columns(), **options)
+
+
+class _PageBuilder:
+    """Cells for one page, built from that page's rows only."""
+
+    def __init__(self, sk: Skeleton, keys: list[str], columns: Columns,
+                 rows: dict[int, dict[str, str]], direction: str, data: bool) -> None:
+        self.sk = sk
+        self.keys = keys
+        self.columns = columns
+        self.rows = rows
+        self.direction = direction
+        self.data = data
+        self.cells: list[Cell] = []
+        self.used = {keys[v] for v in rows}
+        # Links already drawn by the layout (graph mode).
+        self.drawn = False
+
+    def tree(self, forest: _Forest, page: _Page, stubs: set[int],
+             page_of: dict[int, int], group: int, stack: int) -> tuple[float, float]:
+        keys, sk, rows = self.keys, self.sk, self.rows
+        roots = set(page.roots)
+        groups = {
+            v for v in rows
+            if group and v not in roots and v not in stubs
+            and forest.first[v] >= 0 and forest.weight[v] >= group
+        }
+        container: dict[int, int | None] = {}
+        for v in rows:  # parents come before their children
+            p = forest.parent[v]
+            if v in roots or p < 0:
+                container[v] = None
+            else:
+                container[v] = p if p in groups else container[p]
+
+        sizes = {keys[v]: (sk.width[v], sk.height[v]) for v in rows if v not in groups}
+        parent = {keys[v]: None if container[v] is None else keys[container[v]] for v in rows}
+        tree_edges = [(forest.parent[v], v) for v in rows if v not in roots and forest.parent[v] >= 0]
+        header = 26.0 + 14.0 * (len(sk.label) - 1)
+        layout = compound_layout(
+            sizes, [(keys[u], keys[v]) for u, v in tree_edges], parent, self.direction,
+            header=header, engine=tidy_layout, stack=stack,
+        )
+
+        for v in rows:
+            style, link = self._node_style(v), None
+            value = self._value(v)
+            if v in groups:
+                style = GROUP_STYLE.format(start=format_number(header))
+            elif v in stubs:
+                style += STUB_STYLE
+                value += f"<br><i>+{forest.size[v] - 1} more</i>"
+                link = page_of[v]
+            elif v in roots and page.up is not None:
+                link = page.up
+            self._vertex(v, value, style, container[v], layout.boxes[keys[v]], link)
+        for k, (u, v) in enumerate(tree_edges):
+            if u not in groups:  # a container's header stands for its edges
+                self._edge(u, v, TREE_EDGE_STYLE, container[v], layout.routes.get(k))
+        return layout.width, layout.height
+
+    def graph(self, out_links: tuple[array, array]) -> tuple[float, float]:
+        keys, sk = self.keys, self.sk
+        start, adj = out_links
+        edges = [
+            (v, t) for v in self.rows
+            for t in adj[start[v]:start[v + 1]] if t in self.rows
+        ]
+        sizes = {keys[v]: (sk.width[v], sk.height[v]) for v in self.rows}
+        layout = layered_layout(sizes, [(keys[u], keys[v]) for u, v in edges], self.direction)
+        for v in self.rows:
+            self._vertex(v, self._value(v), self._node_style(v), None, layout.boxes[keys[v]], None)
+        for k, (u, v) in enumerate(edges):
+            self._edge(u, v, DEFAULT_EDGE_STYLE, None, layout.routes.get(k))
+        self.drawn = True
+        return layout.width, layout.height
+
+    def links(self, out_links: tuple[array, array]) -> int:
+        """Draw links between rows of this page; return how many leave it."""
+        start, adj = out_links
+        cross = 0
+        for v in self.rows:
+            for t in adj[start[v]:start[v + 1]]:
+                if t not in self.rows:
+                    cross += 1
+                elif not self.drawn:
+                    self._edge(v, t, LINK_STYLE, None, None)
+        return cross
+
+    def _node_style(self, v: int) -> str:
+        icon = self.sk.icons.get(self.sk.kind[v]) if self.sk.icons else None
+        return icon.style() + "whiteSpace=wrap;" if icon is not None else NODE_STYLE
+
+    def _value(self, v: int) -> str:
+        return _label(self.rows[v], self.sk.label) or html.escape(self.keys[v], quote=False)
+
+    def _vertex(self, v: int, value: str, style: str, container: int | None,
+                box: tuple[float, float, float, float], link: int | None) -> None:
+        x, y, w, h = box
+        if container is None:
+            x, y = x + MARGIN, y + MARGIN
+        if self.columns.kind and "fillColor=" not in style:  # icons bring their own
+            fill, stroke = PALETTE[self.sk.kind[v] % len(PALETTE)]
+            style += f"fillColor={fill};strokeColor={stroke};"
+        attrs = self._data(self.rows[v]) if self.data else {}
+        if link is not None:
+            attrs["link"] = f"data:page/id,page-{link + 1}"
+        self.cells.append(Cell(
+            id=self.keys[v], value=value, style=style,
+            parent="1" if container is None else self.keys[container],
+            vertex=True, geometry=Geometry(x, y, w, h), data=attrs,
+        ))
+
+    def _edge(self, u: int, v: int, style: str, container: int | None, route) -> None:
+        points = None
+        if route is not None:
+            offset = MARGIN if container is None else 0.0
+            points = [(x + offset, y + offset) for x, y in route.points] or None
+            style += (
+                f"exitX={format_number(round(route.exit[0], 4))};"
+                f"exitY={format_number(round(route.exit[1], 4))};"
+                f"entryX={format_number(round(route.entry[0], 4))};"
+                f"entryY={format_number(round(route.entry[1], 4))};"
+            )
+        source, target = self.keys[u], self.keys[v]
+        cell_id = f"{source}-{target}"
+        while cell_id in self.used:
+            cell_id += "_"
+        self.used.add(cell_id)
+        self.cells.append(Cell(
+            id=cell_id, style=style,
+            parent="1" if container is None else self.keys[container],
+            edge=True, source=source, target=target,
+            geometry=Geometry(relative=True, points=points),
+        ))
+
+    def _data(self, row: dict[str, str]) -> dict[str, str]:
+        skip = {self.columns.id, self.columns.parent, self.columns.links}
+        attrs = {}
+        for key, value in row.items():
+            if key in skip or not value:
+                continue
+            attr = _ATTR_NAME.sub("_", key) or "_"
+            if attr[0].isdigit() or attr[0] in "-.":
+                attr = "_" + attr
+            if attr in _RESERVED:
+                attr += "_"
+            attrs[attr] = value
+        return attrs
+
+
+def _plain(label: str) -> str:
+    return html.unescape(re.sub(r"<[^>]+>", " ", label)).strip()
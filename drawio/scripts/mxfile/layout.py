@@ -0,0 +1,774 @@
+"""Layered (Sugiyama-style) graph layout with orthogonal edge routing.
+
+The pipeline is the classic one, with each phase chosen to stay close to
+linear so that graphs with thousands of nodes lay out in about a second:
+
+1. Cycle removal -- iterative DFS; back edges are reversed.
+2. Layering -- longest path from the sources, then sources are pulled down
+   next to their first successor.
+3. Normalization -- edges spanning several layers get dummy nodes.
+4. Ordering -- alternating barycenter sweeps; the ordering with the fewest
+   crossings (counted with a Fenwick tree) is kept.
+5. Coordinates -- each layer is placed by isotonic regression (pool adjacent
+   violators) towards its neighbours' positions, which keeps layers packed
+   and long edges straight.
+6. Routing -- orthogonal waypoints through the dummy nodes, with ports spread
+   along the node sides in neighbour order.
+
+Everything is computed top-to-bottom and transformed for ``LR``, ``BT`` and
+``RL`` at the end.  :func:`compound_layout` lays out nested groups
+(subgraphs, composite states) by laying out each group's contents first and
+treating the group as a single box in its parent.
+
+:func:`tidy_layout` is the linear-time alternative for trees (org charts,
+inventories): Reingold-Tilford placement as improved by Buchheim, Junger and
+Leipert, with the same routing conventions.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable
+
+Size = tuple[float, float]
+
+DIRECTIONS = ("TB", "LR", "BT", "RL")
+
+
+@dataclass(slots=True)
+class EdgeRoute:
+    """Waypoints and port constraints for one edge.
+
+    ``exit`` and ``entry`` are fractions of the node bounds, as used by the
+    ``exitX``/``exitY``/``entryX``/``entryY`` style keys.
+    """
+
+    points: list[tuple[float, float]]
+    exit: tuple[float, float]
+    entry: tuple[float, float]
+
+
+@dataclass
+class Layout:
+    """Top-left positions and sizes keyed by node id, plus edge routes."""
+
+    boxes: dict[str, tuple[float, float, float, float]] = field(default_factory=dict)
+    routes: dict[int, EdgeRoute] = field(default_factory=dict)
+    width: float = 0.0
+    height: float = 0.0
+
+
+def layered_layout(
+    sizes: dict[str, Size],
+    edges: list[tuple[str, str]],
+    direction: str = "TB",
+    node_gap: float = 40.0,
+    layer_gap: float = 60.0,
+    sweeps: int = 4,
+    max_span: int = 16,
+) -> Layout:
+    """Lay out a directed graph.
+
+    ``sizes`` maps node id to (width, height) in input order, which is also
+    the tie-breaking order.  Routes are keyed by position in ``edges``.
+    Self-loops, edges to unknown nodes and edges spanning more than
+    ``max_span`` layers get no route: the dummy nodes they would need
+    dominate the cost on large graphs, so they are left to draw.io's router.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"unknown direction: {direction!r}")
+    ids = list(sizes)
+    index = {node: i for i, node in enumerate(ids)}
+    horizontal = direction in ("LR", "RL")
+    # breadth runs along a layer, depth along the flow.
+    breadth = [sizes[n][1] if horizontal else sizes[n][0] for n in ids]
+    depth = [sizes[n][0] if horizontal else sizes[n][1] for n in ids]
+    n = len(ids)
+
+    pairs: list[tuple[int, int, int]] = []  # (edge number, u, v)
+    for k, (s, t) in enumerate(edges):
+        u, v = index.get(s), index.get(t)
+        if u is not None and v is not None and u != v:
+            pairs.append((k, u, v))
+
+    flipped = _break_cycles(n, [(u, v) for _, u, v in pairs])
+    dag = [(v, u) if flip else (u, v) for (_, u, v), flip in zip(pairs, flipped)]
+    layer = _assign_layers(n, dag)
+
+    # Normalize: chains of node numbers, one per edge, dummies appended.
+    kept = [i for i, (u, v) in enumerate(dag) if layer[v] - layer[u] <= max_span]
+    pairs = [pairs[i] for i in kept]
+    flipped = [flipped[i] for i in kept]
+    dag = [dag[i] for i in kept]
+    chains: list[list[int]] = []
+    for u, v in dag:
+        chain = [u]
+        for _ in range(layer[u] + 1, layer[v]):
+            dummy = len(layer)
+            layer.append(layer[chain[-1]] + 1)
+            breadth.append(0.0)
+            depth.append(0.0)
+            chain.append(dummy)
+        chain.append(v)
+        chains.append(chain)
+    total = len(layer)
+    is_dummy = [i >= n for i in range(total)]
+
+    up: list[list[int]] = [[] for _ in range(total)]
+    down: list[list[int]] = [[] for _ in range(total)]
+    for chain in chains:
+        for a, b in zip(chain, chain[1:]):
+            down[a].append(b)
+            up[b].append(a)
+
+    layers = _initial_order(total, layer, down)
+    layers = _minimize_crossings(layers, up, down, sweeps)
+    xs = [float(round(x)) for x in _assign_x(layers, breadth, up, down, is_dummy, node_gap)]
+
+    # Depth coordinates: layers stacked with their tallest member centred.
+    layer_depth = [max((depth[v] for v in row), default=0.0) for row in layers]
+    tops = []
+    offset = 0.0
+    for extent in layer_depth:
+        tops.append(offset)
+        offset += extent + layer_gap
+    total_depth = max(offset - layer_gap, 0.0)
+    total_breadth = max(
+        (xs[v] + breadth[v] / 2 for v in range(total)), default=0.0
+    )
+
+    def d_top(v: int) -> float:
+        row = layer[v]
+        return tops[row] + (layer_depth[row] - depth[v]) / 2
+
+    out = Layout()
+    for i, node in enumerate(ids):
+        b0 = xs[i] - breadth[i] / 2
+        out.boxes[node] = _place(direction, b0, d_top(i), breadth[i], depth[i], total_depth)
+    if horizontal:
+        out.width, out.height = total_depth, total_breadth
+    else:
+        out.width, out.height = total_breadth, total_depth
+
+    # Ports: spread edges along each side in the order of the neighbour,
+    # snapped to whole pixels so that waypoints stay integral.
+    def spread(node: int, i: int, count: int) -> float:
+        extent = breadth[node]
+        frac = (i + 1) / (count + 1)
+        return round(extent * frac) / extent if extent else frac
+
+    bottom_port: dict[int, float] = {}
+    top_port: dict[int, float] = {}
+    by_source: dict[int, list[int]] = defaultdict(list)
+    by_target: dict[int, list[int]] = defaultdict(list)
+    for e, chain in enumerate(chains):
+        by_source[chain[0]].append(e)
+        by_target[chain[-1]].append(e)
+    for node, es in by_source.items():
+        es.sort(key=lambda e: xs[chains[e][1]])
+        for i, e in enumerate(es):
+            bottom_port[e] = spread(node, i, len(es))
+    for node, es in by_target.items():
+        es.sort(key=lambda e: xs[chains[e][-2]])
+        for i, e in enumerate(es):
+            top_port[e] = spread(node, i, len(es))
+
+    for e, ((k, _, _), chain, flip) in enumerate(zip(pairs, chains, flipped)):
+        src, dst = chain[0], chain[-1]
+        start_b = xs[src] - breadth[src] / 2 + breadth[src] * bottom_port[e]
+        end_b = xs[dst] - breadth[dst] / 2 + breadth[dst] * top_port[e]
+        track = [start_b] + [xs[d] for d in chain[1:-1]] + [end_b]
+        points: list[tuple[float, float]] = []
+        for j in range(len(chain) - 1):
+            a, b = track[j], track[j + 1]
+            if abs(a - b) > 0.5:
+                row = layer[chain[j]]
+                mid = tops[row] + layer_depth[row] + layer_gap / 2
+                points.append((a, mid))
+                points.append((b, mid))
+        points = [_point(direction, b, d, total_depth) for b, d in points]
+        exit_port = _port(direction, bottom_port[e], bottom=True)
+        entry_port = _port(direction, top_port[e], bottom=False)
+        if flip:
+            points.reverse()
+            exit_port, entry_port = entry_port, exit_port
+        out.routes[k] = EdgeRoute(points, exit_port, entry_port)
+    return out
+
+
+def tidy_layout(
+    sizes: dict[str, Size],
+    edges: list[tuple[str, str]],
+    direction: str = "TB",
+    node_gap: float = 20.0,
+    layer_gap: float = 50.0,
+    stack: int = 0,
+) -> Layout:
+    """Lay out a forest as a tidy tree, in time linear in its size.
+
+    ``edges`` are (parent, child) pairs; a node's children keep the order of
+    its edges and roots keep the order of ``sizes``.  Edges that would give a
+    node a second parent or close a cycle get no route.  With ``stack``, the
+    children of a node that has at least that many, all of them leaves, are
+    stacked in one column off a shared trunk instead of spread in a row.
+    Levels are top-aligned, so edges enter every node of a level at the same
+    depth.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"unknown direction: {direction!r}")
+    ids = list(sizes)
+    index = {node: i for i, node in enumerate(ids)}
+    horizontal = direction in ("LR", "RL")
+    breadth = [sizes[n][1] if horizontal else sizes[n][0] for n in ids]
+    depth = [sizes[n][0] if horizontal else sizes[n][1] for n in ids]
+    n = len(ids)
+
+    parent = [-1] * n
+    kids: list[list[int]] = [[] for _ in range(n)]
+    edge_of = [-1] * n  # edge number that attaches each node to its parent
+    for k, (s, t) in enumerate(edges):
+        u, v = index.get(s), index.get(t)
+        if u is None or v is None or u == v or parent[v] >= 0:
+            continue
+        parent[v] = u
+        kids[u].append(v)
+        edge_of[v] = k
+    # Nodes not reachable from a root hang off a cycle: cut it at the first.
+    seen = [False] * n
+    roots: list[int] = []
+    for start in [v for v in range(n) if parent[v] < 0] + list(range(n)):
+        if seen[start]:
+            continue
+        if parent[start] >= 0:
+            kids[parent[start]].remove(start)
+            parent[start] = edge_of[start] = -1
+        roots.append(start)
+        seen[start] = True
+        todo = [start]
+        while todo:
+            for w in kids[todo.pop()]:
+                seen[w] = True
+                todo.append(w)
+
+    # Leaf columns become one block child; members are placed afterwards.
+    columns: dict[int, list[int]] = {}
+
+    def column(members: list[int], u: int) -> int:
+        block = len(breadth)
+        breadth.append(max(breadth[c] for c in members) + node_gap)
+        depth.append(sum(depth[c] for c in members) + node_gap / 2 * (len(members) - 1))
+        parent.append(u)
+        kids.append([])
+        columns[block] = members
+        return block
+
+    def stackable(members: list[int]) -> bool:
+        return 0 < stack <= len(members) and not any(kids[c] for c in members)
+
+    for u in range(n):
+        if stackable(kids[u]):
+            kids[u] = [column(kids[u], u)]
+    if stackable(roots):
+        roots = [column(roots, -1)]
+
+    # A virtual root makes the forest one tree.
+    top = len(breadth)
+    breadth.append(0.0)
+    depth.append(0.0)
+    parent.append(-1)
+    kids.append(roots)
+    for r in roots:
+        parent[r] = top
+    total = top + 1
+
+    number = [0] * total
+    for u in range(total):
+        for i, w in enumerate(kids[u]):
+            number[w] = i
+    prelim = [0.0] * total
+    mod = [0.0] * total
+    shift = [0.0] * total
+    change = [0.0] * total
+    thread = [-1] * total
+    ancestor = list(range(total))
+    default = {u: kids[u][0] for u in range(total) if kids[u]}
+
+    def sep(a: int, b: int) -> float:
+        return (breadth[a] + breadth[b]) / 2 + node_gap
+
+    def next_left(v: int) -> int:
+        return kids[v][0] if kids[v] else thread[v]
+
+    def next_right(v: int) -> int:
+        return kids[v][-1] if kids[v] else thread[v]
+
+    def apportion(v: int, p: int) -> None:
+        i = number[v]
+        if i == 0:
+            return
+        siblings = kids[p]
+        vip = vop = v
+        vim = siblings[i - 1]
+        vom = siblings[0]
+        sip, sop, sim, som = mod[vip], mod[vop], mod[vim], mod[vom]
+        while True:
+            right, left = next_right(vim), next_left(vip)
+            if right < 0 or left < 0:
+                break
+            vim, vip = right, left
+            vom, vop = next_left(vom), next_right(vop)
+            ancestor[vop] = v
+            gap = prelim[vim] + sim - (prelim[vip] + sip) + sep(vim, vip)
+            if gap > 0:
+                a = ancestor[vim] if parent[ancestor[vim]] == p else default[p]
+                subtrees = number[v] - number[a]
+                change[v] -= gap / subtrees
+                shift[v] += gap
+                change[a] += gap / subtrees
+                prelim[v] += gap
+                mod[v] += gap
+                sip += gap
+                sop += gap
+            sim += mod[vim]
+            sip += mod[vip]
+            som += mod[vom]
+            sop += mod[vop]
+        if next_right(vim) >= 0 and next_right(vop) < 0:
+            thread[vop] = next_right(vim)
+            mod[vop] += sim - sop
+        if next_left(vip) >= 0 and next_left(vom) < 0:
+            thread[vom] = next_left(vip)
+            mod[vom] += sip - som
+            default[p] = v
+
+    # First walk, in post-order.
+    order: list[int] = []
+    todo = [top]
+    while todo:
+        v = todo.pop()
+        order.append(v)
+        todo.extend(kids[v])
+    for v in reversed(order):
+        children = kids[v]
+        p = parent[v]
+        left = kids[p][number[v] - 1] if p >= 0 and number[v] > 0 else -1
+        if children:
+            moved = changed = 0.0
+            for w in reversed(children):
+                prelim[w] += moved
+                mod[w] += moved
+                changed += change[w]
+                moved += shift[w] + changed
+            mid = (prelim[children[0]] + prelim[children[-1]]) / 2
+            if left >= 0:
+                prelim[v] = prelim[left] + sep(left, v)
+                mod[v] = prelim[v] - mid
+            else:
+                prelim[v] = mid
+        elif left >= 0:
+            prelim[v] = prelim[left] + sep(left, v)
+        if p >= 0:
+            apportion(v, p)
+
+    # Second walk: absolute centres and levels.
+    xs = [0.0] * total
+    level = [0] * total
+    todo = [(top, -prelim[top], -1)]
+    while todo:
+        v, m, lv = todo.pop()
+        xs[v] = prelim[v] + m
+        level[v] = lv
+        for w in kids[v]:
+            todo.append((w, m + mod[v], lv + 1))
+    for block, members in columns.items():
+        for c in members:
+            level[c] = level[block]
+            xs[c] = xs[block] - breadth[block] / 2 + node_gap + breadth[c] / 2
+    placed = range(top)
+    left_edge = min((xs[v] - breadth[v] / 2 for v in placed), default=0.0)
+    xs = [float(round(x - left_edge)) for x in xs]
+
+    levels = max((level[v] for v in placed), default=-1) + 1
+    layer_depth = [0.0] * levels
+    for v in placed:
+        layer_depth[level[v]] = max(layer_depth[level[v]], depth[v])
+    tops = []
+    offset = 0.0
+    for extent in layer_depth:
+        tops.append(offset)
+        offset += extent + layer_gap
+    total_depth = max(offset - layer_gap, 0.0)
+    total_breadth = max((xs[v] + breadth[v] / 2 for v in placed), default=0.0)
+
+    out = Layout()
+    b0 = [xs[v] - breadth[v] / 2 for v in range(total)]
+    d0 = [tops[level[v]] if v < top else 0.0 for v in range(total)]
+    for block, members in columns.items():
+        offset = d0[block]
+        for c in members:
+            d0[c] = offset
+            offset += depth[c] + node_gap / 2
+    for i, node in enumerate(ids):
+        out.boxes[node] = _place(direction, b0[i], d0[i], breadth[i], depth[i], total_depth)
+    if horizontal:
+        out.width, out.height = total_depth, total_breadth
+    else:
+        out.width, out.height = total_breadth, total_depth
+
+    exit_port = _port(direction, 0.5, bottom=True)
+    entry_port = _port(direction, 0.5, bottom=False)
+    side_port = (0.0, 0.5) if not horizontal else (0.5, 0.0)
+    for v in range(n):
+        if edge_of[v] < 0:
+            continue
+        u = parent[v]
+        mid = d0[u] + layer_depth[level[u]] + layer_gap / 2
+        if kids[u][0] in columns:
+            trunk = b0[kids[u][0]] + node_gap / 2
+            points = [(xs[u], mid), (trunk, mid), (trunk, d0[v] + depth[v] / 2)]
+            entry = side_port
+        else:
+            points = [(xs[u], mid), (xs[v], mid)] if abs(xs[u] - xs[v]) > 0.5 else []
+            entry = entry_port
+        points = [_point(direction, b, d, total_depth) for b, d in points]
+        out.routes[edge_of[v]] = EdgeRoute(points, exit_port, entry)
+    return out
+
+
+def _place(direction, b0, d0, b_ext, d_ext, total_depth):
+    if direction == "TB":
+        return (b0, d0, b_ext, d_ext)
+    if direction == "BT":
+        return (b0, total_depth - d0 - d_ext, b_ext, d_ext)
+    if direction == "LR":
+        return (d0, b0, d_ext, b_ext)
+    return (total_depth - d0 - d_ext, b0, d_ext, b_ext)
+
+
+def _point(direction, b, d, total_depth):
+    if direction == "TB":
+        return (b, d)
+    if direction == "BT":
+        return (b, total_depth - d)
+    if direction == "LR":
+        return (d, b)
+    return (total_depth - d, b)
+
+
+def _port(direction: str, frac: float, bottom: bool) -> tuple[float, float]:
+    """Map a fraction along the leading/trailing side to (fx, fy)."""
+    far = 1.0 if bottom else 0.0
+    if direction == "TB":
+        return (frac, far)
+    if direction == "BT":
+        return (frac, 1.0 - far)
+    if direction == "LR":
+        return (far, frac)
+    return (1.0 - far, frac)
+
+
+def _break_cycles(n: int, edges: list[tuple[int, int]]) -> list[bool]:
+    """Return, per edge, whether reversing it is needed to make a DAG."""
+    out: list[list[tuple[int, int]]] = [[] for _ in range(n)]
+    for e, (u, v) in enumerate(edges):
+        out[u].append((v, e))
+    state = [0] * n  # 0 new, 1 on stack, 2 done
+    flipped = [False] * len(edges)
+    for root in range(n):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, iter(out[root]))]
+        while stack:
+            node, it = stack[-1]
+            for v, e in it:
+                if state[v] == 1:
+                    flipped[e] = True
+                elif state[v] == 0:
+                    state[v] = 1
+                    stack.append((v, iter(out[v])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+    return flipped
+
+
+def _assign_layers(n: int, dag: list[tuple[int, int]]) -> list[int]:
+    succ: list[list[int]] = [[] for _ in range(n)]
+    indeg = [0] * n
+    for u, v in dag:
+        succ[u].append(v)
+        indeg[v] += 1
+    layer = [0] * n
+    order = [v for v in range(n) if indeg[v] == 0]
+    for u in order:  # grows while iterating: Kahn's algorithm
+        for v in succ[u]:
+            if layer[u] + 1 > layer[v]:
+                layer[v] = layer[u] + 1
+            indeg[v] -= 1
+            if indeg[v] == 0:
+                order.append(v)
+    # Pull sources down so they sit directly above their nearest successor.
+    has_pred = [False] * n
+    for _, v in dag:
+        has_pred[v] = True
+    for u in range(n):
+        if not has_pred[u] and succ[u]:
+            layer[u] = min(layer[v] for v in succ[u]) - 1
+    return layer
+
+
+def _initial_order(total: int, layer: list[int], down: list[list[int]]) -> list[list[int]]:
+    """Order each layer by first visit in a DFS from the top."""
+    height = max(layer, default=-1) + 1
+    layers: list[list[int]] = [[] for _ in range(height)]
+    seen = [False] * total
+    roots = sorted(range(total), key=lambda v: layer[v])
+    for root in roots:
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            layers[layer[v]].append(v)
+            for w in reversed(down[v]):
+                if not seen[w]:
+                    seen[w] = True
+                    stack.append(w)
+    return layers
+
+
+def _minimize_crossings(
+    layers: list[list[int]], up: list[list[int]], down: list[list[int]], sweeps: int
+) -> list[list[int]]:
+    pos = [0] * len(up)
+    for row in layers:
+        for i, v in enumerate(row):
+            pos[v] = i
+    best = [row[:] for row in layers]
+    best_crossings = _count_crossings(layers, down, pos)
+    for sweep in range(sweeps):
+        rows = range(1, len(layers)) if sweep % 2 == 0 else range(len(layers) - 2, -1, -1)
+        neighbours = up if sweep % 2 == 0 else down
+        for r in rows:
+            row = layers[r]
+            keys = {}
+            for v in row:
+                adj = neighbours[v]
+                keys[v] = sum(pos[w] for w in adj) / len(adj) if adj else pos[v]
+            row.sort(key=keys.__getitem__)
+            for i, v in enumerate(row):
+                pos[v] = i
+        crossings = _count_crossings(layers, down, pos)
+        if crossings < best_crossings:
+            best_crossings = crossings
+            best = [row[:] for row in layers]
+        if crossings == 0:
+            break
+    return best
+
+
+def _count_crossings(layers: list[list[int]], down: list[list[int]], pos: list[int]) -> int:
+    total = 0
+    for row, nxt in zip(layers, layers[1:]):
+        targets = []
+        for v in row:
+            targets.extend(sorted(pos[w] for w in down[v]))
+        size = len(nxt) + 1
+        tree = [0] * (size + 1)
+        seen = 0
+        for t in targets:
+            # Count already-seen targets strictly to the right of t.
+            i = t + 1
+            le = 0
+            while i > 0:
+                le += tree[i]
+                i -= i & -i
+            total += seen - le
+            i = t + 1
+            while i <= size:
+                tree[i] += 1
+                i += i & -i
+            seen += 1
+    return total
+
+
+def _assign_x(
+    layers: list[list[int]],
+    breadth: list[float],
+    up: list[list[int]],
+    down: list[list[int]],
+    is_dummy: list[bool],
+    gap: float,
+    rounds: int = 4,
+) -> list[float]:
+    """Centre x of every node; see :func:`_place_row`."""
+    xs = [0.0] * len(breadth)
+    for row in layers:
+        cursor = 0.0
+        for v in row:
+            xs[v] = cursor + breadth[v] / 2
+            cursor += breadth[v] + gap
+    for r in range(rounds):
+        order = range(1, len(layers)) if r % 2 == 0 else range(len(layers) - 2, -1, -1)
+        neighbours = up if r % 2 == 0 else down
+        for i in order:
+            _place_row(layers[i], xs, breadth, neighbours, is_dummy, gap)
+    # Final pass against both neighbours to balance the result.
+    for row in layers:
+        _place_row(row, xs, breadth, None, is_dummy, gap, up, down)
+    left = min((xs[v] - breadth[v] / 2 for row in layers for v in row), default=0.0)
+    return [x - left for x in xs]
+
+
+def _place_row(
+    row: list[int],
+    xs: list[float],
+    breadth: list[float],
+    neighbours: list[list[int]] | None,
+    is_dummy: list[bool],
+    gap: float,
+    up: list[list[int]] | None = None,
+    down: list[list[int]] | None = None,
+) -> None:
+    """Move ``row`` towards its neighbours without reordering or overlap.
+
+    With separations s_i, centres c_i must satisfy c_{i+1} - c_i >= s_i.
+    Writing c_i = y_i + S_i (S the running sum of s) turns this into
+    "y non-decreasing", solved exactly by weighted isotonic regression.
+    """
+    if not row:
+        return
+    offsets = []
+    running = 0.0
+    prev = None
+    for v in row:
+        if prev is not None:
+            running += (breadth[prev] + breadth[v]) / 2 + gap
+        offsets.append(running)
+        prev = v
+    # Pool-adjacent-violators: blocks of (weighted mean, weight, count).
+    means: list[float] = []
+    weights: list[float] = []
+    counts: list[int] = []
+    for v, s in zip(row, offsets):
+        if neighbours is not None:
+            adj = neighbours[v]
+        else:
+            adj = up[v] + down[v]
+        if adj:
+            target = sum(xs[w] for w in adj) / len(adj)
+            weight = 4.0 if is_dummy[v] else 1.0
+        else:
+            target = xs[v]
+            weight = 0.1
+        m, w, c = target - s, weight, 1
+        while means and means[-1] >= m:
+            pm, pw, pc = means.pop(), weights.pop(), counts.pop()
+            m = (pm * pw + m * w) / (pw + w)
+            w += pw
+            c += pc
+        means.append(m)
+        weights.append(w)
+        counts.append(c)
+    i = 0
+    for m, c in zip(means, counts):
+        for _ in range(c):
+            xs[row[i]] = m + offsets[i]
+            i += 1
+
+
+def compound_layout(
+    sizes: dict[str, Size],
+    edges: list[tuple[str, str]],
+    parent: dict[str, str | None],
+    direction: str = "TB",
+    group_direction: dict[str, str] | None = None,
+    padding: float = 20.0,
+    header: float = 30.0,
+    engine: Callable[..., Layout] | None = None,
+    **options: float,
+) -> Layout:
+    """Lay out nodes nested in groups.
+
+    ``parent`` maps every node *and* group id to its enclosing group (None
+    at top level); ids that appear only as parents are groups.  Boxes of
+    grouped items are relative to their group, as draw.io expects for
+    children of a container.  Edge ends may be groups.  Edges get routes
+    only when both ends sit directly in the same group.  Each group is laid
+    out by ``engine`` (default :func:`layered_layout`), which receives the
+    remaining ``options``.
+    """
+    engine = engine or layered_layout
+    group_direction = group_direction or {}
+    groups = list(dict.fromkeys(
+        [g for g in parent if g not in sizes]
+        + [g for g in parent.values() if g is not None and g not in sizes]
+    ))
+    children: dict[str | None, list[str]] = defaultdict(list)
+    for item in list(sizes) + groups:
+        children[parent.get(item)].append(item)
+
+    def chain(item: str) -> list[str]:
+        path = [item]
+        while parent.get(path[-1]) is not None:
+            path.append(parent[path[-1]])
+        return path
+
+    known = set(sizes).union(groups)
+    lifted: dict[str | None, list[tuple[int, str, str]]] = defaultdict(list)
+    for k, (s, t) in enumerate(edges):
+        if s not in known or t not in known:
+            continue
+        ps, pt = chain(s), chain(t)
+        common = None
+        set_t = set(pt)
+        for g in ps[1:]:
+            if g in set_t:
+                common = g
+                break
+        a = next(x for x in ps if parent.get(x) == common)
+        b = next(x for x in pt if parent.get(x) == common)
+        if a != b:
+            lifted[common].append((k, a, b))
+
+    out = Layout()
+    box_size: dict[str, Size] = dict(sizes)
+    done: set[str | None] = set()
+
+    def depth_of(g: str | None) -> int:
+        return 0 if g is None else len(chain(g))
+
+    for group in sorted(groups, key=depth_of, reverse=True) + [None]:
+        if group in done:
+            continue
+        done.add(group)
+        members = children.get(group, [])
+        local = {m: box_size[m] for m in members}
+        local_edges = [(a, b) for _, a, b in lifted[group]]
+        sub = engine(local, local_edges, group_direction.get(group, direction), **options)
+        inset_x = padding if group is not None else 0.0
+        inset_y = header + padding / 2 if group is not None else 0.0
+        for m, (x, y, w, h) in sub.boxes.items():
+            out.boxes[m] = (x + inset_x, y + inset_y, w, h)
+        for i, (k, a, b) in enumerate(lifted[group]):
+            route = sub.routes.get(i)
+            if route is not None and edges[k] == (a, b):
+                route.points = [(x + inset_x, y + inset_y) for x, y in route.points]
+                out.routes[k] = route
+        if group is not None:
+            # Whole grid steps, so that centred children stay on whole pixels.
+            box_size[group] = (
+                max(_grid(sub.width + 2 * padding), 120.0),
+                _grid(sub.height + header + padding * 1.5),
+            )
+        else:
+            out.width, out.height = sub.width, sub.height
+    return out
+
+
+def _grid(value: float, step: float = 10.0) -> float:
+    return float(-(-value // step) * step)
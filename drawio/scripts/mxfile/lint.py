@@ -0,0 +1,957 @@
+"""Structural lint for .drawio and .mmd files, incremental and cached.
+
+Checks, by rule name:
+
+* ``duplicate-id`` -- two cells on a page share an id.
+* ``dangling-edge`` -- an edge's ``source`` or ``target`` names no cell.
+* ``missing-parent`` -- a cell's ``parent`` names no cell, or the parent
+  chain loops.
+* ``overlap`` -- two sibling vertices partly overlap.  A box that wholly
+  contains a sibling is taken for a backdrop (AWS group frames are drawn
+  that way) unless the two are the same box; text cells and UML frames are
+  ignored, and a UML lifeline counts only as its header, since notes and
+  frames are drawn across its dashed line.
+* ``swimlane-crossing`` -- an edge's route passes through a swimlane that
+  holds neither of its ends.  A straight edge runs from centre to centre
+  through its waypoints.  For edges that draw.io routes itself
+  (``edgeStyle=...`` or ``curved=1``) only the stretches between waypoints
+  that share an x or y are certain, so only those are checked.
+* ``parse-error`` -- the file, a page or the Mermaid source cannot be read.
+
+Parsing is the expensive part, so cells are pulled out of the page with one
+regular expression that expects the attribute order draw.io and the skill
+write; a page it cannot account for cell by cell goes through
+:func:`~mxfile.scanner.scan_cells` instead.  A :class:`PageChecker` keeps a
+page's cells with their raw bytes, a uniform grid of vertex boxes per parent
+and of swimlanes, and the current findings.  Given the next version of the
+page it re-checks only the cells whose bytes changed plus their neighbours:
+children and descendants, attached edges, and edges near a swimlane that
+moved.  A first check is the same update with every cell changed.
+
+:func:`lint_file` caches each file's findings in the skill's cache, keyed by
+size and mtime and then by a content hash, so an unchanged tree is checked
+without reading it.  Mermaid files are converted in memory and the result
+is checked.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gc
+import hashlib
+import io
+import json
+import os
+import re
+import statistics
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from .cache import cache_dir, path_key
+from .codec import decompress_diagram
+from .convert import CONVERTER_VERSION, convert
+from .errors import MermaidError, MxFileError
+from .mermaid import parse
+from .profile import span
+from .scanner import EDGE, VERTEX, scan_cells, scan_pages
+from .xmlutil import ATTRS, parse_attrs, unescape
+
+# Bump when checks change so that cached findings are not reused.
+LINT_VERSION = "2"
+
+RULES = (
+    "duplicate-id",
+    "dangling-edge",
+    "missing-parent",
+    "overlap",
+    "swimlane-crossing",
+    "parse-error",
+)
+
+_V = rb'="([^"]*)"'
+# A cell and its geometry in draw.io's attribute order.
+_FAST_CELL_RE = re.compile(
+    rb"<mxCell id" + _V + rb'(?: value="[^"]*")?(?: style' + _V + rb")?(?: parent" + _V
+    + rb')?(?: (vertex|edge)="1")?(?: connectable="0")?(?: source' + _V + rb")?(?: target"
+    + _V + rb")?\s*(/?)>(?:\s*<mxGeometry(?: x" + _V + rb")?(?: y" + _V + rb")?(?: width"
+    + _V + rb")?(?: height" + _V + rb')?( relative="1")? as="geometry"\s*(/?)>)?'
+)
+_POINT_RE = re.compile(rb"<mxPoint" + ATTRS + rb"/?>")
+_TEXT_STYLE = re.compile(rb"(?:^|;)text(?:;|$)")
+_LANE_STYLE = re.compile(rb"(?:^|;)(?:shape=)?swimlane(?:;|$)")
+_ROUTED_STYLE = re.compile(rb"(?:^|;)(?:edgeStyle=(?!none(?:;|$))[^;]|curved=1)")
+_LIFELINE_SIZE = re.compile(rb"(?:^|;)size=([\d.]+)")
+
+# Children a parent needs for a grid of its own.
+_OWN_GRID = 64
+
+Box = tuple[float, float, float, float]
+Point = tuple[float, float]
+
+
+@dataclass(frozen=True, slots=True)
+class Finding:
+    rule: str
+    page: str
+    cells: tuple[str, ...]
+    message: str
+
+    def __str__(self) -> str:
+        text = f"{self.rule}: {self.message}"
+        return f"{self.page}: {text}" if self.page else text
+
+
+@dataclass(slots=True)
+class LintCell:
+    """What the checks need to know about one cell."""
+
+    id: str
+    parent: str | None
+    source: str | None
+    target: str | None
+    kind: int
+    # x, y, width, height relative to the parent; None for relative geometry.
+    box: Box | None = None
+    points: tuple[Point, ...] = ()
+    source_point: Point | None = None
+    target_point: Point | None = None
+    lane: bool = False
+    # Takes part in overlap checks, with ``area`` for a box.
+    solid: bool = False
+    area: Box | None = None
+    # An edge whose path draw.io's router chooses.
+    routed: bool = False
+
+
+@dataclass(slots=True)
+class PageCells:
+    """One parsed page: cells by id, their raw bytes and repeated ids."""
+
+    cells: dict[str, LintCell] = field(default_factory=dict)
+    raw: dict[str, bytes] = field(default_factory=dict)
+    duplicates: list[str] = field(default_factory=list)
+    # Byte ranges of the cells in page order, for re-parsing only what changed.
+    order: list[str] = field(default_factory=list)
+    starts: list[int] = field(default_factory=list)
+    stops: list[int] = field(default_factory=list)
+
+
+# ----------------------------------------------------------------- parsing
+
+def parse_page(buf: bytes, lo: int = 0, hi: int | None = None) -> PageCells:
+    """Cells of one uncompressed page (the text inside ``<diagram>``), or of
+    the part of it between ``lo`` and ``hi``."""
+    if hi is None:
+        hi = len(buf)
+    page = PageCells()
+    cells, raws, duplicates = page.cells, page.raw, page.duplicates
+    order, starts, stops = page.order, page.starts, page.stops
+    # Entities are rare; a page without any skips the per-cell check.
+    escaped = buf.find(b"&", lo, hi) != -1
+    # Generated pages repeat a few styles many times; classify each once.
+    known: dict[bytes, tuple] = {}
+    routed: dict[bytes, bool] = {}
+    for m in _FAST_CELL_RE.finditer(buf, lo, hi):
+        (cell_id, style, parent, kind, source, target, closed,
+         x, y, width, height, relative, geo_closed) = m.groups()
+        start, end = m.span()
+        kind = VERTEX if kind == b"vertex" else EDGE if kind == b"edge" else 0
+        if escaped and buf.find(b"&", start, end) != -1:
+            cell = LintCell(_text(cell_id), _text(parent), _text(source), _text(target), kind)
+        else:
+            cell = LintCell(
+                cell_id.decode(),
+                None if parent is None else parent.decode(),
+                None if source is None else source.decode(),
+                None if target is None else target.decode(),
+                kind,
+            )
+        if geo_closed is not None and not relative:
+            try:
+                box = (float(x) if x else 0.0, float(y) if y else 0.0,
+                       float(width) if width else 0.0, float(height) if height else 0.0)
+            except ValueError:
+                box = (_num(x), _num(y), _num(width), _num(height))
+            cell.box = box
+            if kind == VERTEX and box[2] > 0 and box[3] > 0:
+                _classify(cell, style or b"", known)
+        if kind == EDGE and style:
+            found = routed.get(style)
+            if found is None:
+                found = routed[style] = _ROUTED_STYLE.search(style) is not None
+            cell.routed = found
+        if geo_closed == b"" and not closed:
+            # The geometry has children: waypoints or terminal points.
+            stop = buf.find(b"</mxGeometry>", end)
+            if stop != -1:
+                _points(cell, buf[end:stop])
+                end = stop
+        cell_id = cell.id
+        if cell_id in raws:
+            duplicates.append(cell_id)
+        else:
+            cells[cell_id] = cell
+            raws[cell_id] = buf[start:end]
+            order.append(cell_id)
+            starts.append(start)
+            stops.append(end)
+    if len(raws) + len(duplicates) != buf.count(b"<mxCell", lo, hi):
+        return _parse_slow(buf, lo, hi)
+    return page
+
+
+def _parse_slow(buf: bytes, lo: int, hi: int) -> PageCells:
+    page = PageCells()
+    for found in scan_cells(buf, 0, lo, hi):
+        cell = LintCell(found.id, found.parent, found.source, found.target, found.kind)
+        if found.x is not None:
+            cell.box = (found.x, found.y or 0.0, found.width or 0.0, found.height or 0.0)
+            if cell.kind == VERTEX and cell.box[2] > 0 and cell.box[3] > 0:
+                _classify(cell, found.style.encode("utf-8"))
+        if cell.kind == EDGE and _ROUTED_STYLE.search(found.style.encode("utf-8")):
+            cell.routed = True
+        raw = buf[found.start:found.stop]
+        if b"<mxPoint" in raw:
+            _points(cell, raw)
+        if cell.id in page.raw:
+            page.duplicates.append(cell.id)
+        else:
+            page.cells[cell.id] = cell
+            page.raw[cell.id] = raw
+            page.order.append(cell.id)
+            page.starts.append(found.start)
+            page.stops.append(found.stop)
+    return page
+
+
+def reparse(old: PageCells, old_buf: bytes, buf: bytes) -> tuple[PageCells, set[str] | None]:
+    """Parse ``buf``, the next version of ``old_buf``, re-using the cells of
+    ``old`` that lie in the unchanged head and tail of the page.
+
+    Returns the page and the ids of cells that were added, removed or
+    changed, or None for "compare everything" when the page was parsed
+    from scratch.
+    """
+    if old_buf == buf:
+        return old, set()
+    if old.duplicates or not old.order:
+        return parse_page(buf), None
+    head = _common_prefix(old_buf, buf)
+    tail = _common_suffix(old_buf, buf, min(len(old_buf), len(buf)) - head)
+    i = bisect.bisect_right(old.stops, head)
+    j = max(i, bisect.bisect_left(old.starts, len(old_buf) - tail))
+    shift = len(buf) - len(old_buf)
+    lo = old.stops[i - 1] if i else 0
+    hi = (old.starts[j] if j < len(old.starts) else len(old_buf)) + shift
+    middle = parse_page(buf, lo, hi)
+    gone = old.order[i:j]
+    cells, raw = dict(old.cells), dict(old.raw)
+    for cell_id in gone:
+        del cells[cell_id], raw[cell_id]
+    if middle.duplicates or any(cell_id in cells for cell_id in middle.order):
+        return parse_page(buf), None
+    cells.update(middle.cells)
+    raw.update(middle.raw)
+    page = PageCells(
+        cells, raw, [],
+        old.order[:i] + middle.order + old.order[j:],
+        old.starts[:i] + middle.starts + [at + shift for at in old.starts[j:]],
+        old.stops[:i] + middle.stops + [at + shift for at in old.stops[j:]],
+    )
+    changed = {cell_id for cell_id in middle.order if old.raw.get(cell_id) != raw[cell_id]}
+    changed.update(cell_id for cell_id in gone if cell_id not in cells)
+    return page, changed
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    n = min(len(a), len(b))
+    at, block = 0, 1 << 16
+    while at < n and a[at:at + block] == b[at:at + block]:
+        at += block
+    if at >= n:
+        return n
+    low, high = at, min(at + block, n)  # the first difference is in here
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[at:mid] == b[at:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common tail of ``a`` and ``b``, at most ``limit``."""
+    la, lb = len(a), len(b)
+    at, block = 0, 1 << 16
+    while at < limit and a[la - min(at + block, limit):la - at] == b[lb - min(at + block, limit):lb - at]:
+        at += block
+    if at >= limit:
+        return limit
+    low, high = at, min(at + block, limit)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[la - mid:la - at] == b[lb - mid:lb - at]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _classify(cell: LintCell, style: bytes, known: dict[bytes, tuple] | None = None) -> None:
+    """Mark a vertex with a box as a swimlane and/or an overlap candidate;
+    ``known`` remembers the answer per style."""
+    found = known.get(style) if known is not None else None
+    if found is None:
+        found = _style_class(style)
+        if known is not None:
+            known[style] = found
+    cell.lane, cell.solid, header = found
+    if header is None:
+        cell.area = cell.box
+    else:
+        x, y, w, h = cell.box
+        cell.area = x, y, w, min(h, header)
+
+
+def _style_class(style: bytes) -> tuple[bool, bool, float | None]:
+    """Whether a style is a swimlane, whether it is solid, and the height of
+    a lifeline's header."""
+    lane = b"swimlane" in style and _LANE_STYLE.search(style) is not None
+    solid = b"text" not in style or _TEXT_STYLE.search(style) is None
+    header = None
+    if b"shape=uml" in style:
+        if b"shape=umlFrame" in style:
+            solid = False
+        elif b"shape=umlLifeline" in style:
+            m = _LIFELINE_SIZE.search(style)
+            header = float(m.group(1)) if m else 40.0
+    return lane, solid, header
+
+
+def _points(cell: LintCell, raw: bytes) -> None:
+    points = []
+    for m in _POINT_RE.finditer(raw):
+        attrs = parse_attrs(m.group(1))
+        point = (_num(attrs.get("x")), _num(attrs.get("y")))
+        role = attrs.get("as")
+        if role is None:
+            points.append(point)
+        elif role == "sourcePoint":
+            cell.source_point = point
+        elif role == "targetPoint":
+            cell.target_point = point
+    cell.points = tuple(points)
+
+
+def _text(value: bytes | None) -> str | None:
+    if value is None:
+        return None
+    return unescape(value.decode("utf-8"))
+
+
+def _num(value: bytes | str | None) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+# ------------------------------------------------------------------ checks
+
+class PageChecker:
+    """Findings for one page, kept up to date cell by cell."""
+
+    def __init__(self, name: str, rules: Iterable[str] = RULES) -> None:
+        self.name = name
+        self.rules = frozenset(rules)
+        self.page = PageCells()
+        self.findings: dict[tuple[str, tuple[str, ...]], Finding] = {}
+        self._involving: dict[str, set[tuple[str, tuple[str, ...]]]] = {}
+        # Who points at whom; only needed from the second version on.
+        self._linked = False
+        self._children: dict[str, set[str]] = {}
+        self._attached: dict[str, set[str]] = {}
+        self._grid: dict[tuple[str | None, int, int], set[str]] = {}
+        self._lanes: dict[tuple[int, int], set[str]] = {}
+        self._lane_box: dict[str, Box] = {}
+        # Swimlanes are indexed once some edge has a known path to test.
+        self._laned = False
+        self._origin: dict[str, Point] = {}
+        self._step = 0.0
+        # Siblings are only compared with each other, so a parent with many
+        # children gets a grid sized for them; the rest share ``_step``.
+        self._steps: dict[str | None, float] = {}
+        # Swimlanes are bigger than most cells, so they get a coarser grid.
+        self._lane_step = 0.0
+
+    def update(self, page: PageCells, changed: set[str] | None = None) -> set[str]:
+        """Move to the next version of the page; return the ids re-checked.
+
+        ``changed`` lists the ids whose cells differ, if the caller knows;
+        otherwise the raw bytes of every cell are compared.
+        """
+        old, new = self.page.cells, page.cells
+        if not self._step:
+            areas: dict[str | None, list[Box]] = {}
+            for cell in new.values():
+                if cell.solid:
+                    if cell.parent in areas:
+                        areas[cell.parent].append(cell.area)
+                    else:
+                        areas[cell.parent] = [cell.area]
+            self._steps = {
+                parent: _grid_step(boxes) for parent, boxes in areas.items()
+                if len(boxes) >= _OWN_GRID
+            }
+            self._step = _grid_step(box for boxes in areas.values() for box in boxes)
+            self._lane_step = max(
+                _grid_step(cell.area for cell in new.values() if cell.lane), self._step
+            )
+        if not old:
+            changed = set(new)
+            dirty = set(changed)
+            cells = list(new.values())
+        else:
+            if not self._linked:
+                self._linked = True
+                self._link(old.values())
+            if changed is None:
+                old_raw = self.page.raw
+                changed = {i for i, raw in page.raw.items() if old_raw.get(i) != raw}
+                changed.update(i for i in old if i not in new)
+            dirty = self._neighbours(changed, new)
+            for i in changed:
+                if i in old:
+                    self._unindex(old[i])
+            for i in dirty:
+                self._origin.pop(i, None)
+                if i in self._lane_box:
+                    self._unlane(i)
+            cells = [new[i] for i in dirty if i in new]
+        self.page = page
+        self._index([new[i] for i in changed if i in new] if len(changed) < len(dirty) else cells)
+        moved_lanes = []
+        if self._laned:
+            moved_lanes = [self._lane(cell) for cell in cells if cell.lane]
+        if moved_lanes and len(dirty) < len(new):
+            near = [i for i in self._edges_near(moved_lanes) if i not in dirty]
+            dirty.update(near)
+            cells.extend(new[i] for i in near)
+
+        if self.findings:
+            involving = self._involving
+            for i in dirty:
+                if i in involving:
+                    for key in list(involving[i]):
+                        self._drop(key)
+            for key in [k for k in self.findings if k[0] == "duplicate-id"]:
+                self._drop(key)
+        if "duplicate-id" in self.rules:
+            for i in dict.fromkeys(page.duplicates):
+                self._report("duplicate-id", (i,), f"id {i!r} is used by more than one cell")
+
+        if "missing-parent" in self.rules:
+            self._check_parents(cells)
+        for cell in cells:
+            if cell.kind == EDGE:
+                self._check_edge(cell)
+        if "overlap" in self.rules:
+            solid = [cell for cell in cells if cell.solid]
+            if len(solid) * 4 > len(new):
+                self._check_all_overlaps()
+            else:
+                for cell in solid:
+                    self._check_overlap(cell)
+        return dirty
+
+    def _neighbours(self, changed: set[str], new: dict[str, LintCell]) -> set[str]:
+        """Cells whose findings may change with ``changed``: cells that point
+        at them, everything inside a changed container (it moved with it) and
+        the edges attached to all of those."""
+        dirty = set(changed)
+        for i in changed:
+            dirty.update(self._children.get(i, ()))
+            dirty.update(self._attached.get(i, ()))
+        stack = [i for i in changed if i in new and new[i].kind == VERTEX]
+        while stack:
+            for child in self._children.get(stack.pop(), ()):
+                if child not in dirty:
+                    dirty.add(child)
+                    stack.append(child)
+        for i in list(dirty):
+            dirty.update(self._attached.get(i, ()))
+        return dirty
+
+    # -- indexes
+
+    def _link(self, cells: Iterable[LintCell]) -> None:
+        children, attached = self._children, self._attached
+        for cell in cells:
+            i = cell.id
+            if cell.parent:
+                if cell.parent in children:
+                    children[cell.parent].add(i)
+                else:
+                    children[cell.parent] = {i}
+            if cell.kind == EDGE:
+                for end in (cell.source, cell.target):
+                    if end:
+                        if end in attached:
+                            attached[end].add(i)
+                        else:
+                            attached[end] = {i}
+
+    def _index(self, cells: list[LintCell]) -> None:
+        if self._linked:
+            self._link(cells)
+        grid, steps, default = self._grid, self._steps, self._step
+        for cell in cells:
+            if not cell.solid:
+                continue
+            x, y, w, h = cell.area
+            parent, cell_id = cell.parent, cell.id
+            step = steps.get(parent, default)
+            rows = range(int(y // step), int((y + h) // step) + 1)
+            for gx in range(int(x // step), int((x + w) // step) + 1):
+                for gy in rows:
+                    members = grid.get((parent, gx, gy))
+                    if members is None:
+                        grid[parent, gx, gy] = {cell_id}
+                    else:
+                        members.add(cell_id)
+
+    def _unindex(self, cell: LintCell) -> None:
+        if cell.parent:
+            _discard(self._children, cell.parent, cell.id)
+        for end in (cell.source, cell.target):
+            if end:
+                _discard(self._attached, end, cell.id)
+        if cell.solid:
+            for key in self._cells_of(cell.parent, cell.area):
+                _discard(self._grid, key, cell.id)
+
+    def _lane(self, cell: LintCell) -> Box:
+        box = self._absolute(cell)
+        self._lane_box[cell.id] = box
+        lanes = self._lanes
+        for key in self._cells_of(None, box, self._lane_step):
+            members = lanes.get(key[1:])
+            if members is None:
+                lanes[key[1:]] = {cell.id}
+            else:
+                members.add(cell.id)
+        return box
+
+    def _unlane(self, cell_id: str) -> None:
+        box = self._lane_box.pop(cell_id)
+        for key in self._cells_of(None, box, self._lane_step):
+            _discard(self._lanes, key[1:], cell_id)
+
+    def _cells_of(
+        self, parent: str | None, box: Box, step: float = 0.0
+    ) -> list[tuple[str | None, int, int]]:
+        step = step or self._steps.get(parent, self._step)
+        x, y, w, h = box
+        gx, gy = int(x // step), int(y // step)
+        gx1, gy1 = int((x + w) // step), int((y + h) // step)
+        if gx1 == gx and gy1 == gy:
+            return [(parent, gx, gy)]
+        rows = range(gy, gy1 + 1)
+        return [(parent, i, j) for i in range(gx, gx1 + 1) for j in rows]
+
+    def _edges_near(self, boxes: list[Box]) -> Iterable[str]:
+        cells = self.page.cells
+        for cell in cells.values():
+            if cell.kind != EDGE:
+                continue
+            segments = self._segments(cell)
+            if segments:
+                reach = _bounds([point for segment in segments for point in segment])
+                if any(_boxes_meet(reach, box) for box in boxes):
+                    yield cell.id
+
+    # -- geometry
+
+    def _origin_of(self, cell_id: str | None) -> Point:
+        """Absolute position of a cell's coordinate origin (its own x, y)."""
+        if cell_id is None:
+            return 0.0, 0.0
+        known = self._origin.get(cell_id)
+        if known is not None:
+            return known
+        chain = []
+        cells = self.page.cells
+        seen = set()
+        current = cells.get(cell_id)
+        while current is not None and current.id not in seen and current.id not in self._origin:
+            seen.add(current.id)
+            chain.append(current)
+            current = cells.get(current.parent) if current.parent else None
+        x, y = self._origin.get(current.id, (0.0, 0.0)) if current is not None else (0.0, 0.0)
+        for cell in reversed(chain):
+            if cell.box is not None and cell.kind == VERTEX:
+                x, y = x + cell.box[0], y + cell.box[1]
+            self._origin[cell.id] = (x, y)
+        return self._origin[cell_id]
+
+    def _absolute(self, cell: LintCell) -> Box:
+        x, y = self._origin_of(cell.id)
+        return x, y, cell.box[2], cell.box[3]
+
+    def _center(self, cell_id: str | None) -> Point | None:
+        cell = self.page.cells.get(cell_id) if cell_id else None
+        if cell is None or cell.box is None or cell.kind != VERTEX:
+            return None
+        x, y, w, h = self._absolute(cell)
+        return x + w / 2, y + h / 2
+
+    def _segments(self, edge: LintCell) -> list[tuple[Point, Point]]:
+        """The straight stretches of the edge's path that are known here."""
+        if edge.routed and len(edge.points) < 2:
+            return []
+        ox, oy = self._origin_of(edge.parent)
+        points = [(ox + px, oy + py) for px, py in edge.points]
+        if edge.routed:
+            # draw.io's router picks the legs to the ends and any elbow
+            # between unaligned waypoints; aligned ones are joined directly.
+            return [(a, b) for a, b in zip(points, points[1:]) if a[0] == b[0] or a[1] == b[1]]
+        start = self._center(edge.source)
+        if start is None and edge.source_point is not None:
+            start = (ox + edge.source_point[0], oy + edge.source_point[1])
+        end = self._center(edge.target)
+        if end is None and edge.target_point is not None:
+            end = (ox + edge.target_point[0], oy + edge.target_point[1])
+        if start is None or end is None:
+            return []
+        path = [start, *points, end]
+        return list(zip(path, path[1:]))
+
+    # -- rules
+
+    def _check_parents(self, dirty: list[LintCell]) -> None:
+        cells = self.page.cells
+        # Cells whose chain is known to end without a loop.
+        ends: set[str] = set()
+        for cell in dirty:
+            parent = cell.parent
+            if parent is None:
+                if cell.kind:
+                    self._report("missing-parent", (cell.id,), f"{cell.id} has no parent")
+                continue
+            up = cells.get(parent)
+            if up is None:
+                self._report("missing-parent", (cell.id,),
+                             f"{cell.id} has parent {parent!r}, which does not exist")
+                continue
+            if parent in ends:
+                ends.add(cell.id)
+                continue
+            seen = {cell.id}
+            while up is not None and up.parent and up.id not in ends:
+                if up.id in seen:
+                    self._report("missing-parent", (cell.id,),
+                                 f"parent chain of {cell.id} loops")
+                    break
+                seen.add(up.id)
+                up = cells.get(up.parent)
+            else:
+                ends.update(seen)
+
+    def _check_edge(self, edge: LintCell) -> None:
+        cells = self.page.cells
+        if "dangling-edge" in self.rules:
+            for role, end in (("source", edge.source), ("target", edge.target)):
+                if end and end not in cells:
+                    self._report("dangling-edge", (edge.id, role),
+                                 f"edge {edge.id} has {role} {end!r}, which does not exist")
+        if "swimlane-crossing" not in self.rules:
+            return
+        segments = self._segments(edge)
+        if not segments:
+            return
+        if not self._laned:
+            self._laned = True
+            for cell in self.page.cells.values():
+                if cell.lane:
+                    self._lane(cell)
+        if not self._lanes:
+            return
+        exempt = self._ancestors(edge.source) | self._ancestors(edge.target)
+        step = self._lane_step
+        crossed: set[str] = set()
+        for (ax, ay), (bx, by) in segments:
+            for gx in range(int(min(ax, bx) // step), int(max(ax, bx) // step) + 1):
+                for gy in range(int(min(ay, by) // step), int(max(ay, by) // step) + 1):
+                    for lane in self._lanes.get((gx, gy), ()):
+                        if lane in exempt or lane in crossed:
+                            continue
+                        if _segment_hits((ax, ay), (bx, by), self._lane_box[lane]):
+                            crossed.add(lane)
+        for lane in sorted(crossed):
+            self._report("swimlane-crossing", (edge.id, lane),
+                         f"edge {edge.id} crosses swimlane {lane}")
+
+    def _ancestors(self, cell_id: str | None) -> set[str]:
+        out: set[str] = set()
+        cells = self.page.cells
+        while cell_id and cell_id not in out:
+            out.add(cell_id)
+            cell = cells.get(cell_id)
+            cell_id = cell.parent if cell is not None else None
+        return out
+
+    def _check_overlap(self, cell: LintCell) -> None:
+        cells = self.page.cells
+        box = cell.area
+        seen = {cell.id}
+        for key in self._cells_of(cell.parent, box):
+            for other_id in self._grid.get(key, ()):
+                if other_id in seen:
+                    continue
+                seen.add(other_id)
+                other = cells[other_id].area
+                if _overlap(box, other):
+                    pair = tuple(sorted((cell.id, other_id)))
+                    self._report("overlap", pair, f"{pair[0]} overlaps {pair[1]}")
+
+    def _check_all_overlaps(self) -> None:
+        """Every overlapping pair, bucket by bucket.
+
+        A pair that shares several buckets is reported from the one holding
+        the top-left corner of its intersection.
+        """
+        for key in [k for k in self.findings if k[0] == "overlap"]:
+            self._drop(key)
+        cells = self.page.cells
+        steps, default = self._steps, self._step
+        for (parent, gx, gy), members in self._grid.items():
+            if len(members) < 2:
+                continue
+            step = steps.get(parent, default)
+            boxes = sorted((cell_id, cells[cell_id].area) for cell_id in members)
+            for k, (a, abox) in enumerate(boxes):
+                ax, ay, aw, ah = abox
+                for b, bbox in boxes[k + 1:]:
+                    bx, by, bw, bh = bbox
+                    if ax >= bx + bw or bx >= ax + aw or ay >= by + bh or by >= ay + ah:
+                        continue
+                    if int(max(ax, bx) // step) != gx or int(max(ay, by) // step) != gy:
+                        continue
+                    if _overlap(abox, bbox):
+                        self._report("overlap", (a, b), f"{a} overlaps {b}")
+
+    # -- findings
+
+    def _report(self, rule: str, cells: tuple[str, ...], message: str) -> None:
+        key = (rule, cells)
+        self.findings[key] = Finding(rule, self.name, cells, message)
+        for cell_id in cells:
+            self._involving.setdefault(cell_id, set()).add(key)
+
+    def _drop(self, key: tuple[str, tuple[str, ...]]) -> None:
+        if self.findings.pop(key, None) is not None:
+            for cell_id in key[1]:
+                _discard(self._involving, cell_id, key)
+
+
+def _grid_step(boxes: Iterable[Box]) -> float:
+    sizes = [max(w, h) for _, _, w, h in boxes]
+    return max(2.0 * statistics.median(sizes), 20.0) if sizes else 200.0
+
+
+def _discard(index: dict, key, value) -> None:
+    members = index.get(key)
+    if members is not None:
+        members.discard(value)
+        if not members:
+            del index[key]
+
+
+def _overlap(a: Box, b: Box) -> bool:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    if ax >= bx + bw or bx >= ax + aw or ay >= by + bh or by >= ay + ah:
+        return False
+    if a == b:
+        return True
+    a_holds = ax <= bx and ay <= by and ax + aw >= bx + bw and ay + ah >= by + bh
+    b_holds = bx <= ax and by <= ay and bx + bw >= ax + aw and by + bh >= ay + ah
+    return not (a_holds or b_holds)
+
+
+def _bounds(points: list[Point]) -> Box:
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)
+
+
+def _boxes_meet(a: Box, b: Box) -> bool:
+    return not (a[0] > b[0] + b[2] or b[0] > a[0] + a[2] or a[1] > b[1] + b[3] or b[1] > a[1] + a[3])
+
+
+def _segment_hits(p: Point, q: Point, box: Box) -> bool:
+    """Whether segment p-q passes through the inside of ``box`` (Liang-Barsky)."""
+    x, y, w, h = box
+    left, top, right, bottom = x + 1, y + 1, x + w - 1, y + h - 1
+    if right <= left or bottom <= top:
+        return False
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    t0, t1 = 0.0, 1.0
+    for edge_p, edge_q in ((-dx, p[0] - left), (dx, right - p[0]), (-dy, p[1] - top), (dy, bottom - p[1])):
+        if edge_p == 0:
+            if edge_q < 0:
+                return False
+            continue
+        t = edge_q / edge_p
+        if edge_p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return False
+    return True
+
+
+# ------------------------------------------------------------------- files
+
+class FileLinter:
+    """Checks one file and keeps per-page state for incremental re-checks."""
+
+    def __init__(self, path: str | Path, rules: Iterable[str] = RULES) -> None:
+        self.path = Path(path)
+        self.rules = frozenset(rules)
+        self._pages: dict[str, tuple[bytes, PageChecker]] = {}
+        # Cells re-checked by the last run.
+        self.rechecked = 0
+
+    def run(self, data: bytes | None = None) -> list[Finding]:
+        """Check the file's current contents; only changed cells are re-checked."""
+        if data is None:
+            data = self.path.read_bytes()
+        extra: list[Finding] = []
+        try:
+            if self.path.suffix == ".mmd":
+                pages = self._mermaid(data, extra)
+            else:
+                pages = self._drawio(data, extra)
+        except MxFileError as exc:
+            pages = []
+            extra.append(Finding("parse-error", "", (), str(exc)))
+        live = {}
+        self.rechecked = 0
+        # Every object made here stays alive, so collecting mid-run only
+        # walks them again; on a large page that is a third of the time.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for key, name, content in pages:
+                previous = self._pages.get(key)
+                with span("parse"):
+                    if previous is None:
+                        checker = PageChecker(name, self.rules)
+                        page, changed = parse_page(content), None
+                    else:
+                        old_content, checker = previous
+                        page, changed = reparse(checker.page, old_content, content)
+                checker.name = name
+                with span("check"):
+                    self.rechecked += len(checker.update(page, changed))
+                live[key] = (content, checker)
+        finally:
+            if collecting:
+                gc.enable()
+        self._pages = live
+        findings = [f for f in extra if f.rule in self.rules]
+        for _, checker in live.values():
+            findings.extend(checker.findings.values())
+        return sorted(findings, key=lambda f: (f.page, f.rule, f.cells))
+
+    def _drawio(self, data: bytes, extra: list[Finding]) -> list[tuple[str, str, bytes]]:
+        pages = []
+        for page in scan_pages(data):
+            name = page.name or page.id or f"page {page.index + 1}"
+            content = data[page.content_start:page.content_stop]
+            if page.compressed:
+                try:
+                    content = decompress_diagram(content).encode("utf-8")
+                except MxFileError as exc:
+                    extra.append(Finding("parse-error", name, (), str(exc)))
+                    continue
+            pages.append((page.id or str(page.index), name, content))
+        if not pages and not extra:
+            raise MxFileError("no pages found")
+        return pages
+
+    def _mermaid(self, data: bytes, extra: list[Finding]) -> list[tuple[str, str, bytes]]:
+        text = data.decode("utf-8")
+        try:
+            diagram = parse(text)
+        except MermaidError as exc:
+            extra.append(Finding("parse-error", "", (), str(exc)))
+            return []
+        out = io.StringIO()
+        convert(text, out, name=self.path.stem)
+        converted = out.getvalue().encode("utf-8")
+        page = next(scan_pages(converted))
+        return [("mermaid", self.path.stem, converted[page.content_start:page.content_stop])]
+
+
+def lint_file(path: str | Path, rules: Iterable[str] = RULES, cache: bool = True) -> list[Finding]:
+    """Findings for one file, from the cache when the file has not changed."""
+    path = Path(path)
+    rules = sorted(set(rules))
+    entry = cache_dir("lint") / f"{path_key(path)}.json"
+    st = os.stat(path)
+    stat = f"{st.st_size}:{st.st_mtime_ns}"
+    version = _version(rules)
+    stored = None
+    if cache and entry.exists():
+        try:
+            stored = json.loads(entry.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            stored = None
+        if stored is not None and stored.get("version") != version:
+            stored = None
+    if stored is not None and stored["stat"] == stat:
+        return [_finding(item) for item in stored["findings"]]
+    data = path.read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    if stored is not None and stored["digest"] == digest:
+        findings = [_finding(item) for item in stored["findings"]]
+    else:
+        findings = FileLinter(path, rules).run(data)
+    if cache:
+        store_findings(path, findings, rules, stat=stat, digest=digest)
+    return findings
+
+
+def store_findings(
+    path: str | Path, findings: list[Finding], rules: Iterable[str] = RULES,
+    *, stat: str | None = None, digest: str | None = None,
+) -> None:
+    """Record ``findings`` as the cached result for ``path``'s current contents."""
+    path = Path(path)
+    if stat is None or digest is None:
+        st = os.stat(path)
+        stat = f"{st.st_size}:{st.st_mtime_ns}"
+        digest = hashlib.sha1(path.read_bytes()).hexdigest()
+    entry = cache_dir("lint") / f"{path_key(path)}.json"
+    tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({
+        "version": _version(rules),
+        "stat": stat,
+        "digest": digest,
+        "findings": [asdict(f) for f in findings],
+    }), encoding="utf-8")
+    os.replace(tmp, entry)
+
+
+def _finding(item: dict) -> Finding:
+    return Finding(item["rule"], item["page"], tuple(item["cells"]), item["message"])
+
+
+def _version(rules: Iterable[str]) -> str:
+    # .mmd findings also depend on what the converter makes of the source.
+    return f"{LINT_VERSION}:{CONVERTER_VERSION}:{','.join(sorted(set(rules)))}"
@@ -0,0 +1,388 @@
+"""Three-way merge of mxfiles.
+
+Each side is diffed against the base with :mod:`mxfile.diff`, so only cells
+that changed on some side are parsed.  A cell changed on both sides is merged
+aspect by aspect: one branch moving a box while the other recolours it is
+not a conflict, and neither is one branch setting ``fillColor`` while the
+other sets ``dashed`` -- styles merge property by property and object data
+key by key.
+
+Attributes and geometry children the model has no field for (``collapsed``,
+``connectable``, ``<mxPoint as="targetPoint">``) are kept on each
+:class:`~mxfile.model.Cell` and merge as the ``other`` aspect, key by key.
+A cell changed on only one side is copied from that side byte for byte.
+
+Conflicts (both sides changed the same aspect differently, or one side
+deleted a cell the other changed or connected to) resolve to "ours" and are
+reported, so the merged file always opens in draw.io.  Cells nobody changed
+are copied byte for byte, and each page's ``<mxGraphModel>`` gets the merged
+attributes only.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TextIO
+
+from .diff import STRUCTURE, Change, Snapshot, compare, diff_pages, load, pair_pages, style_props
+from .model import Cell
+from .profile import span
+from .scanner import scan_header
+from .styles import format_style
+from .writer import STEP, MxFileWriter
+
+
+@dataclass(slots=True)
+class Conflict:
+    page: str
+    id: str
+    aspect: str
+    detail: str = ""
+
+    def __str__(self) -> str:
+        text = f'page "{self.page}": {self.id}: {self.aspect}'
+        return f"{text} ({self.detail})" if self.detail else text
+
+
+@dataclass(slots=True)
+class MergedPage:
+    meta: Snapshot
+    model: dict[str, str]
+    # Raw XML (unchanged cells) or merged cells, in output order.
+    cells: list[bytes | Cell] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class MergeResult:
+    pages: list[MergedPage]
+    conflicts: list[Conflict]
+    # "ours"'s <mxfile> attributes, written back unchanged; None if unknown.
+    header: dict[str, str] | None = None
+
+    def write(self, stream: TextIO) -> None:
+        """Write the merged file; each page keeps its own compression."""
+        with MxFileWriter(stream, attrs=self.header) as writer:
+            for page in self.pages:
+                writer.begin_page(
+                    page.meta.name, page.meta.id, layers=False,
+                    compressed=page.meta.compressed, defaults=False, **page.model,
+                )
+                for item in page.cells:
+                    if isinstance(item, Cell):
+                        writer.write_cell(item)
+                    else:
+                        writer.write_raw(STEP * 4 + item.decode("utf-8") + "\n")
+                writer.end_page()
+
+
+def merge(
+    base: str | Path | bytes | list[Snapshot],
+    ours: str | Path | bytes | list[Snapshot],
+    theirs: str | Path | bytes | list[Snapshot],
+) -> MergeResult:
+    header = None
+    with span("load"):
+        base_pages = base if isinstance(base, list) else load(base)
+        if not isinstance(ours, list):
+            ours = ours if isinstance(ours, bytes) else Path(ours).read_bytes()
+            header = scan_header(ours) or None
+        our_pages = ours if isinstance(ours, list) else load(ours)
+        their_pages = theirs if isinstance(theirs, list) else load(theirs)
+    conflicts: list[Conflict] = []
+
+    ours_by_base = {id(b): o for b, o in pair_pages(base_pages, our_pages) if b is not None}
+    theirs_by_base = {id(b): t for b, t in pair_pages(base_pages, their_pages) if b is not None}
+    our_new = [o for b, o in pair_pages(base_pages, our_pages) if b is None]
+    their_new = [t for b, t in pair_pages(base_pages, their_pages) if b is None]
+
+    merged: list[MergedPage] = []
+    for page in base_pages:
+        o, t = ours_by_base.get(id(page)), theirs_by_base.get(id(page))
+        name = page.name or page.id or str(page.index)
+        if o is None and t is None:
+            continue
+        if o is None or t is None:
+            kept = o or t
+            if diff_pages(page, kept).changes:
+                side = "ours" if o is None else "theirs"
+                conflicts.append(Conflict(name, "(page)", "deleted", f"deleted in {side}, changed in the other"))
+                merged.append(_whole(kept))
+            continue
+        with span("merge"):
+            merged.append(_merge_page(page, o, t, conflicts))
+    our_ids = {p.id for p in our_new}
+    merged.extend(_whole(p) for p in our_new)
+    for page in their_new:
+        if page.id in our_ids:
+            other = next(p for p in our_new if p.id == page.id)
+            if diff_pages(other, page).changes:
+                conflicts.append(Conflict(page.name or page.id or "", "(page)", "added",
+                                          "added on both sides with different content"))
+            continue
+        merged.append(_whole(page))
+
+    return MergeResult(merged, conflicts, header)
+
+
+def merge_files(
+    base: str | Path, ours: str | Path, theirs: str | Path, output: str | Path | None = None
+) -> list[Conflict]:
+    """Merge into ``output`` (default: ``ours``, as git merge drivers do)."""
+    result = merge(base, ours, theirs)
+    target = Path(output if output is not None else ours)
+    tmp = target.with_name(target.name + ".merge-tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        result.write(fh)
+    tmp.replace(target)
+    return result.conflicts
+
+
+def _whole(page: Snapshot) -> MergedPage:
+    return MergedPage(page, page.model, [page.raw[i] for i in page.order])
+
+
+# A cell copied unchanged from one input: (side, id in that side's page).
+Raw = tuple[str, str]
+
+
+def _merge_page(base: Snapshot, ours: Snapshot, theirs: Snapshot, conflicts: list[Conflict]) -> MergedPage:
+    name = base.name or base.id or str(base.index)
+    pages = {"base": base, "ours": ours, "theirs": theirs}
+    od, td = diff_pages(base, ours), diff_pages(base, theirs)
+    # side id -> base id, for cells matched under a new id.
+    to_base = {"base": {}, "ours": od.renamed, "theirs": td.renamed}
+    changes = {
+        "ours": {(c.old_id or c.id): c for c in od.changes if c.kind != "added"},
+        "theirs": {(c.old_id or c.id): c for c in td.changes if c.kind != "added"},
+    }
+
+    def conflict(cell_id: str, aspect: str, detail: str = "") -> None:
+        conflicts.append(Conflict(name, cell_id, aspect, detail))
+
+    def in_base_ids(side: str, cell: Cell) -> Cell:
+        mapping = to_base[side]
+        if not mapping:
+            return cell
+        cell = copy.copy(cell)
+        for attr in ("id", *STRUCTURE):
+            value = getattr(cell, attr)
+            setattr(cell, attr, mapping.get(value, value))
+        return cell
+
+    # Keyed by base id (or the side id of an added cell): a merged Cell in
+    # base ids, or a Raw reference to copy.
+    result: dict[str, Raw | Cell] = {}
+    for cell_id in base.order:
+        oc, tc = changes["ours"].get(cell_id), changes["theirs"].get(cell_id)
+        if oc is None and tc is None:
+            result[cell_id] = ("base", cell_id)
+        elif oc is None or tc is None:
+            change, side = (oc, "ours") if tc is None else (tc, "theirs")
+            if change.kind == "changed":
+                result[cell_id] = (side, change.id)
+            # else: removed on one side, untouched on the other
+        elif oc.kind == "removed" and tc.kind == "removed":
+            pass
+        elif oc.kind == "removed" or tc.kind == "removed":
+            kept, side, other = (tc, "theirs", "ours") if oc.kind == "removed" else (oc, "ours", "theirs")
+            conflict(cell_id, "deleted", f"deleted in {other}, changed in {side}")
+            result[cell_id] = (side, kept.id)
+        elif _unmodelled(oc) or _unmodelled(tc):
+            conflict(cell_id, "other", "changed on both sides, one in XML the merge cannot split")
+            result[cell_id] = ("ours", oc.id)
+        else:
+            result[cell_id] = _merge_cell(
+                base.cell(cell_id),
+                in_base_ids("ours", oc.new),
+                in_base_ids("theirs", tc.new),
+                lambda aspect, detail="", cell_id=cell_id: conflict(cell_id, aspect, detail),
+            )
+
+    for change in od.changes:
+        if change.kind == "added":
+            result[change.id] = ("ours", change.id)
+    for change in td.changes:
+        if change.kind != "added":
+            continue
+        if change.id in result:
+            if change.id in ours.raw and compare(ours.cell(change.id), theirs.cell(change.id)):
+                conflict(change.id, "added", "added on both sides with different content")
+            continue
+        result[change.id] = ("theirs", change.id)
+
+    def cell_of(item: Raw | Cell) -> Cell:
+        if isinstance(item, Cell):
+            return item
+        side, side_id = item
+        return in_base_ids(side, pages[side].cell(side_id))
+
+    # Bring back cells one side deleted that the merge still refers to.
+    pending = [key for key, item in result.items() if isinstance(item, Cell) or item[0] != "base"]
+    while pending:
+        key = pending.pop()
+        cell = cell_of(result[key])
+        for attr in STRUCTURE:
+            ref = getattr(cell, attr)
+            if ref is None or ref in result or ref not in base.raw:
+                continue
+            result[ref] = ("base", ref)
+            for side in ("ours", "theirs"):
+                change = changes[side].get(ref)
+                if change is not None and change.kind == "changed":
+                    result[ref] = (side, change.id)
+            conflict(ref, "deleted", f"still referenced by {key} as {attr}")
+            pending.append(ref)
+
+    # A cell renamed on one side keeps that side's new id.
+    final: dict[str, str] = {}
+    for side in ("theirs", "ours"):
+        final.update({b: s for s, b in to_base[side].items()})
+    renames = bool(final)
+
+    cells: dict[str, bytes | Cell] = {}
+    for key, item in result.items():
+        out_id = final.get(key, key)
+        if not renames and not isinstance(item, Cell):
+            cells[out_id] = pages[item[0]].raw[item[1]]
+            continue
+        cell = copy.copy(cell_of(item))
+        for attr in ("id", *STRUCTURE):
+            value = getattr(cell, attr)
+            setattr(cell, attr, final.get(value, value))
+        if not isinstance(item, Cell):
+            original = pages[item[0]].cell(item[1])
+            if all(getattr(cell, a) == getattr(original, a) for a in ("id", *STRUCTURE)):
+                cells[out_id] = pages[item[0]].raw[item[1]]
+                continue
+        cells[out_id] = cell
+
+    model = _merge_dict(base.model, ours.model, theirs.model, lambda key: None)
+    return MergedPage(ours, model, [cells[i] for i in _order(ours, theirs, cells)])
+
+
+def _merge_cell(base: Cell, ours: Cell, theirs: Cell, conflict) -> Cell:
+    """Merge two edits of one cell aspect by aspect; all ids are base ids."""
+    merged = copy.copy(ours)
+    o_aspects = set(compare(base, ours))
+    t_aspects = compare(base, theirs)
+    differing = set(compare(ours, theirs))
+    for aspect in t_aspects:
+        if aspect not in o_aspects:
+            _take(merged, theirs, aspect)
+        elif aspect == "style":
+            merged.style = format_style(_merge_dict(
+                style_props(base.style), style_props(ours.style), style_props(theirs.style),
+                lambda key: conflict("style", key),
+            ))
+        elif aspect == "data":
+            merged.data = _merge_dict(base.data, ours.data, theirs.data, lambda key: conflict("data", key))
+        elif aspect == "other":
+            merged.extra = _merge_dict(
+                base.extra, ours.extra, theirs.extra, lambda key: conflict("other", key)
+            )
+            b, o, t = (_geometry_extra(c) for c in (base, ours, theirs))
+            if t != b and t != o:
+                if o == b:
+                    _take_geometry_extra(merged, theirs)
+                else:
+                    conflict("other", "geometry")
+        elif aspect not in differing:
+            continue  # both made the same change
+        else:
+            conflict(aspect)
+    return merged
+
+
+def _take(cell: Cell, other: Cell, aspect: str) -> None:
+    if aspect in ("position", "size", "points"):
+        geometry = copy.copy(cell.geometry) if cell.geometry is not None else None
+        source = other.geometry
+        if geometry is None or source is None:
+            cell.geometry = copy.copy(source)
+            return
+        if aspect == "position":
+            geometry.x, geometry.y, geometry.relative = source.x, source.y, source.relative
+        elif aspect == "size":
+            geometry.width, geometry.height = source.width, source.height
+        else:
+            geometry.points = list(source.points) if source.points else None
+        cell.geometry = geometry
+    elif aspect == "style":
+        cell.style, cell.vertex, cell.edge = other.style, other.vertex, other.edge
+    elif aspect == "data":
+        cell.data = dict(other.data)
+    elif aspect == "other":
+        cell.extra = dict(other.extra)
+        _take_geometry_extra(cell, other)
+    else:
+        setattr(cell, aspect, getattr(other, aspect))
+
+
+def _unmodelled(change: Change) -> bool:
+    """Whether the change touches XML that :class:`Cell` does not keep."""
+    return "other" in change.aspects and "other" not in compare(change.old, change.new)
+
+
+def _geometry_extra(cell: Cell) -> tuple:
+    geometry = cell.geometry
+    return ({}, []) if geometry is None else (geometry.extra, geometry.children)
+
+
+def _take_geometry_extra(cell: Cell, other: Cell) -> None:
+    if cell.geometry is None or other.geometry is None:
+        return
+    geometry = copy.copy(cell.geometry)
+    geometry.extra = dict(other.geometry.extra)
+    geometry.children = list(other.geometry.children)
+    cell.geometry = geometry
+
+
+def _merge_dict(base: dict, ours: dict, theirs: dict, conflict) -> dict:
+    """Three-way merge of flat mappings; conflicting keys keep ours."""
+    out = dict(ours)
+    for key in dict.fromkeys([*base, *theirs]):
+        b, o, t = base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING)
+        if t == b or t == o:
+            continue
+        if o == b:
+            if t is _MISSING:
+                out.pop(key, None)
+            else:
+                out[key] = t
+        else:
+            conflict(key)
+    return out
+
+
+_MISSING = object()
+
+
+def _order(ours: Snapshot, theirs: Snapshot, cells: dict) -> list[str]:
+    """Ours' cell order, with cells only theirs has placed after their
+    predecessor in theirs."""
+    order = [i for i in ours.order if i in cells]
+    placed = set(order)
+    after: dict[str | None, list[str]] = {}
+    previous: str | None = None
+    for cell_id in theirs.order:
+        if cell_id in placed:
+            previous = cell_id
+            continue
+        if cell_id in cells:
+            after.setdefault(previous, []).append(cell_id)
+            placed.add(cell_id)
+            previous = cell_id
+    # Anything left (cells kept from the base only) goes last.
+    rest = [i for i in cells if i not in placed]
+    out = list(after.get(None, []))
+    for cell_id in order:
+        out.append(cell_id)
+        stack = list(after.get(cell_id, []))
+        while stack:
+            nxt = stack.pop(0)
+            out.append(nxt)
+            stack[:0] = after.get(nxt, [])
+    out.extend(rest)
+    return out
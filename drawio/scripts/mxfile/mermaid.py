@@ -0,0 +1,835 @@
+"""Parser for the Mermaid diagram types the skill converts to draw.io.
+
+Flowcharts, state, class and ER diagrams parse into a :class:`Graph` of
+nodes, edges and nested groups, which :mod:`mxfile.convert` lays out;
+sequence diagrams parse into a :class:`Sequence` of timeline events.  Only
+structure is kept.  Mermaid styling (``style``, ``classDef``) is mapped onto
+draw.io style keys where there is a direct equivalent, and statements that
+do not affect structure (``click``, ``linkStyle``, notes on states...) are
+skipped, so anything Mermaid renders converts even if a detail is lost.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from dataclasses import dataclass, field
+
+from .errors import MermaidError
+
+_DIRECTIONS = {"TB": "TB", "TD": "TB", "BT": "BT", "LR": "LR", "RL": "RL"}
+
+
+@dataclass(slots=True)
+class Node:
+    id: str
+    label: str
+    shape: str = "rect"
+    # Class attributes and methods, entity attributes.
+    rows: list[str] = field(default_factory=list)
+    methods: list[str] = field(default_factory=list)
+    # draw.io style overrides from Mermaid ``style``/``classDef``.
+    style: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Edge:
+    """A link; ``head`` and ``tail`` name the markers at target and source."""
+
+    source: str
+    target: str
+    label: str = ""
+    line: str = "solid"  # solid | dotted | thick | invisible
+    head: str = "arrow"
+    tail: str = "none"
+    head_label: str = ""
+    tail_label: str = ""
+
+
+@dataclass
+class Graph:
+    kind: str  # flowchart | state | class | er
+    direction: str = "TB"
+    nodes: dict[str, Node] = field(default_factory=dict)
+    edges: list[Edge] = field(default_factory=list)
+    groups: dict[str, str] = field(default_factory=dict)  # id -> title
+    parent: dict[str, str] = field(default_factory=dict)  # node or group -> group
+    group_direction: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Participant:
+    id: str
+    label: str
+    actor: bool = False
+
+
+@dataclass(slots=True)
+class Message:
+    source: str
+    target: str
+    label: str = ""
+    line: str = "solid"  # solid | dotted
+    head: str = "arrow"  # arrow | open | cross | none
+    tail: str = "none"
+    activate: bool = False  # activates the target
+    deactivate: bool = False  # deactivates the source
+
+
+@dataclass(slots=True)
+class Note:
+    over: list[str]
+    side: str  # left | right | over
+    text: str
+
+
+@dataclass(slots=True)
+class Block:
+    """Start (``loop``, ``alt``...), divider (``else``, ``and``) or ``end``."""
+
+    kind: str
+    text: str = ""
+
+
+@dataclass(slots=True)
+class Activation:
+    participant: str
+    active: bool
+
+
+@dataclass
+class Sequence:
+    participants: dict[str, Participant] = field(default_factory=dict)
+    events: list[Message | Note | Block | Activation] = field(default_factory=list)
+    autonumber: bool = False
+
+
+def parse(source: str) -> Graph | Sequence:
+    """Parse Mermaid source; the diagram type comes from its header line."""
+    lines = _lines(source)
+    if not lines:
+        raise MermaidError("empty diagram")
+    number, header = lines[0]
+    # ``graph TD;A-->B;B-->C`` puts the whole diagram on the header line.
+    header, *statements = _split_statements(header)
+    body = lines[1:]
+    if statements:
+        body.insert(0, (number, ";".join(statements)))
+    keyword, _, rest = header.partition(" ")
+    rest = rest.strip()
+    if keyword in ("flowchart", "graph"):
+        parser = _FlowParser(Graph("flowchart", _direction(rest or "TB", number)))
+    elif keyword in ("stateDiagram", "stateDiagram-v2"):
+        parser = _StateParser(Graph("state"))
+    elif keyword in ("classDiagram", "classDiagram-v2"):
+        parser = _ClassParser(Graph("class"))
+    elif keyword == "erDiagram":
+        parser = _ERParser(Graph("er", "LR"))
+    elif keyword == "sequenceDiagram":
+        parser = _SequenceParser(Sequence())
+    else:
+        raise MermaidError(f"unsupported diagram type: {keyword!r}", number)
+    for number, line in body:
+        parser.line(line, number)
+    return parser.finish()
+
+
+def normalize(source: str) -> str:
+    """The source without comments, front matter, blank lines or indentation.
+
+    Sources that normalize the same parse to the same diagram, so this is
+    what caches of converted or rendered Mermaid should key on.
+    """
+    return "\n".join(line for _, line in _lines(source))
+
+
+def _lines(source: str) -> list[tuple[int, str]]:
+    """Non-blank lines without comments, front matter and directives."""
+    out = []
+    in_front_matter = False
+    for number, raw in enumerate(source.splitlines(), 1):
+        line = raw.strip()
+        if not out and line == "---":
+            in_front_matter = not in_front_matter
+            continue
+        if in_front_matter or not line or line.startswith("%%"):
+            continue
+        out.append((number, line))
+    return out
+
+
+def _direction(text: str, number: int) -> str:
+    try:
+        return _DIRECTIONS[text.upper()]
+    except KeyError:
+        raise MermaidError(f"unknown direction: {text!r}", number) from None
+
+
+def _text(raw: str) -> str:
+    """Label text: unquoted, Markdown backticks dropped, ``#name;`` decoded."""
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        raw = raw[1:-1]
+    if len(raw) >= 2 and raw[0] == raw[-1] == "`":
+        raw = raw[1:-1]
+    return re.sub(r"#(\w+);", lambda m: html.unescape(f"&{m.group(1)};")
+                  if not m.group(1).isdigit() else chr(int(m.group(1))), raw)
+
+
+# CSS properties with a draw.io equivalent.
+_CSS = {
+    "fill": "fillColor",
+    "stroke": "strokeColor",
+    "color": "fontColor",
+    "stroke-width": "strokeWidth",
+}
+
+
+def _css(text: str) -> dict[str, str]:
+    """Map ``fill:#f9f,stroke-width:2px`` to draw.io style keys."""
+    props = {}
+    for part in re.split(r"[,;]", text):
+        key, sep, value = part.partition(":")
+        key, value = key.strip(), value.strip()
+        if not sep:
+            continue
+        if key in _CSS:
+            props[_CSS[key]] = value.removesuffix("px")
+        elif key == "stroke-dasharray":
+            props["dashed"] = "1"
+            props["dashPattern"] = value.replace(",", " ")
+        elif key == "font-weight" and value in ("bold", "700", "800", "900"):
+            props["fontStyle"] = "1"
+    return props
+
+
+class _StyledParser:
+    """``style``, ``classDef`` and ``class`` handling shared by graph parsers."""
+
+    def __init__(self, graph: Graph) -> None:
+        self.graph = graph
+        self.class_defs: dict[str, dict[str, str]] = {}
+        self.node_classes: dict[str, list[str]] = {}
+
+    def styling(self, line: str) -> bool:
+        keyword, _, rest = line.partition(" ")
+        rest = rest.strip()
+        if keyword == "style":
+            target, _, css = rest.partition(" ")
+            node = self.graph.nodes.get(target)
+            if node is not None:
+                node.style.update(_css(css))
+            return True
+        if keyword == "classDef":
+            names, _, css = rest.partition(" ")
+            for name in names.split(","):
+                self.class_defs[name] = _css(css)
+            return True
+        if keyword in ("class", "cssClass") and not rest.endswith("{"):
+            targets, _, name = rest.rpartition(" ")
+            if targets:
+                for target in re.split(r"\s*,\s*", targets.strip('"')):
+                    self.node_classes.setdefault(target, []).append(name)
+                return True
+        return keyword in ("click", "linkStyle", "callback", "link")
+
+    def finish(self) -> Graph:
+        default = self.class_defs.get("default")
+        for node_id, node in self.graph.nodes.items():
+            own = node.style
+            merged = dict(default or {})
+            for name in self.node_classes.get(node_id, ()):
+                merged.update(self.class_defs.get(name, {}))
+            merged.update(own)
+            node.style = merged
+        return self.graph
+
+
+# --------------------------------------------------------------- flowchart
+
+# (opener, closer, shape); longer openers first.
+_SHAPES = [
+    ("(((", ")))", "double_circle"),
+    ("([", "])", "stadium"),
+    ("[[", "]]", "subroutine"),
+    ("[(", ")]", "cylinder"),
+    ("((", "))", "circle"),
+    ("{{", "}}", "hexagon"),
+    ("[/", "/]", "parallelogram"),
+    ("[/", "\\]", "trapezoid"),
+    ("[\\", "\\]", "parallelogram_alt"),
+    ("[\\", "/]", "trapezoid_alt"),
+    ("[", "]", "rect"),
+    ("(", ")", "round"),
+    ("{", "}", "rhombus"),
+    (">", "]", "asymmetric"),
+]
+
+_NODE_ID = re.compile(r"\w+")
+_AMPERSAND = re.compile(r"\s*&\s*")
+_CLASS_SUFFIX = re.compile(r":::([\w-]+)")
+_LINK = re.compile(
+    r"""\s*
+    (?P<head>[<ox])?
+    (?:(?P<open>--|==|-\.)(?![-=.>]|[ox]\s)\s*(?P<inline>[^|\[\](){}<>]*?)\s*)?
+    (?P<line>-{2,}|={2,}|-?\.+-|~{3,})
+    (?P<tail>>|[ox](?=\s))?
+    (?:\s*\|(?P<label>[^|]*)\|)?
+    \s*""",
+    re.X,
+)
+_MARKER = {">": "arrow", "<": "arrow", "o": "circle", "x": "cross", None: "none"}
+
+
+def _split_statements(line: str) -> list[str]:
+    """Split on ``;`` outside quotes and brackets (entities like ``#quot;`` kept)."""
+    parts = []
+    depth = 0
+    quoted = False
+    start = 0
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif ch in "[({":
+            depth += 1
+        elif ch in "])}":
+            depth = max(depth - 1, 0)
+        elif ch == ";" and depth == 0 and not re.search(r"#\w+$", line[start:i]):
+            parts.append(line[start:i])
+            start = i + 1
+    parts.append(line[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+class _FlowParser(_StyledParser):
+    def __init__(self, graph: Graph) -> None:
+        super().__init__(graph)
+        self.stack: list[str] = []
+        self.anonymous = 0
+
+    def line(self, line: str, number: int) -> None:
+        for statement in _split_statements(line):
+            self.statement(statement, number)
+
+    def statement(self, line: str, number: int) -> None:
+        graph = self.graph
+        keyword = line.split(None, 1)[0]
+        if keyword == "subgraph":
+            self.subgraph(line[len("subgraph"):].strip())
+        elif keyword == "end" and line == "end":
+            if self.stack:
+                self.stack.pop()
+        elif keyword == "direction":
+            direction = _direction(line.split()[1], number)
+            if self.stack:
+                graph.group_direction[self.stack[-1]] = direction
+            else:
+                graph.direction = direction
+        elif not self.styling(line) and not self.chain(line):
+            raise MermaidError(f"cannot parse: {line!r}", number)
+
+    def subgraph(self, rest: str) -> None:
+        m = re.fullmatch(r"(\w+)\s*\[(.*)\]", rest)
+        if m:
+            group_id, title = m.group(1), _text(m.group(2))
+        elif _NODE_ID.fullmatch(rest):
+            group_id = title = rest
+        else:
+            self.anonymous += 1
+            group_id, title = f"subgraph{self.anonymous}", _text(rest)
+        self.graph.groups[group_id] = title
+        self.graph.nodes.pop(group_id, None)
+        if self.stack:
+            self.graph.parent[group_id] = self.stack[-1]
+        self.stack.append(group_id)
+
+    def chain(self, line: str) -> bool:
+        """``a & b --> c -- text --> d`` and friends."""
+        ids, pos = self.node_group(line, 0)
+        if ids is None:
+            return False
+        while pos < len(line):
+            m = _LINK.match(line, pos)
+            if m is None:
+                return False
+            targets, pos = self.node_group(line, m.end())
+            if targets is None:
+                return False
+            self.link(ids, targets, m)
+            ids = targets
+        return True
+
+    def node_group(self, line: str, pos: int) -> tuple[list[str] | None, int]:
+        ids = []
+        while True:
+            node_id, pos = self.node(line, pos)
+            if node_id is None:
+                return None, pos
+            ids.append(node_id)
+            m = _AMPERSAND.match(line, pos)
+            if m is None:
+                return ids, pos
+            pos = m.end()
+
+    def node(self, line: str, pos: int) -> tuple[str | None, int]:
+        m = _NODE_ID.match(line, pos)
+        if m is None:
+            return None, pos
+        node_id = m.group()
+        pos = m.end()
+        label = shape = None
+        for opener, _, _ in _SHAPES:
+            if line.startswith(opener, pos):
+                label, shape, pos = self.shape(line, pos, opener)
+                break
+        m = _CLASS_SUFFIX.match(line, pos)
+        if m:
+            self.node_classes.setdefault(node_id, []).append(m.group(1))
+            pos = m.end()
+        self.declare(node_id, label, shape)
+        return node_id, pos
+
+    def shape(self, line: str, pos: int, opener: str) -> tuple[str, str, int]:
+        start = pos + len(opener)
+        search = start
+        if line.startswith('"', start):
+            close = line.find('"', start + 1)
+            if close != -1:
+                search = close + 1
+        best = None
+        for candidate, closer, shape in _SHAPES:
+            if candidate != opener:
+                continue
+            end = line.find(closer, search)
+            if end != -1 and (best is None or end < best[0]):
+                best = (end, closer, shape)
+        if best is None:
+            return _text(line[start:]), "rect", len(line)
+        end, closer, shape = best
+        return _text(line[start:end]), shape, end + len(closer)
+
+    def declare(self, node_id: str, label: str | None, shape: str | None) -> None:
+        graph = self.graph
+        if node_id in graph.groups:
+            return
+        node = graph.nodes.get(node_id)
+        if node is None:
+            node = graph.nodes[node_id] = Node(node_id, node_id)
+        if label is not None:
+            node.label, node.shape = label, shape
+        if self.stack and node_id not in graph.parent:
+            graph.parent[node_id] = self.stack[-1]
+
+    def link(self, sources: list[str], targets: list[str], m: re.Match) -> None:
+        body = m.group("line")
+        line = ("thick" if "=" in body else "dotted" if "." in body
+                else "invisible" if "~" in body else "solid")
+        label = m.group("label") or m.group("inline") or ""
+        head = _MARKER[m.group("tail")]
+        tail = _MARKER[m.group("head")]
+        for s in sources:
+            for t in targets:
+                self.graph.edges.append(Edge(s, t, _text(label), line, head, tail))
+
+
+# ------------------------------------------------------------------- state
+
+_STATE_REF = r"(\[\*\]|[\w.-]+)(?::::[\w-]+)?"
+_TRANSITION = re.compile(rf"{_STATE_REF}\s*-->\s*{_STATE_REF}\s*(?::\s*(.*))?")
+_STATE_KINDS = {"<<fork>>": "fork", "<<join>>": "join", "<<choice>>": "choice"}
+
+
+class _StateParser(_StyledParser):
+    def __init__(self, graph: Graph) -> None:
+        super().__init__(graph)
+        self.stack: list[str] = []
+        self.in_note = False
+
+    @property
+    def scope(self) -> str | None:
+        return self.stack[-1] if self.stack else None
+
+    def line(self, line: str, number: int) -> None:
+        graph = self.graph
+        if self.in_note:
+            self.in_note = line != "end note"
+            return
+        keyword = line.split(None, 1)[0]
+        if keyword == "note":
+            self.in_note = ":" not in line
+            return
+        if line == "}":
+            if self.stack:
+                self.stack.pop()
+            return
+        if line == "--" or keyword in ("hide", "scale"):
+            return
+        if keyword == "direction":
+            direction = _direction(line.split()[1], number)
+            if self.stack:
+                graph.group_direction[self.stack[-1]] = direction
+            else:
+                graph.direction = direction
+            return
+        if keyword == "state":
+            self.state(line[len("state"):].strip(), number)
+            return
+        m = _TRANSITION.fullmatch(line)
+        if m:
+            source = self.ref(m.group(1), start=True)
+            target = self.ref(m.group(2), start=False)
+            graph.edges.append(Edge(source, target, _text(m.group(3) or "")))
+            return
+        if self.styling(line):
+            return
+        m = re.fullmatch(r"([\w.-]+)(?::::([\w-]+))?\s*(?::\s*(.*))?", line)
+        if m is None:
+            raise MermaidError(f"cannot parse: {line!r}", number)
+        self.ref(m.group(1), start=False)
+        if m.group(2):
+            self.node_classes.setdefault(m.group(1), []).append(m.group(2))
+        if m.group(3):
+            self.describe(m.group(1), _text(m.group(3)))
+
+    def state(self, rest: str, number: int) -> None:
+        opens = rest.endswith("{")
+        rest = rest.removesuffix("{").strip()
+        m = re.fullmatch(r'"([^"]*)"\s+as\s+([\w.-]+)', rest)
+        if m:
+            label, state_id = _text(m.group(1)), m.group(2)
+        else:
+            m = re.fullmatch(r"([\w.-]+)(?:\s*(<<\w+>>))?(?:\s*:\s*(.*))?", rest)
+            if m is None:
+                raise MermaidError(f"cannot parse state: {rest!r}", number)
+            state_id = m.group(1)
+            label = _text(m.group(3)) if m.group(3) else None
+            kind = _STATE_KINDS.get(m.group(2) or "")
+            if kind:
+                node = self.declare(state_id)
+                node.shape, node.label = kind, ""
+                return
+        if opens:
+            self.graph.nodes.pop(state_id, None)
+            self.graph.groups[state_id] = label or self.graph.groups.get(state_id) or state_id
+            if self.stack:
+                self.graph.parent[state_id] = self.stack[-1]
+            self.stack.append(state_id)
+        else:
+            self.declare(state_id)
+            if label:
+                self.describe(state_id, label)
+
+    def ref(self, name: str, start: bool) -> str:
+        if name != "[*]":
+            if name not in self.graph.groups:
+                self.declare(name)
+            return name
+        scope = self.scope
+        state_id = f"{scope or ''}_{'start' if start else 'end'}"
+        node = self.declare(state_id)
+        node.shape, node.label = ("start", "") if start else ("end", "")
+        return state_id
+
+    def declare(self, state_id: str) -> Node:
+        graph = self.graph
+        node = graph.nodes.get(state_id)
+        if node is None:
+            node = graph.nodes[state_id] = Node(state_id, state_id, "state")
+            if self.stack:
+                graph.parent[state_id] = self.stack[-1]
+        return node
+
+    def describe(self, state_id: str, text: str) -> None:
+        if state_id in self.graph.groups:
+            self.graph.groups[state_id] = text
+            return
+        node = self.declare(state_id)
+        if node.label == state_id:
+            node.label = text
+        else:
+            node.rows.append(text)
+
+
+# ------------------------------------------------------------------- class
+
+_CLASS_NAME = r"[\w.]+(?:~[^~]*~)?"
+_RELATION = re.compile(
+    rf"""({_CLASS_NAME})\s*(?:"([^"]*)"\s*)?
+    (<\||\*|o|<)?(--|\.\.)(\|>|\*|o|>)?
+    \s*(?:"([^"]*)"\s*)?({_CLASS_NAME})\s*(?::\s*(.*))?""",
+    re.X,
+)
+_CLASS_MARKERS = {
+    "<|": "triangle", "|>": "triangle", "*": "diamond", "o": "odiamond",
+    "<": "open", ">": "open", None: "none",
+}
+
+
+def _generic(name: str) -> str:
+    """``List~int~`` is Mermaid's spelling of ``List<int>``."""
+    return re.sub(r"~([^~]*)~", r"<\1>", name)
+
+
+class _ClassParser(_StyledParser):
+    def __init__(self, graph: Graph) -> None:
+        super().__init__(graph)
+        self.body: str | None = None  # class whose ``{ ... }`` is open
+        self.stack: list[str] = []  # open namespaces
+        self.annotations: dict[str, str] = {}
+
+    def line(self, line: str, number: int) -> None:
+        graph = self.graph
+        if self.body is not None:
+            if line == "}":
+                self.body = None
+            elif line.startswith("<<"):
+                self.annotations[self.body] = line
+            else:
+                self.member(self.body, line)
+            return
+        keyword = line.split(None, 1)[0]
+        if line == "}":
+            if self.stack:
+                self.stack.pop()
+            return
+        if keyword == "direction":
+            graph.direction = _direction(line.split()[1], number)
+            return
+        if keyword == "namespace":
+            name = line[len("namespace"):].removesuffix("{").strip()
+            graph.groups[name] = name
+            if self.stack:
+                graph.parent[name] = self.stack[-1]
+            self.stack.append(name)
+            return
+        if keyword == "note":
+            return
+        m = re.fullmatch(rf"<<(.+)>>\s*({_CLASS_NAME})", line)
+        if m:
+            self.declare(m.group(2))
+            self.annotations[self.key(m.group(2))] = f"<<{m.group(1)}>>"
+            return
+        if keyword == "class":
+            self.klass(line[len("class"):].strip(), number)
+            return
+        m = _RELATION.fullmatch(line)
+        if m:
+            left, tail_label, lm, body, rm, head_label, right, label = m.groups()
+            source, target = self.declare(left), self.declare(right)
+            graph.edges.append(Edge(
+                source, target, _text(label or ""),
+                "dotted" if body == ".." else "solid",
+                _CLASS_MARKERS[rm], _CLASS_MARKERS[lm],
+                head_label or "", tail_label or "",
+            ))
+            return
+        if self.styling(line):
+            return
+        m = re.fullmatch(rf"({_CLASS_NAME})\s*:\s*(.*)", line)
+        if m is None:
+            raise MermaidError(f"cannot parse: {line!r}", number)
+        self.member(self.declare(m.group(1)), m.group(2))
+
+    def klass(self, rest: str, number: int) -> None:
+        opens = rest.endswith("{")
+        rest = rest.removesuffix("{").strip()
+        m = re.fullmatch(rf'({_CLASS_NAME})(?:\["([^"]*)"\])?(?::::([\w-]+))?', rest)
+        if m is None:
+            raise MermaidError(f"cannot parse class: {rest!r}", number)
+        class_id = self.declare(m.group(1))
+        if m.group(2):
+            self.graph.nodes[class_id].label = m.group(2)
+        if m.group(3):
+            self.node_classes.setdefault(class_id, []).append(m.group(3))
+        if opens:
+            self.body = class_id
+
+    @staticmethod
+    def key(name: str) -> str:
+        return name.split("~", 1)[0]
+
+    def declare(self, name: str) -> str:
+        class_id = self.key(name)
+        node = self.graph.nodes.get(class_id)
+        if node is None:
+            node = self.graph.nodes[class_id] = Node(class_id, _generic(name), "class")
+            if self.stack:
+                self.graph.parent[class_id] = self.stack[-1]
+        elif "~" in name:
+            node.label = _generic(name)
+        return class_id
+
+    def member(self, class_id: str, text: str) -> None:
+        node = self.graph.nodes[class_id]
+        text = _generic(text.strip())
+        if text.startswith("<<"):
+            self.annotations[class_id] = text
+        elif "(" in text:
+            node.methods.append(text)
+        else:
+            node.rows.append(text)
+
+    def finish(self) -> Graph:
+        for class_id, annotation in self.annotations.items():
+            node = self.graph.nodes[class_id]
+            node.label = f"{annotation}\n{node.label}"
+        return super().finish()
+
+
+# ---------------------------------------------------------------------- ER
+
+_ENTITY = r'("[^"]+"|[\w-]+)'
+_ER_RELATION = re.compile(
+    rf"{_ENTITY}\s*(\|o|\|\||\}}o|\}}\|)(--|\.\.)(o\||\|\||o\{{|\|\{{)\s*{_ENTITY}"
+    r"\s*:\s*(.*)"
+)
+_ER_LEFT = {"||": "one", "|o": "zero_or_one", "}o": "zero_or_more", "}|": "one_or_more"}
+_ER_RIGHT = {"||": "one", "o|": "zero_or_one", "o{": "zero_or_more", "|{": "one_or_more"}
+
+
+class _ERParser(_StyledParser):
+    def __init__(self, graph: Graph) -> None:
+        super().__init__(graph)
+        self.body: str | None = None
+
+    def line(self, line: str, number: int) -> None:
+        graph = self.graph
+        if self.body is not None:
+            if line == "}":
+                self.body = None
+            else:
+                self.attribute(self.body, line)
+            return
+        if line.startswith("direction "):
+            graph.direction = _direction(line.split()[1], number)
+            return
+        m = _ER_RELATION.fullmatch(line)
+        if m:
+            left, lm, body, rm, right, label = m.groups()
+            graph.edges.append(Edge(
+                self.declare(left), self.declare(right), _text(label),
+                "dotted" if body == ".." else "solid",
+                _ER_RIGHT[rm], _ER_LEFT[lm],
+            ))
+            return
+        m = re.fullmatch(rf'{_ENTITY}(?:\["([^"]*)"\])?\s*(\{{)?', line)
+        if m:
+            entity = self.declare(m.group(1))
+            if m.group(2):
+                graph.nodes[entity].label = m.group(2)
+            if m.group(3):
+                self.body = entity
+            return
+        if not self.styling(line):
+            raise MermaidError(f"cannot parse: {line!r}", number)
+
+    def declare(self, name: str) -> str:
+        entity = _text(name)
+        if entity not in self.graph.nodes:
+            self.graph.nodes[entity] = Node(entity, entity, "entity")
+        return entity
+
+    def attribute(self, entity: str, line: str) -> None:
+        m = re.fullmatch(r'(\S+)\s+(\S+)((?:\s*(?:PK|FK|UK)\s*,?)*)\s*(?:"([^"]*)")?', line)
+        if m is None:
+            self.graph.nodes[entity].rows.append(line)
+            return
+        kind, name, keys, _comment = m.groups()
+        keys = ",".join(re.findall(r"PK|FK|UK", keys or ""))
+        row = f"{name}: {_generic(kind)}"
+        self.graph.nodes[entity].rows.append(f"{keys} {row}" if keys else row)
+
+
+# ---------------------------------------------------------------- sequence
+
+_ARROWS = {
+    # arrow: (line, head, tail)
+    "<<-->>": ("dotted", "arrow", "arrow"),
+    "<<->>": ("solid", "arrow", "arrow"),
+    "-->>": ("dotted", "arrow", "none"),
+    "->>": ("solid", "arrow", "none"),
+    "--x": ("dotted", "cross", "none"),
+    "-x": ("solid", "cross", "none"),
+    "--)": ("dotted", "open", "none"),
+    "-)": ("solid", "open", "none"),
+    "-->": ("dotted", "none", "none"),
+    "->": ("solid", "none", "none"),
+}
+_MESSAGE = re.compile(
+    r"([^\s:+<>-][^:<>]*?)\s*("
+    + "|".join(re.escape(a) for a in _ARROWS)
+    + r")\s*([+-]?)\s*([^\s:+-][^:]*?)\s*(?::\s*(.*))?"
+)
+_BLOCKS = ("loop", "alt", "opt", "par", "critical", "break", "rect", "box")
+_DIVIDERS = ("else", "and", "option")
+
+
+class _SequenceParser:
+    def __init__(self, sequence: Sequence) -> None:
+        self.sequence = sequence
+
+    def line(self, line: str, number: int) -> None:
+        seq = self.sequence
+        keyword, _, rest = line.partition(" ")
+        rest = rest.strip()
+        lower = keyword.lower()
+        if keyword in ("create", "destroy") and rest:
+            if keyword == "destroy":
+                return
+            keyword, _, rest = rest.partition(" ")
+            rest = rest.strip()
+        if keyword in ("participant", "actor"):
+            m = re.fullmatch(r"(.+?)(?:\s+as\s+(.+))?", rest)
+            name = m.group(1)
+            participant = self.participant(name)
+            participant.actor = keyword == "actor"
+            if m.group(2):
+                participant.label = _text(m.group(2))
+        elif keyword == "autonumber":
+            seq.autonumber = True
+        elif keyword in ("activate", "deactivate"):
+            self.participant(rest)
+            seq.events.append(Activation(rest, keyword == "activate"))
+        elif lower == "note":
+            self.note_line(rest, number)
+        elif keyword in _BLOCKS:
+            seq.events.append(Block(keyword, _text(rest)))
+        elif keyword in _DIVIDERS:
+            seq.events.append(Block(keyword, _text(rest)))
+        elif line == "end":
+            seq.events.append(Block("end"))
+        elif keyword in ("title", "accTitle", "accDescr", "links", "link", "properties"):
+            pass
+        else:
+            m = _MESSAGE.fullmatch(line)
+            if m is None:
+                raise MermaidError(f"cannot parse: {line!r}", number)
+            source, arrow, flag, target, text = m.groups()
+            self.participant(source)
+            self.participant(target)
+            kind, head, tail = _ARROWS[arrow]
+            seq.events.append(Message(
+                source, target, _text(text or ""), kind, head, tail,
+                activate=flag == "+", deactivate=flag == "-",
+            ))
+
+    def note_line(self, rest: str, number: int) -> None:
+        m = re.fullmatch(r"(left of|right of|over)\s+([^:]+?)\s*:\s*(.*)", rest, re.I)
+        if m is None:
+            raise MermaidError(f"cannot parse note: {rest!r}", number)
+        over = [p.strip() for p in m.group(2).split(",")]
+        for name in over:
+            self.participant(name)
+        side = m.group(1).lower().split()[0]
+        self.sequence.events.append(Note(over, side, _text(m.group(3))))
+
+    def participant(self, name: str) -> Participant:
+        participants = self.sequence.participants
+        if name not in participants:
+            participants[name] = Participant(name, name)
+        return participants[name]
+
+    def finish(self) -> Sequence:
+        return self.sequence
@@ -0,0 +1,210 @@
+"""Plain data types for pages and cells."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from xml.etree.ElementTree import Element, tostring
+
+from .xmlutil import format_attrs
+
+# Elements that form one cell directly under <root>.  ``object`` and
+# ``UserObject`` wrap an mxCell and carry the id, label and custom data.
+CELL_TAGS = ("mxCell", "object", "UserObject")
+WRAPPER_TAGS = ("object", "UserObject")
+
+# Attributes the dataclasses below model; others are kept in ``extra``.
+_CELL_ATTRS = frozenset(("id", "value", "style", "parent", "vertex", "edge", "source", "target"))
+_GEOMETRY_ATTRS = frozenset(("x", "y", "width", "height", "relative", "as"))
+
+
+@dataclass(slots=True)
+class Geometry:
+    x: float = 0.0
+    y: float = 0.0
+    width: float = 0.0
+    height: float = 0.0
+    relative: bool = False
+    # Edge waypoints.
+    points: list[tuple[float, float]] | None = None
+    # Other attributes (e.g. ``rotation`` on old files), kept as read.
+    extra: dict[str, str] = field(default_factory=dict)
+    # Raw XML of the other children, such as ``<mxPoint as="targetPoint">``
+    # or a collapsed swimlane's ``<mxRectangle as="alternateBounds">``.
+    children: list[str] = field(default_factory=list)
+
+    def to_xml(self, indent: str = "", step: str = "    ") -> str:
+        """Serialize; ``indent`` applies to the lines after the first."""
+        attrs: dict[str, object] = {}
+        if self.relative:
+            attrs["relative"] = "1"
+        else:
+            attrs.update(
+                x=format_number(self.x), y=format_number(self.y),
+                width=format_number(self.width), height=format_number(self.height),
+            )
+        attrs.update(self.extra)
+        if not self.points and not self.children:
+            return f'<mxGeometry{format_attrs(attrs)} as="geometry"/>'
+        inner = indent + step
+        lines = [f'<mxGeometry{format_attrs(attrs)} as="geometry">']
+        if self.points:
+            lines.append(f'{inner}<Array as="points">')
+            for x, y in self.points:
+                lines.append(
+                    f'{inner}{step}<mxPoint x="{format_number(x)}" y="{format_number(y)}"/>'
+                )
+            lines.append(f"{inner}</Array>")
+        lines.extend(inner + child for child in self.children)
+        lines.append(f"{indent}</mxGeometry>")
+        return "\n".join(lines)
+
+
+@dataclass(slots=True)
+class Cell:
+    """One mxCell, flattened out of any ``object`` wrapper."""
+
+    id: str
+    value: str = ""
+    style: str = ""
+    parent: str | None = None
+    vertex: bool = False
+    edge: bool = False
+    source: str | None = None
+    target: str | None = None
+    geometry: Geometry | None = None
+    # Custom attributes of an <object>/<UserObject> wrapper, excluding
+    # id and label.
+    data: dict[str, str] = field(default_factory=dict)
+    # Other mxCell attributes (``collapsed``, ``connectable``, ``visible``...).
+    extra: dict[str, str] = field(default_factory=dict)
+
+    def to_xml(self, indent: str = "", step: str = "    ") -> str:
+        """Serialize the cell, using an ``<object>`` wrapper if it has data."""
+        cell_attrs: dict[str, object] = {
+            "style": self.style or None,
+            "parent": self.parent,
+            "vertex": "1" if self.vertex else None,
+            "edge": "1" if self.edge else None,
+            "source": self.source,
+            "target": self.target,
+            **self.extra,
+        }
+        if self.data:
+            outer = {"id": self.id, "label": self.value, **self.data}
+            inner = _cell_body(cell_attrs, self.geometry, indent + step, step)
+            return (
+                f"{indent}<object{format_attrs(outer)}>\n"
+                f"{inner}\n"
+                f"{indent}</object>"
+            )
+        # draw.io writes value on every vertex and edge, even when empty.
+        keep_value = self.value or self.vertex or self.edge
+        attrs = {"id": self.id, "value": self.value if keep_value else None}
+        attrs.update(cell_attrs)
+        return _cell_body(attrs, self.geometry, indent, step)
+
+
+@dataclass(slots=True)
+class Diagram:
+    """One ``<diagram>`` page."""
+
+    index: int
+    id: str | None = None
+    name: str | None = None
+    compressed: bool = False
+    # Attributes of the page's <mxGraphModel> (dx, grid, pageWidth, ...).
+    model: dict[str, str] = field(default_factory=dict)
+
+
+def _cell_body(
+    attrs: dict[str, object], geometry: Geometry | None, indent: str, step: str
+) -> str:
+    if geometry is None:
+        return f"{indent}<mxCell{format_attrs(attrs)}/>"
+    return (
+        f"{indent}<mxCell{format_attrs(attrs)}>\n"
+        f"{indent}{step}{geometry.to_xml(indent + step, step)}\n"
+        f"{indent}</mxCell>"
+    )
+
+
+def format_number(value: float) -> str:
+    """Format a coordinate the way draw.io does: no ``.0`` on integers."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _float(value: str | None) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def geometry_from_attrs(attrs: dict[str, str]) -> Geometry:
+    return Geometry(
+        x=_float(attrs.get("x")),
+        y=_float(attrs.get("y")),
+        width=_float(attrs.get("width")),
+        height=_float(attrs.get("height")),
+        relative=attrs.get("relative") == "1",
+    )
+
+
+def cell_from_element(elem: Element) -> Cell:
+    """Build a :class:`Cell` from an ``mxCell``/``object`` element."""
+    if elem.tag in WRAPPER_TAGS:
+        inner = elem.find("mxCell")
+        data = {
+            k: v for k, v in elem.attrib.items() if k not in ("id", "label")
+        }
+        value = elem.get("label", "")
+        cell_el = inner if inner is not None else Element("mxCell")
+    else:
+        data = {}
+        value = elem.get("value", "")
+        cell_el = elem
+    geo_el = cell_el.find("mxGeometry")
+    geometry = None
+    if geo_el is not None:
+        geometry = geometry_from_attrs(geo_el.attrib)
+        geometry.extra = _extra(geo_el.attrib, _GEOMETRY_ATTRS)
+        for child in geo_el:
+            if child.tag == "Array" and child.get("as") == "points":
+                geometry.points = [
+                    (_float(p.get("x")), _float(p.get("y"))) for p in child.iter("mxPoint")
+                ]
+            else:
+                geometry.children.append(_child_xml(child))
+    return Cell(
+        id=elem.get("id", ""),
+        value=value,
+        style=cell_el.get("style", ""),
+        parent=cell_el.get("parent"),
+        vertex=cell_el.get("vertex") == "1",
+        edge=cell_el.get("edge") == "1",
+        source=cell_el.get("source"),
+        target=cell_el.get("target"),
+        geometry=geometry,
+        data=data,
+        extra=_extra(cell_el.attrib, _CELL_ATTRS),
+    )
+
+
+def _extra(attrib: dict[str, str], known: frozenset[str]) -> dict[str, str]:
+    if known.issuperset(attrib):
+        return {}
+    return {k: v for k, v in attrib.items() if k not in known}
+
+
+def _child_xml(elem: Element) -> str:
+    elem.tail = None
+    return tostring(elem, encoding="unicode", short_empty_elements=True).replace(" />", "/>")
+
+
+def diagram_open_tag(diagram: Diagram) -> str:
+    attrs = {"name": diagram.name, "id": diagram.id}
+    return f"<diagram{format_attrs(attrs)}>"
+
+
+def model_open_tag(model: dict[str, str]) -> str:
+    return f"<mxGraphModel{format_attrs(dict(model))}>"
@@ -0,0 +1,200 @@
+"""Opt-in timing and allocation spans for diagnosing slow runs.
+
+The library marks its phases -- parsing, layout, writing, indexing,
+compression, rendering, linting -- with :func:`span`.  Nothing is measured
+unless ``$DRAWIO_SKILL_PROFILE`` is set when the package is imported, so
+any script can be profiled in place without changing code::
+
+    DRAWIO_SKILL_PROFILE=1 python3 mmd2drawio.py big.mmd
+    DRAWIO_SKILL_PROFILE=alloc,/tmp/prof.jsonl python3 mxedit.py set ...
+
+The value is a comma-separated list:
+
+* ``1`` (or ``on``, ``true``, ``yes``) -- time spans and record the
+  process's peak RSS.
+* ``alloc`` -- also trace Python allocations with :mod:`tracemalloc` and
+  record each span's peak allocation above what was live when it began.
+  Tracing slows the run down several times.
+* a path (one with a ``/`` or ending in ``.json`` or ``.jsonl``) -- a file
+  to append the report to as one JSON line, instead of printing a table on
+  stderr.
+
+``0``, ``off``, ``false``, ``no`` or an empty value leave profiling off.
+Any other word is reported on stderr and ignored.
+
+Spans nest: a span opened inside another is reported as ``outer/inner``,
+aggregated over calls.  The report is written when the process exits;
+spans in worker processes (``-j``) are not collected.  Disabled, a span is
+a shared no-op context manager, so hooks belong around phases, not
+per-cell work.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import ContextManager
+
+PROFILE_ENV = "DRAWIO_SKILL_PROFILE"
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass(slots=True)
+class SpanStats:
+    name: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    # Peak traced allocation above the span's starting point, with ``alloc``.
+    alloc_peak_kb: int | None = None
+    # The process's peak RSS when the span last ended.
+    rss_kb: int | None = None
+
+
+def peak_rss_kb() -> int | None:
+    """The process's peak resident set size so far, in KiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class _Profiler:
+    def __init__(self, alloc: bool, output: str | None) -> None:
+        self.alloc = alloc
+        self.output = output
+        self.started = time.perf_counter()
+        self.stats: dict[str, SpanStats] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        stack = self._local.__dict__.setdefault("stack", [])
+        path = f"{stack[-1][0]}/{name}" if stack else name
+        entry = [path, 0, 0]  # path, traced memory at start, highest peak seen
+        if self.alloc:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][2] = max(stack[-1][2], peak)
+            tracemalloc.reset_peak()
+            entry[1] = current
+        stack.append(entry)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            stack.pop()
+            alloc_kb = None
+            if self.alloc:
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(entry[2], peak)
+                if stack:
+                    stack[-1][2] = max(stack[-1][2], peak)
+                tracemalloc.reset_peak()
+                alloc_kb = (peak - entry[1]) // 1024
+            rss = peak_rss_kb()
+            with self._lock:
+                stats = self.stats.get(path)
+                if stats is None:
+                    stats = self.stats[path] = SpanStats(path)
+                stats.calls += 1
+                stats.total_ms += elapsed
+                stats.max_ms = max(stats.max_ms, elapsed)
+                if alloc_kb is not None:
+                    stats.alloc_peak_kb = max(stats.alloc_peak_kb or 0, alloc_kb)
+                stats.rss_kb = rss
+
+    def report(self) -> dict:
+        return {
+            "argv": sys.argv,
+            "pid": os.getpid(),
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "peak_rss_kb": peak_rss_kb(),
+            "spans": [
+                {**asdict(s), "total_ms": round(s.total_ms, 3), "max_ms": round(s.max_ms, 3)}
+                for s in self.stats.values()
+            ],
+        }
+
+    def write(self) -> None:
+        report = self.report()
+        if self.output:
+            with open(self.output, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(report) + "\n")
+            return
+        out = sys.stderr
+        print(f"profile: {report['wall_ms']:.1f} ms wall, peak RSS "
+              f"{_kb(report['peak_rss_kb'])}", file=out)
+        alloc = f" {'alloc peak':>11}" if self.alloc else ""
+        print(f"  {'span':<40} {'calls':>6} {'total ms':>10} {'max ms':>9}{alloc}", file=out)
+        for s in sorted(self.stats.values(), key=lambda s: s.name):
+            extra = f" {_kb(s.alloc_peak_kb):>11}" if self.alloc else ""
+            print(f"  {s.name:<40} {s.calls:>6} {s.total_ms:>10.1f} {s.max_ms:>9.1f}{extra}",
+                  file=out)
+
+
+def _kb(value: int | None) -> str:
+    if value is None:
+        return "n/a"
+    return f"{value / 1024:.1f} MiB" if value >= 1024 else f"{value} KiB"
+
+
+_ON = frozenset({"1", "on", "true", "yes"})
+_OFF = frozenset({"0", "off", "false", "no"})
+
+
+def _configure(value: str) -> _Profiler | None:
+    on = alloc = False
+    output = None
+    for option in (part.strip() for part in value.split(",")):
+        word = option.lower()
+        if not option or word in _OFF:
+            continue
+        if word in _ON:
+            on = True
+        elif word == "alloc":
+            on = alloc = True
+        elif "/" in option or os.sep in option or word.endswith((".json", ".jsonl")):
+            on, output = True, option
+        else:
+            print(f"{PROFILE_ENV}: ignoring {option!r}; expected 1, alloc or a "
+                  "path such as /tmp/profile.jsonl", file=sys.stderr)
+    return _Profiler(alloc, output) if on else None
+
+
+_profiler = _configure(os.environ.get(PROFILE_ENV, ""))
+_NULL = contextlib.nullcontext()
+if _profiler is not None:
+    atexit.register(_profiler.write)
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+def span(name: str) -> ContextManager[None]:
+    """Time (and with ``alloc``, trace) the block as phase ``name``."""
+    if _profiler is None:
+        return _NULL
+    return _profiler.span(name)
+
+
+def report() -> dict | None:
+    """The spans recorded so far, as written at exit; None when disabled."""
+    return None if _profiler is None else _profiler.report()
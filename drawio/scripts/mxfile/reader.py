@@ -0,0 +1,93 @@
+"""Streaming, read-only access to the pages and cells of a .drawio file.
+
+Cells are produced with ``iterparse`` and discarded as soon as they have been
+yielded, so memory use does not grow with the number of cells.  Compressed
+pages are inflated chunk by chunk into a pull parser.
+"""
+
+from __future__ import annotations
+
+import os
+import xml.etree.ElementTree as ET
+from typing import IO, Iterable, Iterator
+
+from .codec import iter_decompressed, looks_compressed
+from .errors import MxFileError
+from .model import CELL_TAGS, Cell, Diagram, cell_from_element
+
+Source = str | os.PathLike[str] | IO[bytes]
+
+
+def iter_cells(source: Source) -> Iterator[tuple[Diagram, Cell]]:
+    """Yield ``(page, cell)`` for every cell, in document order."""
+    for diagram, cell in _walk(_parse(source)):
+        if cell is not None:
+            yield diagram, cell
+
+
+def iter_pages(source: Source) -> Iterator[Diagram]:
+    """Yield each page once its cells have been read."""
+    for diagram, cell in _walk(_parse(source)):
+        if cell is None:
+            yield diagram
+
+
+def read_cells(source: Source, page: int = 0) -> list[Cell]:
+    """Return the cells of one page as a list."""
+    return [cell for diagram, cell in iter_cells(source) if diagram.index == page]
+
+
+def _parse(source: Source) -> Iterator[tuple[str, ET.Element]]:
+    try:
+        yield from ET.iterparse(source, events=("start", "end"))
+    except ET.ParseError as exc:
+        raise MxFileError(f"not a valid mxfile: {exc}") from exc
+
+
+def _pull(payload: str) -> Iterator[tuple[str, ET.Element]]:
+    parser = ET.XMLPullParser(events=("start", "end"))
+    try:
+        for chunk in iter_decompressed(payload):
+            parser.feed(chunk)
+            yield from parser.read_events()
+        parser.close()
+    except ET.ParseError as exc:
+        raise MxFileError(f"invalid XML in compressed page: {exc}") from exc
+    yield from parser.read_events()
+
+
+def _walk(
+    events: Iterable[tuple[str, ET.Element]], diagram: Diagram | None = None
+) -> Iterator[tuple[Diagram, Cell | None]]:
+    """Turn parse events into cells; ``(page, None)`` marks the end of a page."""
+    stack: list[ET.Element] = []
+    pages = 0
+    bare = False
+    for event, elem in events:
+        if event == "start":
+            if elem.tag == "diagram":
+                diagram = Diagram(pages, elem.get("id"), elem.get("name"))
+                pages += 1
+            elif elem.tag == "mxGraphModel":
+                if diagram is None:
+                    # A bare <mxGraphModel> document is a single page.
+                    diagram = Diagram(0)
+                    bare = True
+                diagram.model = dict(elem.attrib)
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if elem.tag in CELL_TAGS and parent is not None and parent.tag == "root":
+            yield diagram, cell_from_element(elem)
+            parent.remove(elem)
+        elif elem.tag == "diagram":
+            if len(elem) == 0 and looks_compressed(elem.text or ""):
+                diagram.compressed = True
+                yield from _walk(_pull(elem.text), diagram)
+            yield diagram, None
+            if parent is not None:
+                parent.remove(elem)
+        elif elem.tag == "mxGraphModel" and bare:
+            yield diagram, None
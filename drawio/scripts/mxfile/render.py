@@ -0,0 +1,178 @@
+"""Render .drawio and .mmd files to SVG/PNG through a content-addressed cache.
+
+A page's cache key hashes what it looks like, not where it lives: the
+serialized cells (so compressed and plain copies of a page share a key), the
+page background, theme, output format, scale and :data:`RENDERER_VERSION`.
+Mermaid sources are keyed by their comment- and blank-line-free text and
+:data:`~mxfile.convert.CONVERTER_VERSION`.
+Renaming, touching or copying a file therefore never re-renders it.
+
+PNG output rasterizes the SVG with ``cairosvg`` when it is importable, else
+with ``rsvg-convert`` from librsvg; neither is required for SVG.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from .cache import cache_dir
+from .convert import CONVERTER_VERSION, to_store
+from .errors import MxFileError
+from .mermaid import normalize, parse
+from .model import Cell
+from .profile import span
+from .reader import iter_cells
+from .svg import THEMES, render_svg
+
+# Bump when rendering changes so that stale cache entries are not reused.
+RENDERER_VERSION = "2"
+
+FORMATS = ("svg", "png")
+
+
+@dataclass(slots=True)
+class Page:
+    """One renderable page of a source file."""
+
+    index: int
+    name: str | None
+    cells: list[Cell]
+    background: str | None
+    key: str
+    # Mermaid pages are laid out only when rendered, not on a cache hit.
+    mermaid: str | None = None
+
+
+@dataclass(slots=True)
+class Result:
+    target: Path
+    cached: bool
+
+
+def load_pages(source: str | Path, theme: str = "light", fmt: str = "svg", scale: float = 1.0) -> list[Page]:
+    """Read a .drawio or .mmd file into pages with their cache keys."""
+    source = Path(source)
+    salt = f"{RENDERER_VERSION}\0{theme}\0{fmt}\0{scale:g}\0"
+    if source.suffix == ".mmd":
+        return [_mermaid_page(source.read_text(encoding="utf-8"), salt)]
+    pages: dict[int, Page] = {}
+    digests = {}
+    with open(source, "rb") as fh:
+        for diagram, cell in iter_cells(fh):
+            page = pages.get(diagram.index)
+            if page is None:
+                background = (diagram.model or {}).get("background")
+                page = pages[diagram.index] = Page(diagram.index, diagram.name, [], background, "")
+                digests[diagram.index] = hashlib.sha256(f"{salt}{background}\0".encode())
+            page.cells.append(cell)
+            digests[diagram.index].update(cell.to_xml().encode("utf-8"))
+    for index, page in pages.items():
+        page.key = digests[index].hexdigest()
+    return [pages[index] for index in sorted(pages)]
+
+
+def _mermaid_page(text: str, salt: str) -> Page:
+    key = f"{salt}mmd\0{CONVERTER_VERSION}\0{normalize(text)}"
+    key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return Page(0, None, [], None, key, mermaid=text)
+
+
+def targets_for(name: str, count: int, out_dir: Path, fmt: str) -> list[Path]:
+    """``name.svg`` for a one-page file, ``name-1.svg``... otherwise."""
+    if count == 1:
+        return [out_dir / f"{name}.{fmt}"]
+    return [out_dir / f"{name}-{i + 1}.{fmt}" for i in range(count)]
+
+
+def render_file(
+    source: str | Path,
+    out_dir: str | Path | None = None,
+    *,
+    fmt: str = "svg",
+    theme: str = "light",
+    scale: float = 1.0,
+    use_cache: bool = True,
+    name: str | None = None,
+) -> list[Result]:
+    """Render every page of ``source``; outputs go next to it by default.
+
+    Outputs are named after the source's stem unless ``name`` is given.
+    """
+    if fmt not in FORMATS:
+        raise MxFileError(f"unknown format: {fmt!r}")
+    if theme not in THEMES:
+        raise MxFileError(f"unknown theme: {theme!r}")
+    source = Path(source)
+    out_dir = Path(out_dir) if out_dir is not None else source.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with span("load"):
+        pages = load_pages(source, theme, fmt, scale)
+    results = []
+    store = cache_dir("render") if use_cache else None
+    for page, target in zip(pages, targets_for(name or source.stem, len(pages), out_dir, fmt)):
+        entry = store / page.key[:2] / f"{page.key}.{fmt}" if store else None
+        if entry is not None and entry.exists():
+            shutil.copyfile(entry, target)
+            results.append(Result(target, True))
+            continue
+        with span("draw"):
+            data = render_page(page, fmt, theme, scale)
+        if entry is not None:
+            _store(entry, data)
+        _write(target, data)
+        results.append(Result(target, False))
+    return results
+
+
+def render_page(page: Page, fmt: str = "svg", theme: str = "light", scale: float = 1.0) -> bytes:
+    cells = page.cells
+    if page.mermaid is not None:
+        store, _ = to_store(parse(page.mermaid))
+        cells = list(store.cells())
+    svg = render_svg(cells, theme, page.background).encode("utf-8")
+    if fmt == "svg":
+        return svg
+    return rasterize(svg, scale)
+
+
+def rasterize(svg: bytes, scale: float = 1.0) -> bytes:
+    """Convert SVG to PNG with whichever rasterizer is available."""
+    try:
+        import cairosvg  # type: ignore[import-not-found]
+    except ImportError:
+        pass
+    else:
+        return cairosvg.svg2png(bytestring=svg, scale=scale)
+    tool = shutil.which("rsvg-convert")
+    if tool is None:
+        raise MxFileError("PNG output needs cairosvg (pip install cairosvg) or rsvg-convert")
+    proc = subprocess.run(
+        [tool, "-f", "png", "-z", f"{scale:g}"], input=svg, capture_output=True, check=False
+    )
+    if proc.returncode:
+        raise MxFileError(f"rsvg-convert failed: {proc.stderr.decode(errors='replace').strip()}")
+    return proc.stdout
+
+
+def _store(entry: Path, data: bytes) -> None:
+    """Write a cache entry atomically, so parallel workers never see half a file."""
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, entry)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _write(target: Path, data: bytes) -> None:
+    with open(target, "wb") as fh:
+        fh.write(data)
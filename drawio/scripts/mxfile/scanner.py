@@ -0,0 +1,200 @@
+"""Byte-offset scanner for mxfile documents.
+
+Unlike :mod:`mxfile.reader`, which goes through ElementTree, the scanner runs
+regular expressions directly over a bytes-like buffer (usually an ``mmap``)
+and reports where every page and cell starts and ends.  Those offsets are what
+the index stores and what the editor splices.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from .errors import MxFileError
+from .model import WRAPPER_TAGS, geometry_from_attrs
+from .xmlutil import ATTRS, parse_attrs
+
+_MXFILE_RE = re.compile(rb"<mxfile" + ATTRS + rb"(/?)>")
+_DIAGRAM_RE = re.compile(rb"<diagram" + ATTRS + rb"(/?)>")
+_MODEL_RE = re.compile(rb"<mxGraphModel" + ATTRS + rb"(/?)>")
+_ROOT_RE = re.compile(rb"<root\s*>")
+_CELL_RE = re.compile(rb"<(mxCell|object|UserObject)" + ATTRS + rb"(/?)>")
+_INNER_CELL_RE = re.compile(rb"<mxCell" + ATTRS + rb"/?>")
+_GEOMETRY_RE = re.compile(rb"<mxGeometry" + ATTRS + rb"/?>")
+_NON_SPACE_RE = re.compile(rb"\S")
+
+VERTEX = 1
+EDGE = 2
+
+
+@dataclass(slots=True)
+class PageSpan:
+    """Where one ``<diagram>`` page sits in the buffer."""
+
+    index: int
+    id: str | None
+    name: str | None
+    start: int
+    stop: int
+    # Text content of the <diagram> element: an mxGraphModel or a payload.
+    content_start: int
+    content_stop: int
+    # Offset of "</root>", where new cells are inserted; None if compressed.
+    root_end: int | None
+    compressed: bool
+    model: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class CellSpan:
+    """One cell and the byte range of its element.
+
+    Offsets are relative to the page's content, so edits on one page never
+    move the cells of another.  On a compressed page they refer to the
+    decompressed XML.
+    """
+
+    page: int
+    id: str
+    parent: str | None
+    source: str | None
+    target: str | None
+    kind: int
+    value: str
+    style: str
+    x: float | None
+    y: float | None
+    width: float | None
+    height: float | None
+    start: int
+    stop: int
+
+    @property
+    def is_vertex(self) -> bool:
+        return self.kind == VERTEX
+
+    @property
+    def is_edge(self) -> bool:
+        return self.kind == EDGE
+
+
+def scan_header(buf) -> dict[str, str]:
+    """Attributes of the ``<mxfile>`` element, or {} for a bare model."""
+    m = _MXFILE_RE.search(buf, 0, 4096)
+    return parse_attrs(m.group(1)) if m is not None else {}
+
+
+def scan_pages(buf) -> Iterator[PageSpan]:
+    """Yield every page in ``buf``.
+
+    A bare ``<mxGraphModel>`` document (no ``<mxfile>`` wrapper) is reported
+    as a single uncompressed page spanning the whole buffer.
+    """
+    pos = 0
+    index = 0
+    while True:
+        m = _DIAGRAM_RE.search(buf, pos)
+        if m is None:
+            break
+        attrs = parse_attrs(m.group(1))
+        if m.group(2):
+            start = end = m.end()
+            close = m.end()
+        else:
+            start = m.end()
+            end = buf.find(b"</diagram>", start)
+            if end == -1:
+                raise MxFileError(f"unterminated <diagram> at offset {m.start()}")
+            close = end + len(b"</diagram>")
+        page = _page(buf, index, attrs, m.start(), close, start, end)
+        yield page
+        index += 1
+        pos = close
+    if index == 0:
+        page = _page(buf, 0, {}, 0, len(buf), 0, len(buf))
+        if page.model or page.root_end is not None:
+            yield page
+
+
+def _page(buf, index, attrs, start, end, content_start, content_end) -> PageSpan:
+    first = _NON_SPACE_RE.search(buf, content_start, content_end)
+    if first is not None and buf[first.start():first.start() + 1] != b"<":
+        return PageSpan(
+            index, attrs.get("id"), attrs.get("name"), start, end,
+            content_start, content_end, None, True,
+        )
+    model: dict[str, str] = {}
+    root_end = None
+    m = _MODEL_RE.search(buf, content_start, content_end)
+    if m is not None:
+        model = parse_attrs(m.group(1))
+        r = _ROOT_RE.search(buf, m.end(), content_end)
+        if r is not None:
+            found = buf.find(b"</root>", r.end(), content_end)
+            root_end = found if found != -1 else None
+    return PageSpan(
+        index, attrs.get("id"), attrs.get("name"), start, end,
+        content_start, content_end, root_end, False, model,
+    )
+
+
+def scan_cells(
+    buf, page: int, start: int = 0, end: int | None = None, base: int = 0
+) -> Iterator[CellSpan]:
+    """Yield the cells whose elements lie in ``buf[start:end]``.
+
+    Reported offsets are relative to ``base``, normally the page's
+    ``content_start``.
+    """
+    if end is None:
+        end = len(buf)
+    pos = start
+    while True:
+        m = _CELL_RE.search(buf, pos, end)
+        if m is None:
+            return
+        tag = m.group(1)
+        if m.group(3):
+            body_end = close = m.end()
+        else:
+            closing = b"</" + tag + b">"
+            body_end = buf.find(closing, m.end(), end)
+            if body_end == -1:
+                raise MxFileError(f"unterminated <{tag.decode()}> at offset {m.start()}")
+            close = body_end + len(closing)
+        yield _cell(buf, page, tag, m, body_end, close, base)
+        pos = close
+
+
+def _cell(
+    buf, page: int, tag: bytes, m: re.Match, body_end: int, close: int, base: int
+) -> CellSpan:
+    attrs = parse_attrs(m.group(2))
+    cell_id = attrs.get("id", "")
+    if tag.decode() in WRAPPER_TAGS:
+        value = attrs.get("label", "")
+        inner = _INNER_CELL_RE.search(buf, m.end(), body_end)
+        if inner is not None:
+            attrs = parse_attrs(inner.group(1))
+    else:
+        value = attrs.get("value", "")
+    if attrs.get("vertex") == "1":
+        kind = VERTEX
+    elif attrs.get("edge") == "1":
+        kind = EDGE
+    else:
+        kind = 0
+    x = y = width = height = None
+    g = _GEOMETRY_RE.search(buf, m.end(), body_end) if body_end > m.end() else None
+    if g is not None:
+        geo = geometry_from_attrs(parse_attrs(g.group(1)))
+        if not geo.relative:
+            x, y, width, height = geo.x, geo.y, geo.width, geo.height
+    return CellSpan(
+        page, cell_id, attrs.get("parent"), attrs.get("source"),
+        attrs.get("target"), kind, value, attrs.get("style", ""),
+        x, y, width, height, m.start() - base, close - base,
+    )
+
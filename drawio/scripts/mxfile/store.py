@@ -0,0 +1,210 @@
+"""Compact, column-oriented cell storage for generating large diagrams.
+
+A :class:`~mxfile.model.Cell` object per cell costs several hundred bytes
+before counting its style string.  :class:`CellStore` keeps cells in parallel
+``array`` columns instead: parents and edge endpoints are row numbers, and a
+cell's style, overrides included, is one variant id into a shared
+:class:`~mxfile.styles.StyleTable`.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Iterator
+
+from .errors import CellNotFound, MxFileError
+from .model import Cell, Geometry
+from .styles import Props, StyleTable
+from .writer import MxFileWriter
+
+_NONE = -1
+_VERTEX = 1
+_EDGE = 2
+
+
+class CellStore:
+    """Cells of one page, stored column-wise.
+
+    The root cell ``0`` and default layer ``1`` are created up front.
+    """
+
+    __slots__ = (
+        "styles", "_ids", "_rows", "_values", "_style",
+        "_parent", "_kind", "_source", "_target", "_geometry", "_points",
+    )
+
+    def __init__(self, styles: StyleTable | None = None) -> None:
+        self.styles = styles if styles is not None else StyleTable()
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._values: list[str] = []
+        self._style = array("i")
+        self._parent = array("i")
+        self._kind = array("b")
+        self._source = array("i")
+        self._target = array("i")
+        # x, y, width, height per row; unused for edges, which are relative.
+        self._geometry = array("d")
+        # Edge waypoints, only for the edges that have them.
+        self._points: dict[int, list[tuple[float, float]]] = {}
+        self._append("0", "", _NONE, 0, _NONE, _NONE, None)
+        self._append("1", "", _NONE, 0, 0, _NONE, None)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, cell_id: str) -> bool:
+        return cell_id in self._rows
+
+    def add_vertex(
+        self,
+        cell_id: str,
+        value: str = "",
+        style: int | str = "",
+        x: float = 0,
+        y: float = 0,
+        width: float = 120,
+        height: float = 60,
+        parent: str = "1",
+        **overrides: str,
+    ) -> int:
+        """Add a vertex and return its row.
+
+        ``style`` is a style id, a name defined in the table, or a style
+        string to intern; a bare word that is not a defined name, such as
+        ``ellipse``, is a built-in style.  Keyword arguments override single
+        properties.
+        """
+        return self._append(
+            cell_id, value, self._variant(style, overrides), _VERTEX,
+            self._row(parent), _NONE, (x, y, width, height),
+        )
+
+    def add_edge(
+        self,
+        cell_id: str,
+        source: str,
+        target: str,
+        value: str = "",
+        style: int | str = "",
+        parent: str = "1",
+        points: list[tuple[float, float]] | None = None,
+        **overrides: str,
+    ) -> int:
+        target_row = self._row(target)
+        row = self._append(
+            cell_id, value, self._variant(style, overrides), _EDGE,
+            self._row(parent), self._row(source), None,
+        )
+        self._target[row] = target_row
+        if points:
+            self._points[row] = points
+        return row
+
+    def set_style(self, cell_id: str, **overrides: str | None) -> None:
+        """Override style properties on one cell (``None`` removes one)."""
+        row = self._row(cell_id)
+        if self._style[row] == _NONE:
+            base, current = self.styles.intern(""), {}
+        else:
+            base, current = self.styles.variant_parts(self._style[row])
+        for key, value in overrides.items():
+            if value is None:
+                current.pop(key, None)
+            else:
+                current[key] = value
+        self._style[row] = self.styles.variant(base, current)
+
+    def move(self, cell_id: str, x: float, y: float) -> None:
+        row = self._row(cell_id)
+        self._geometry[row * 4] = x
+        self._geometry[row * 4 + 1] = y
+
+    def get(self, cell_id: str, named: bool = False) -> Cell:
+        return self._cell(self._row(cell_id), named)
+
+    def cells(self, named: bool = False) -> Iterator[Cell]:
+        """Materialize cells one at a time, in insertion order."""
+        for row in range(len(self._ids)):
+            yield self._cell(row, named)
+
+    def write(self, writer: MxFileWriter, named: bool = False) -> None:
+        """Write every cell except the root and layer to an open page.
+
+        With ``named``, styles are emitted as stylesheet references; save
+        ``self.styles.stylesheet()`` alongside for the host to load.  Plain
+        draw.io cannot resolve those references, so never use ``named`` for
+        a ``.drawio`` file meant to be opened on its own.
+        """
+        for row in range(2, len(self._ids)):
+            writer.write_cell(self._cell(row, named))
+
+    def _cell(self, row: int, named: bool) -> Cell:
+        kind = self._kind[row]
+        style = self._style[row]
+        parent = self._parent[row]
+        source = self._source[row]
+        target = self._target[row]
+        geometry = None
+        if kind == _VERTEX:
+            x, y, w, h = self._geometry[row * 4:row * 4 + 4]
+            geometry = Geometry(x, y, w, h)
+        elif kind == _EDGE:
+            geometry = Geometry(relative=True, points=self._points.get(row))
+        return Cell(
+            id=self._ids[row],
+            value=self._values[row],
+            style="" if style == _NONE else self.styles.render(style, named),
+            parent=None if parent == _NONE else self._ids[parent],
+            vertex=kind == _VERTEX,
+            edge=kind == _EDGE,
+            source=None if source == _NONE else self._ids[source],
+            target=None if target == _NONE else self._ids[target],
+            geometry=geometry,
+        )
+
+    def _append(
+        self,
+        cell_id: str,
+        value: str,
+        style: int,
+        kind: int,
+        parent: int,
+        source: int,
+        geometry: tuple[float, float, float, float] | None,
+    ) -> int:
+        if cell_id in self._rows:
+            raise MxFileError(f"duplicate cell id: {cell_id!r}")
+        row = len(self._ids)
+        self._ids.append(cell_id)
+        self._rows[cell_id] = row
+        self._values.append(value)
+        self._style.append(style)
+        self._kind.append(kind)
+        self._parent.append(parent)
+        self._source.append(source)
+        self._target.append(_NONE)
+        self._geometry.extend(geometry or (0.0, 0.0, 0.0, 0.0))
+        return row
+
+    def _row(self, cell_id: str) -> int:
+        try:
+            return self._rows[cell_id]
+        except KeyError:
+            raise CellNotFound(cell_id) from None
+
+    def _variant(self, style: int | str, overrides: Props) -> int:
+        if isinstance(style, int):
+            base = style
+        elif not style:
+            if not overrides:
+                return _NONE
+            base = self.styles.intern("")
+        elif "=" not in style and ";" not in style:
+            try:
+                base = self.styles.lookup(style)
+            except MxFileError:
+                base = self.styles.intern(style)
+        else:
+            base = self.styles.intern(style)
+        return self.styles.variant(base, overrides)
@@ -0,0 +1,190 @@
+"""Interned draw.io style strings.
+
+Generated diagrams repeat a handful of long style strings thousands of times
+(every AWS icon carries the same ~300 bytes with only ``fillColor`` and
+``shape`` changing).  A :class:`StyleTable` stores each distinct base style
+once, and each distinct (base, overrides) combination is interned again as a
+*variant*; a cell holds nothing but a variant id.  Restyling every cell that
+uses a base is a single :meth:`StyleTable.update`.
+
+Styles render either inline (the full string, portable to any draw.io) or as
+named references (``awsIcon;fillColor=#ED7100;``) backed by an
+``<mxStylesheet>`` that embedding hosts load with ``Graph.loadStylesheet``.
+The mxfile format has nowhere to carry that stylesheet, so draw.io itself
+draws named references with its defaults; every ``.drawio`` file the skill
+writes uses inline styles.
+Bare tokens such as ``ellipse`` or ``swimlane`` are themselves references to
+draw.io's built-in styles; the table keeps them as keys with a ``None`` value
+and writes them in front of the named reference.
+"""
+
+from __future__ import annotations
+
+from .errors import MxFileError
+from .xmlutil import escape_attr
+
+Props = dict[str, str | None]
+
+
+def parse_style(style: str) -> tuple[list[str], Props]:
+    """Split a style string into named styles and ``key=value`` properties."""
+    names: list[str] = []
+    props: Props = {}
+    for part in style.split(";"):
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        if sep:
+            props[key] = value
+        else:
+            names.append(part)
+    return names, props
+
+
+def format_style(props: Props, names: list[str] | tuple[str, ...] = ()) -> str:
+    """Inverse of :func:`parse_style`; always ends with ``;`` like draw.io.
+
+    Keys whose value is ``None`` are written as bare names.
+    """
+    parts = list(names) + [
+        key if value is None else f"{key}={value}" for key, value in props.items()
+    ]
+    return "".join(f"{part};" for part in parts)
+
+
+def _style_props(style: str) -> Props:
+    names, props = parse_style(style)
+    return {**dict.fromkeys(names), **props}
+
+
+class StyleTable:
+    """Interning table of base styles; see the module docstring."""
+
+    __slots__ = (
+        "_props", "_names", "_by_key", "_by_name",
+        "_variants", "_by_variant", "_rendered",
+    )
+
+    def __init__(self) -> None:
+        self._props: list[Props] = []
+        self._names: list[str | None] = []
+        self._by_key: dict[tuple, int] = {}
+        self._by_name: dict[str, int] = {}
+        self._variants: list[tuple[int, tuple[tuple[str, str], ...]]] = []
+        self._by_variant: dict[tuple, int] = {}
+        self._rendered: dict[tuple[int, bool], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._props)
+
+    def intern(self, style: str | Props) -> int:
+        """Return the id of ``style``, adding it if it is new."""
+        props = _style_props(style) if isinstance(style, str) else dict(style)
+        key = tuple(props.items())
+        style_id = self._by_key.get(key)
+        if style_id is None:
+            style_id = len(self._props)
+            self._props.append(props)
+            self._names.append(None)
+            self._by_key[key] = style_id
+        return style_id
+
+    def define(self, name: str, style: str | Props) -> int:
+        """Intern ``style`` under a stylesheet name."""
+        style_id = self.intern(style)
+        self._names[style_id] = name
+        self._by_name[name] = style_id
+        return style_id
+
+    def lookup(self, name_or_id: str | int) -> int:
+        if isinstance(name_or_id, int):
+            return name_or_id
+        try:
+            return self._by_name[name_or_id]
+        except KeyError:
+            raise MxFileError(f"unknown style name: {name_or_id!r}") from None
+
+    def split(self, style: str, vary: tuple[str, ...] = ("fillColor", "shape")) -> tuple[int, Props]:
+        """Intern ``style`` without the ``vary`` keys; return them as overrides.
+
+        This is how the AWS icon styles collapse to one base: only the
+        category colour and the shape differ between icons.
+        """
+        props = _style_props(style)
+        overrides = {key: props.pop(key) for key in vary if key in props}
+        return self.intern(props), overrides
+
+    def props(self, style_id: int) -> Props:
+        return dict(self._props[style_id])
+
+    def name(self, style_id: int) -> str:
+        return self._names[style_id] or f"s{style_id}"
+
+    def update(self, name_or_id: str | int, **props: str | None) -> None:
+        """Change a base style for every cell that uses it.
+
+        A value of ``None`` removes the property.
+        """
+        style_id = self.lookup(name_or_id)
+        base = self._props[style_id]
+        del self._by_key[tuple(base.items())]
+        for key, value in props.items():
+            if value is None:
+                base.pop(key, None)
+            else:
+                base[key] = value
+        self._by_key.setdefault(tuple(base.items()), style_id)
+        self._rendered.clear()
+
+    def variant(self, style_id: int, overrides: Props | None = None) -> int:
+        """Intern a base style plus per-cell overrides; return the variant id.
+
+        Overrides match in any order; the first order seen is the one
+        rendered.
+        """
+        items = tuple(overrides.items()) if overrides else ()
+        key = (style_id, tuple(sorted(items)))
+        variant_id = self._by_variant.get(key)
+        if variant_id is None:
+            variant_id = len(self._variants)
+            self._variants.append((style_id, items))
+            self._by_variant[key] = variant_id
+        return variant_id
+
+    def variant_parts(self, variant_id: int) -> tuple[int, Props]:
+        """Return the base style id and overrides of a variant."""
+        style_id, overrides = self._variants[variant_id]
+        return style_id, dict(overrides)
+
+    def render(self, variant_id: int, named: bool = False) -> str:
+        """Return the style string for a variant.
+
+        Inline, this is the base merged with the overrides; ``named`` gives
+        a stylesheet reference followed by the overrides only.
+        """
+        key = (variant_id, named)
+        text = self._rendered.get(key)
+        if text is None:
+            style_id, overrides = self._variants[variant_id]
+            if named:
+                bare = [k for k, v in self._props[style_id].items() if v is None]
+                text = format_style(dict(overrides), (*bare, self.name(style_id)))
+            else:
+                text = format_style({**self._props[style_id], **dict(overrides)})
+            self._rendered[key] = text
+        return text
+
+    def stylesheet(self) -> str:
+        """Serialize every base style as an ``<mxStylesheet>`` document."""
+        lines = ["<mxStylesheet>"]
+        for style_id, props in enumerate(self._props):
+            lines.append(f'    <add as="{escape_attr(self.name(style_id))}">')
+            for key, value in props.items():
+                if value is None:
+                    continue
+                lines.append(
+                    f'        <add as="{escape_attr(key)}" value="{escape_attr(value)}"/>'
+                )
+            lines.append("    </add>")
+        lines.append("</mxStylesheet>")
+        return "\n".join(lines) + "\n"
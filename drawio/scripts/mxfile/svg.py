@@ -0,0 +1,920 @@
+"""Pure-Python SVG rendering of draw.io pages.
+
+This is not draw.io's renderer; it covers what the skill generates so that
+diagrams can be previewed and diffed in CI with no browser and no network:
+
+* Basic shapes -- rectangles (rounded), ellipses, rhombus, hexagon,
+  parallelogram, trapezoid, step, process, cylinder, note, triangle,
+  swimlanes, UML lifelines and frames, text and lines.  Unknown shapes fall
+  back to a rectangle.
+* Edges -- straight and orthogonal routing through waypoints, fixed
+  ``exitX``/``entryX`` ports, perimeter clipping, the common arrow heads and
+  ER markers, dashes and labels.
+* ``mxgraph.aws4.*`` icons -- drawn as a tile in the icon's category colour
+  with the service abbreviation (``λ``, ``EC2``, ``S3``...), and AWS groups
+  as framed containers.  The official artwork is not bundled.
+
+Labels are HTML-stripped, wrapped by an average character width and placed
+with draw.io's ``align``/``verticalAlign``/``labelPosition`` rules.  Only
+default colours depend on the theme; explicit colours are kept, as in
+draw.io's dark mode.
+"""
+
+from __future__ import annotations
+
+import html
+import math
+import re
+from dataclasses import dataclass
+
+from .model import Cell, format_number
+from .styles import parse_style
+
+Box = tuple[float, float, float, float]
+Point = tuple[float, float]
+
+
+@dataclass(frozen=True, slots=True)
+class Theme:
+    background: str | None
+    stroke: str
+    fill: str
+    font: str
+    label_background: str
+    # Pick black or white default text on explicitly filled shapes.
+    contrast: bool = False
+
+
+THEMES = {
+    "light": Theme("#FFFFFF", "#000000", "#FFFFFF", "#000000", "#FFFFFF"),
+    "dark": Theme("#1E1E1E", "#F0F0F0", "#1E1E1E", "#F0F0F0", "#1E1E1E", contrast=True),
+}
+
+FONT_FAMILY = "Helvetica, Arial, sans-serif"
+BORDER = 10.0
+
+# Bare style names that select a shape.
+_SHAPE_NAMES = {
+    "ellipse", "rhombus", "swimlane", "text", "edgeLabel", "line", "triangle",
+    "image", "label", "cloud", "hexagon", "cylinder", "doubleEllipse",
+}
+_ORTHOGONAL = {
+    "orthogonalEdgeStyle", "elbowEdgeStyle", "entityRelationEdgeStyle",
+    "segmentEdgeStyle",
+}
+
+# Abbreviations for AWS services whose name does not abbreviate well.
+_AWS_GLYPHS = {
+    "lambda": "λ", "instance": "EC2", "ec2": "EC2", "s3": "S3", "bucket": "S3",
+    "simple_storage_service": "S3", "dynamodb": "DDB", "rds": "RDS",
+    "aurora": "AUR", "sns": "SNS", "sqs": "SQS", "simple_queue_service": "SQS",
+    "simple_email_service": "SES", "api_gateway": "API", "cloudwatch": "CW",
+    "cloudfront": "CF", "route_53": "R53", "elastic_load_balancing": "ELB",
+    "application_load_balancer": "ALB", "network_load_balancer": "NLB",
+    "vpc": "VPC", "virtual_private_cloud": "VPC", "iam": "IAM",
+    "cognito": "COG", "kinesis": "KIN", "step_functions": "SF",
+    "eventbridge": "EB", "ecs": "ECS", "eks": "EKS", "fargate": "FG",
+    "elasticache": "EC", "redshift": "RS", "athena": "ATH", "glue": "GLU",
+    "sagemaker": "SM", "secrets_manager": "SEC", "key_management_service": "KMS",
+    "waf": "WAF", "shield": "SHD", "client": "▭", "user": "☺", "users": "☺",
+    "internet": "◎", "cloud": "☁",
+}
+_AWS_PREFIXES = sorted(_AWS_GLYPHS, key=len, reverse=True)
+
+# Hex, a named colour (or "none") and rgb()/rgba()/hsl()/hsla().
+_COLOR_RE = re.compile(r"#[0-9A-Fa-f]{3,8}|[A-Za-z]+|(?:rgb|hsl)a?\([0-9.,%\s]*\)")
+
+
+def render_svg(cells: list[Cell], theme: str | Theme = "light", background: str | None = None) -> str:
+    """Render the cells of one page as a standalone SVG document."""
+    if isinstance(theme, str):
+        theme = THEMES[theme]
+    return _Renderer(cells, theme).render(background)
+
+
+def _color(value: str | None, default: str) -> str:
+    """``value`` if it is a colour SVG accepts as is, else ``default``.
+
+    Style values reach SVG attributes, so anything else -- including quotes
+    and markup smuggled into a style -- is dropped rather than escaped.
+    """
+    if value is None or value in ("default", "inherit") or not _COLOR_RE.fullmatch(value):
+        return default
+    return value
+
+
+def _num(props: dict, key: str, default: float) -> float:
+    try:
+        return float(props[key])
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+def _f(value: float) -> str:
+    return format_number(round(value, 2))
+
+
+def _escape(text: str) -> str:
+    return html.escape(text, quote=True)
+
+
+def label_lines(value: str, is_html: bool) -> list[str]:
+    """Plain text lines of a cell value."""
+    if not value:
+        return []
+    if is_html:
+        value = re.sub(r"<br\s*/?>|</(?:div|p|li|tr|h\d)>", "\n", value, flags=re.I)
+        value = html.unescape(re.sub(r"<[^>]+>", "", value))
+        value = value.replace("\xa0", " ")
+    return value.split("\n")
+
+
+def _wrap(lines: list[str], width: float, size: float) -> list[str]:
+    limit = max(int(width / (size * 0.55)), 1)
+    out = []
+    for line in lines:
+        words = line.split(" ")
+        current = ""
+        for word in words:
+            candidate = f"{current} {word}" if current else word
+            if len(candidate) > limit and current:
+                out.append(current)
+                current = word
+            else:
+                current = candidate
+        out.append(current)
+    return out
+
+
+def _aws_glyph(name: str) -> str:
+    name = name.removeprefix("mxgraph.aws4.")
+    for key in _AWS_PREFIXES:
+        if name.startswith(key):
+            return _AWS_GLYPHS[key]
+    words = [w for w in re.split(r"[_\d]+", name) if w]
+    return "".join(w[0] for w in words[:3]).upper() or "AWS"
+
+
+class _Renderer:
+    def __init__(self, cells: list[Cell], theme: Theme) -> None:
+        self.theme = theme
+        self.cells = cells
+        self.by_id = {cell.id: cell for cell in cells}
+        self.styles = {}
+        for cell in cells:
+            names, props = parse_style(cell.style or "")
+            self.styles[cell.id] = (names, props)
+        self.origins: dict[str, Point] = {}
+        self.boxes: dict[str, Box] = {}
+        self.paths: dict[str, list[Point]] = {}
+        self.out: list[str] = []
+
+    # -------------------------------------------------------- geometry
+
+    def origin(self, cell_id: str | None) -> Point:
+        """Absolute position of a container's top-left corner."""
+        if cell_id is None:
+            return (0.0, 0.0)
+        cached = self.origins.get(cell_id)
+        if cached is not None:
+            return cached
+        cell = self.by_id.get(cell_id)
+        result = (0.0, 0.0)
+        if cell is not None:
+            px, py = self.origin(cell.parent)
+            geo = cell.geometry
+            if cell.vertex and geo is not None and not geo.relative:
+                result = (px + geo.x, py + geo.y)
+            else:
+                result = (px, py)
+        self.origins[cell_id] = result
+        return result
+
+    def layout(self) -> None:
+        for cell in self.cells:
+            geo = cell.geometry
+            if cell.vertex and geo is not None and not geo.relative:
+                x, y = self.origin(cell.id)
+                self.boxes[cell.id] = (x, y, geo.width, geo.height)
+        for cell in self.cells:
+            if cell.edge:
+                path = self.route(cell)
+                if path:
+                    self.paths[cell.id] = path
+
+    def bounds(self) -> Box:
+        xs: list[float] = []
+        ys: list[float] = []
+        for cell_id, (x, y, w, h) in self.boxes.items():
+            names, props = self.styles[cell_id]
+            if props.get("verticalLabelPosition") == "bottom" and self.by_id[cell_id].value:
+                h += _num(props, "fontSize", 12) * 2.5
+            xs += [x, x + w]
+            ys += [y, y + h]
+        for path in self.paths.values():
+            xs += [p[0] for p in path]
+            ys += [p[1] for p in path]
+        if not xs:
+            return (0.0, 0.0, 0.0, 0.0)
+        return (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+
+    # ---------------------------------------------------------- output
+
+    def render(self, background: str | None) -> str:
+        self.layout()
+        x, y, w, h = self.bounds()
+        x0, y0 = x - BORDER, y - BORDER
+        width, height = w + 2 * BORDER, h + 2 * BORDER
+        bg = self.theme.background
+        if background not in (None, "none"):
+            bg = _color(background, bg)
+        out = self.out
+        out.append(
+            f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'version="1.1" width="{_f(width)}" height="{_f(height)}" '
+            f'viewBox="{_f(x0)} {_f(y0)} {_f(width)} {_f(height)}" '
+            f'font-family="{FONT_FAMILY}">'
+        )
+        if bg:
+            out.append(
+                f'<rect x="{_f(x0)}" y="{_f(y0)}" width="{_f(width)}" '
+                f'height="{_f(height)}" fill="{bg}"/>'
+            )
+        for cell in self.cells:
+            if cell.vertex:
+                if cell.id in self.boxes:
+                    self.vertex(cell)
+                elif cell.parent in self.paths:
+                    self.edge_child_label(cell)
+            elif cell.edge and cell.id in self.paths:
+                self.edge(cell)
+        out.append("</svg>")
+        return "\n".join(out) + "\n"
+
+    def paint(self, props: dict, fill_default: str | None = None, stroke_default: str | None = None) -> str:
+        theme = self.theme
+        fill = _color(props.get("fillColor"), fill_default or theme.fill)
+        stroke = _color(props.get("strokeColor"), stroke_default or theme.stroke)
+        attrs = [f'fill="{fill}"', f'stroke="{stroke}"']
+        width = _num(props, "strokeWidth", 1)
+        if width != 1:
+            attrs.append(f'stroke-width="{_f(width)}"')
+        if props.get("dashed") == "1":
+            pattern = props.get("dashPattern", "3 3")
+            scaled = " ".join(_f(float(p) * width) for p in pattern.split() if _is_number(p))
+            attrs.append(f'stroke-dasharray="{scaled or "3 3"}"')
+        opacity = _num(props, "opacity", 100)
+        if opacity < 100:
+            attrs.append(f'opacity="{_f(opacity / 100)}"')
+        for key, attr in (("fillOpacity", "fill-opacity"), ("strokeOpacity", "stroke-opacity")):
+            if key in props:
+                attrs.append(f'{attr}="{_f(_num(props, key, 100) / 100)}"')
+        return " ".join(attrs)
+
+    # -------------------------------------------------------- vertices
+
+    def vertex(self, cell: Cell) -> None:
+        names, props = self.styles[cell.id]
+        x, y, w, h = self.boxes[cell.id]
+        shape = props.get("shape") or next((n for n in names if n in _SHAPE_NAMES), "rect")
+        out = self.out
+        label_box = (x, y, w, h)
+        if shape.startswith("mxgraph.aws4."):
+            label_box = self.aws(shape, props, x, y, w, h)
+        elif shape in ("text", "edgeLabel", "label") and "fillColor" not in props and "strokeColor" not in props:
+            pass
+        elif shape == "swimlane":
+            label_box = self.swimlane(props, x, y, w, h)
+        elif shape == "umlLifeline":
+            label_box = self.lifeline(props, x, y, w, h)
+        elif shape == "umlFrame":
+            label_box = self.frame(props, x, y, w, h)
+        elif shape == "line":
+            stroke = _color(props.get("strokeColor"), self.theme.stroke)
+            width = _num(props, "strokeWidth", 1)
+            dash = ' stroke-dasharray="3 3"' if props.get("dashed") == "1" else ""
+            out.append(
+                f'<line x1="{_f(x)}" y1="{_f(y + h / 2)}" x2="{_f(x + w)}" y2="{_f(y + h / 2)}" '
+                f'stroke="{stroke}" stroke-width="{_f(width)}"{dash}/>'
+            )
+        elif shape == "image":
+            image = props.get("image", "")
+            if image.startswith("data:image/svg+xml,") and not image.startswith("data:image/svg+xml,%3C"):
+                image = "data:image/svg+xml;base64," + image.split(",", 1)[1]
+            if image:
+                out.append(
+                    f'<image x="{_f(x)}" y="{_f(y)}" width="{_f(w)}" height="{_f(h)}" '
+                    f'xlink:href="{_escape(image)}" preserveAspectRatio="xMidYMid meet"/>'
+                )
+        else:
+            out.append(self.shape(shape, names, props, x, y, w, h))
+        self.label(cell, props, label_box)
+
+    def shape(self, shape: str, names: list[str], props: dict, x: float, y: float, w: float, h: float) -> str:
+        paint = self.paint(props)
+        size = props.get("size")
+        if shape in ("ellipse", "doubleEllipse", "endState"):
+            cx, cy, rx, ry = x + w / 2, y + h / 2, w / 2, h / 2
+            if shape == "endState":
+                inner = self.paint(props)
+                outer = self.paint({**props, "fillColor": "none"})
+                return (
+                    f'<ellipse cx="{_f(cx)}" cy="{_f(cy)}" rx="{_f(rx)}" ry="{_f(ry)}" {outer}/>'
+                    f'<ellipse cx="{_f(cx)}" cy="{_f(cy)}" rx="{_f(rx * 0.6)}" ry="{_f(ry * 0.6)}" {inner}/>'
+                )
+            svg = f'<ellipse cx="{_f(cx)}" cy="{_f(cy)}" rx="{_f(rx)}" ry="{_f(ry)}" {paint}/>'
+            if shape == "doubleEllipse":
+                inset = min(4.0, w / 4, h / 4)
+                svg += (
+                    f'<ellipse cx="{_f(cx)}" cy="{_f(cy)}" rx="{_f(rx - inset)}" '
+                    f'ry="{_f(ry - inset)}" {self.paint({**props, "fillColor": "none"})}/>'
+                )
+            return svg
+        if shape == "rhombus":
+            return _polygon([(x + w / 2, y), (x + w, y + h / 2), (x + w / 2, y + h), (x, y + h / 2)], paint)
+        if shape == "triangle":
+            return _polygon([(x, y), (x + w, y + h / 2), (x, y + h)], paint)
+        if shape == "hexagon":
+            s = _size(size, props, w, 0.25, 20)
+            return _polygon([(x + s, y), (x + w - s, y), (x + w, y + h / 2),
+                             (x + w - s, y + h), (x + s, y + h), (x, y + h / 2)], paint)
+        if shape == "parallelogram":
+            s = _size(size, props, w, 0.2, 20)
+            pts = [(x + s, y), (x + w, y), (x + w - s, y + h), (x, y + h)]
+            if props.get("flipH") == "1":
+                pts = [(x, y), (x + w - s, y), (x + w, y + h), (x + s, y + h)]
+            return _polygon(pts, paint)
+        if shape == "trapezoid":
+            s = _size(size, props, w, 0.2, 20)
+            pts = [(x + s, y), (x + w - s, y), (x + w, y + h), (x, y + h)]
+            if props.get("flipV") == "1":
+                pts = [(x, y), (x + w, y), (x + w - s, y + h), (x + s, y + h)]
+            return _polygon(pts, paint)
+        if shape == "step":
+            s = _size(size, props, w, 0.2, 20)
+            return _polygon([(x, y), (x + w - s, y), (x + w, y + h / 2), (x + w - s, y + h),
+                             (x, y + h), (x + s, y + h / 2)], paint)
+        if shape == "process":
+            s = _size(size, props, w, 0.1, 0.1 * w)
+            line = self.paint({**props, "fillColor": "none"})
+            return (
+                _rect(x, y, w, h, 0, paint)
+                + f'<path d="M{_f(x + s)} {_f(y)}V{_f(y + h)}M{_f(x + w - s)} {_f(y)}V{_f(y + h)}" {line}/>'
+            )
+        if shape in ("cylinder", "cylinder3"):
+            s = min(_num(props, "size", 15), h / 2)
+            body = (
+                f"M{_f(x)} {_f(y + s)}"
+                f"A{_f(w / 2)} {_f(s)} 0 0 1 {_f(x + w)} {_f(y + s)}"
+                f"V{_f(y + h - s)}"
+                f"A{_f(w / 2)} {_f(s)} 0 0 1 {_f(x)} {_f(y + h - s)}Z"
+            )
+            rim = f"M{_f(x)} {_f(y + s)}A{_f(w / 2)} {_f(s)} 0 0 0 {_f(x + w)} {_f(y + s)}"
+            return f'<path d="{body}" {paint}/><path d="{rim}" {self.paint({**props, "fillColor": "none"})}/>'
+        if shape == "note":
+            s = min(_num(props, "size", 30), w, h)
+            fold = self.paint({**props, "fillColor": "none"})
+            return (
+                _polygon([(x, y), (x + w - s, y), (x + w, y + s), (x + w, y + h), (x, y + h)], paint)
+                + f'<path d="M{_f(x + w - s)} {_f(y)}V{_f(y + s)}H{_f(x + w)}" {fold}/>'
+            )
+        if shape == "cloud":
+            return f'<ellipse cx="{_f(x + w / 2)}" cy="{_f(y + h / 2)}" rx="{_f(w / 2)}" ry="{_f(h / 2)}" {paint}/>'
+        return _rect(x, y, w, h, self.radius(props, w, h), paint)
+
+    def radius(self, props: dict, w: float, h: float) -> float:
+        if props.get("rounded") != "1":
+            return 0.0
+        arc = _num(props, "arcSize", 15)
+        if props.get("absoluteArcSize") == "1":
+            return arc / 2
+        return min(w, h) * arc / 100
+
+    def swimlane(self, props: dict, x: float, y: float, w: float, h: float) -> Box:
+        start = _num(props, "startSize", 23)
+        horizontal = props.get("horizontal", "1") != "0"
+        r = 0.0
+        if props.get("rounded") == "1":
+            # draw.io scales a swimlane's corners by its header, not its body.
+            arc = _num(props, "arcSize", 15)
+            r = min(arc / 2 if props.get("absoluteArcSize") == "1" else start * arc / 100 * 3, start / 2)
+        out = self.out
+        body_fill = props.get("swimlaneFillColor", "none")
+        if body_fill != "none":
+            out.append(_rect(x, y, w, h, r, self.paint({**props, "fillColor": body_fill, "strokeColor": "none"})))
+        if horizontal:
+            header = (x, y, w, min(start, h))
+        else:
+            header = (x, y, min(start, w), h)
+        hx, hy, hw, hh = header
+        out.append(f'<path d="{_header_path(hx, hy, hw, hh, r, horizontal)}" '
+                   f'{self.paint({**props, "strokeColor": "none"})}/>')
+        if props.get("swimlaneLine", "1") != "0":
+            stroke = self.paint({**props, "fillColor": "none"})
+            if horizontal:
+                out.append(f'<path d="M{_f(x)} {_f(y + hh)}H{_f(x + w)}" {stroke}/>')
+            else:
+                out.append(f'<path d="M{_f(x + hw)} {_f(y)}V{_f(y + h)}" {stroke}/>')
+        out.append(_rect(x, y, w, h, r, self.paint({**props, "fillColor": "none"})))
+        return header
+
+    def lifeline(self, props: dict, x: float, y: float, w: float, h: float) -> Box:
+        size = _num(props, "size", 40)
+        cx = x + w / 2
+        out = self.out
+        stroke = _color(props.get("strokeColor"), self.theme.stroke)
+        if props.get("participant") == "umlActor":
+            out.append(_actor(cx, y, size, self.paint({**props, "fillColor": "none"})))
+            label_box = (x, y, w, h)
+        else:
+            out.append(_rect(x, y, w, size, 0, self.paint(props)))
+            label_box = (x, y, w, size)
+        out.append(
+            f'<path d="M{_f(cx)} {_f(y + size)}V{_f(y + h)}" fill="none" '
+            f'stroke="{stroke}" stroke-dasharray="3 3"/>'
+        )
+        return label_box
+
+    def frame(self, props: dict, x: float, y: float, w: float, h: float) -> Box:
+        tab_w = _num(props, "width", 60)
+        tab_h = _num(props, "height", 30)
+        out = self.out
+        out.append(_rect(x, y, w, h, 0, self.paint({**props, "fillColor": "none"})))
+        corner = min(10.0, tab_h / 2)
+        out.append(_polygon(
+            [(x, y), (x + tab_w, y), (x + tab_w, y + tab_h - corner),
+             (x + tab_w - corner, y + tab_h), (x, y + tab_h)],
+            self.paint(props),
+        ))
+        return (x, y, tab_w, tab_h)
+
+    def aws(self, shape: str, props: dict, x: float, y: float, w: float, h: float) -> Box:
+        """AWS icon tile or group frame; returns the label box."""
+        name = shape.removeprefix("mxgraph.aws4.")
+        out = self.out
+        if name in ("group", "groupCenter"):
+            stroke = _color(props.get("strokeColor"), self.theme.stroke)
+            out.append(_rect(x, y, w, h, 0, self.paint({**props, "fillColor": props.get("fillColor", "none")})))
+            icon = props.get("grIcon", "")
+            if icon:
+                out.append(_tile(x, y, 25, 25, stroke, _aws_glyph(icon), 0))
+            return (x, y, w, h)
+        if name == "resourceIcon":
+            name = props.get("resIcon", "mxgraph.aws4.resource")
+        color = _color(props.get("fillColor"), "none")
+        if color == "none":
+            color = _color(props.get("strokeColor"), "#232F3E")
+            if color == "none":
+                color = "#232F3E"
+        out.append(_tile(x, y, w, h, color, _aws_glyph(name), min(w, h) * 0.12))
+        return (x, y, w, h)
+
+    # ---------------------------------------------------------- labels
+
+    def label(self, cell: Cell, props: dict, box: Box, lines: list[str] | None = None) -> None:
+        if lines is None:
+            lines = label_lines(cell.value or "", props.get("html") == "1")
+        if not any(line.strip() for line in lines):
+            return
+        x, y, w, h = box
+        size = _num(props, "fontSize", 12)
+        spacing = _num(props, "spacing", 2)
+        left = spacing + _num(props, "spacingLeft", 0)
+        right = spacing + _num(props, "spacingRight", 0)
+        top = spacing + _num(props, "spacingTop", 0)
+        bottom = spacing + _num(props, "spacingBottom", 0)
+        position = props.get("labelPosition", "center")
+        vposition = props.get("verticalLabelPosition", "middle")
+        if position == "left":
+            x -= w
+        elif position == "right":
+            x += w
+        if vposition == "top":
+            y -= h
+        elif vposition == "bottom":
+            y += h
+        if props.get("whiteSpace") == "wrap" and position == "center" and w > 0:
+            lines = _wrap(lines, w - left - right, size)
+
+        align = props.get("align", "center")
+        valign = props.get("verticalAlign", "middle")
+        line_height = size * 1.2
+        total = line_height * len(lines)
+        if align == "left":
+            tx, anchor = x + left, "start"
+        elif align == "right":
+            tx, anchor = x + w - right, "end"
+        else:
+            tx, anchor = x + (w + left - right) / 2, "middle"
+        if valign == "top":
+            ty = y + top
+        elif valign == "bottom":
+            ty = y + h - bottom - total
+        else:
+            ty = y + (h + top - bottom - total) / 2
+        baseline = ty + size * 0.95
+
+        style = int(_num(props, "fontStyle", 0))
+        font = self.theme.font
+        if self.theme.contrast and position == "center" and vposition == "middle":
+            font = _contrast(props.get("fillColor"), font)
+        attrs = [
+            f'font-size="{_f(size)}"',
+            f'fill="{_color(props.get("fontColor"), font)}"',
+            f'text-anchor="{anchor}"',
+        ]
+        if props.get("fontFamily"):
+            attrs.append(f'font-family="{_escape(props["fontFamily"])}"')
+        if style & 1:
+            attrs.append('font-weight="bold"')
+        if style & 2:
+            attrs.append('font-style="italic"')
+        if style & 4:
+            attrs.append('text-decoration="underline"')
+        if props.get("horizontal") == "0":
+            cx, cy = x + w / 2, y + h / 2
+            attrs.append(f'transform="rotate(-90 {_f(cx)} {_f(cy)})"')
+            tx = cx
+            baseline = cy - total / 2 + size * 0.95
+            attrs[2] = 'text-anchor="middle"'
+        background = props.get("labelBackgroundColor")
+        if background and background != "none":
+            width = max(len(line) for line in lines) * size * 0.55 + 4
+            bx = {"start": tx - 2, "end": tx - width + 2}.get(anchor, tx - width / 2)
+            self.out.append(
+                f'<rect x="{_f(bx)}" y="{_f(ty)}" width="{_f(width)}" height="{_f(total)}" '
+                f'fill="{_color(background, self.theme.label_background)}"/>'
+            )
+        spans = "".join(
+            f'<tspan x="{_f(tx)}" y="{_f(baseline + i * line_height)}">{_escape(line)}</tspan>'
+            for i, line in enumerate(lines)
+        )
+        self.out.append(f"<text {' '.join(attrs)}>{spans}</text>")
+
+    def edge_child_label(self, cell: Cell) -> None:
+        """A label vertex attached to an edge (``relative`` geometry)."""
+        names, props = self.styles[cell.id]
+        path = self.paths[cell.parent]
+        fraction = ((cell.geometry.x if cell.geometry else 0.0) + 1) / 2
+        px, py = _along(path, fraction)
+        props = {"labelBackgroundColor": "default", **props}
+        self.label(cell, props, (px, py, 0, 0))
+
+    # ----------------------------------------------------------- edges
+
+    def route(self, cell: Cell) -> list[Point] | None:
+        names, props = self.styles[cell.id]
+        source = self.boxes.get(cell.source or "")
+        target = self.boxes.get(cell.target or "")
+        geo = cell.geometry
+        ox, oy = self.origin(cell.parent)
+        points = [(ox + px, oy + py) for px, py in (geo.points or [])] if geo else []
+        if source is None or target is None:
+            return None
+        exit_port = _port(props, "exit", source)
+        entry_port = _port(props, "entry", target)
+        src_shape = self.shape_of(cell.source)
+        tgt_shape = self.shape_of(cell.target)
+        start = exit_port[0] if exit_port else _centre(source)
+        end = entry_port[0] if entry_port else _centre(target)
+
+        if props.get("edgeStyle") in _ORTHOGONAL:
+            path = _orthogonal(start, end, points, exit_port, entry_port, source, target)
+        else:
+            path = [start, *points, end]
+        if not exit_port and len(path) > 1:
+            path[0] = _clip(source, src_shape, path[1])
+        if not entry_port and len(path) > 1:
+            path[-1] = _clip(target, tgt_shape, path[-2])
+        return _simplify(path)
+
+    def shape_of(self, cell_id: str | None) -> str:
+        names, props = self.styles.get(cell_id or "", ([], {}))
+        shape = props.get("shape") or next((n for n in names if n in _SHAPE_NAMES), "rect")
+        return "ellipse" if shape in ("ellipse", "doubleEllipse", "endState") else shape
+
+    def edge(self, cell: Cell) -> None:
+        names, props = self.styles[cell.id]
+        path = list(self.paths[cell.id])
+        theme = self.theme
+        stroke = _color(props.get("strokeColor"), theme.stroke)
+        if stroke == "none":
+            return
+        width = _num(props, "strokeWidth", 1)
+        markers = []
+        for end, default in (("end", "classic"), ("start", "none")):
+            kind = props.get(f"{end}Arrow", default)
+            if kind == "none" or len(path) < 2:
+                continue
+            tip, prev = (path[-1], path[-2]) if end == "end" else (path[0], path[1])
+            fill = props.get(f"{end}Fill", "1") != "0"
+            size = _num(props, f"{end}Size", 6 if kind not in ("diamond", "diamondThin") else 7)
+            svg, back = _marker(kind, tip, prev, size, width, stroke, fill, theme.background or "none")
+            markers.append(svg)
+            if back:
+                shortened = _toward(tip, prev, back)
+                if end == "end":
+                    path[-1] = shortened
+                else:
+                    path[0] = shortened
+        attrs = [f'fill="none"', f'stroke="{stroke}"']
+        if width != 1:
+            attrs.append(f'stroke-width="{_f(width)}"')
+        if props.get("dashed") == "1":
+            pattern = props.get("dashPattern", "3 3")
+            attrs.append(f'stroke-dasharray="{" ".join(_f(float(p) * width) for p in pattern.split() if _is_number(p)) or "3 3"}"')
+        opacity = _num(props, "opacity", 100)
+        if opacity < 100:
+            attrs.append(f'opacity="{_f(opacity / 100)}"')
+        d = "M" + "L".join(f"{_f(px)} {_f(py)}" for px, py in path)
+        self.out.append(f'<path d="{d}" {" ".join(attrs)}/>')
+        self.out.extend(markers)
+        if cell.value:
+            px, py = _along(self.paths[cell.id], 0.5)
+            label_props = {"labelBackgroundColor": "default", "fontSize": "11", **props}
+            self.label(cell, label_props, (px, py, 0, 0))
+
+
+# ------------------------------------------------------------- helpers
+
+def _is_number(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _contrast(fill: str | None, default: str) -> str:
+    """Black or white, whichever reads better on an explicit ``#RRGGBB`` fill."""
+    if not fill or not re.fullmatch(r"#[0-9A-Fa-f]{6}", fill):
+        return default
+    r, g, b = (int(fill[i:i + 2], 16) for i in (1, 3, 5))
+    return "#000000" if 0.299 * r + 0.587 * g + 0.114 * b > 150 else "#FFFFFF"
+
+
+def _size(size: str | None, props: dict, w: float, ratio: float, fixed: float) -> float:
+    if props.get("fixedSize") == "1":
+        return float(size) if size and _is_number(size) else fixed
+    if size and _is_number(size):
+        value = float(size)
+        return value * w if value <= 1 else value
+    return w * ratio
+
+
+def _rect(x: float, y: float, w: float, h: float, r: float, paint: str) -> str:
+    radius = f' rx="{_f(r)}" ry="{_f(r)}"' if r else ""
+    return f'<rect x="{_f(x)}" y="{_f(y)}" width="{_f(w)}" height="{_f(h)}"{radius} {paint}/>'
+
+
+def _header_path(x: float, y: float, w: float, h: float, r: float, horizontal: bool) -> str:
+    """A swimlane header: rounded on the outer corners only."""
+    if not r:
+        return f"M{_f(x)} {_f(y)}H{_f(x + w)}V{_f(y + h)}H{_f(x)}Z"
+    if horizontal:
+        return (f"M{_f(x)} {_f(y + h)}V{_f(y + r)}Q{_f(x)} {_f(y)} {_f(x + r)} {_f(y)}"
+                f"H{_f(x + w - r)}Q{_f(x + w)} {_f(y)} {_f(x + w)} {_f(y + r)}V{_f(y + h)}Z")
+    return (f"M{_f(x + w)} {_f(y)}H{_f(x + r)}Q{_f(x)} {_f(y)} {_f(x)} {_f(y + r)}"
+            f"V{_f(y + h - r)}Q{_f(x)} {_f(y + h)} {_f(x + r)} {_f(y + h)}H{_f(x + w)}Z")
+
+
+def _polygon(points: list[Point], paint: str) -> str:
+    return f'<polygon points="{" ".join(f"{_f(x)},{_f(y)}" for x, y in points)}" {paint}/>'
+
+
+def _tile(x: float, y: float, w: float, h: float, color: str, glyph: str, radius: float) -> str:
+    size = min(w, h) * (0.42 if len(glyph) == 1 else 0.3)
+    return (
+        _rect(x, y, w, h, radius, f'fill="{color}" stroke="none"')
+        + f'<text x="{_f(x + w / 2)}" y="{_f(y + h / 2 + size * 0.35)}" font-size="{_f(size)}" '
+        f'font-weight="bold" fill="#FFFFFF" text-anchor="middle">{_escape(glyph)}</text>'
+    )
+
+
+def _actor(cx: float, y: float, size: float, paint: str) -> str:
+    head = size * 0.12
+    body_top = y + head * 2
+    hip = y + size * 0.62
+    return (
+        f'<ellipse cx="{_f(cx)}" cy="{_f(y + head)}" rx="{_f(head)}" ry="{_f(head)}" {paint}/>'
+        f'<path d="M{_f(cx)} {_f(body_top)}V{_f(hip)}'
+        f'M{_f(cx - size * 0.3)} {_f(y + size * 0.35)}H{_f(cx + size * 0.3)}'
+        f'M{_f(cx - size * 0.25)} {_f(y + size)}L{_f(cx)} {_f(hip)}L{_f(cx + size * 0.25)} {_f(y + size)}" {paint}/>'
+    )
+
+
+def _centre(box: Box) -> Point:
+    x, y, w, h = box
+    return (x + w / 2, y + h / 2)
+
+
+def _port(props: dict, end: str, box: Box) -> tuple[Point, str] | None:
+    """Fixed connection point and the side it lies on, if the style has one."""
+    if f"{end}X" not in props or f"{end}Y" not in props:
+        return None
+    fx, fy = _num(props, f"{end}X", 0.5), _num(props, f"{end}Y", 0.5)
+    x, y, w, h = box
+    point = (x + fx * w + _num(props, f"{end}Dx", 0), y + fy * h + _num(props, f"{end}Dy", 0))
+    if fy <= 0:
+        side = "top"
+    elif fy >= 1:
+        side = "bottom"
+    elif fx <= 0:
+        side = "left"
+    elif fx >= 1:
+        side = "right"
+    else:
+        side = "inside"
+    return point, side
+
+
+def _orthogonal(start, end, points, exit_port, entry_port, source: Box, target: Box) -> list[Point]:
+    """Axis-parallel path from ``start`` through ``points`` to ``end``."""
+    exit_side = exit_port[1] if exit_port else None
+    entry_side = entry_port[1] if entry_port else None
+    if not points and exit_side is None and entry_side is None:
+        return _elbow(source, target)
+    vertical: bool | None = None
+    if exit_side in ("top", "bottom"):
+        vertical = True
+    elif exit_side in ("left", "right"):
+        vertical = False
+    path = [start]
+    stops = [*points, end]
+    for i, p in enumerate(stops):
+        cur = path[-1]
+        last = i == len(stops) - 1
+        if abs(cur[0] - p[0]) < 0.5 or abs(cur[1] - p[1]) < 0.5:
+            vertical = abs(cur[0] - p[0]) < 0.5
+            path.append(p)
+            continue
+        if vertical is None:
+            vertical = abs(p[1] - cur[1]) > abs(p[0] - cur[0])
+        if last and entry_side in ("top", "bottom", "left", "right"):
+            end_vertical = entry_side in ("top", "bottom")
+            if vertical == end_vertical:
+                if vertical:
+                    mid = (cur[1] + p[1]) / 2
+                    path += [(cur[0], mid), (p[0], mid), p]
+                else:
+                    mid = (cur[0] + p[0]) / 2
+                    path += [(mid, cur[1]), (mid, p[1]), p]
+                continue
+        path.append((cur[0], p[1]) if vertical else (p[0], cur[1]))
+        path.append(p)
+        vertical = not vertical
+    return path
+
+
+def _elbow(source: Box, target: Box) -> list[Point]:
+    """Route between two boxes with no ports or waypoints, like draw.io's default."""
+    sx, sy, sw, sh = source
+    tx, ty, tw, th = target
+    scx, scy = sx + sw / 2, sy + sh / 2
+    tcx, tcy = tx + tw / 2, ty + th / 2
+    lo, hi = max(sx, tx), min(sx + sw, tx + tw)
+    if lo < hi:
+        x = (lo + hi) / 2
+        return [(x, scy), (x, tcy)]
+    lo, hi = max(sy, ty), min(sy + sh, ty + th)
+    if lo < hi:
+        y = (lo + hi) / 2
+        return [(scx, y), (tcx, y)]
+    # Prefer leaving through the top or bottom when there is room for the
+    # middle segment between the boxes, as in top-down diagrams.
+    vgap = max(ty - (sy + sh), sy - (ty + th))
+    hgap = max(tx - (sx + sw), sx - (tx + tw))
+    if vgap >= 20 or (hgap < 20 and abs(tcy - scy) > abs(tcx - scx)):
+        mid = (sy + sh + ty) / 2 if ty > sy else (ty + th + sy) / 2
+        return [(scx, scy), (scx, mid), (tcx, mid), (tcx, tcy)]
+    mid = (sx + sw + tx) / 2 if tx > sx else (tx + tw + sx) / 2
+    return [(scx, scy), (mid, scy), (mid, tcy), (tcx, tcy)]
+
+
+def _clip(box: Box, shape: str, toward: Point) -> Point:
+    """Where the line from the centre of ``box`` to ``toward`` leaves it."""
+    x, y, w, h = box
+    cx, cy = x + w / 2, y + h / 2
+    dx, dy = toward[0] - cx, toward[1] - cy
+    if dx == 0 and dy == 0 or w == 0 or h == 0:
+        return (cx, cy)
+    if shape == "ellipse":
+        t = 1 / math.sqrt((dx / (w / 2)) ** 2 + (dy / (h / 2)) ** 2)
+    elif shape == "rhombus":
+        t = 1 / (abs(dx) / (w / 2) + abs(dy) / (h / 2))
+    else:
+        t = min(
+            (w / 2) / abs(dx) if dx else math.inf,
+            (h / 2) / abs(dy) if dy else math.inf,
+        )
+    if t >= 1:
+        return (cx, cy)
+    return (cx + dx * t, cy + dy * t)
+
+
+def _simplify(path: list[Point]) -> list[Point]:
+    out: list[Point] = []
+    for p in path:
+        if out and abs(out[-1][0] - p[0]) < 0.01 and abs(out[-1][1] - p[1]) < 0.01:
+            continue
+        if len(out) >= 2:
+            a, b = out[-2], out[-1]
+            if (abs(a[0] - b[0]) < 0.01 and abs(b[0] - p[0]) < 0.01) or (
+                abs(a[1] - b[1]) < 0.01 and abs(b[1] - p[1]) < 0.01
+            ):
+                out[-1] = p
+                continue
+        out.append(p)
+    return out
+
+
+def _along(path: list[Point], fraction: float) -> Point:
+    lengths = [math.dist(a, b) for a, b in zip(path, path[1:])]
+    total = sum(lengths)
+    if not total:
+        return path[0]
+    remaining = total * min(max(fraction, 0.0), 1.0)
+    for (a, b), length in zip(zip(path, path[1:]), lengths):
+        if remaining <= length and length:
+            t = remaining / length
+            return (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+        remaining -= length
+    return path[-1]
+
+
+def _toward(tip: Point, prev: Point, distance: float) -> Point:
+    dx, dy = prev[0] - tip[0], prev[1] - tip[1]
+    length = math.hypot(dx, dy) or 1.0
+    distance = min(distance, length)
+    return (tip[0] + dx / length * distance, tip[1] + dy / length * distance)
+
+
+def _marker(
+    kind: str, tip: Point, prev: Point, size: float, width: float,
+    stroke: str, fill: bool, background: str,
+) -> tuple[str, float]:
+    """SVG for an arrow head at ``tip``; also how far to pull the line back."""
+    dx, dy = tip[0] - prev[0], tip[1] - prev[1]
+    length = math.hypot(dx, dy) or 1.0
+    ux, uy = dx / length, dy / length  # direction of travel
+    nx, ny = -uy, ux  # normal
+    size = size + width - 1
+
+    def at(back: float, side: float) -> Point:
+        return (tip[0] - ux * back + nx * side, tip[1] - uy * back + ny * side)
+
+    def poly(points: list[Point], filled: bool) -> str:
+        paint = f'fill="{stroke if filled else background}" stroke="{stroke}"'
+        if width != 1:
+            paint += f' stroke-width="{_f(width)}"'
+        return _polygon(points, paint)
+
+    def lines(*segments: tuple[Point, Point]) -> str:
+        d = "".join(f"M{_f(a[0])} {_f(a[1])}L{_f(b[0])} {_f(b[1])}" for a, b in segments)
+        extra = f' stroke-width="{_f(width)}"' if width != 1 else ""
+        return f'<path d="{d}" fill="none" stroke="{stroke}"{extra}/>'
+
+    def circle(back: float, r: float) -> str:
+        c = at(back, 0)
+        extra = f' stroke-width="{_f(width)}"' if width != 1 else ""
+        return (f'<ellipse cx="{_f(c[0])}" cy="{_f(c[1])}" rx="{_f(r)}" ry="{_f(r)}" '
+                f'fill="{background}" stroke="{stroke}"{extra}/>')
+
+    half = size / 2
+    if kind in ("classic", "classicThin"):
+        spread = half * (0.6 if kind == "classicThin" else 1)
+        return poly([tip, at(size * 1.5, spread), at(size, 0), at(size * 1.5, -spread)], fill), size
+    if kind in ("block", "blockThin"):
+        spread = half * (0.6 if kind == "blockThin" else 1)
+        return poly([tip, at(size * 1.5, spread), at(size * 1.5, -spread)], fill), size * 1.5
+    if kind in ("open", "openThin"):
+        spread = half * (0.6 if kind == "openThin" else 1)
+        return lines((at(size * 1.5, spread), tip), (tip, at(size * 1.5, -spread))), 0.0
+    if kind in ("oval", "circle", "circlePlus"):
+        c = at(half, 0)
+        paint = f'fill="{stroke if fill else background}" stroke="{stroke}"'
+        return (f'<ellipse cx="{_f(c[0])}" cy="{_f(c[1])}" rx="{_f(half)}" ry="{_f(half)}" {paint}/>',
+                size)
+    if kind in ("diamond", "diamondThin"):
+        spread = half * (0.6 if kind == "diamondThin" else 1)
+        return poly([tip, at(size, spread), at(size * 2, 0), at(size, -spread)], fill), size * 2
+    if kind == "cross":
+        return lines((at(size + half, half), at(half, -half)), (at(size + half, -half), at(half, half))), 0.0
+    if kind.startswith("ER"):
+        s = max(size, 10.0)
+        parts = []
+        if kind in ("ERmandOne", "ERone"):
+            parts.append(lines((at(s * 0.5, s * 0.5), at(s * 0.5, -s * 0.5))))
+        if kind == "ERmandOne":
+            parts.append(lines((at(s, s * 0.5), at(s, -s * 0.5))))
+        if kind in ("ERzeroToOne", "ERoneToMany", "ERzeroToMany", "ERmany"):
+            if kind in ("ERoneToMany", "ERzeroToMany", "ERmany"):
+                parts.append(lines((at(s, 0), at(0, s * 0.5)), (at(s, 0), at(0, -s * 0.5))))
+            if kind == "ERzeroToOne":
+                parts.append(lines((at(s * 0.5, s * 0.5), at(s * 0.5, -s * 0.5))))
+            if kind == "ERoneToMany":
+                parts.append(lines((at(s * 1.2, s * 0.5), at(s * 1.2, -s * 0.5))))
+            if kind in ("ERzeroToOne", "ERzeroToMany"):
+                parts.append(circle(s * 1.5, s * 0.35))
+        return "".join(parts), 0.0
+    return poly([tip, at(size * 1.5, half), at(size * 1.5, -half)], fill), size
@@ -0,0 +1,231 @@
+"""Wait for diagram files to change.
+
+:class:`Watcher` reports which ``.drawio``/``.mmd`` files under a set of
+files and directories were written, created or removed.  On Linux it uses
+inotify (through ``ctypes``, no extra packages) with a watch on every
+directory, so an idle watch costs nothing and a change is seen at once.
+Bursts of events -- an editor writing a temp file and renaming it over the
+original -- are gathered for ``debounce`` seconds and reported as one set.
+If the kernel's event queue overflows, or inotify is not available, the
+watcher falls back to comparing ``(size, mtime)`` of every file, which is
+what the polling backend on other platforms does every ``interval``
+seconds.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+SUFFIXES = (".drawio", ".mmd")
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE
+         | _IN_DELETE | _IN_DELETE_SELF | _IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")
+
+
+class Watcher:
+    """Report changed diagram files under ``paths``.
+
+    Directories are watched recursively (hidden ones are skipped); files
+    named directly are watched whatever their suffix.
+    """
+
+    def __init__(
+        self, paths: Iterable[str | os.PathLike[str]], *, suffixes: tuple[str, ...] = SUFFIXES,
+        interval: float = 1.0, debounce: float = 0.1, polling: bool = False,
+    ) -> None:
+        self.suffixes = suffixes
+        self.interval = interval
+        self.debounce = debounce
+        self._roots: list[Path] = []
+        self._named: set[Path] = set()
+        for name in paths:
+            path = Path(name).resolve()
+            if path.is_dir():
+                self._roots.append(path)
+            else:
+                self._named.add(path)
+        self._fd = -1
+        self._dirs: dict[int, Path] = {}
+        self._snapshot = self._stat_all()
+        if not polling:
+            self._start_inotify()
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._fd >= 0 else "polling"
+
+    def files(self) -> list[Path]:
+        """The diagram files currently watched."""
+        return sorted(self._snapshot)
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """Block until files change; return them (removed files included).
+
+        Returns an empty set if ``timeout`` seconds pass without a change.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if self._fd >= 0:
+                changed = self._read(remaining)
+            else:
+                time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+                changed = self._rescan()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def __iter__(self) -> Iterator[set[Path]]:
+        while True:
+            yield self.wait()
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> Watcher:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -- scanning
+
+    def _wanted(self, path: Path) -> bool:
+        if path in self._named:
+            return True
+        return path.suffix in self.suffixes and any(
+            path.is_relative_to(root) for root in self._roots)
+
+    def _walk(self, root: Path) -> Iterator[tuple[Path, list[str]]]:
+        for top, dirs, names in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            yield Path(top), names
+
+    def _stat_all(self) -> dict[Path, tuple[int, int]]:
+        found = {}
+        candidates = list(self._named)
+        for root in self._roots:
+            for top, names in self._walk(root):
+                candidates.extend(top / name for name in names
+                                  if name.endswith(self.suffixes))
+        for path in candidates:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            found[path] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def _rescan(self) -> set[Path]:
+        old, new = self._snapshot, self._stat_all()
+        self._snapshot = new
+        return {p for p in old.keys() | new.keys() if old.get(p) != new.get(p)}
+
+    # -- inotify
+
+    def _start_inotify(self) -> None:
+        if not sys.platform.startswith("linux"):
+            return
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        self._fd = fd
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        for root in self._roots:
+            self._watch_tree(root)
+        for path in self._named:
+            self._watch(path.parent)
+        if not self._dirs:
+            # Typically the per-user watch limit; polling still works.
+            self.close()
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._add_watch(self._fd, os.fsencode(directory), _MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def _watch_tree(self, root: Path) -> list[Path]:
+        """Watch ``root`` and its subdirectories; return the files in them."""
+        files = []
+        for top, names in self._walk(root):
+            self._watch(top)
+            files.extend(top / name for name in names)
+        return files
+
+    def _read(self, timeout: float | None) -> set[Path]:
+        changed: set[Path] = set()
+        overflow = False
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        wait = timeout
+        while True:
+            if not poller.poll(None if wait is None else int(wait * 1000)):
+                break
+            try:
+                data = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, size = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + size].rstrip(b"\0")
+                offset += _EVENT.size + size
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & _IN_IGNORED:
+                    del self._dirs[wd]
+                    continue
+                if not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO) and any(
+                            path.is_relative_to(root) for root in self._roots) \
+                            and not path.name.startswith("."):
+                        changed.update(p for p in self._watch_tree(path) if self._wanted(p))
+                    elif mask & _IN_MOVED_FROM:
+                        changed.update(p for p in self._snapshot if p.is_relative_to(path))
+                elif self._wanted(path):
+                    changed.add(path)
+            # Gather the rest of the burst before reporting it.
+            wait = self.debounce
+        if overflow:
+            return self._rescan() | changed
+        for path in changed:
+            try:
+                st = path.stat()
+            except OSError:
+                self._snapshot.pop(path, None)
+            else:
+                self._snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return changed
@@ -0,0 +1,148 @@
+"""Streaming mxfile writer.
+
+Pages are written cell by cell straight to the output stream.  Compressed
+pages go through an incremental deflate+base64 encoder, so neither form keeps
+more than the current cell in memory.
+"""
+
+from __future__ import annotations
+
+from typing import TextIO
+
+from .codec import PayloadEncoder
+from .errors import MxFileError
+from .model import Cell, Diagram, diagram_open_tag, model_open_tag
+from .xmlutil import format_attrs
+
+HOST = "drawio-skill"
+
+# The page settings the skill's examples use.
+DEFAULT_MODEL = {
+    "dx": "1326", "dy": "843", "grid": "1", "gridSize": "10", "guides": "1",
+    "tooltips": "1", "connect": "1", "arrows": "1", "fold": "1", "page": "1",
+    "pageScale": "1", "pageWidth": "1100", "pageHeight": "850", "math": "0",
+    "shadow": "0",
+}
+
+STEP = "    "
+
+
+class MxFileWriter:
+    """Write an ``<mxfile>`` document to a text stream one cell at a time.
+
+    ::
+
+        with open("out.drawio", "w", encoding="utf-8") as fh, MxFileWriter(fh) as w:
+            w.begin_page("Overview")
+            w.write_cell(Cell("a", "Hello", vertex=True, parent="1", ...))
+            w.end_page()
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        compressed: bool = False,
+        host: str = HOST,
+        attrs: dict[str, str] | None = None,
+    ) -> None:
+        self.stream = stream
+        self.compressed = compressed
+        self.host = host
+        # All of the <mxfile> element's attributes, e.g. those of a file
+        # being rewritten; ``host`` is ignored when given.
+        self.attrs = attrs
+        self.pages = 0
+        self._encoder: PayloadEncoder | None = None
+        self._in_page = False
+        self._started = False
+
+    def __enter__(self) -> MxFileWriter:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def start(self) -> None:
+        if not self._started:
+            attrs = self.attrs if self.attrs is not None else {"host": self.host}
+            self.stream.write(f"<mxfile{format_attrs(attrs)}>\n")
+            self._started = True
+
+    def begin_page(
+        self,
+        name: str | None = None,
+        id: str | None = None,
+        layers: bool = True,
+        compressed: bool | None = None,
+        defaults: bool = True,
+        **model: object,
+    ) -> Diagram:
+        """Open a ``<diagram>`` page; ``model`` overrides ``DEFAULT_MODEL``.
+
+        With ``layers`` the standard root cell ``0`` and default layer ``1``
+        are written first.  ``compressed`` overrides the writer's setting
+        for this page.  Without ``defaults`` the ``<mxGraphModel>`` gets
+        exactly the attributes in ``model``, as when rewriting a page.
+        """
+        self.start()
+        if self._in_page:
+            raise MxFileError("begin_page() called inside an open page")
+        if compressed is None:
+            compressed = self.compressed
+        attrs = dict(DEFAULT_MODEL) if defaults else {}
+        attrs.update((k, str(v)) for k, v in model.items())
+        diagram = Diagram(
+            self.pages, id or f"page-{self.pages + 1}", name or f"Page-{self.pages + 1}",
+            compressed, attrs,
+        )
+        self.stream.write(f"{STEP}{diagram_open_tag(diagram)}")
+        if compressed:
+            self._encoder = PayloadEncoder()
+        else:
+            self.stream.write("\n")
+        self._in_page = True
+        self._emit(f"{STEP * 2}{model_open_tag(diagram.model)}\n{STEP * 3}<root>\n")
+        if layers:
+            self.write_cell(Cell("0"))
+            self.write_cell(Cell("1", parent="0"))
+        self.pages += 1
+        return diagram
+
+    def write_cell(self, cell: Cell) -> None:
+        if not self._in_page:
+            raise MxFileError("write_cell() called outside a page")
+        self._emit(cell.to_xml(STEP * 4, STEP) + "\n")
+
+    def write_raw(self, xml: str) -> None:
+        """Write pre-serialized cell XML into the current page."""
+        if not self._in_page:
+            raise MxFileError("write_raw() called outside a page")
+        self._emit(xml)
+
+    def end_page(self) -> None:
+        if not self._in_page:
+            raise MxFileError("end_page() called without an open page")
+        self._emit(f"{STEP * 3}</root>\n{STEP * 2}</mxGraphModel>\n")
+        if self._encoder is not None:
+            self.stream.write(self._encoder.finish())
+            self._encoder = None
+            self.stream.write("</diagram>\n")
+        else:
+            self.stream.write(f"{STEP}</diagram>\n")
+        self._in_page = False
+
+    def close(self) -> None:
+        if self._in_page:
+            self.end_page()
+        self.start()
+        self.stream.write("</mxfile>\n")
+
+    def _emit(self, text: str) -> None:
+        if self._encoder is not None:
+            # Compressed payloads carry no indentation.
+            text = "".join(line.strip() for line in text.splitlines())
+            self.stream.write(self._encoder.feed(text))
+        else:
+            self.stream.write(text)
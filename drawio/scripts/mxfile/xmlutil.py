@@ -0,0 +1,67 @@
+"""Small XML helpers shared by the byte scanner and the writers.
+
+The scanner works on raw bytes so it can report exact offsets; these helpers
+parse and produce attribute text without going through a full XML parser.
+"""
+
+from __future__ import annotations
+
+import re
+
+# One attribute: name = "value" or name = 'value'.  XML forbids a raw "<" in
+# attribute values, so a quoted run is always safe to consume greedily.
+_ATTR = rb"""\s+([^\s=/>]+)\s*=\s*(?:"([^"]*)"|'([^']*)')"""
+# The attribute section of a start tag, as one capturing group.
+ATTRS = rb"""((?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*)\s*"""
+
+_ATTR_RE = re.compile(_ATTR)
+_ENTITY_RE = re.compile(r"&(#x[0-9a-fA-F]+|#[0-9]+|amp|lt|gt|quot|apos);")
+_NAMED = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+
+
+def _entity(match: re.Match[str]) -> str:
+    name = match.group(1)
+    if name[0] != "#":
+        return _NAMED[name]
+    if name[1] in "xX":
+        return chr(int(name[2:], 16))
+    return chr(int(name[1:]))
+
+
+def unescape(text: str) -> str:
+    """Resolve the predefined XML entities and character references."""
+    if "&" not in text:
+        return text
+    return _ENTITY_RE.sub(_entity, text)
+
+
+def escape_attr(text: str) -> str:
+    """Escape ``text`` for use inside a double-quoted attribute value.
+
+    Newlines become ``&#xa;`` the way draw.io writes multi-line labels.
+    """
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("\n", "&#xa;")
+    )
+
+
+def parse_attrs(raw: bytes) -> dict[str, str]:
+    """Parse the attribute section of a start tag into a dict."""
+    attrs: dict[str, str] = {}
+    for m in _ATTR_RE.finditer(raw):
+        value = m.group(2) if m.group(2) is not None else m.group(3)
+        attrs[m.group(1).decode("utf-8")] = unescape(value.decode("utf-8"))
+    return attrs
+
+
+def format_attrs(attrs: dict[str, object]) -> str:
+    """Render ``attrs`` as `` name="value"`` pairs, skipping ``None`` values."""
+    return "".join(
+        f' {name}="{escape_attr(str(value))}"'
+        for name, value in attrs.items()
+        if value is not None
+    )
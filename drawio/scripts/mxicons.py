@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Look up AWS, Azure and GCP icons and check diagrams for unknown ones.
+
+``find`` resolves a name, alias or misspelling to the draw.io style that
+draws the icon.  ``check`` lists ``shape=``/``prIcon=``/``image=`` icon
+references in .drawio files that no stencil provides (draw.io shows those
+as empty boxes) and exits 1 if there are any.  ``build`` compiles draw.io's
+stencil libraries into the full catalog; without it the bundled seed of
+common icons is used, and ``check`` only warns, since a valid stencil may
+simply be missing from the seed.
+
+Examples:
+    python3 mxicons.py find "app load balancer"
+    python3 mxicons.py find queue --provider aws --limit 5
+    python3 mxicons.py check ../examples
+    python3 mxicons.py build ~/src/drawio/src/main/webapp/stencils Sidebar-AWS4.js
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from mxfile import MxFileError, iter_cells
+from mxfile.cache import cache_dir
+from mxfile.icons import PROVIDERS, Match, build, load_catalog, provider_of
+
+
+def cmd_find(args: argparse.Namespace) -> int:
+    catalog = load_catalog(args.index)
+    matches = catalog.search(args.query, args.limit, args.provider)
+    exact = catalog.lookup(args.query, args.provider, threshold=1.0)
+    if exact is not None and exact not in [match.icon for match in matches]:
+        # An alias can be spelled nothing like the name it stands for.
+        matches = [Match(1.0, args.query, exact)] + matches[:args.limit - 1]
+    if not matches:
+        print(f"no icon matches {args.query!r}", file=sys.stderr)
+        return 1
+    for match in matches:
+        icon = match.icon
+        print(f"{match.score:.3f}  {icon.id}  ({icon.name}, {icon.category})")
+    if args.style:
+        print((exact or matches[0].icon).style())
+    return 0
+
+
+def cmd_check(args: argparse.Namespace) -> int:
+    catalog = load_catalog(args.index)
+    # The seed lacks most stencils, so a miss there proves nothing.
+    label = "unknown icon" if catalog.complete else "warning: icon not in the seed catalog:"
+    files: list[Path] = []
+    for name in args.paths:
+        path = Path(name)
+        files.extend(sorted(path.rglob("*.drawio")) if path.is_dir() else [path])
+    problems = 0
+    for path in files:
+        for diagram, cell in iter_cells(path):
+            for ref in catalog.unknown(cell.style or ""):
+                problems += 1
+                matches = catalog.search(ref, 1, provider_of(ref))
+                hint = f" (did you mean {matches[0].icon.id}?)" if matches else ""
+                print(f"{path}: {diagram.name}: {cell.id}: {label} {ref}{hint}")
+    if not catalog.complete:
+        print(f"{len(files)} files, {problems} icons not in the seed catalog; run "
+              "'mxicons.py build' to check against every stencil", file=sys.stderr)
+        return 0
+    print(f"{len(files)} files, {problems} unknown icons", file=sys.stderr)
+    return 1 if problems else 0
+
+
+def cmd_build(args: argparse.Namespace) -> int:
+    target = Path(args.out) if args.out else cache_dir("icons") / "catalog.idx"
+    count = build(args.sources, target)
+    catalog = load_catalog(str(target))
+    if not catalog.complete:
+        print("warning: no stencil library among the sources; only overlays were added",
+              file=sys.stderr)
+    print(f"{count} icons -> {target}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--time", action="store_true", help="print elapsed time")
+    parser.add_argument("--index", help="catalog file (default: built catalog, else the seed)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("find", help="icons matching a name, alias or typo")
+    p.add_argument("query")
+    p.add_argument("--provider", choices=PROVIDERS)
+    p.add_argument("--limit", type=int, default=5)
+    p.add_argument("--style", action="store_true", help="also print the best match's style")
+    p.set_defaults(func=cmd_find)
+
+    p = sub.add_parser("check", help="report unknown icon shapes in .drawio files")
+    p.add_argument("paths", nargs="+", metavar="path", help="files or directories")
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("build", help="compile stencil libraries into the catalog")
+    p.add_argument("sources", nargs="+", metavar="source",
+                   help="stencil .xml, Sidebar-*.js, .tsv files or directories of them")
+    p.add_argument("-o", "--out", help="index file (default: the cache's catalog.idx)")
+    p.set_defaults(func=cmd_build)
+
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    try:
+        status = args.func(args)
+    except (MxFileError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    if args.time:
+        print(f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Check .drawio and .mmd files for broken structure, once or as they change.
+
+Reports duplicate ids, edges whose source or target does not exist, cells
+with a missing parent, sibling vertices that overlap and edges routed
+through a swimlane that holds neither end; see ``mxfile.lint`` for the
+exact rules.  Results are cached per file, so re-running over an unchanged
+tree reads nothing.  ``--watch`` keeps running and re-checks files as they
+are saved: only the changed files, and in them only the changed cells and
+their neighbours.  Exits 1 if there are findings, 2 on errors.
+
+Examples:
+    python3 mxlint.py ../examples
+    python3 mxlint.py arch.drawio flows/ --rules dangling-edge,overlap
+    python3 mxlint.py diagrams/ --json > lint.json
+    python3 mxlint.py diagrams/ --watch
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from mxfile import MxFileError
+from mxfile.lint import RULES, FileLinter, Finding, lint_file, store_findings
+from mxfile.watch import SUFFIXES, Watcher
+
+
+def collect(paths: list[str]) -> list[Path]:
+    files: list[Path] = []
+    for name in paths:
+        path = Path(name)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix in SUFFIXES))
+        else:
+            files.append(path)
+    return files
+
+
+def record(path: Path, finding: Finding, **extra: object) -> dict:
+    return {"path": str(path), **asdict(finding), **extra}
+
+
+def check(args: argparse.Namespace, rules: list[str]) -> int:
+    status = 0
+    records = []
+    for path in collect(args.paths):
+        try:
+            findings = lint_file(path, rules, cache=not args.no_cache)
+        except (MxFileError, OSError) as exc:
+            print(f"error: {path}: {exc}", file=sys.stderr)
+            status = 2
+            continue
+        if findings and not status:
+            status = 1
+        for finding in findings:
+            if args.json:
+                records.append(record(path, finding))
+            else:
+                print(f"{path}: {finding}")
+    if args.json:
+        json.dump(records, sys.stdout, indent=1)
+        print()
+    return status
+
+
+def watch(args: argparse.Namespace, rules: list[str]) -> int:
+    linters: dict[Path, FileLinter] = {}
+    current: dict[Path, set[Finding]] = {}
+    with Watcher(args.paths, interval=args.interval, polling=args.poll) as watcher:
+        pending = set(watcher.files())
+        print(f"watching {len(pending)} files ({watcher.backend}); Ctrl-C to stop",
+              file=sys.stderr)
+        first = True
+        try:
+            while True:
+                for path in sorted(pending):
+                    recheck(args, rules, path, linters, current, quiet=first)
+                if first:
+                    count = sum(len(found) for found in current.values())
+                    print(f"{len(current)} files, {count} findings", file=sys.stderr)
+                    first = False
+                pending = watcher.wait()
+        except KeyboardInterrupt:
+            pass
+    return 1 if any(current.values()) else 0
+
+
+def recheck(
+    args: argparse.Namespace, rules: list[str], path: Path,
+    linters: dict[Path, FileLinter], current: dict[Path, set[Finding]], quiet: bool,
+) -> int:
+    """Re-check one file and print what changed; return the cells re-checked."""
+    shown = display(path)
+    old = current.pop(path, set())
+    if not path.exists():
+        linters.pop(path, None)
+        if not quiet:
+            print(f"{shown}: removed", file=sys.stderr)
+        return 0
+    started = time.perf_counter()
+    linter = linters.get(path)
+    if linter is None:
+        linter = linters[path] = FileLinter(path, rules)
+    try:
+        findings = linter.run()
+    except (MxFileError, OSError, UnicodeDecodeError) as exc:
+        print(f"error: {shown}: {exc}", file=sys.stderr)
+        linters.pop(path, None)
+        return 0
+    elapsed = (time.perf_counter() - started) * 1000
+    new = set(findings)
+    current[path] = new
+    if not args.no_cache:
+        try:
+            store_findings(path, findings, rules)
+        except OSError:
+            pass
+    added = [f for f in findings if f not in old]
+    fixed = sorted(old - new, key=lambda f: (f.page, f.rule, f.cells))
+    for finding in added:
+        if args.json:
+            print(json.dumps(record(shown, finding, status="new")))
+        else:
+            print(f"{shown}: {finding}")
+    for finding in fixed:
+        if args.json:
+            print(json.dumps(record(shown, finding, status="fixed")))
+        else:
+            print(f"{shown}: fixed: {finding}")
+    if not quiet:
+        print(f"{shown}: {len(new)} findings (+{len(added)} -{len(fixed)}), "
+              f"{linter.rechecked} cells re-checked in {elapsed:.0f} ms", file=sys.stderr)
+    sys.stdout.flush()
+    return linter.rechecked
+
+
+def display(path: Path) -> Path:
+    try:
+        return path.relative_to(Path.cwd())
+    except ValueError:
+        return path
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", metavar="path", help="files or directories")
+    parser.add_argument("--rules", help=f"comma-separated subset of: {', '.join(RULES)}")
+    parser.add_argument("--watch", action="store_true", help="re-check files as they change")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between scans when polling (default: 1)")
+    parser.add_argument("--poll", action="store_true", help="poll even where inotify works")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and keep no cached results")
+    parser.add_argument("--json", action="store_true",
+                        help="print findings as JSON (one object per line with --watch)")
+    parser.add_argument("--time", action="store_true", help="print elapsed time")
+    args = parser.parse_args(argv)
+
+    rules = list(RULES)
+    if args.rules:
+        rules = [rule.strip() for rule in args.rules.split(",") if rule.strip()]
+        unknown = sorted(set(rules) - set(RULES))
+        if unknown:
+            parser.error(f"unknown rule {unknown[0]!r}; choose from {', '.join(RULES)}")
+
+    started = time.perf_counter()
+    if args.watch:
+        return watch(args, rules)
+    status = check(args, rules)
+    if args.time:
+        print(f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Render .drawio and .mmd files to SVG or PNG, offline and in parallel.
+
+Uses the pure-Python renderer in mxfile/svg.py: no browser, no network.
+Rendered pages are cached by content, so unchanged diagrams are copied from
+the cache instead of re-rendered.  Multi-page files produce ``name-1.svg``,
+``name-2.svg``...  When a .drawio and a .mmd file share a name, the Mermaid
+output keeps its extension (``name.mmd.svg``); other inputs that would
+write the same file are numbered (``name.2.svg``).
+
+Examples:
+    python3 mxrender.py ../examples/microservices.drawio
+    python3 mxrender.py ../examples -o build/svg -j 0
+    python3 mxrender.py flow.mmd -f png --scale 2 --theme dark
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from mxfile import MxFileError
+from mxfile.render import FORMATS, render_file
+from mxfile.svg import THEMES
+
+SUFFIXES = (".drawio", ".mmd")
+
+
+def collect(inputs: list[str]) -> list[tuple[Path, Path]]:
+    """(source, directory relative to its input root) for every diagram."""
+    found = []
+    for name in inputs:
+        path = Path(name)
+        if path.is_dir():
+            found.extend(
+                (p, p.parent.relative_to(path))
+                for p in sorted(path.rglob("*"))
+                if p.suffix in SUFFIXES and p.is_file()
+            )
+        else:
+            found.append((path, Path()))
+    return found
+
+
+def output_names(sources: list[tuple[Path, Path]], out: str | None) -> list[str]:
+    """Output base names that do not collide in their output directories.
+
+    A .mmd file that shares a directory and stem with another input keeps its
+    extension; any clash left, such as the same file name under two input
+    roots rendered into one ``-o`` tree, is numbered (``name.2``).
+    """
+    directories = [
+        (Path(out, relative) if out else source.parent).resolve()
+        for source, relative in sources
+    ]
+    stems = Counter(
+        (directory, source.stem) for (source, _), directory in zip(sources, directories)
+    )
+    used: set[tuple[Path, str]] = set()
+    names = []
+    for (source, _), directory in zip(sources, directories):
+        name = source.stem
+        if stems[directory, name] > 1 and source.suffix == ".mmd":
+            name = source.name
+        candidate, number = name, 1
+        while (directory, candidate) in used:
+            number += 1
+            candidate = f"{name}.{number}"
+        used.add((directory, candidate))
+        names.append(candidate)
+    return names
+
+
+def run_one(job: tuple[Path, Path | None, str, dict]) -> tuple[Path, int, int, str | None]:
+    source, out_dir, name, options = job
+    try:
+        results = render_file(source, out_dir, name=name, **options)
+    except (MxFileError, OSError, UnicodeDecodeError) as exc:
+        return source, 0, 0, str(exc)
+    cached = sum(result.cached for result in results)
+    return source, len(results) - cached, cached, None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help=".drawio/.mmd files or directories")
+    parser.add_argument("-o", "--out", help="output directory (default: next to each input)")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="svg")
+    parser.add_argument("--theme", choices=sorted(THEMES), default="light")
+    parser.add_argument("--scale", type=float, default=1.0, help="PNG scale factor")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="worker processes (0 = one per CPU)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="neither read nor fill the render cache")
+    parser.add_argument("--time", action="store_true", help="print elapsed time")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+
+    options = {
+        "fmt": args.format,
+        "theme": args.theme,
+        "scale": args.scale,
+        "use_cache": not args.no_cache,
+    }
+    sources = collect(args.inputs)
+    jobs = [
+        (source, Path(args.out, relative) if args.out else None, name, options)
+        for (source, relative), name in zip(sources, output_names(sources, args.out))
+    ]
+    workers = args.jobs or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        results = [run_one(job) for job in jobs]
+
+    rendered = cached = failed = 0
+    for source, fresh, hits, error in results:
+        if error is not None:
+            failed += 1
+            print(f"error: {source}: {error}", file=sys.stderr)
+        rendered += fresh
+        cached += hits
+    print(f"{rendered} rendered, {cached} from cache"
+          + (f", {failed} failed" if failed else ""), file=sys.stderr)
+    if args.time:
+        print(f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
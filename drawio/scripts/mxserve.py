@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Serve the viewers and their vendored engines locally, with caching.
+
+Files under ``vendor/`` are pinned by ``install.sh --vendor-viewers``, so they
+are sent with a one-year ``immutable`` Cache-Control; the pages themselves are
+revalidated on every load (``no-cache`` plus ETag).  Text assets are
+precompressed to ``.gz`` siblings at startup, and ``.br`` siblings are used
+when present, so nothing is compressed per request.
+
+Examples:
+    python3 mxserve.py                 # http://127.0.0.1:8765/drawioxml_viewer.html
+    python3 mxserve.py --port 9000 --bind 0.0.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.utils
+import gzip
+import mimetypes
+import os
+import shutil
+import sys
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+VIEWERS = Path(__file__).resolve().parent.parent / "viewers"
+COMPRESSIBLE = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".xml", ".drawio", ".mmd"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+MIN_SIZE = 1024
+
+mimetypes.add_type("text/javascript", ".mjs")
+mimetypes.add_type("application/xml", ".drawio")
+mimetypes.add_type("text/plain", ".mmd")
+
+
+def precompress(root: Path) -> int:
+    """Write missing or stale ``.gz`` siblings for text assets; return the count."""
+    written = 0
+    for path in root.rglob("*"):
+        if path.suffix not in COMPRESSIBLE or not path.is_file():
+            continue
+        stat = path.stat()
+        if stat.st_size < MIN_SIZE:
+            continue
+        target = path.with_name(path.name + ".gz")
+        if target.exists() and target.stat().st_mtime_ns >= stat.st_mtime_ns:
+            continue
+        tmp = target.with_name(target.name + ".tmp")
+        with open(path, "rb") as src, open(tmp, "wb") as raw:
+            # mtime=0 keeps the output byte-identical across runs.
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as dst:
+                shutil.copyfileobj(src, dst)
+        os.replace(tmp, target)
+        written += 1
+    return written
+
+
+class Handler(SimpleHTTPRequestHandler):
+    """Static files with precompressed variants, ETags and cache headers."""
+
+    def end_headers(self) -> None:
+        self.send_header("X-Content-Type-Options", "nosniff")
+        super().end_headers()
+
+    def send_head(self):  # type: ignore[override]
+        path = Path(self.translate_path(self.path))
+        if path.is_dir() or not path.is_file():
+            return super().send_head()
+        encoding, variant = None, path
+        accepted = self.headers.get("Accept-Encoding", "")
+        for name, suffix in (("br", ".br"), ("gzip", ".gz")):
+            candidate = path.with_name(path.name + suffix)
+            if name in accepted and _fresh(candidate, path):
+                encoding, variant = name, candidate
+                break
+        stat = variant.stat()
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-" + encoding if encoding else ""}"'
+        relative = path.relative_to(Path(self.directory).resolve()).parts
+        cache = IMMUTABLE if relative and relative[0] == "vendor" else "no-cache"
+
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+
+        fh = open(variant, "rb")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", self.guess_type(str(path)))
+        self.send_header("Content-Length", str(stat.st_size))
+        self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        return fh
+
+
+def _fresh(variant: Path, original: Path) -> bool:
+    try:
+        return variant.stat().st_mtime_ns >= original.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", type=Path, default=VIEWERS,
+                        help="directory to serve (default: the skill's viewers/)")
+    parser.add_argument("--bind", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--quiet", action="store_true", help="do not log requests")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    if not root.is_dir():
+        print(f"error: not a directory: {root}", file=sys.stderr)
+        return 1
+    if not (root / "vendor").is_dir():
+        print("note: no vendor/ directory; viewers will load their engines from the "
+              "network (run install.sh --vendor-viewers)", file=sys.stderr)
+    compressed = precompress(root)
+    if compressed:
+        print(f"precompressed {compressed} files", file=sys.stderr)
+
+    class RootHandler(Handler):
+        def __init__(self, *handler_args, **kwargs) -> None:
+            super().__init__(*handler_args, directory=str(root), **kwargs)
+
+        def log_message(self, format: str, *log_args) -> None:
+            if not args.quiet:
+                super().log_message(format, *log_args)
+
+    with ThreadingHTTPServer((args.bind, args.port), RootHandler) as server:
+        host, port = server.server_address[:2]
+        print(f"serving {root} at http://{host}:{port}/", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
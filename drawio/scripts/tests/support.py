@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from mxfile import Cell, Geometry, MxFileWriter
+
+
+class TempDirTest(unittest.TestCase):
+    """Runs each test in a scratch directory with its own skill cache."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        old = os.environ.get("DRAWIO_SKILL_CACHE")
+        os.environ["DRAWIO_SKILL_CACHE"] = str(self.tmp / "cache")
+        self.addCleanup(_restore, "DRAWIO_SKILL_CACHE", old)
+
+
+def _restore(name: str, value: str | None) -> None:
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+
+
+def write_chain(path: Path, pages: int = 2, cells: int = 20, compressed: bool = False) -> None:
+    """A file of ``pages`` pages, each a chain of vertices ``v0``, ``v1``, ...
+
+    Edges ``e1``, ``e2``, ... join each vertex to the one before it.
+    """
+    with open(path, "w", encoding="utf-8") as fh, MxFileWriter(fh, compressed) as w:
+        for number in range(pages):
+            w.begin_page(f"Page {number}")
+            for i in range(cells):
+                w.write_cell(Cell(f"v{i}", f"Node {i}", "rounded=1;", "1", vertex=True,
+                                  geometry=Geometry(i * 160, 40, 120, 60)))
+                if i:
+                    w.write_cell(Cell(f"e{i}", "", "", "1", edge=True, source=f"v{i - 1}",
+                                      target=f"v{i}", geometry=Geometry(relative=True)))
+            w.end_page()
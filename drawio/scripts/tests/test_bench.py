@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import unittest
+
+from mxfile.bench import compare
+
+
+def report(median_ms: float, spread_ms: float | None = None) -> dict:
+    result = {"case": "parse", "cells": 1000, "runs": 9, "best_ms": median_ms * 0.9,
+              "median_ms": median_ms}
+    if spread_ms is not None:
+        result["spread_ms"] = spread_ms
+    return {"version": "2", "results": [result]}
+
+
+class CompareTest(unittest.TestCase):
+    def status(self, base: dict, new: dict) -> str:
+        [comparison] = compare(base, new)
+        return comparison.status
+
+    def test_regression_beyond_noise(self) -> None:
+        self.assertEqual(self.status(report(100, 2), report(140, 2)), "regression")
+        self.assertEqual(self.status(report(140, 2), report(100, 2)), "faster")
+
+    def test_noisy_runs_are_not_flagged(self) -> None:
+        self.assertEqual(self.status(report(100, 8), report(140, 8)), "same")
+
+    def test_small_and_old_results(self) -> None:
+        # Below the floor in absolute terms, and a report without spreads.
+        self.assertEqual(self.status(report(1.0, 0), report(2.5, 0)), "same")
+        self.assertEqual(self.status(report(100), report(140)), "regression")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import base64
+import unittest
+import zlib
+from urllib.parse import quote
+
+from mxfile.codec import (
+    compress_diagram, decompress_diagram, iter_decompressed, looks_compressed,
+)
+
+
+def _model(cells: int) -> str:
+    rows = "".join(
+        f'<mxCell id="n{i}" value="Node {i} &amp; ü" style="rounded=1;" vertex="1" parent="1">'
+        f'<mxGeometry x="{i * 7 % 997}" y="{i * 13 % 991}" width="120" height="60" as="geometry"/>'
+        f"</mxCell>"
+        for i in range(cells)
+    )
+    return f'<mxGraphModel><root><mxCell id="0"/><mxCell id="1" parent="0"/>{rows}</root></mxGraphModel>'
+
+
+class CodecTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        xml = _model(10)
+        payload = compress_diagram(xml)
+        self.assertTrue(looks_compressed(payload))
+        self.assertEqual(decompress_diagram(payload), xml)
+
+    def test_escapes_match_encode_uri_component(self) -> None:
+        xml = '<a v="100%3C &amp; %25 ü 😀 -_.!~*\'()"/>'
+        payload = compress_diagram(xml)
+        self.assertEqual(decompress_diagram(payload), xml)
+        quoted = zlib.decompress(base64.b64decode(payload), -zlib.MAX_WBITS)
+        self.assertEqual(quoted, quote(xml, safe="-_.!~*'()").encode("ascii"))
+
+    def test_round_trip_over_one_chunk(self) -> None:
+        # Payloads longer than the 64 KiB decode chunk used to come back
+        # truncated.
+        xml = _model(20000)
+        payload = compress_diagram(xml)
+        self.assertGreater(len(payload), 1 << 16)
+        self.assertEqual(decompress_diagram(payload), xml)
+        self.assertEqual(decompress_diagram(payload.encode("ascii")), xml)
+
+    def test_streamed_chunks(self) -> None:
+        xml = _model(5000)
+        payload = compress_diagram(xml).encode("ascii")
+        chunks = (payload[i:i + 1000] for i in range(0, len(payload), 1000))
+        self.assertEqual(b"".join(iter_decompressed(chunks)).decode("utf-8"), xml)
+
+
+if __name__ == "__main__":
+    unittest.main()
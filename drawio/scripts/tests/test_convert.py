@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import unittest
+
+from mxfile.convert import to_store
+from mxfile.mermaid import parse
+
+SEQUENCE = """sequenceDiagram
+    participant Alice
+    participant Bob
+    participant Carol
+    Alice->>Bob: Hello Bob, how are you?
+    Note right of Bob: Bob thinks about it for a while
+    Note over Alice,Bob: A long note shared by both of them
+    Note left of Alice: left of the first lifeline
+    Bob->>Carol: hi
+    Note right of Carol: right of the last lifeline
+"""
+
+
+class SequenceLayoutTest(unittest.TestCase):
+    def test_notes_clear_other_lifelines(self) -> None:
+        store, (width, _) = to_store(parse(SEQUENCE))
+        cells = list(store.cells())
+        centres = {c.id: c.geometry.x + c.geometry.width / 2
+                   for c in cells if c.id in ("Alice", "Bob", "Carol")}
+        notes = [c for c in cells if c.id.startswith("note")]
+        self.assertEqual(len(notes), 4)
+        for note, own in zip(notes, (["Bob"], ["Alice", "Bob"], ["Alice"], ["Carol"])):
+            x0, x1 = note.geometry.x, note.geometry.x + note.geometry.width
+            self.assertGreaterEqual(x0, 0)
+            self.assertLessEqual(x1, width + 80)
+            for name, centre in centres.items():
+                if name not in own:
+                    self.assertFalse(x0 - 10 < centre < x1 + 10, f"{note.id} crosses {name}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import unittest
+
+from mxfile import CellIndex, CellNotFound, Editor, decompress_diagram, read_cells, recode
+from mxfile.scanner import scan_pages
+from tests.support import TempDirTest, write_chain
+
+
+class EditorTest(TempDirTest):
+    def round_trip(self, compressed: bool) -> None:
+        path = self.tmp / "chain.drawio"
+        write_chain(path, pages=2, cells=10, compressed=compressed)
+        with Editor(path) as ed:
+            ed.update("v3", value="Renamed", geometry={"x": 5})
+            ed.add_vertex("CloudWatch", "shape=cloud;", 900, 200, id="cw", page=1)
+            ed.add_edge("v9", "cw", "metrics", id="m", page=1)
+            self.assertEqual(ed.delete("v5", cascade=True), ["v5", "e5", "e6"])
+
+        cells = {c.id: c for c in read_cells(path, 0)}
+        self.assertEqual(cells["v3"].value, "Renamed")
+        self.assertEqual(cells["v3"].geometry.x, 5)
+        self.assertNotIn("v5", cells)
+        self.assertNotIn("e6", cells)
+        other = {c.id: c for c in read_cells(path, 1)}
+        self.assertEqual((other["m"].source, other["m"].target), ("v9", "cw"))
+        self.assertEqual(other["cw"].value, "CloudWatch")
+
+        # The index was updated incrementally and agrees with a fresh scan.
+        with CellIndex(path) as index:
+            self.assertTrue(index.is_current())
+            incremental = sorted((c.page, c.id, c.start, c.stop) for c in index.cells())
+            index.rebuild()
+            rebuilt = sorted((c.page, c.id, c.start, c.stop) for c in index.cells())
+        self.assertEqual(incremental, rebuilt)
+
+        # And the next edit through that index still lands in the right place.
+        with Editor(path) as ed:
+            ed.update("cw", value="Alarms", page=1)
+        self.assertEqual({c.id: c for c in read_cells(path, 1)}["cw"].value, "Alarms")
+
+    def test_plain(self) -> None:
+        self.round_trip(compressed=False)
+
+    def test_compressed(self) -> None:
+        self.round_trip(compressed=True)
+
+    def test_shrinking_edit_in_place(self) -> None:
+        path = self.tmp / "chain.drawio"
+        write_chain(path, pages=1, cells=5)
+        size = path.stat().st_size
+        with Editor(path) as ed:
+            ed.update("v2", value="x")
+        self.assertEqual(path.stat().st_size, size)
+        self.assertEqual({c.id: c for c in read_cells(path)}["v2"].value, "x")
+
+    def test_compressed_delete_leaves_no_blank_lines(self) -> None:
+        path = self.tmp / "chain.drawio"
+        # Compressing an indented file keeps its line breaks in the payload.
+        write_chain(path, pages=1, cells=5)
+        recode(path, compressed=True)
+        with Editor(path) as ed:
+            ed.delete("v4", cascade=True)
+        data = path.read_bytes()
+        page = next(iter(scan_pages(data)))
+        xml = decompress_diagram(data[page.content_start:page.content_stop])
+        self.assertNotIn("e4", xml)
+        self.assertIn('id="e3"', xml)
+        self.assertFalse([line for line in xml.splitlines() if not line.strip()])
+
+    def test_plain_delete_leaves_no_blank_lines(self) -> None:
+        path = self.tmp / "chain.drawio"
+        write_chain(path, pages=2, cells=5)
+        with Editor(path) as ed:
+            ed.add_vertex("Queue", x=0, y=200, id="q")
+            ed.add_edge("v4", "q", id="q_in")
+        with Editor(path) as ed:
+            self.assertEqual(ed.delete("q", cascade=True), ["q", "q_in"])
+            ed.delete("v4", cascade=True, page=1)
+        text = path.read_text(encoding="utf-8")
+        self.assertFalse([line for line in text.splitlines() if not line.strip()])
+        self.assertNotIn('id="q"', text)
+        self.assertEqual(len(list(read_cells(path, 1))), 2 + 7)
+
+    def test_missing_cell(self) -> None:
+        path = self.tmp / "chain.drawio"
+        write_chain(path, pages=1, cells=3)
+        with Editor(path) as ed, self.assertRaises(CellNotFound):
+            ed.delete("nope")
+
+
+if __name__ == "__main__":
+    unittest.main()
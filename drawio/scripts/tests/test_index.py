@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import unittest
+
+from mxfile import CellIndex, read_cells
+from tests.support import TempDirTest, write_chain
+
+
+class CellIndexTest(TempDirTest):
+    def check_file(self, compressed: bool) -> None:
+        path = self.tmp / "chain.drawio"
+        write_chain(path, pages=2, cells=20, compressed=compressed)
+        with CellIndex(path) as index:
+            self.assertEqual([p.compressed for p in index.pages()], [compressed] * 2)
+            self.assertEqual(index.count(0), 2 + 20 + 19)
+            self.assertEqual(index.count(), 2 * (2 + 20 + 19))
+            self.assertEqual(index.page("Page 1").index, 1)
+            self.assertIsNone(index.find("missing"))
+            self.assertEqual(
+                sorted(c.id for c in index.edges("v5", page=1)), ["e5", "e6"]
+            )
+            self.assertEqual(len(index.children("1")), 39)
+            # Each indexed range holds exactly that cell's element.
+            by_id = {c.id: c for c in read_cells(path, 1)}
+            for cell in index.cells(1):
+                xml = index.read_cell(cell, index.page(1)).decode("utf-8")
+                self.assertIn(f'id="{cell.id}"', xml)
+                self.assertIn(cell.id, by_id)
+
+    def test_plain(self) -> None:
+        self.check_file(compressed=False)
+
+    def test_compressed(self) -> None:
+        self.check_file(compressed=True)
+
+    def test_refresh_after_outside_change(self) -> None:
+        path = self.tmp / "chain.drawio"
+        write_chain(path, pages=1, cells=5)
+        with CellIndex(path) as index:
+            self.assertTrue(index.is_current())
+            write_chain(path, pages=1, cells=8)
+            self.assertTrue(index.refresh())
+            self.assertEqual(index.count(), 2 + 8 + 7)
+            self.assertIsNotNone(index.find("v7"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import unittest
+
+from mxfile.ingest import Columns, scan
+from tests.support import TempDirTest
+
+
+class ScanTest(TempDirTest):
+    def test_more_kinds_than_a_short_holds(self) -> None:
+        path = self.tmp / "assets.csv"
+        rows = 70000
+        path.write_text("id,type\n" + "".join(f"r{i},type{i}\n" for i in range(rows)))
+        sk = scan(path, Columns(kind="type"))
+        self.assertEqual(len(sk.kinds), rows)
+        self.assertEqual(sk.kind[-1], rows - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
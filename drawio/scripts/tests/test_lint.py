@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+from mxfile import Cell, Geometry, MxFileWriter
+from mxfile.lint import FileLinter
+
+from .support import TempDirTest
+
+EXAMPLES = Path(__file__).resolve().parents[2] / "examples"
+
+
+class LintTest(TempDirTest):
+    def lint(self, edge_style: str) -> list[str]:
+        path = self.tmp / "lanes.drawio"
+        with open(path, "w", encoding="utf-8") as fh, MxFileWriter(fh) as w:
+            w.begin_page("Page 1")
+            w.write_cell(Cell("lane", "Lane", "swimlane;", "1", vertex=True,
+                              geometry=Geometry(200, 0, 200, 200)))
+            for cell_id, x in (("a", 0), ("b", 500)):
+                w.write_cell(Cell(cell_id, cell_id, "rounded=1;", "1", vertex=True,
+                                  geometry=Geometry(x, 70, 80, 60)))
+            w.write_cell(Cell("e", "", edge_style, "1", edge=True, source="a", target="b",
+                              geometry=Geometry(relative=True)))
+            w.end_page()
+        return [f.rule for f in FileLinter(path).run()]
+
+    def test_straight_edge_through_lane(self) -> None:
+        self.assertEqual(self.lint("endArrow=block;"), ["swimlane-crossing"])
+
+    def test_routed_edge_is_left_to_draw_io(self) -> None:
+        self.assertEqual(self.lint("edgeStyle=orthogonalEdgeStyle;"), [])
+
+    def test_notes_and_frames_on_lifelines(self) -> None:
+        path = self.tmp / "sequence.mmd"
+        path.write_text(
+            "sequenceDiagram\n"
+            "    participant A as Alice\n"
+            "    participant B as Bob\n"
+            "    A->>B: hello there\n"
+            "    Note over A,B: a fairly long note spanning both lifelines\n"
+            "    loop every minute\n"
+            "        B-->>A: ack\n"
+            "    end\n",
+            encoding="utf-8",
+        )
+        self.assertEqual(FileLinter(path).run(), [])
+
+    def test_incremental_matches_from_scratch(self) -> None:
+        path = self.tmp / "grid.drawio"
+
+        def page(lane_x: float, points: list[tuple[float, float]], moved: float) -> bytes:
+            with open(path, "w", encoding="utf-8") as fh, MxFileWriter(fh) as w:
+                w.begin_page("Page 1")
+                w.write_cell(Cell("lane", "Lane", "swimlane;", "1", vertex=True,
+                                  geometry=Geometry(lane_x, 0, 200, 200)))
+                # Enough siblings for the layer to get a grid of its own.
+                for n in range(80):
+                    x = moved if n == 0 else 1000 + 100 * (n % 10)
+                    w.write_cell(Cell(f"v{n}", "", "rounded=1;", "1", vertex=True,
+                                      geometry=Geometry(x, 300 + 100 * (n // 10), 80, 60)))
+                w.write_cell(Cell("e", "", "edgeStyle=orthogonalEdgeStyle;", "1", edge=True,
+                                  source="v1", target="v2",
+                                  geometry=Geometry(relative=True, points=points)))
+                w.end_page()
+            return path.read_bytes()
+
+        linter = FileLinter(path)
+        above = [(1140, 100), (240, 100)]
+        # No path to check, then one through the lane, then the lane moves
+        # off it and back while a vertex moves onto a sibling.
+        for version, rules in (
+            (page(200, [], 0), []),
+            (page(200, above, 0), ["swimlane-crossing"]),
+            (page(2000, above, 0), []),
+            (page(600, above, 1130), ["overlap", "overlap", "swimlane-crossing"]),
+        ):
+            found = linter.run(version)
+            self.assertEqual(found, FileLinter(path).run(version))
+            self.assertEqual([f.rule for f in found], rules)
+
+    def test_examples_are_clean(self) -> None:
+        for path in sorted(EXAMPLES.iterdir()):
+            with self.subTest(path.name):
+                self.assertEqual(FileLinter(path).run(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
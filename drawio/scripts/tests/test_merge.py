@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import io
+import unittest
+
+from mxfile import Cell, Geometry, MxFileWriter, read_cells
+from mxfile.diff import diff
+from mxfile.merge import merge
+from mxfile.scanner import scan_header, scan_pages
+
+HEADER = {"host": "app.diagrams.net", "agent": "Mozilla/5.0", "version": "24.7.17"}
+
+
+def document(values: dict[str, str]) -> bytes:
+    """Two pages, the first plain and the second compressed."""
+    out = io.StringIO()
+    with MxFileWriter(out, attrs=HEADER) as w:
+        for number, compressed in enumerate((False, True)):
+            w.begin_page(f"Page {number}", f"p{number}", compressed=compressed)
+            for cell_id, value in values.items():
+                w.write_cell(Cell(cell_id, value, "rounded=1;", "1", vertex=True,
+                                  geometry=Geometry(0, 0, 120, 60)))
+            w.end_page()
+    return out.getvalue().encode("utf-8")
+
+
+class MergeTest(unittest.TestCase):
+    def test_keeps_header_and_page_compression(self) -> None:
+        base = document({"a": "A", "b": "B"})
+        ours = document({"a": "A ours", "b": "B"})
+        theirs = document({"a": "A", "b": "B theirs"})
+        result = merge(base, ours, theirs)
+        self.assertEqual(result.conflicts, [])
+        out = io.StringIO()
+        result.write(out)
+        merged = out.getvalue().encode("utf-8")
+
+        self.assertEqual(scan_header(merged), HEADER)
+        self.assertEqual([p.compressed for p in scan_pages(merged)], [False, True])
+        for page in (0, 1):
+            values = {c.id: c.value for c in read_cells(io.BytesIO(merged), page)}
+            self.assertEqual((values["a"], values["b"]), ("A ours", "B theirs"))
+
+    def test_keeps_attributes_the_model_does_not_name(self) -> None:
+        base = lanes()
+        ours = lanes(collapsed=' collapsed="1"', text="Note ours")
+        theirs = lanes(target_x="480", text_style="text;html=1;fontSize=14;")
+        self.assertEqual(
+            [(c.id, c.aspects) for c in diff(base, theirs)[0].changes],
+            [("e", ("other",)), ("t", ("style",))],
+        )
+        result = merge(base, ours, theirs)
+        self.assertEqual(result.conflicts, [])
+        out = io.StringIO()
+        result.write(out)
+        merged = out.getvalue().encode("utf-8")
+
+        cells = {c.id: c for c in read_cells(io.BytesIO(merged))}
+        self.assertEqual(cells["lane"].extra, {"collapsed": "1"})
+        self.assertEqual(cells["e"].geometry.children,
+                         ['<mxPoint x="480" y="100" as="targetPoint"/>'])
+        text = cells["t"]
+        self.assertEqual((text.value, text.style), ("Note ours", "text;html=1;fontSize=14;"))
+        self.assertEqual(text.extra, {"connectable": "0"})
+        # Only the inputs' model attributes, not the writer's defaults.
+        self.assertEqual(next(scan_pages(merged)).model, {"grid": "1"})
+
+
+def lanes(
+    collapsed: str = "", target_x: str = "400", text: str = "Note",
+    text_style: str = "text;html=1;",
+) -> bytes:
+    """A swimlane, an edge with a loose end and a text cell."""
+    return f"""<mxfile host="test">
+  <diagram name="Page-1" id="p0">
+    <mxGraphModel grid="1">
+      <root>
+        <mxCell id="0"/>
+        <mxCell id="1" parent="0"/>
+        <mxCell id="lane" value="Lane" style="swimlane;" parent="1" vertex="1"{collapsed}>
+          <mxGeometry x="0" y="0" width="200" height="200" as="geometry"/>
+        </mxCell>
+        <mxCell id="e" value="" style="endArrow=block;" parent="1" source="lane" edge="1">
+          <mxGeometry relative="1" as="geometry">
+            <mxPoint x="{target_x}" y="100" as="targetPoint"/>
+          </mxGeometry>
+        </mxCell>
+        <mxCell id="t" value="{text}" style="{text_style}" parent="1" vertex="1" connectable="0">
+          <mxGeometry x="300" y="0" width="80" height="30" as="geometry"/>
+        </mxCell>
+      </root>
+    </mxGraphModel>
+  </diagram>
+</mxfile>
+""".encode("utf-8")
+
+
+if __name__ == "__main__":
+    unittest.main()
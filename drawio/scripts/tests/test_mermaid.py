@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import unittest
+
+from mxfile.mermaid import parse
+
+
+class MermaidTest(unittest.TestCase):
+    def test_statements_on_header_line(self) -> None:
+        graph = parse("graph TD;A-->B;B-->C")
+        self.assertEqual(graph.direction, "TB")
+        self.assertEqual([(e.source, e.target) for e in graph.edges], [("A", "B"), ("B", "C")])
+
+    def test_semicolon_inside_label(self) -> None:
+        graph = parse('flowchart LR; A["x;y"] --> B;\n  B --> C;')
+        self.assertEqual(graph.direction, "LR")
+        self.assertEqual(graph.nodes["A"].label, "x;y")
+        self.assertEqual(len(graph.edges), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import unittest
+
+import mxicons
+from mxfile import Cell, Geometry, MxFileWriter
+from tests.support import TempDirTest
+
+
+class CheckTest(TempDirTest):
+    def test_seed_catalog_only_warns(self) -> None:
+        path = self.tmp / "icons.drawio"
+        with open(path, "w", encoding="utf-8") as fh, MxFileWriter(fh) as w:
+            w.begin_page()
+            w.write_cell(Cell("a", "", "shape=mxgraph.aws4.not_in_the_seed;", "1", vertex=True,
+                              geometry=Geometry(0, 0, 78, 78)))
+            w.end_page()
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            status = mxicons.main(["check", str(path)])
+        self.assertEqual(status, 0)
+        self.assertIn("warning: icon not in the seed catalog", out.getvalue())
+        self.assertIn("mxicons.py build", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from mxfile import render
+from mxrender import output_names
+
+from .support import TempDirTest
+
+
+class OutputNamesTest(unittest.TestCase):
+    def test_drawio_and_mermaid_twins(self) -> None:
+        sources = [(Path("d/arch.drawio"), Path()), (Path("d/arch.mmd"), Path())]
+        self.assertEqual(output_names(sources, None), ["arch", "arch.mmd"])
+
+    def test_same_name_under_two_roots(self) -> None:
+        sources = [(Path("a/x/arch.drawio"), Path("x")), (Path("b/x/arch.drawio"), Path("x"))]
+        self.assertEqual(output_names(sources, "out"), ["arch", "arch.2"])
+        # Rendered next to their sources they do not clash.
+        self.assertEqual(output_names(sources, None), ["arch", "arch"])
+
+
+class MermaidKeyTest(TempDirTest):
+    def test_key_follows_the_converter(self) -> None:
+        source = self.tmp / "flow.mmd"
+        source.write_text("graph TD\n    A --> B\n", encoding="utf-8")
+        [before] = render.load_pages(source)
+        with mock.patch.object(render, "CONVERTER_VERSION", "next"):
+            [after] = render.load_pages(source)
+        self.assertNotEqual(before.key, after.key)
+
+
+if __name__ == "__main__":
+    unittest.main()
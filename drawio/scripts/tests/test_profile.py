@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import tracemalloc
+import unittest
+
+from mxfile.profile import _configure
+
+
+class ConfigureTest(unittest.TestCase):
+    def test_off_values_disable(self) -> None:
+        for value in ("", "0", "off", "OFF", "false", "no", " off , "):
+            with self.subTest(value=value):
+                self.assertIsNone(_configure(value))
+
+    def test_options(self) -> None:
+        if not tracemalloc.is_tracing():
+            self.addCleanup(tracemalloc.stop)
+        profiler = _configure("on,alloc,/tmp/profile.jsonl")
+        self.assertTrue(profiler.alloc)
+        self.assertEqual(profiler.output, "/tmp/profile.jsonl")
+        profiler = _configure("true")
+        self.assertEqual((profiler.alloc, profiler.output), (False, None))
+        self.assertEqual(_configure("profile.json").output, "profile.json")
+
+    def test_unknown_words_are_not_paths(self) -> None:
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err):
+            self.assertIsNone(_configure("verbose"))
+            self.assertIsNone(_configure("1,verbose").output)
+        self.assertIn("ignoring 'verbose'", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
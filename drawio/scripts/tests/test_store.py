@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+import unittest
+
+from mxfile import MxFileWriter, read_cells
+from mxfile.errors import CellNotFound, MxFileError
+from mxfile.store import CellStore
+
+
+class CellStoreTest(unittest.TestCase):
+    def test_styles_by_name_string_and_builtin(self) -> None:
+        store = CellStore()
+        store.styles.define("box", "rounded=1;html=1;")
+        store.add_vertex("a", "A", "box", fillColor="#FFF")
+        store.add_vertex("b", "B", "ellipse")
+        store.add_vertex("c", "C", "ellipse;html=1;")
+        store.add_vertex("d", "D")
+        self.assertEqual(store.get("a").style, "rounded=1;html=1;fillColor=#FFF;")
+        self.assertEqual(store.get("b").style, "ellipse;")
+        self.assertEqual(store.get("c").style, "ellipse;html=1;")
+        self.assertEqual(store.get("d").style, "")
+        self.assertEqual(store.get("a", named=True).style, "box;fillColor=#FFF;")
+
+    def test_set_style_and_restyle(self) -> None:
+        store = CellStore()
+        store.styles.define("box", "rounded=1;")
+        store.add_vertex("a", "A", "box", fillColor="#FFF", strokeColor="#000")
+        store.add_vertex("b", "B", "box", strokeColor="#000", fillColor="#FFF")
+        store.set_style("a", fillColor=None, dashed="1")
+        self.assertEqual(store.get("a").style, "rounded=1;strokeColor=#000;dashed=1;")
+        store.styles.update("box", rounded="0")
+        self.assertEqual(store.get("b").style, "rounded=0;fillColor=#FFF;strokeColor=#000;")
+
+    def test_write_round_trip(self) -> None:
+        store = CellStore()
+        store.add_vertex("a", "A", "ellipse", 10, 20, 80, 40)
+        store.add_vertex("b", "B", "rounded=1;", 200, 20)
+        store.add_edge("e", "a", "b", "go", "endArrow=block;", points=[(150, 40)])
+        store.move("b", 300, 30)
+        out = io.StringIO()
+        with MxFileWriter(out) as writer:
+            writer.begin_page("Page")
+            store.write(writer)
+            writer.end_page()
+        cells = {c.id: c for c in read_cells(io.BytesIO(out.getvalue().encode("utf-8")))}
+        self.assertEqual(list(cells), ["0", "1", "a", "b", "e"])
+        self.assertEqual((cells["b"].geometry.x, cells["b"].geometry.y), (300, 30))
+        edge = cells["e"]
+        self.assertEqual((edge.source, edge.target, edge.geometry.points), ("a", "b", [(150, 40)]))
+
+    def test_errors(self) -> None:
+        store = CellStore()
+        store.add_vertex("a")
+        with self.assertRaises(MxFileError):
+            store.add_vertex("a")
+        with self.assertRaises(CellNotFound):
+            store.add_edge("e", "a", "missing")
+        self.assertNotIn("e", store)
+
+
+if __name__ == "__main__":
+    unittest.main()
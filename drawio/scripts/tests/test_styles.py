@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import unittest
+import xml.etree.ElementTree as ET
+
+from mxfile.errors import MxFileError
+from mxfile.styles import StyleTable, format_style, parse_style
+
+
+class StyleTableTest(unittest.TestCase):
+    def test_intern_shares_equal_styles(self) -> None:
+        table = StyleTable()
+        a = table.intern("rounded=1;whiteSpace=wrap;")
+        self.assertEqual(table.intern({"rounded": "1", "whiteSpace": "wrap"}), a)
+        self.assertNotEqual(table.intern("rounded=0;"), a)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.props(table.intern("ellipse;html=1;")),
+                         {"ellipse": None, "html": "1"})
+
+    def test_update_restyles_every_variant(self) -> None:
+        table = StyleTable()
+        base = table.define("icon", "aspect=fixed;fontSize=10;")
+        red = table.variant(base, {"fillColor": "#FF0000"})
+        plain = table.variant(base)
+        self.assertEqual(table.render(red), "aspect=fixed;fontSize=10;fillColor=#FF0000;")
+        table.update("icon", fontSize="12", aspect=None)
+        self.assertEqual(table.render(red), "fontSize=12;fillColor=#FF0000;")
+        self.assertEqual(table.render(plain), "fontSize=12;")
+        self.assertEqual(table.intern("fontSize=12;"), base)
+        with self.assertRaises(MxFileError):
+            table.update("missing", fontSize="1")
+
+    def test_variant_ignores_override_order(self) -> None:
+        table = StyleTable()
+        base = table.intern("html=1;")
+        a = table.variant(base, {"fillColor": "#FFF", "shape": "cloud"})
+        b = table.variant(base, {"shape": "cloud", "fillColor": "#FFF"})
+        self.assertEqual(a, b)
+        self.assertEqual(table.render(b), "html=1;fillColor=#FFF;shape=cloud;")
+        self.assertEqual(table.variant_parts(a), (base, {"fillColor": "#FFF", "shape": "cloud"}))
+
+    def test_named_rendering_and_stylesheet(self) -> None:
+        table = StyleTable()
+        lane = table.define("lane", "swimlane;startSize=30;")
+        variant = table.variant(lane, {"fillColor": "#E3F2FD"})
+        self.assertEqual(table.render(variant, named=True), "swimlane;lane;fillColor=#E3F2FD;")
+        sheet = ET.fromstring(table.stylesheet())
+        [entry] = sheet
+        self.assertEqual(entry.get("as"), "lane")
+        self.assertEqual([(e.get("as"), e.get("value")) for e in entry], [("startSize", "30")])
+
+    def test_parse_and_format_round_trip(self) -> None:
+        names, props = parse_style("ellipse;fillColor=#FFF;html=1")
+        self.assertEqual((names, props), (["ellipse"], {"fillColor": "#FFF", "html": "1"}))
+        self.assertEqual(format_style(props, names), "ellipse;fillColor=#FFF;html=1;")
+
+
+if __name__ == "__main__":
+    unittest.main()
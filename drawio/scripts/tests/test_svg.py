@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import unittest
+import xml.etree.ElementTree as ET
+
+from mxfile import Cell, Geometry
+from mxfile.svg import render_svg
+
+
+def box(style: str) -> list[Cell]:
+    return [Cell("0"), Cell("1", parent="0"),
+            Cell("a", "A", style, "1", vertex=True, geometry=Geometry(0, 0, 120, 60))]
+
+
+class SvgTest(unittest.TestCase):
+    def test_style_values_cannot_add_attributes(self) -> None:
+        svg = render_svg(box('fillColor=red" onload="alert(1);fontColor=#000<b>;'))
+        ET.fromstring(svg)  # still well-formed
+        self.assertNotIn("onload", svg)
+        self.assertNotIn("<b>", svg)
+
+    def test_malformed_colour_falls_back(self) -> None:
+        svg = render_svg(box("fillColor=a&b;strokeColor=rgb(1, 2, 3);"))
+        rect = ET.fromstring(svg).findall(".//{http://www.w3.org/2000/svg}rect")[-1]
+        self.assertEqual((rect.get("fill"), rect.get("stroke")), ("#FFFFFF", "rgb(1, 2, 3)"))
+
+    def test_colours_are_kept(self) -> None:
+        svg = render_svg(box("fillColor=#E1D5E7;strokeColor=none;"))
+        self.assertIn('fill="#E1D5E7" stroke="none"', svg)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,16 @@
 #   ./install.sh drawio --target /path/to/project Install one skill (project-level)
 #   ./install.sh --dry-run                        Preview what would be installed
 #   ./install.sh --force                          Overwrite existing installs
+#   ./install.sh --vendor-viewers                 Also download pinned viewer engines
+#                                                 into each skill's viewers/vendor/
+#   ./install.sh --build-icons                    Also download draw.io's pinned AWS/GCP
+#                                                 stencils and Azure icon images, and
+#                                                 compile the icon catalog
+#
+# Vendoring sources can point at a mirror (http(s):// or file://) for hosts
+# without internet access: DRAWIO_VIEWER_URL, MERMAID_URL, DRAWIO_STENCIL_URL.
+# A file:// DRAWIO_STENCIL_URL is listed locally; an http(s) mirror also needs
+# DRAWIO_FILES_URL, a jsDelivr-style flat listing of the draw.io tree.
 
 set -euo pipefail
 
@@ -16,6 +26,8 @@ SKILLS_SRC="$REPO_DIR/.claude/skills"
 
 DRY_RUN=false
 FORCE=false
+VENDOR=false
+ICONS=false
 TARGET_SKILL=""
 TARGET_DIR=""
 
@@ -24,6 +36,8 @@ while [[ $# -gt 0 ]]; do
   case $1 in
     --dry-run) DRY_RUN=true; shift ;;
     --force)   FORCE=true; shift ;;
+    --vendor-viewers) VENDOR=true; shift ;;
+    --build-icons) ICONS=true; shift ;;
     --target)
       [[ -z "${2:-}" ]] && { echo "ERROR: --target requires a directory path"; exit 1; }
       TARGET_DIR="$2"; shift 2 ;;
@@ -42,6 +56,116 @@ fi
 
 mkdir -p "$SKILLS_DST"
 
+# Pinned viewer engines for --vendor-viewers
+DRAWIO_VERSION="24.7.17"
+MERMAID_VERSION="11.4.1"
+DRAWIO_VIEWER_URL="${DRAWIO_VIEWER_URL:-https://cdn.jsdelivr.net/gh/jgraph/drawio@v$DRAWIO_VERSION/src/main/webapp/js/viewer-static.min.js}"
+MERMAID_URL="${MERMAID_URL:-https://cdn.jsdelivr.net/npm/mermaid@$MERMAID_VERSION/dist/mermaid.min.js}"
+# Base of draw.io's webapp for --build-icons (stencils/, js/diagramly/sidebar/)
+DRAWIO_STENCIL_URL="${DRAWIO_STENCIL_URL:-https://cdn.jsdelivr.net/gh/jgraph/drawio@v$DRAWIO_VERSION/src/main/webapp}"
+ICON_SOURCES=(stencils/aws4.xml stencils/gcp2.xml js/diagramly/sidebar/Sidebar-AWS4.js js/diagramly/sidebar/Sidebar-GCP2.js)
+# Azure icons are one SVG each, so their directory is listed and fetched whole
+ICON_TREES=(img/lib/azure2)
+DRAWIO_FILES_URL="${DRAWIO_FILES_URL:-https://data.jsdelivr.com/v1/packages/gh/jgraph/drawio@v$DRAWIO_VERSION?structure=flat}"
+
+sha256() {
+  if command -v sha256sum >/dev/null; then sha256sum "$1" | cut -d' ' -f1
+  else shasum -a 256 "$1" | cut -d' ' -f1
+  fi
+}
+
+# fetch <url> <file> <version>: download unless the pinned version is present
+fetch() {
+  local url="$1" file="$2" version="$3"
+  local stamp="$file.version"
+  if [[ -s "$file" && -f "$stamp" && "$(cat "$stamp")" == "$version $url" && "$FORCE" == false ]]; then
+    echo "  SKIP  $(basename "$file") $version (already vendored)"
+    return
+  fi
+  curl -fsSL --retry 2 -o "$file.tmp" "$url" || { rm -f "$file.tmp"; echo "  ERROR: could not download $url"; exit 1; }
+  mv "$file.tmp" "$file"
+  echo "$version $url" > "$stamp"
+  # Precompressed copies for scripts/mxserve.py
+  gzip -9 -n -k -f "$file"
+  if command -v brotli >/dev/null; then brotli -q 11 -k -f "$file"; fi
+  echo "  OK    $(basename "$file") $version ($(sha256 "$file"))"
+}
+
+# list_tree <dir>: the SVGs under a directory of draw.io's webapp, relative to it
+list_tree() {
+  local dir="$1"
+  if [[ "$DRAWIO_STENCIL_URL" == file://* ]]; then
+    (cd "${DRAWIO_STENCIL_URL#file://}/$dir" && find . -name '*.svg' | sed 's|^\./||' | sort)
+    return
+  fi
+  curl -fsSL --retry 2 "$DRAWIO_FILES_URL" | python3 -c '
+import json, sys
+prefix = "/src/main/webapp/" + sys.argv[1] + "/"
+for item in json.load(sys.stdin).get("files", []):
+    name = item.get("name", "")
+    if name.startswith(prefix) and name.endswith(".svg"):
+        print(name[len(prefix):])
+' "$dir"
+}
+
+# fetch_tree <dir> <dest> <version>: download a webapp directory's SVGs in one curl run
+fetch_tree() {
+  local dir="$1" dest="$2" version="$3"
+  local stamp="$dest.version" config count
+  if [[ -d "$dest" && -f "$stamp" && "$(cat "$stamp")" == "$version $DRAWIO_STENCIL_URL/$dir" && "$FORCE" == false ]]; then
+    echo "  SKIP  $dir $version (already vendored)"
+    return
+  fi
+  config="$(mktemp)"
+  list_tree "$dir" | while IFS= read -r path; do
+    printf 'url = "%s/%s/%s"\noutput = "%s.tmp/%s"\n' \
+      "$DRAWIO_STENCIL_URL" "$dir" "${path// /%20}" "$dest" "$path"
+  done > "$config" || { rm -f "$config"; echo "  ERROR: could not list $dir"; exit 1; }
+  count="$(grep -c '^url' "$config" || true)"
+  if [[ "$count" == 0 ]]; then
+    rm -f "$config"; echo "  ERROR: no SVGs under $dir"; exit 1
+  fi
+  rm -rf "$dest.tmp"
+  curl -fsS --retry 2 --fail-early --create-dirs -K "$config" \
+    || { rm -rf "$config" "$dest.tmp"; echo "  ERROR: could not download $dir"; exit 1; }
+  rm -rf "$config" "$dest"
+  mv "$dest.tmp" "$dest"
+  echo "$version $DRAWIO_STENCIL_URL/$dir" > "$stamp"
+  echo "  OK    $dir $version ($count files)"
+}
+
+vendor_viewers() {
+  local viewers="$1/viewers"
+  [[ -d "$viewers" ]] || return 0
+  if [[ "$DRY_RUN" == true ]]; then
+    echo "  DRY   draw.io viewer $DRAWIO_VERSION, mermaid $MERMAID_VERSION → $viewers/vendor"
+    return
+  fi
+  mkdir -p "$viewers/vendor"
+  fetch "$DRAWIO_VIEWER_URL" "$viewers/vendor/viewer-static.min.js" "$DRAWIO_VERSION"
+  fetch "$MERMAID_URL" "$viewers/vendor/mermaid.min.js" "$MERMAID_VERSION"
+}
+
+build_icons() {
+  local scripts="$1/scripts"
+  [[ -f "$scripts/mxicons.py" ]] || return 0
+  if [[ "$DRY_RUN" == true ]]; then
+    echo "  DRY   draw.io $DRAWIO_VERSION stencils and Azure images → icon catalog"
+    return
+  fi
+  local src="$1/icons-src" files=() path
+  mkdir -p "$src"
+  for path in "${ICON_SOURCES[@]}"; do
+    fetch "$DRAWIO_STENCIL_URL/$path" "$src/$(basename "$path")" "$DRAWIO_VERSION"
+    files+=("$src/$(basename "$path")")
+  done
+  for path in "${ICON_TREES[@]}"; do
+    fetch_tree "$path" "$src/$path" "$DRAWIO_VERSION"
+    files+=("$src/$path")
+  done
+  python3 "$scripts/mxicons.py" build "${files[@]}" | sed 's/^/  OK    /'
+}
+
 install_skill() {
   local skill_name="$1"
   local src="$SKILLS_SRC/$skill_name"
@@ -54,16 +178,20 @@ install_skill() {
 
   if [[ -d "$dst" && "$FORCE" == false ]]; then
     echo "  SKIP  $skill_name (already installed — use --force to overwrite)"
-    return
-  fi
-
-  if [[ "$DRY_RUN" == true ]]; then
+  elif [[ "$DRY_RUN" == true ]]; then
     echo "  DRY   $src → $dst"
   else
     rm -rf "$dst"
     cp -r "$src" "$dst"
     echo "  OK    $skill_name → $dst"
   fi
+
+  if [[ "$VENDOR" == true ]]; then
+    vendor_viewers "$dst"
+  fi
+  if [[ "$ICONS" == true ]]; then
+    build_icons "$dst"
+  fi
 }
 
 echo "Installing Claude Code skills to $SKILLS_DST"